@@ -0,0 +1,135 @@
+"""Decode throughput for stored memories.
+
+Compares the previous decoding path (``datetime.strptime`` for every
+timestamp and :mod:`json` for every metadata/payload column) against
+:mod:`copal_cli.memory.codec` with ``fromisoformat`` timestamps, for both
+SQLite rows and NetworkX JSON payloads.
+
+Usage::
+
+    python benchmarks/bench_codec.py --count 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from copal_cli.memory import codec  # noqa: E402
+from copal_cli.memory.models import ISO_FORMAT, Memory, MemoryType, _now  # noqa: E402
+from copal_cli.memory.scope import ScopeManager  # noqa: E402
+from copal_cli.memory.sqlite_store import SQLiteMemoryStore  # noqa: E402
+
+
+def _legacy_datetime(value: str | None) -> datetime | None:
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, ISO_FORMAT)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", ""))
+
+
+def _legacy_row(row: sqlite3.Row) -> Memory:
+    return Memory(
+        id=row["id"],
+        type=MemoryType(row["type"]),
+        content=row["content"],
+        scope=row["scope"],
+        metadata=json.loads(row["metadata"] or "{}"),
+        created_at=_legacy_datetime(row["created_at"]),
+        updated_at=_legacy_datetime(row["updated_at"]),
+        valid_from=_legacy_datetime(row["valid_from"]),
+        valid_until=_legacy_datetime(row["valid_until"]),
+        importance=float(row["importance"]),
+        access_count=int(row["access_count"] or 0),
+        last_accessed=_legacy_datetime(row["last_accessed"]),
+    )
+
+
+def _legacy_payload(payload: str) -> Memory:
+    data = json.loads(payload)
+    return Memory(
+        id=data["id"],
+        type=MemoryType(data["type"]),
+        content=data.get("content", ""),
+        scope=data.get("scope", "default"),
+        metadata=data.get("metadata", {}) or {},
+        created_at=_legacy_datetime(data.get("created_at")),
+        updated_at=_legacy_datetime(data.get("updated_at")),
+        valid_from=_legacy_datetime(data.get("valid_from")),
+        valid_until=_legacy_datetime(data.get("valid_until")),
+        importance=float(data.get("importance", 0.5)),
+        access_count=int(data.get("access_count", 0)),
+        last_accessed=_legacy_datetime(data.get("last_accessed")),
+    )
+
+
+def _memories(count: int) -> list[Memory]:
+    now = _now()
+    return [
+        Memory(
+            id=f"m{i}",
+            type=MemoryType.NOTE,
+            content=f"note {i} about the build pipeline",
+            scope="bench",
+            metadata={"topic": "ci", "task_id": str(i % 50), "tags": ["a", "b"]},
+            valid_from=now,
+            last_accessed=now,
+        )
+        for i in range(count)
+    ]
+
+
+def _rate(count: int, decode, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        decode(item)
+    return count / (time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=20_000)
+    args = parser.parse_args()
+    memories = _memories(args.count)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        config = {"backend": "sqlite"}
+        store = SQLiteMemoryStore(
+            target_root=root,
+            db_path=root / ".copal" / "memory.db",
+            config=config,
+            scope_manager=ScopeManager.from_config(root, config),
+        )
+        store.upsert_many(memories)
+        with store._get_connection() as conn:
+            rows = conn.execute("SELECT * FROM memories").fetchall()
+        store.close()
+
+    payloads = [codec.dumps(memory.to_dict()) for memory in memories]
+
+    print(f"codec backend: {codec.BACKEND}")
+    print(f"{'source':<16} {'legacy/sec':>12} {'current/sec':>12} {'speed-up':>9}")
+    cases = (
+        ("sqlite rows", rows, _legacy_row, SQLiteMemoryStore._row_to_memory),
+        ("json payloads", payloads, _legacy_payload, lambda p: Memory.from_dict(codec.loads(p))),
+    )
+    for label, items, legacy, current in cases:
+        old = _rate(args.count, legacy, items)
+        new = _rate(args.count, current, items)
+        print(f"{label:<16} {old:>12,.0f} {new:>12,.0f} {new / old:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Search micro-benchmark for :class:`MemoryQueryEngine`.
+
+Compares the inverted token index against a linear scan of every memory
+(what ``search`` did before the index existed) at several corpus sizes.
+
+Usage::
+
+    python benchmarks/bench_query_index.py --sizes 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import networkx as nx  # noqa: E402
+
+from copal_cli.memory.models import Memory, MemoryType  # noqa: E402
+from copal_cli.memory.query import MemoryQueryEngine  # noqa: E402
+
+QUERIES = ["redis", "session storage", "auth* AND token", "cache OR queue", "word4711"]
+VOCABULARY = [
+    "redis", "session", "storage", "auth", "authentication", "token", "cache",
+    "queue", "deploy", "schema", "migration", "index", "latency", "worker",
+]
+
+
+def _corpus(size: int, rng: random.Random) -> list[Memory]:
+    memories = []
+    for i in range(size):
+        words = rng.choices(VOCABULARY, k=8) + [f"word{rng.randrange(size)}" for _ in range(4)]
+        rng.shuffle(words)
+        memories.append(
+            Memory(id=f"m{i}", type=MemoryType.NOTE, content=" ".join(words), scope="bench")
+        )
+    return memories
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'memories':>9} {'query':<18} {'scan ms':>9} {'index ms':>9} {'hits':>7}")
+    for size in args.sizes:
+        memories = _corpus(size, rng)
+        graph = nx.MultiDiGraph()
+        engine = MemoryQueryEngine(graph)
+        start = time.perf_counter()
+        for memory in memories:
+            graph.add_node(memory.id, memory=memory)
+            engine.index(memory)
+        print(f"{size:>9} {'(build index)':<18} {'':>9} {(time.perf_counter() - start) * 1000:>9.1f}")
+        for query in QUERIES:
+            scan = _time(lambda: engine.search(query, memories=memories), args.repeat)
+            indexed = _time(lambda: engine.search(query), args.repeat)
+            hits = len(engine.search(query))
+            print(f"{size:>9} {query:<18} {scan:>9.2f} {indexed:>9.2f} {hits:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
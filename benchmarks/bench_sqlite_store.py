@@ -0,0 +1,83 @@
+"""Throughput benchmark for :class:`SQLiteMemoryStore`.
+
+Compares the legacy connection-per-operation behaviour (default rollback
+journal) against the persistent WAL connection the store now owns.
+
+Usage::
+
+    python benchmarks/bench_sqlite_store.py --count 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from collections.abc import Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from copal_cli.memory.models import Memory, MemoryType  # noqa: E402
+from copal_cli.memory.scope import ScopeManager  # noqa: E402
+from copal_cli.memory.sqlite_store import SQLiteMemoryStore  # noqa: E402
+
+
+class LegacySQLiteMemoryStore(SQLiteMemoryStore):
+    """Reproduces the pre-WAL behaviour: one short-lived connection per call."""
+
+    @contextlib.contextmanager
+    def _get_connection(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def _build(store_cls: type[SQLiteMemoryStore], root: Path) -> SQLiteMemoryStore:
+    config = {"backend": "sqlite"}
+    return store_cls(
+        target_root=root,
+        db_path=root / ".copal" / "memory.db",
+        config=config,
+        scope_manager=ScopeManager.from_config(root, config),
+    )
+
+
+def _run(store_cls: type[SQLiteMemoryStore], count: int) -> tuple[float, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _build(store_cls, Path(tmp))
+        start = time.perf_counter()
+        for i in range(count):
+            store.add_memory(
+                Memory(id=f"m{i}", type=MemoryType.NOTE, content=f"note {i}", scope="bench")
+            )
+        add_rate = count / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(count):
+            store.get_memory(f"m{i}")
+        get_rate = count / (time.perf_counter() - start)
+        store.close()
+    return add_rate, get_rate
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'store':<12} {'adds/sec':>12} {'gets/sec':>12}")
+    for label, cls in (("legacy", LegacySQLiteMemoryStore), ("persistent", SQLiteMemoryStore)):
+        add_rate, get_rate = _run(cls, args.count)
+        print(f"{label:<12} {add_rate:>12,.0f} {get_rate:>12,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""CLI start-up cost, measured with ``python -X importtime``.
+
+Imports ``copal_cli.cli`` in fresh interpreters and reports the median
+cumulative import time plus the slowest modules, then times a full
+``copal --help`` run. With ``--budget-ms`` it exits non-zero when the
+median import exceeds the budget (about 45 ms when the commands were made
+lazy; 150 ms leaves room for slow CI machines).
+``tests/test_cli_startup.py`` checks which modules are imported and keeps
+a loose 450 ms budget that only a large regression trips.
+
+Usage::
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --budget-ms 150
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def importtime(module: str) -> dict[str, tuple[int, int]]:
+    """``{module: (self_us, cumulative_us)}`` for one fresh import of ``module``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            timings[name.strip()] = (int(own), int(cumulative))
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--module", default="copal_cli.cli")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, help="fail if the median import takes longer")
+    args = parser.parse_args()
+
+    samples = [importtime(args.module) for _ in range(args.runs)]
+    totals = [sample[args.module][1] for sample in samples]
+    print(f"import {args.module}: median {statistics.median(totals) / 1000:.1f} ms over {args.runs} runs")
+    print(f"{'module':<48} {'cumulative ms':>14}")
+    last = samples[-1]
+    for name, (_, cumulative) in sorted(last.items(), key=lambda item: -item[1][1])[1:args.top + 1]:
+        print(f"{name:<48} {cumulative / 1000:>14.1f}")
+
+    walls = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "copal_cli.cli", "--help"], cwd=ROOT, capture_output=True, check=True)
+        walls.append(time.perf_counter() - start)
+    print(f"copal --help: median {statistics.median(walls) * 1000:.1f} ms wall")
+
+    if args.budget_ms is not None and statistics.median(totals) / 1000 > args.budget_ms:
+        print(f"import {args.module} is over the {args.budget_ms:g} ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
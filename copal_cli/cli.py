@@ -1,36 +1,18 @@
 from __future__ import annotations
 
 import argparse
+import importlib
 import logging
 import sys
+from collections.abc import Callable
 from pathlib import Path
 
 
-# Valid new imports
-from .harness.init import init_command as harness_init_command
-from .harness.validate import validate_command as harness_validate_command
-from .harness.export import export_command as harness_export_command
-from .harness.status import status_command as harness_status_command
-from .harness.skill import skill_create_command, skill_list_command
-from .harness.agent_manager import AgentManager
-
-# Keep existing imports for other commands
-from .memory.cli_commands import (
-    memory_add_command,
-    memory_delete_command,
-    memory_list_command,
-    memory_search_command,
-    memory_show_command,
-    memory_update_command,
-)
-from .memory.models import MemoryType
-from .worktree.commands import (
-    handle_new as worktree_new_command,
-    handle_list as worktree_list_command,
-    handle_remove as worktree_remove_command,
-)
-from .system.mcp import print_mcp_available
-from .system.resume import print_resume_info
+# Only constants needed to build the parser are imported here; command
+# modules (rich, PyYAML, jsonschema, the memory stores...) load on use.
+from .memory.branches import BRANCH_STATUSES
+from .memory.dedupe import DEDUPE_POLICIES
+from .memory.models import EdgeType, MemoryType
 
 # Configure logging
 logging.basicConfig(
@@ -40,6 +22,17 @@ logging.basicConfig(
 )
 
 
+def _lazy(target: str) -> Callable[[argparse.Namespace], int]:
+    """Handler for ``module:function`` that imports the module when the command runs."""
+    module_name, _, name = target.partition(":")
+
+    def handler(args: argparse.Namespace) -> int:
+        return getattr(importlib.import_module(module_name, __package__), name)(args)
+
+    handler.__name__ = handler.__qualname__ = name
+    return handler
+
+
 def build_parser() -> argparse.ArgumentParser:
     """Build and configure the argument parser for the CoPal CLI."""
 
@@ -137,6 +130,68 @@ def build_parser() -> argparse.ArgumentParser:
     )
     status_parser.set_defaults(handler=_handle_status)
 
+    # Context command
+    context_parser = subparsers.add_parser(
+        "context",
+        help="Print a token-budgeted context pack for the active task",
+    )
+    context_parser.add_argument(
+        "--target",
+        default=".",
+        help="Target repository path (default: current directory)",
+    )
+    context_parser.add_argument(
+        "--budget",
+        type=int,
+        metavar="TOKENS",
+        help="Approximate token budget (default: 4000)",
+    )
+    context_parser.add_argument(
+        "--format",
+        choices=["markdown", "json"],
+        default="markdown",
+        help="Output format",
+    )
+    context_parser.add_argument(
+        "--task",
+        dest="task_id",
+        help="Task ID to build context for (default: the task in progress)",
+    )
+    context_parser.add_argument("--scope", help="Memory scope (default: active scope)")
+    context_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rebuild the pack even if nothing changed",
+    )
+    context_parser.set_defaults(handler=_handle_context)
+
+    # Sessions command
+    sessions_parser = subparsers.add_parser(
+        "sessions",
+        help="List recorded session summaries, newest first",
+    )
+    sessions_parser.add_argument(
+        "--target",
+        default=".",
+        help="Target repository path (default: current directory)",
+    )
+    sessions_parser.add_argument("--task", dest="task_id", help="Only sessions for this task ID")
+    sessions_parser.add_argument("--since", help="Only sessions at or after this ISO date/time (UTC)")
+    sessions_parser.add_argument("--until", help="Only sessions before this ISO date/time (UTC)")
+    sessions_parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Maximum number of sessions to show (default: 20)",
+    )
+    sessions_parser.add_argument(
+        "--format",
+        choices=["table", "jsonl"],
+        default="table",
+        help="Output format",
+    )
+    sessions_parser.set_defaults(handler=_handle_sessions)
+
     # Next command
     next_parser = subparsers.add_parser(
         "next",
@@ -187,15 +242,39 @@ def build_parser() -> argparse.ArgumentParser:
     wt_new_parser.add_argument("name", help="Name of the worktree/task")
     wt_new_parser.add_argument("--branch", help="Branch name (defaults to name)")
     wt_new_parser.add_argument("--base", help="Base branch to checkout from")
-    wt_new_parser.set_defaults(handler=worktree_new_command)
+    wt_new_parser.add_argument(
+        "--with-memory",
+        action="store_true",
+        help="Start from a snapshot of the project's memory; merged back on remove",
+    )
+    wt_new_parser.set_defaults(handler=_lazy(".worktree.commands:handle_new"))
 
     wt_list_parser = wt_subparsers.add_parser("list", help="List worktrees")
-    wt_list_parser.set_defaults(handler=worktree_list_command)
+    wt_list_parser.set_defaults(handler=_lazy(".worktree.commands:handle_list"))
 
     wt_rm_parser = wt_subparsers.add_parser("remove", aliases=["rm"], help="Remove a worktree")
     wt_rm_parser.add_argument("name", help="Name of the worktree to remove")
     wt_rm_parser.add_argument("--force", "-f", action="store_true", help="Force removal")
-    wt_rm_parser.set_defaults(handler=worktree_remove_command)
+    wt_rm_memory = wt_rm_parser.add_mutually_exclusive_group()
+    wt_rm_memory.add_argument(
+        "--merge-memory",
+        dest="merge_memory",
+        action="store_true",
+        default=None,
+        help="Merge the worktree's memory snapshot into the project without asking",
+    )
+    wt_rm_memory.add_argument(
+        "--discard-memory",
+        dest="merge_memory",
+        action="store_false",
+        help="Drop the worktree's memory changes",
+    )
+    wt_rm_parser.add_argument(
+        "--prefer-task",
+        action="store_true",
+        help="Resolve memory conflicts with the worktree's version",
+    )
+    wt_rm_parser.set_defaults(handler=_lazy(".worktree.commands:handle_remove"))
 
     # Memory commands
     memory_parser = subparsers.add_parser(
@@ -243,7 +322,13 @@ def build_parser() -> argparse.ArgumentParser:
         action="append",
         help="Key=value metadata entries",
     )
-    memory_add_parser.set_defaults(handler=memory_add_command)
+    memory_add_parser.add_argument(
+        "--dedupe",
+        choices=DEDUPE_POLICIES,
+        help="What to do if a memory with the same type and content exists "
+        "(default: the 'dedupe' memory setting, or 'off')",
+    )
+    memory_add_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_add_command"))
 
     memory_search_parser = memory_subparsers.add_parser(
         "search",
@@ -262,7 +347,68 @@ def build_parser() -> argparse.ArgumentParser:
         choices=[t.value for t in MemoryType],
         help="Filter by memory type",
     )
-    memory_search_parser.set_defaults(handler=memory_search_command)
+    memory_search_parser.add_argument(
+        "--limit",
+        type=int,
+        help="Maximum number of results (best matches first)",
+    )
+    memory_search_parser.add_argument(
+        "--top",
+        type=int,
+        metavar="K",
+        help="Return the K most relevant unexpired memories "
+        "(text match, importance, recency and access frequency); not paged, "
+        "so it cannot be combined with --limit or --after",
+    )
+    memory_search_parser.add_argument(
+        "--after",
+        metavar="MEMORY_ID",
+        help="Continue after this result (cursor from the previous page)",
+    )
+    memory_search_parser.add_argument(
+        "--format",
+        choices=["table", "jsonl"],
+        default="table",
+        help="Output format; jsonl streams one memory per line",
+    )
+    memory_search_parser.add_argument(
+        "--semantic",
+        action="store_true",
+        help="Rank by embedding similarity (requires memory.vector.enabled)",
+    )
+    memory_search_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_search_command"))
+
+    memory_recall_parser = memory_subparsers.add_parser(
+        "recall",
+        help="Retrieve the most relevant memories (full-text and semantic, fused)",
+    )
+    memory_recall_parser.add_argument("query", help="What to recall")
+    memory_recall_parser.add_argument("--scope", help="Scope filter")
+    memory_recall_parser.add_argument(
+        "--type",
+        dest="types",
+        action="append",
+        choices=[t.value for t in MemoryType],
+        help="Filter by memory type",
+    )
+    memory_recall_parser.add_argument(
+        "--limit",
+        type=int,
+        help="Maximum number of memories (default: 10)",
+    )
+    memory_recall_parser.add_argument(
+        "--budget",
+        type=int,
+        metavar="TOKENS",
+        help="Approximate token budget for returned content (0 for no limit)",
+    )
+    memory_recall_parser.add_argument(
+        "--format",
+        choices=["table", "jsonl"],
+        default="table",
+        help="Output format; jsonl adds score and sources to each memory",
+    )
+    memory_recall_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_recall_command"))
 
     memory_show_parser = memory_subparsers.add_parser(
         "show",
@@ -270,7 +416,7 @@ def build_parser() -> argparse.ArgumentParser:
     )
     memory_show_parser.add_argument("memory_id", help="Memory identifier")
     memory_show_parser.add_argument("--scope", help="Scope filter")
-    memory_show_parser.set_defaults(handler=memory_show_command)
+    memory_show_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_show_command"))
 
     memory_update_parser = memory_subparsers.add_parser(
         "update",
@@ -294,7 +440,7 @@ def build_parser() -> argparse.ArgumentParser:
         choices=[t.value for t in MemoryType],
         help="Updated memory type",
     )
-    memory_update_parser.set_defaults(handler=memory_update_command)
+    memory_update_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_update_command"))
 
     memory_delete_parser = memory_subparsers.add_parser(
         "delete",
@@ -302,7 +448,7 @@ def build_parser() -> argparse.ArgumentParser:
     )
     memory_delete_parser.add_argument("memory_id", help="Memory identifier")
     memory_delete_parser.add_argument("--scope", help="Scope filter")
-    memory_delete_parser.set_defaults(handler=memory_delete_command)
+    memory_delete_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_delete_command"))
 
 
     memory_list_parser = memory_subparsers.add_parser(
@@ -317,7 +463,183 @@ def build_parser() -> argparse.ArgumentParser:
         choices=[t.value for t in MemoryType],
         help="Filter by memory type",
     )
-    memory_list_parser.set_defaults(handler=memory_list_command)
+    memory_list_parser.add_argument(
+        "--limit",
+        type=int,
+        help="Maximum number of memories per page",
+    )
+    memory_list_parser.add_argument(
+        "--after",
+        metavar="MEMORY_ID",
+        help="Continue after this memory (cursor from the previous page)",
+    )
+    memory_list_parser.add_argument(
+        "--format",
+        choices=["table", "jsonl"],
+        default="table",
+        help="Output format; jsonl streams one memory per line",
+    )
+    memory_list_parser.add_argument(
+        "--where",
+        action="append",
+        metavar="KEY=VALUE",
+        help="Only memories whose metadata KEY equals VALUE (repeatable)",
+    )
+    memory_list_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_list_command"))
+
+    memory_related_parser = memory_subparsers.add_parser(
+        "related",
+        help="Traverse relationships around a memory",
+    )
+    memory_related_parser.add_argument("memory_id", help="Memory identifier")
+    memory_related_parser.add_argument("--scope", help="Scope filter")
+    memory_related_parser.add_argument(
+        "--depth",
+        type=int,
+        help="Maximum hops to expand (default: 1; 6 with --path-to)",
+    )
+    memory_related_parser.add_argument(
+        "--edge-type",
+        dest="edge_types",
+        action="append",
+        choices=[t.value for t in EdgeType],
+        help="Only follow relationships of this type",
+    )
+    memory_related_parser.add_argument(
+        "--direction",
+        choices=["out", "in", "both"],
+        default="both",
+        help="Edge direction to follow (default: both)",
+    )
+    memory_related_mode = memory_related_parser.add_mutually_exclusive_group()
+    memory_related_mode.add_argument(
+        "--path-to",
+        metavar="MEMORY_ID",
+        help="Show the shortest path to another memory",
+    )
+    memory_related_mode.add_argument(
+        "--latest",
+        action="store_true",
+        help="Show the newest version along SUPERSEDES edges",
+    )
+    memory_related_mode.add_argument(
+        "--chain",
+        action="store_true",
+        help="Walk the TEMPORAL_SEQUENCE session chain",
+    )
+    memory_related_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_related_command"))
+
+    memory_reindex_parser = memory_subparsers.add_parser(
+        "reindex",
+        help="Rebuild the semantic search vector index",
+    )
+    memory_reindex_scope = memory_reindex_parser.add_mutually_exclusive_group()
+    memory_reindex_scope.add_argument("--scope", help="Scope to rebuild (default: active scope)")
+    memory_reindex_scope.add_argument(
+        "--all",
+        action="store_true",
+        help="Rebuild every scope",
+    )
+    memory_reindex_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_reindex_command"))
+
+    memory_compact_parser = memory_subparsers.add_parser(
+        "compact",
+        help="Digest old sessions, merge duplicates and reclaim space",
+    )
+    memory_compact_parser.add_argument("--scope", help="Scope to compact (default: active scope)")
+    memory_compact_parser.add_argument(
+        "--older-than",
+        type=float,
+        metavar="DAYS",
+        help="Digest sessions from periods that ended this many days ago (default: 30)",
+    )
+    memory_compact_parser.add_argument(
+        "--period",
+        choices=["week", "month"],
+        help="Digest granularity (default: week)",
+    )
+    memory_compact_parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Delete digested sessions instead of archiving them",
+    )
+    memory_compact_parser.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="Skip merging memories with identical content",
+    )
+    memory_compact_parser.add_argument(
+        "--no-vacuum",
+        action="store_true",
+        help="Skip reclaiming disk space",
+    )
+    memory_compact_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_compact_command"))
+
+    memory_branch_parser = memory_subparsers.add_parser(
+        "branch",
+        help="Manage task-scoped memory branches",
+    )
+    memory_branch_subparsers = memory_branch_parser.add_subparsers(dest="branch_command", required=True)
+
+    memory_branch_create_parser = memory_branch_subparsers.add_parser("create", help="Create a branch for a task")
+    memory_branch_create_parser.add_argument("task_id", help="Task ID (memories go to scope task:<id>)")
+    memory_branch_create_parser.add_argument("--description", help="What the task is about")
+    memory_branch_create_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_branch_create_command"))
+
+    memory_branch_list_parser = memory_branch_subparsers.add_parser("list", help="List branches")
+    memory_branch_list_parser.add_argument("--status", choices=list(BRANCH_STATUSES), help="Filter by status")
+    memory_branch_list_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_branch_list_command"))
+
+    memory_branch_merge_parser = memory_branch_subparsers.add_parser(
+        "merge",
+        help="Promote a branch's memories into the project scope",
+    )
+    memory_branch_merge_parser.add_argument("task_id", help="Task ID of the branch")
+    memory_branch_merge_parser.add_argument("--scope", help="Scope to merge into (default: active scope)")
+    memory_branch_merge_parser.add_argument(
+        "--id",
+        dest="memory_ids",
+        action="append",
+        metavar="MEMORY_ID",
+        help="Only promote this memory (repeatable)",
+    )
+    memory_branch_merge_parser.add_argument(
+        "--type",
+        dest="types",
+        action="append",
+        choices=[t.value for t in MemoryType],
+        help="Only promote memories of this type (repeatable)",
+    )
+    memory_branch_merge_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_branch_merge_command"))
+
+    memory_serve_parser = memory_subparsers.add_parser(
+        "serve",
+        help="Share one memory store between worktrees through a local server",
+    )
+    memory_serve_parser.add_argument(
+        "--socket",
+        help="Unix socket to listen on (default: server.socket, .copal/memory.sock)",
+    )
+    memory_serve_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_serve_command"))
+
+    memory_import_parser = memory_subparsers.add_parser(
+        "import",
+        help="Bulk import memories and relationships from NDJSON",
+    )
+    memory_import_parser.add_argument(
+        "file",
+        nargs="?",
+        default="-",
+        help="NDJSON file to read (default: stdin)",
+    )
+    memory_import_parser.add_argument("--scope", help="Scope for records without one")
+    memory_import_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Records written per transaction (default: 500)",
+    )
+    memory_import_parser.set_defaults(handler=_lazy(".memory.cli_commands:memory_import_command"))
 
     # Skill commands
     skill_parser = subparsers.add_parser(
@@ -376,10 +698,33 @@ def build_parser() -> argparse.ArgumentParser:
     resume_parser = subparsers.add_parser("resume", help="Resume context (Legacy/Debug)")
     resume_parser.add_argument("--target", default=".")
 
+    # Daemon
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="Keep a warm process that runs this project's copal commands",
+    )
+    daemon_parser.add_argument(
+        "--target",
+        default=".",
+        help="Target repository path (default: current directory)",
+    )
+    daemon_parser.add_argument(
+        "--socket",
+        help="Unix socket to listen on (default: .copal/daemon.sock)",
+    )
+    daemon_parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Stop the running daemon instead of starting one",
+    )
+    daemon_parser.set_defaults(handler=_lazy(".daemon:daemon_command"))
+
     return parser
 
 
 def _handle_skill_create(args: argparse.Namespace) -> int:
+    from copal_cli.harness.skill import skill_create_command
+
     tags = None
     if args.tags:
         tags = [t.strip() for t in args.tags.split(",") if t.strip()]
@@ -394,10 +739,14 @@ def _handle_skill_create(args: argparse.Namespace) -> int:
 
 
 def _handle_skill_list(args: argparse.Namespace) -> int:
+    from copal_cli.harness.skill import skill_list_command
+
     return skill_list_command(target=args.target)
 
 
 def _handle_init(args: argparse.Namespace) -> int:
+    from copal_cli.harness.init import init_command as harness_init_command
+
     tools_arg = getattr(args, "tools", None)
     tools = [t.strip() for t in tools_arg.split(",")] if tools_arg else None
 
@@ -420,21 +769,46 @@ def _handle_validate(args: argparse.Namespace) -> int:
         return validate_pre_task(target=args.target)
     
     # Use standard harness validator
+    from copal_cli.harness.validate import validate_command as harness_validate_command
     return harness_validate_command(
         target=args.target, 
         check_artifacts=getattr(args, "check_artifacts", False)
     )
 
 def _handle_export(args: argparse.Namespace) -> int:
+    from copal_cli.harness.export import export_command as harness_export_command
     return harness_export_command(
         tool=args.tool,
         target=args.target,
     )
 
 def _handle_status(args: argparse.Namespace) -> int:
+    from copal_cli.harness.status import status_command as harness_status_command
     return harness_status_command(target=args.target)
 
 
+def _handle_context(args: argparse.Namespace) -> int:
+    from copal_cli.harness.context import context_command
+    return context_command(
+        target=args.target,
+        budget=args.budget,
+        fmt=args.format,
+        task_id=args.task_id,
+        scope=args.scope,
+        use_cache=not args.no_cache,
+    )
+
+def _handle_sessions(args: argparse.Namespace) -> int:
+    from copal_cli.harness.session import sessions_command
+    return sessions_command(
+        target=args.target,
+        task_id=args.task_id,
+        since=args.since,
+        until=args.until,
+        limit=args.limit,
+        fmt=args.format,
+    )
+
 def _handle_next(args):
     from copal_cli.harness.agent_manager import AgentManager
     manager = AgentManager(Path(args.target).resolve())
@@ -443,6 +817,7 @@ def _handle_next(args):
 
 def _handle_done(args: argparse.Namespace) -> int:
     from rich.console import Console
+    from copal_cli.harness.agent_manager import AgentManager
     console = Console()
     
     manager = AgentManager(Path(args.target).resolve())
@@ -473,10 +848,14 @@ def _handle_done(args: argparse.Namespace) -> int:
     return 1
 
 
-def main(argv: list[str] | None = None) -> int:
-    """Main entry point for the CoPal CLI."""
+def main(argv: list[str] | None = None, *, parser: argparse.ArgumentParser | None = None) -> int:
+    """Main entry point for the CoPal CLI.
+
+    ``parser`` lets a long-lived caller (``copal daemon``) reuse one built parser.
+    """
 
-    parser = build_parser()
+    if parser is None:
+        parser = build_parser()
     args = parser.parse_args(argv)
 
     if hasattr(args, "verbose") and args.verbose:
@@ -491,9 +870,11 @@ def main(argv: list[str] | None = None) -> int:
         
     if args.command == "mcp":
         if args.mcp_command == "ls":
+            from .system.mcp import print_mcp_available
             print_mcp_available(Path(target).resolve())
             return 0
     if args.command == "resume":
+        from .system.resume import print_resume_info
         print_resume_info(Path(target).resolve())
         return 0
 
@@ -0,0 +1,166 @@
+"""Entry point of the ``copal`` script: forward to a warm daemon when one is running.
+
+``copal daemon`` keeps a process per project with the command modules
+imported and manifests, packs, ``todo.json`` and memory stores loaded. This
+module is all a forwarded call imports: it finds the daemon's socket by
+walking up from the working directory, sends argv, cwd and the environment,
+and copies the output the daemon streams back. With no daemon (or with
+``COPAL_NO_DAEMON=1``) the command runs in-process as before.
+
+Protocol: one JSON line ``{"argv", "cwd", "env", "tty"}`` per connection.
+When the daemon is ready to run it, it sends ``{"ready": true}`` and waits
+for ``{"run": true}``; a client that got no answer within ``DAEMON_TIMEOUT``
+seconds (``COPAL_DAEMON_TIMEOUT``) hangs up and runs the command itself. The
+daemon then streams ``{"stream": "stdout" | "stderr", "data"}`` lines and a
+final ``{"exit": code}``. ``{"op": "stop"}`` shuts the daemon down.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+DAEMON_SOCKET = Path(".copal") / "daemon.sock"
+
+# Seconds to wait for the daemon to connect and take a command.
+DAEMON_TIMEOUT = 1.0
+
+# Commands that prompt, read stdin or run child processes (git, the verify
+# command) whose output would go to the daemon's terminal: these always run
+# in-process.
+_LOCAL_COMMANDS = {"daemon", "init", "validate", "worktree", "wt"}
+_LOCAL_SUBCOMMANDS = {
+    "memory": {"serve", "import"},
+}
+
+
+def find_daemon(start: Path | None = None) -> Path | None:
+    """Socket of the nearest ``copal daemon`` at or above ``start`` (default: cwd)."""
+    path = Path(start if start is not None else os.getcwd()).absolute()
+    for directory in (path, *path.parents):
+        candidate = directory / DAEMON_SOCKET
+        if candidate.is_socket():
+            return candidate
+    return None
+
+
+def connect(path: Path, timeout: float | None = None) -> socket.socket | None:
+    """A connection to the daemon on ``path``, or None if nothing is listening."""
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    try:
+        conn.connect(str(path))
+    except OSError:
+        conn.close()
+        return None
+    return conn
+
+
+# Options that take a value and may come before a subcommand, as in
+# ``copal memory --target DIR serve`` (see ``cli.build_parser``).
+_VALUE_OPTIONS = {"--target"}
+
+
+def _command_words(argv: list[str]) -> list[str]:
+    """The command and subcommand named in ``argv``, skipping options and their values."""
+    words: list[str] = []
+    args = iter(argv)
+    for arg in args:
+        if arg in _VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith("-"):
+            words.append(arg)
+            if len(words) == 2:
+                break
+    return words
+
+
+def _runs_locally(argv: list[str]) -> bool:
+    words = _command_words(argv)
+    if not words:
+        return False
+    command, subcommand = words[0], words[1] if len(words) > 1 else None
+    if command in _LOCAL_COMMANDS:
+        return True
+    if command == "skill" and subcommand == "create" and "--no-interactive" not in argv:
+        return True
+    if command == "next" and "--worktree" in argv:
+        return True
+    return subcommand in _LOCAL_SUBCOMMANDS.get(command, set())
+
+
+def _environment() -> dict[str, str]:
+    env = dict(os.environ)
+    try:
+        # The daemon has no terminal to measure; give rich the client's width.
+        env.setdefault("COLUMNS", str(os.get_terminal_size(sys.stdout.fileno()).columns))
+    except (OSError, ValueError):
+        pass
+    return env
+
+
+def _timeout() -> float:
+    try:
+        return float(os.environ.get("COPAL_DAEMON_TIMEOUT", DAEMON_TIMEOUT))
+    except ValueError:
+        return DAEMON_TIMEOUT
+
+
+def forward(argv: list[str], path: Path) -> int | None:
+    """Run ``argv`` in the daemon on ``path``; None if it did not take the command in time."""
+    conn = connect(path, _timeout())
+    if conn is None:
+        return None
+    request = {"argv": argv, "cwd": os.getcwd(), "env": _environment(), "tty": sys.stdout.isatty()}
+    streams = {"stdout": sys.stdout, "stderr": sys.stderr}
+    accepted = False
+    try:
+        conn.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with conn.makefile("rb") as replies:
+            for line in replies:
+                message = json.loads(line)
+                if message.get("ready"):
+                    conn.sendall(b'{"run": true}\n')
+                    # The command itself may take as long as it needs.
+                    conn.settimeout(None)
+                    accepted = True
+                elif "exit" in message:
+                    return int(message["exit"])
+                else:
+                    stream = streams[message["stream"]]
+                    stream.write(message["data"])
+                    stream.flush()
+    except OSError as exc:
+        if not accepted:
+            # Not started (busy, wedged or gone): the caller runs it instead.
+            return None
+        print(f"copal: lost connection to the daemon: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    if not accepted:
+        return None
+    print("copal: the daemon closed the connection without an exit status", file=sys.stderr)
+    return 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run a CLI command through the project's daemon, or in-process without one."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    if os.environ.get("COPAL_NO_DAEMON") != "1" and not _runs_locally(args):
+        path = find_daemon()
+        if path is not None:
+            code = forward(args, path)
+            if code is not None:
+                return code
+
+    from copal_cli.cli import main as cli_main
+
+    return cli_main(args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
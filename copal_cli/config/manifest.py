@@ -7,6 +7,8 @@ from typing import List, Dict, Optional, Any
 
 import yaml
 
+from copal_cli.fs.cache import file_cache
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -47,7 +49,10 @@ class Manifest:
         """Load manifest from a YAML file."""
         if not path.exists():
             raise FileNotFoundError(f"Manifest not found at {path}")
-            
+        return file_cache.load(path, cls._parse)
+
+    @classmethod
+    def _parse(cls, path: Path) -> Manifest:
         try:
             with open(path, "r", encoding="utf-8") as f:
                 data = yaml.safe_load(f)
@@ -6,6 +6,8 @@ from typing import Dict, Optional
 
 import yaml
 
+from copal_cli.fs.cache import file_cache
+
 @dataclass
 class Pack:
     name: str
@@ -29,7 +31,10 @@ class Pack:
             
         if not pack_file.exists():
             raise FileNotFoundError(f"Pack configuration not found at {pack_file}")
-            
+        return file_cache.load(pack_file, cls._parse)
+
+    @classmethod
+    def _parse(cls, pack_file: Path) -> Pack:
         try:
             with open(pack_file, "r", encoding="utf-8") as f:
                 data = yaml.safe_load(f)
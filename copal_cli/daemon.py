@@ -0,0 +1,403 @@
+"""Warm per-project CLI daemon.
+
+``copal daemon`` imports the command modules once, turns on the parsed-file
+cache (:mod:`copal_cli.fs.cache`) and opens the project's memory store, then
+runs the commands that :mod:`copal_cli.client` forwards over
+``.copal/daemon.sock``. Commands run one at a time, in the client's working
+directory and environment, with their output streamed back as it is written.
+
+Nothing goes stale between commands: cached manifests, packs and
+``todo.json`` are keyed on file mtime and size, and idle memory stores
+whose files another process wrote are reopened
+(:func:`copal_cli.memory.factory.refresh_stores`) before each command.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import errno
+import importlib
+import io
+import json
+import logging
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from rich.console import Console
+
+from .client import DAEMON_SOCKET, DAEMON_TIMEOUT, connect, find_daemon
+from .fs.cache import file_cache
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+# Imported at start-up so forwarded commands find them loaded.
+WARM_MODULES = (
+    "copal_cli.cli",
+    "copal_cli.config.manifest",
+    "copal_cli.config.pack",
+    "copal_cli.harness.agent_manager",
+    "copal_cli.harness.context",
+    "copal_cli.harness.session",
+    "copal_cli.harness.status",
+    "copal_cli.memory.cli_commands",
+    "copal_cli.worktree.commands",
+)
+
+
+class _StreamWriter(io.TextIOBase):
+    """Text stream that forwards each write to the client as a message."""
+
+    def __init__(self, wfile: BinaryIO, name: str, tty: bool) -> None:
+        self._wfile = wfile
+        self._name = name
+        self._tty = tty
+        self.disconnected = False
+
+    @property
+    def encoding(self) -> str:
+        return "utf-8"
+
+    def isatty(self) -> bool:
+        return self._tty
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str) -> int:
+        if data and not self.disconnected:
+            message = json.dumps({"stream": self._name, "data": data}).encode("utf-8") + b"\n"
+            try:
+                self._wfile.write(message)
+                self._wfile.flush()
+            except OSError:
+                # The client went away; let the command finish regardless.
+                self.disconnected = True
+        return len(data)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: _SocketServer
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line.strip():
+            return
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be an object")
+        except ValueError as exc:
+            self._reply({"stream": "stderr", "data": f"copal daemon: malformed request: {exc}\n"})
+            self._reply({"exit": 2})
+            return
+        if request.get("op") == "stop":
+            self._reply({"exit": 0})
+            threading.Thread(target=self.server.daemon.stop, daemon=True).start()
+            return
+        code = self.server.daemon.submit(_Job(request, self.connection, self.rfile, self.wfile))
+        if code is not None:
+            self._reply({"exit": code})
+
+    def _reply(self, message: dict[str, Any]) -> None:
+        try:
+            self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+        except OSError:
+            pass
+
+
+class _SocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, daemon: CopalDaemon) -> None:
+        self.daemon = daemon
+        super().__init__(str(path), _Handler)
+
+
+# How long the runner waits for a client to confirm a command it offered.
+CLAIM_TIMEOUT = 5.0
+
+
+@dataclass
+class _Job:
+    request: dict[str, Any]
+    connection: socket.socket
+    rfile: BinaryIO
+    wfile: BinaryIO
+    done: threading.Event = field(default_factory=threading.Event)
+    code: int | None = None
+
+    def claim(self) -> bool:
+        """Offer the command to its client; False if the client gave up waiting.
+
+        Nothing runs until the client answers ``run``, so a client that timed
+        out and ran the command itself never sees it run twice.
+        """
+        try:
+            self.wfile.write(b'{"ready": true}\n')
+            self.connection.settimeout(CLAIM_TIMEOUT)
+            reply = self.rfile.readline()
+            self.connection.settimeout(None)
+            return json.loads(reply).get("run") is True
+        except (OSError, ValueError, AttributeError):
+            return False
+
+
+class CopalDaemon:
+    """Run forwarded CLI commands for ``target_root`` from a warm process."""
+
+    def __init__(self, target_root: Path, *, path: Path | None = None) -> None:
+        self.target_root = Path(target_root).resolve()
+        self.path = Path(path) if path is not None else self.target_root / DAEMON_SOCKET
+        self.commands = 0
+        self._queue: queue.SimpleQueue[_Job | None] = queue.SimpleQueue()
+        self._server: _SocketServer | None = None
+        self._worker: threading.Thread | None = None
+        self._serving: threading.Thread | None = None
+        self._ready = threading.Event()
+        self._startup_error: Exception | None = None
+        self._parser: argparse.ArgumentParser | None = None
+
+    # --- lifecycle ------------------------------------------------------------------
+    def _open(self) -> None:
+        probe = connect(self.path, DAEMON_TIMEOUT) if self.path.is_socket() else None
+        if probe is not None:
+            probe.close()
+            raise OSError(errno.EADDRINUSE, f"A copal daemon is already listening on {self.path}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)
+        self._worker = threading.Thread(target=self._work, name="copal-daemon-runner", daemon=True)
+        self._worker.start()
+        self._ready.wait()
+        if self._startup_error is not None:
+            raise self._startup_error
+        self._server = _SocketServer(self.path, self)
+        os.chmod(self.path, 0o600)
+        logger.info(f"copal daemon for {self.target_root} listening on {self.path}")
+
+    def warm(self) -> None:
+        """Import the command modules and load the project's files and memory store."""
+        file_cache.enabled = True
+        for name in WARM_MODULES:
+            importlib.import_module(name)
+
+        from .cli import build_parser
+        from .config.manifest import Manifest
+        from .memory.config import is_memory_enabled, load_memory_config
+        from .memory.factory import open_store
+
+        manifest_path = self.target_root / ".copal" / "manifest.yaml"
+        if manifest_path.exists():
+            try:
+                Manifest.load(manifest_path)
+            except ValueError as exc:
+                logger.warning(f"Not preloading {manifest_path}: {exc}")
+        config = load_memory_config(self.target_root)
+        if is_memory_enabled(config):
+            open_store(self.target_root, config).close()
+        self._parser = build_parser()
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until :meth:`stop` or an interrupt."""
+        self._open()
+        assert self._server is not None
+        self._server.serve_forever()
+
+    def start(self) -> CopalDaemon:
+        """Serve from a background thread; returns once the socket accepts connections."""
+        self._open()
+        assert self._server is not None
+        self._serving = threading.Thread(target=self._server.serve_forever, name="copal-daemon", daemon=True)
+        self._serving.start()
+        return self
+
+    def stop(self) -> None:
+        """Make :meth:`serve_forever` return."""
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self) -> None:
+        if self._server is not None:
+            if self._serving is not None:
+                self._server.shutdown()
+                self._serving.join()
+            self._server.server_close()
+            self._server = None
+            self.path.unlink(missing_ok=True)
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def __enter__(self) -> CopalDaemon:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # --- commands -------------------------------------------------------------------
+    def submit(self, job: _Job) -> int | None:
+        """Run one forwarded command; its exit code, or None if the client gave up on it."""
+        self._queue.put(job)
+        job.done.wait()
+        return job.code
+
+    def _work(self) -> None:
+        # Commands run one at a time on this thread: SQLite connections in the
+        # pooled stores belong to the thread that opened them.
+        try:
+            self.warm()
+        except Exception as exc:
+            self._startup_error = exc
+            return
+        finally:
+            self._ready.set()
+        from .memory.factory import close_stores
+
+        try:
+            while (job := self._queue.get()) is not None:
+                try:
+                    if job.claim():
+                        job.code = self._run(job.request, job.wfile)
+                finally:
+                    job.done.set()
+        finally:
+            close_stores()
+
+    def _run(self, request: dict[str, Any], wfile: BinaryIO) -> int:
+        from .cli import main as cli_main
+        from .memory.factory import refresh_stores
+
+        argv = [str(arg) for arg in request.get("argv") or []]
+        tty = bool(request.get("tty"))
+        stdout = _StreamWriter(wfile, "stdout", tty)
+        stderr = _StreamWriter(wfile, "stderr", tty)
+
+        self.commands += 1
+        refresh_stores()
+        try:
+            with _client_context(request, stdout, stderr):
+                try:
+                    code = cli_main(argv, parser=self._parser)
+                except SystemExit as exc:
+                    code = _exit_code(exc.code)
+                except KeyboardInterrupt:
+                    code = 130
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+        except OSError as exc:
+            stderr.write(f"copal daemon: {exc}\n")
+            code = 1
+        return code if isinstance(code, int) else 0
+
+
+@contextlib.contextmanager
+def _client_context(request: dict[str, Any], stdout: _StreamWriter, stderr: _StreamWriter) -> Iterator[None]:
+    """Run in the client's cwd and environment with stdio sent to the client."""
+    cwd = os.getcwd()
+    env = dict(os.environ)
+    stdio = (sys.stdin, sys.stdout, sys.stderr)
+    root = logging.getLogger()
+    level = root.level
+    handlers = [
+        (handler, handler.stream)
+        for handler in root.handlers
+        if isinstance(handler, logging.StreamHandler) and handler.stream in stdio[1:]
+    ]
+    try:
+        client_env = request.get("env")
+        if isinstance(client_env, dict):
+            _set_environ({str(key): str(value) for key, value in client_env.items()})
+        sys.stdin = io.StringIO("")
+        sys.stdout, sys.stderr = stdout, stderr
+        for handler, stream in handlers:
+            handler.setStream(stdout if stream is stdio[1] else stderr)
+        if request.get("cwd"):
+            os.chdir(request["cwd"])
+        yield
+    finally:
+        for handler, stream in handlers:
+            handler.setStream(stream)
+        root.setLevel(level)
+        sys.stdin, sys.stdout, sys.stderr = stdio
+        os.chdir(cwd)
+        _set_environ(env)
+
+
+def _set_environ(env: dict[str, str]) -> None:
+    # In place, touching only what differs: rich consoles hold a reference to
+    # ``os.environ`` and every assignment is a putenv call.
+    current = dict(os.environ)
+    for key in current.keys() - env.keys():
+        del os.environ[key]
+    for key, value in env.items():
+        if current.get(key) != value:
+            os.environ[key] = value
+
+
+def _exit_code(code: object) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def stop_daemon(path: Path) -> bool:
+    """Ask the daemon on ``path`` to shut down; False if none is running."""
+    conn = connect(path, DAEMON_TIMEOUT)
+    if conn is None:
+        return False
+    try:
+        conn.sendall(json.dumps({"op": "stop"}).encode("utf-8") + b"\n")
+        conn.recv(64)
+    finally:
+        conn.close()
+    return True
+
+
+def daemon_command(args: argparse.Namespace) -> int:
+    """Run (or stop) the warm CLI daemon for the target root."""
+    target_root = Path(getattr(args, "target", ".")).resolve()
+    socket_arg = getattr(args, "socket", None)
+    path = Path(socket_arg).resolve() if socket_arg else None
+
+    if getattr(args, "stop", False):
+        running = path or find_daemon(target_root)
+        if running is None or not stop_daemon(running):
+            console.print("[yellow]No copal daemon is running.[/yellow]")
+            return 1
+        console.print(f"[green]✓ Stopped the copal daemon on {running}[/green]")
+        return 0
+
+    daemon = CopalDaemon(target_root, path=path)
+
+    def _stop(signum: int, frame: object) -> None:
+        raise KeyboardInterrupt
+
+    previous = signal.signal(signal.SIGTERM, _stop)
+    try:
+        try:
+            daemon.serve_forever()
+        except OSError as exc:
+            console.print(f"[red]✗ Cannot start copal daemon:[/red] {exc}")
+            return 1
+        except KeyboardInterrupt:
+            pass
+        return 0
+    finally:
+        daemon.close()
+        signal.signal(signal.SIGTERM, previous)
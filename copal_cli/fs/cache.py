@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import copy
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class FileCache:
+    """
+    Parsed file contents keyed by path, reused until the file's mtime or size changes.
+
+    Disabled by default, so one-shot CLI runs parse files exactly as before;
+    the daemon (``copal daemon``) enables it to keep manifests, packs and
+    ``todo.json`` warm between commands. Callers get a deep copy, so they
+    may mutate what they load.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._entries: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: Path, loader: Callable[[Path], T]) -> T:
+        """Return ``loader(path)``, from the cache when the file is unchanged."""
+        if not self.enabled:
+            return loader(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return loader(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None or entry[0] != stamp:
+            value = loader(path)
+            with self._lock:
+                self._entries[path] = (stamp, value)
+        else:
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+file_cache = FileCache()
@@ -6,7 +6,13 @@ import shutil
 from pathlib import Path
 from typing import Union
 
-def atomic_write(path: Path, content: Union[str, bytes], encoding: str = "utf-8", overwrite: bool = True) -> bool:
+def atomic_write(
+    path: Path,
+    content: Union[str, bytes],
+    encoding: str = "utf-8",
+    overwrite: bool = True,
+    fsync: bool = False,
+) -> bool:
     """
     Write content to a file atomically.
     First writes to a temporary file, then renames it to the target path.
@@ -16,6 +22,8 @@ def atomic_write(path: Path, content: Union[str, bytes], encoding: str = "utf-8"
         content: String or bytes to write.
         encoding: Encoding validation for string content.
         overwrite: If False, raise FileExistsError if file exists.
+        fsync: If True, flush the data to disk before the rename so the new
+            content survives a crash once this returns.
         
     Returns:
         True if written successfully.
@@ -33,6 +41,9 @@ def atomic_write(path: Path, content: Union[str, bytes], encoding: str = "utf-8"
     try:
         with os.fdopen(fd, 'w' if isinstance(content, str) else 'wb') as f:
             f.write(content)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
         
         # Atomic rename
         os.replace(temp_path, path)
@@ -9,8 +9,8 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.console import Console
 
+from copal_cli.fs.cache import file_cache
 from copal_cli.harness.session import SessionManager
-from copal_cli.harness.validate import validate_command
 
 logger = logging.getLogger(__name__)
 console = Console()
@@ -66,8 +66,7 @@ class AgentManager:
             return {"items": []}
             
         try:
-            with open(self.todo_path, "r") as f:
-                return json.load(f)
+            return file_cache.load(self.todo_path, _read_json)
         except json.JSONDecodeError:
             console.print(f"[red]✗ Invalid JSON in {self.todo_path}[/red]")
             return {"items": []}
@@ -140,6 +139,7 @@ class AgentManager:
                     self.console.print("\n[dim]Recent Sessions:[/dim]")
                     for h in history:
                          self.console.print(f"[dim]- {h.formatted}[/dim]")
+                    self.console.print("[dim]Full context: copal context --budget 4000[/dim]")
             
             # Create Worktree if requested
             if worktree:
@@ -262,3 +262,7 @@ class AgentManager:
 
         console.print(table)
 
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        return json.load(f)
@@ -0,0 +1,267 @@
+"""Token-budgeted context packs for agent resumption.
+
+``copal context`` gathers what an agent needs to pick a task back up - the
+active task, recent session summaries, important decisions and preferences,
+and memories linked to the task - and packs them into a single markdown or
+JSON blob that fits a token budget.
+
+Candidates are scored with the memory relevance scorer (importance, recency,
+use), weighted by where they came from, and selected greedily by score per
+token. Near-duplicates (token Jaccard similarity at or above
+``dedupe_threshold``) are skipped. The rendered pack is cached in
+``.copal/runtime`` until the store's fingerprint, the task or the options
+change. Tune under the ``context`` key of the memory config.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from rich.console import Console
+
+from copal_cli.fs.writer import atomic_write
+from copal_cli.memory.config import is_memory_enabled, load_memory_config
+from copal_cli.memory.factory import open_store
+from copal_cli.memory.models import Memory, MemoryType
+from copal_cli.memory.query import tokenize
+from copal_cli.memory.ranking import RelevanceScorer, is_expired
+from copal_cli.memory.recall import estimate_tokens
+from copal_cli.memory.scope import ScopeManager
+from copal_cli.memory.store_interface import IMemoryStore
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+DEFAULT_CONTEXT: dict[str, Any] = {
+    "budget": 4000,
+    "sessions": 10,
+    "candidates": 50,
+    "dedupe_threshold": 0.8,
+    "weights": {
+        "task": 2.0,
+        "sessions": 1.5,
+        "decisions": 1.0,
+        "related": 0.75,
+    },
+}
+
+SECTION_TITLES = {
+    "task": "Task Memories",
+    "sessions": "Recent Sessions",
+    "decisions": "Decisions & Preferences",
+    "related": "Related",
+}
+
+CACHE_FILE = "context-cache.json"
+
+
+def load_active_task(target_root: Path, task_id: str | None = None) -> dict[str, Any] | None:
+    """The todo item ``task_id``, or the first one in progress."""
+    todo_path = target_root / ".copal" / "artifacts" / "todo.json"
+    try:
+        items = json.loads(todo_path.read_text()).get("items", [])
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    for item in items:
+        if task_id is not None:
+            if str(item.get("id")) == str(task_id):
+                return item
+        elif item.get("status") == "in_progress":
+            return item
+    return None
+
+
+def _line(memory: Memory) -> str:
+    return f"- ({memory.type.value}, `{memory.id}`) {memory.content}"
+
+
+def _similar(a: frozenset[str], b: frozenset[str], threshold: float) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= threshold
+
+
+@dataclass(slots=True)
+class ContextEntry:
+    memory: Memory
+    section: str
+    relevance: float
+    tokens: int
+
+
+@dataclass(slots=True)
+class ContextPack:
+    scope: str
+    budget: int
+    task: dict[str, Any] | None = None
+    entries: list[ContextEntry] = field(default_factory=list)
+    tokens: int = 0
+
+    def sections(self) -> dict[str, list[ContextEntry]]:
+        grouped: dict[str, list[ContextEntry]] = {name: [] for name in SECTION_TITLES}
+        for entry in self.entries:
+            grouped[entry.section].append(entry)
+        return {name: entries for name, entries in grouped.items() if entries}
+
+    def to_markdown(self) -> str:
+        lines = [f"# Context ({self.scope}, ~{self.tokens}/{self.budget} tokens)", ""]
+        if self.task:
+            lines += ["## Active Task", f"**{self.task.get('id')}**: {self.task.get('action', '')}", ""]
+        for name, entries in self.sections().items():
+            if name == "sessions":
+                # Oldest first reads as a timeline.
+                entries = sorted(entries, key=lambda entry: entry.memory.created_at)
+            lines.append(f"## {SECTION_TITLES[name]}")
+            lines.extend(_line(entry.memory) for entry in entries)
+            lines.append("")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "scope": self.scope,
+            "budget": self.budget,
+            "tokens": self.tokens,
+            "task": self.task,
+            "sections": {
+                name: [
+                    {
+                        "id": entry.memory.id,
+                        "type": entry.memory.type.value,
+                        "content": entry.memory.content,
+                        "created_at": entry.memory.created_at.isoformat(),
+                        "importance": entry.memory.importance,
+                    }
+                    for entry in entries
+                ]
+                for name, entries in self.sections().items()
+            },
+        }
+
+
+class ContextPackBuilder:
+    """Collects candidate memories and packs the best ones into a token budget."""
+
+    def __init__(self, store: IMemoryStore, config: dict[str, Any]) -> None:
+        self.store = store
+        settings = config.get("context")
+        settings = settings if isinstance(settings, dict) else {}
+        self.settings = {**DEFAULT_CONTEXT, **settings}
+        self.weights = {**DEFAULT_CONTEXT["weights"], **(settings.get("weights") or {})}
+        self.scorer = RelevanceScorer.from_config(config)
+
+    def _candidates(self, scope: str, task: dict[str, Any] | None) -> dict[str, tuple[Memory, str]]:
+        """Memory id -> (memory, section); the first section to claim a memory keeps it."""
+        found: dict[str, tuple[Memory, str]] = {}
+        limit = int(self.settings["candidates"])
+
+        def claim(memories: Any, section: str) -> None:
+            for memory in memories:
+                found.setdefault(memory.id, (memory, section))
+
+        if task is not None:
+            linked = list(self.store.iter_memories(scope=scope, where={"task_id": str(task.get("id"))}))
+            claim(linked, "task")
+            if task.get("action"):
+                claim((m for m, _ in self.store.lexical_search(task["action"], scope=scope, limit=limit)), "task")
+            for memory in linked:
+                claim((m for m, _ in self.store.related_memories(memory.id, scope=scope)), "related")
+
+        claim(self.store.list_sessions(scope=scope, limit=int(self.settings["sessions"])), "sessions")
+        claim(
+            self.store.rank_memories(scope=scope, types=[MemoryType.DECISION, MemoryType.PREFERENCE], limit=limit),
+            "decisions",
+        )
+        return found
+
+    def build(self, scope: str, *, budget: int, task: dict[str, Any] | None = None) -> ContextPack:
+        pack = ContextPack(scope=scope, budget=budget, task=task)
+        if task:
+            pack.tokens = estimate_tokens(f"**{task.get('id')}**: {task.get('action', '')}")
+
+        now = datetime.now(timezone.utc)
+        scored = []
+        for memory, section in self._candidates(scope, task).values():
+            if is_expired(memory, now):
+                continue
+            tokens = estimate_tokens(_line(memory))
+            relevance = self.weights.get(section, 1.0) * self.scorer.score(memory, now=now)
+            scored.append(ContextEntry(memory, section, relevance, tokens))
+        scored.sort(key=lambda entry: entry.relevance / entry.tokens, reverse=True)
+
+        threshold = float(self.settings["dedupe_threshold"])
+        kept: list[frozenset[str]] = []
+        for entry in scored:
+            if pack.tokens + entry.tokens > budget:
+                continue
+            tokens = frozenset(tokenize(entry.memory.content))
+            if any(_similar(tokens, other, threshold) for other in kept):
+                continue
+            kept.append(tokens)
+            pack.entries.append(entry)
+            pack.tokens += entry.tokens
+        # Within each section, present the most relevant first.
+        pack.entries.sort(key=lambda entry: entry.relevance, reverse=True)
+        return pack
+
+
+def _cache_key(store: IMemoryStore, **options: Any) -> str:
+    payload = json.dumps({"fingerprint": store.fingerprint(), **options}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def context_command(
+    target: str = ".",
+    budget: int | None = None,
+    fmt: str = "markdown",
+    task_id: str | None = None,
+    scope: str | None = None,
+    use_cache: bool = True,
+) -> int:
+    """Print a context pack for the active task to stdout."""
+    target_root = Path(target).resolve()
+    config = load_memory_config(target_root)
+    if not is_memory_enabled(config):
+        console.print("[yellow]Memory subsystem is disabled in configuration.[/yellow]")
+        return 1
+
+    task = load_active_task(target_root, task_id)
+    if task_id is not None and task is None:
+        console.print(f"[red]✗ Task ID {task_id} not found.[/red]")
+        return 1
+
+    scope_manager = ScopeManager.from_config(target_root, config)
+    resolved_scope = scope_manager.resolve(scope)
+    store = open_store(target_root, config)
+    try:
+        builder = ContextPackBuilder(store, config)
+        budget = budget if budget is not None else int(builder.settings["budget"])
+        cache_path = target_root / ".copal" / "runtime" / CACHE_FILE
+        key = _cache_key(
+            store, scope=resolved_scope, budget=budget, fmt=fmt, task=task, settings=builder.settings
+        )
+        output = None
+        if use_cache:
+            try:
+                cached = json.loads(cache_path.read_text())
+                if cached.get("key") == key:
+                    output = cached["output"]
+            except (FileNotFoundError, json.JSONDecodeError, KeyError):
+                pass
+        if output is None:
+            pack = builder.build(resolved_scope, budget=budget, task=task)
+            output = pack.to_markdown() if fmt == "markdown" else json.dumps(pack.to_dict(), indent=2)
+            try:
+                atomic_write(cache_path, json.dumps({"key": key, "output": output}))
+            except OSError as e:
+                logger.warning(f"Could not cache context pack: {e}")
+        sys.stdout.write(output.rstrip("\n") + "\n")
+        return 0
+    finally:
+        store.close()
@@ -1,18 +1,27 @@
 from __future__ import annotations
 
+import json
 import logging
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, List, Optional
 from uuid import uuid4
 
+from rich.console import Console
+from rich.table import Table
+
 from copal_cli.memory.models import Memory, MemoryType, Relationship, EdgeType, _now
-from copal_cli.memory.sqlite_store import SQLiteMemoryStore
-from copal_cli.memory.config import load_memory_config, resolve_database_path, is_memory_enabled
+from copal_cli.memory.config import load_memory_config, is_memory_enabled
+from copal_cli.memory.factory import open_store
+from copal_cli.memory.store_interface import IMemoryStore
 from copal_cli.memory.scope import ScopeManager
 
 logger = logging.getLogger(__name__)
+console = Console()
+
+DEFAULT_SESSION_LIMIT = 20
 
 @dataclass
 class SessionSummary:
@@ -25,6 +34,15 @@ class SessionSummary:
     def formatted(self) -> str:
         return f"[{self.created_at.strftime('%Y-%m-%d %H:%M')}] Task {self.task_id}: {self.content}"
 
+    @classmethod
+    def from_memory(cls, memory: Memory) -> "SessionSummary":
+        return cls(
+            id=memory.id,
+            task_id=str(memory.metadata.get("task_id", "unknown")),
+            content=memory.content,
+            created_at=memory.created_at,
+        )
+
 class SessionManager:
     """Manages session-level memories (EXPERIENCE) for long-running agent contexts."""
 
@@ -34,23 +52,17 @@ class SessionManager:
         self.scope_manager = ScopeManager.from_config(target_root, self.config)
         
         # Initialize store only if enabled
-        self._store: Optional[SQLiteMemoryStore] = None
+        self._store: Optional[IMemoryStore] = None
         if is_memory_enabled(self.config):
-            # For now, default to SQLite. Can abstract later if needed.
             try:
-                db_path = resolve_database_path(target_root, self.config)
-                self._store = SQLiteMemoryStore(
-                    target_root=target_root,
-                    db_path=db_path,
-                    config=self.config,
-                    scope_manager=self.scope_manager,
-                )
+                self._store = open_store(target_root, self.config)
             except Exception as e:
                 logger.warning(f"Failed to initialize memory store for session manager: {e}")
 
     def close(self):
         if self._store:
             self._store.close()
+            self._store = None
 
     def is_enabled(self) -> bool:
         return self._store is not None
@@ -97,33 +109,33 @@ class SessionManager:
 
     def get_recent_sessions(self, limit: int = 5) -> List[SessionSummary]:
         """Retrieve the N most recent session summaries."""
+        return self.get_sessions(limit=limit)
+
+    def get_sessions(
+        self,
+        *,
+        task_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[SessionSummary]:
+        """Session summaries, newest first, optionally for one task or time range.
+
+        Archived sessions (valid_until set) live on in compaction digests and
+        are not returned.
+        """
         if not self._store:
             return []
 
         try:
-            # Query for EXPERIENCE memories with metadata type=session_summary
-            # Since SQLite store search/list capabilities might be limited in filtering by metadata,
-            # we rely on listing EXPERIENCE types and sorting/filtering in memory for now.
-            # TODO: Add nicer filtering to store interface later.
-            memories = self._store.list_memories(
+            memories = self._store.list_sessions(
                 scope=self.scope_manager.current_scope,
-                types=[MemoryType.EXPERIENCE]
+                task_id=task_id,
+                since=since,
+                until=until,
+                limit=limit,
             )
-            
-            # Filter for session summaries and sort by creation time desc
-            summaries = []
-            for m in memories:
-                if m.metadata.get("type") == "session_summary":
-                    summaries.append(SessionSummary(
-                        id=m.id,
-                        task_id=m.metadata.get("task_id", "unknown"),
-                        content=m.content,
-                        created_at=m.created_at
-                    ))
-            
-            # Sort descending (newest first)
-            summaries.sort(key=lambda s: s.created_at, reverse=True)
-            return summaries[:limit]
+            return [SessionSummary.from_memory(m) for m in memories]
 
         except Exception as e:
             logger.error(f"Failed to retrieve recent sessions: {e}")
@@ -131,15 +143,68 @@ class SessionManager:
 
     def _get_latest_session_memory(self) -> Optional[Memory]:
         """Get the single most recent session memory."""
-        recents = self.get_recent_sessions(limit=1)
-        if not recents:
-            return None
-        
-        # We need the full Memory object to get its ID for linking
-        # Re-fetch is safest or just use what we have if we trust ID consistency.
-        # Ideally get_recent_sessions returns objects that contain enough info.
-        # Let's just re-fetch the memory by ID from the store.
         if not self._store:
             return None
-            
-        return self._store.get_memory(recents[0].id)
+        try:
+            latest = self._store.list_sessions(scope=self.scope_manager.current_scope, limit=1)
+        except Exception as e:
+            logger.error(f"Failed to retrieve latest session: {e}")
+            return None
+        return latest[0] if latest else None
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO date or datetime; values without a zone are taken as UTC."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def sessions_command(
+    target: str = ".",
+    task_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = DEFAULT_SESSION_LIMIT,
+    fmt: str = "table",
+) -> int:
+    """List recorded session summaries, newest first."""
+    try:
+        start = parse_timestamp(since) if since else None
+        end = parse_timestamp(until) if until else None
+    except ValueError as e:
+        console.print(f"[red]✗ Invalid time: {e}[/red]")
+        return 1
+
+    manager = SessionManager(Path(target).resolve())
+    if not manager.is_enabled():
+        console.print("[yellow]Memory subsystem is disabled in configuration.[/yellow]")
+        return 1
+    try:
+        sessions = manager.get_sessions(task_id=task_id, since=start, until=end, limit=limit)
+    finally:
+        manager.close()
+
+    if fmt == "jsonl":
+        for session in sessions:
+            record = {
+                "id": session.id,
+                "task_id": session.task_id,
+                "created_at": session.created_at.isoformat(),
+                "content": session.content,
+            }
+            sys.stdout.write(json.dumps(record) + "\n")
+        return 0
+
+    if not sessions:
+        console.print("[dim]No sessions recorded.[/dim]")
+        return 0
+    table = Table(title=f"Sessions ({len(sessions)})")
+    table.add_column("When", style="dim")
+    table.add_column("Task", style="magenta")
+    table.add_column("ID", style="cyan")
+    table.add_column("Summary")
+    for session in sessions:
+        summary = session.content if len(session.content) <= 60 else session.content[:60] + "..."
+        table.add_row(session.created_at.strftime("%Y-%m-%d %H:%M"), session.task_id, session.id, summary)
+    console.print(table)
+    return 0
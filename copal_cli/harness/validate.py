@@ -5,10 +5,8 @@ import logging
 import subprocess
 from pathlib import Path
 
-import jsonschema
 from rich.console import Console
 from rich.panel import Panel
-from rich.syntax import Syntax
 
 from copal_cli.config.manifest import Manifest
 from copal_cli.config.pack import Pack
@@ -102,6 +100,9 @@ def validate_command(target: str = ".", check_artifacts: bool = False) -> int:
              console.print(f"[yellow]⚠ Artifacts directory not found: {artifacts_dir}[/yellow]")
              return 0
 
+        # jsonschema is slow to import; only artifact checks need it.
+        import jsonschema
+
         # Collect schemas from all packs
         for pack in valid_packs:
             for schema_name, schema_rel_path in pack.schemas.items():
@@ -1,16 +1,32 @@
-"""Memory subsystem for CoPal."""
+"""Memory subsystem for CoPal.
 
-from .models import Memory, MemoryType, Relationship, EdgeType
-from .store_interface import IMemoryStore
-from .networkx_store import NetworkXMemoryStore
-from .scope import ScopeManager
+Names are resolved on first use, so importing one submodule (say
+``copal_cli.memory.models``) does not load every store and its
+dependencies.
+"""
 
-__all__ = [
-    "Memory",
-    "MemoryType",
-    "EdgeType",
-    "Relationship",
-    "IMemoryStore",
-    "NetworkXMemoryStore",
-    "ScopeManager",
-]
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "Memory": ".models",
+    "MemoryType": ".models",
+    "EdgeType": ".models",
+    "Relationship": ".models",
+    "IMemoryStore": ".store_interface",
+    "NetworkXMemoryStore": ".networkx_store",
+    "ScopeManager": ".scope",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
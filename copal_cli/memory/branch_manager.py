@@ -9,7 +9,12 @@ from datetime import datetime
 from .models import Memory, MemoryType
 
 class BranchManager:
-    """Manages memory branches for tasks."""
+    """Manages memory branches for tasks.
+
+    This is the original file-per-branch layout. Stores now keep branch
+    memories alongside all others; :class:`JsonMemoryStore` only uses this
+    class to import branches written by older versions.
+    """
     
     def __init__(self, memory_dir: Path):
         self.memory_dir = memory_dir
@@ -35,6 +40,14 @@ class BranchManager:
         with open(branch_path / "memories.json", "w") as f:
             json.dump({"memories": []}, f, indent=2)
 
+    def get_branch_meta(self, task_id: str) -> Dict[str, Any]:
+        """Get a branch's meta.json contents ({} if missing)."""
+        meta_file = self.branches_dir / task_id / "meta.json"
+        if not meta_file.exists():
+            return {}
+        with open(meta_file, "r") as f:
+            return json.load(f)
+
     def get_branch_memories(self, task_id: str) -> List[Dict[str, Any]]:
         """Get memories from a branch."""
         mem_file = self.branches_dir / task_id / "memories.json"
@@ -0,0 +1,115 @@
+"""Task-scoped memory branches.
+
+A branch is the set of memories saved under the scope ``task:<task_id>``
+while a task is in progress. Branch memories live in the same table/graph
+as every other memory (so they are indexed and searchable like the rest);
+stores additionally keep a small registry of branches with a description
+and a status. ``merge_branch`` promotes a branch's memories into a project
+scope in one transaction, and the branch is marked ``merged`` once nothing
+is left in it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+from collections.abc import Iterable
+
+from .models import Memory, MemoryType, Relationship, _deserialize_datetime, _now, _serialize_datetime
+
+BRANCH_SCOPE_PREFIX = "task:"
+
+BRANCH_ACTIVE = "active"
+BRANCH_MERGED = "merged"
+BRANCH_STATUSES = (BRANCH_ACTIVE, BRANCH_MERGED)
+
+# Description recorded for branches created implicitly by a task-scoped write.
+AUTO_BRANCH_DESCRIPTION = "Auto-created for memory"
+
+
+class BranchExistsError(ValueError):
+    """Raised by ``create_branch`` when the task already has a branch."""
+
+
+class UnknownBranchError(LookupError):
+    """Raised by ``merge_branch`` for a task without a branch."""
+
+
+def branch_scope(task_id: str) -> str:
+    return f"{BRANCH_SCOPE_PREFIX}{task_id}"
+
+
+def branch_task(scope: str | None) -> str | None:
+    """Task id of a branch scope, or None for any other scope."""
+    if scope and scope.startswith(BRANCH_SCOPE_PREFIX):
+        return scope[len(BRANCH_SCOPE_PREFIX):]
+    return None
+
+
+@dataclass(slots=True)
+class Branch:
+    """Registry entry for a task branch; ``memories`` counts live memories."""
+
+    task_id: str
+    description: str = ""
+    status: str = BRANCH_ACTIVE
+    created_at: datetime = field(default_factory=_now)
+    merged_at: datetime | None = None
+    memories: int = 0
+
+    @property
+    def scope(self) -> str:
+        return branch_scope(self.task_id)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "task_id": self.task_id,
+            "description": self.description,
+            "status": self.status,
+            "created_at": _serialize_datetime(self.created_at),
+            "merged_at": _serialize_datetime(self.merged_at),
+        }
+
+    @staticmethod
+    def from_dict(payload: dict[str, Any], memories: int = 0) -> Branch:
+        return Branch(
+            task_id=payload["task_id"],
+            description=payload.get("description") or "",
+            status=payload.get("status") or BRANCH_ACTIVE,
+            created_at=_deserialize_datetime(payload.get("created_at")) or _now(),
+            merged_at=_deserialize_datetime(payload.get("merged_at")),
+            memories=memories,
+        )
+
+
+def select_promoted(
+    memories: Iterable[Memory],
+    memory_ids: Iterable[str] | None = None,
+    types: Iterable[MemoryType] | None = None,
+) -> list[Memory]:
+    """Branch memories chosen for a merge: all of them, or those matching ``memory_ids``/``types``."""
+    wanted = set(memory_ids) if memory_ids is not None else None
+    type_set = set(types) if types else None
+    return [
+        memory
+        for memory in memories
+        if (wanted is None or memory.id in wanted) and (type_set is None or memory.type in type_set)
+    ]
+
+
+def promote_relationships(
+    relationships: Iterable[Relationship],
+    promoted: set[str],
+    source_scope: str,
+    target_scope: str,
+) -> list[Relationship]:
+    """Branch relationships touching a promoted memory, re-scoped to ``target_scope``."""
+    moved: list[Relationship] = []
+    for relationship in relationships:
+        if relationship.scope != source_scope:
+            continue
+        if relationship.source_id in promoted or relationship.target_id in promoted:
+            relationship.scope = target_scope
+            moved.append(relationship)
+    return moved
@@ -3,29 +3,37 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import json
+import signal
+import sys
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import Optional
-from collections.abc import Iterable
+from typing import IO, Optional
+from collections.abc import Iterable, Iterator
 from uuid import uuid4
 
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 
-from .config import (
-    is_memory_enabled,
-    load_memory_config,
-    resolve_database_path,
-)
-from .models import Memory, MemoryType
-from .json_store import JsonMemoryStore
-from .sqlite_store import SQLiteMemoryStore
+from .branches import BranchExistsError, UnknownBranchError, branch_scope
+from .compaction import MemoryCompactor
+from .config import is_memory_enabled, load_memory_config
+from .dedupe import DuplicateMemoryError
+from .factory import open_store
+from .models import EdgeType, Memory, MemoryType, Relationship
+from .query import DEFAULT_PATH_DEPTH, metadata_filters
+from .ranking import DEFAULT_TOP_K
+from .recall import HybridRetriever
 from .scope import ScopeManager
 from .store_interface import IMemoryStore
 
 console = Console()
 
+IMPORT_BATCH_SIZE = 500
+
 
 @dataclass
 class MemoryCLIContext:
@@ -54,30 +62,11 @@ def _build_context(args: argparse.Namespace) -> MemoryCLIContext | None:
         console.print("[yellow]Memory subsystem is disabled in configuration.[/yellow]")
         return None
 
-    scope_manager = ScopeManager.from_config(target_root, config)
-    backend = str(config.get("backend", "sqlite")).lower()
-
-    if backend == "sqlite":
-        db_path = resolve_database_path(target_root, config)
-        store = SQLiteMemoryStore(
-            target_root=target_root,
-            db_path=db_path,
-            config=config,
-            scope_manager=scope_manager,
-        )
-    else:
-        # Fallback to json for compatibility
-        store = JsonMemoryStore(
-            target_root,
-            config=config,
-            scope_manager=scope_manager,
-        )
-
     return MemoryCLIContext(
         target_root=target_root,
         config=config,
-        scope_manager=scope_manager,
-        store=store,
+        scope_manager=ScopeManager.from_config(target_root, config),
+        store=open_store(target_root, config),
     )
 
 
@@ -93,6 +82,20 @@ def _parse_metadata(pairs: Iterable[str] | None) -> dict[str, str]:
     return metadata
 
 
+def _parse_where(pairs: Iterable[str] | None) -> dict[str, str] | None:
+    """``--where key=value`` filters; unlike ``--metadata``, malformed pairs are errors."""
+    if not pairs:
+        return None
+    where: dict[str, str] = {}
+    for pair in pairs:
+        if "=" not in pair:
+            raise ValueError(f"Invalid --where '{pair}' (expected key=value)")
+        key, value = pair.split("=", 1)
+        where[key.strip()] = value.strip()
+    metadata_filters(where)
+    return where
+
+
 def memory_add_command(args: argparse.Namespace) -> int:
     context = _build_context(args)
     if context is None:
@@ -110,14 +113,52 @@ def memory_add_command(args: argparse.Namespace) -> int:
             metadata=metadata,
             importance=float(getattr(args, "importance", 0.5)),
         )
-        context.store.add_memory(memory)
+        try:
+            stored = context.store.add_memory(memory, dedupe=getattr(args, "dedupe", None))
+        except DuplicateMemoryError as exc:
+            console.print(f"[yellow]Not added:[/yellow] duplicate of [cyan]{exc.existing.id}[/cyan]")
+            return 1
+        except ValueError as exc:
+            console.print(f"[red]{exc}[/red]")
+            return 1
+        if stored.id != memory.id:
+            console.print(f"[green]✓ Merged into existing memory[/green] [cyan]{stored.id}[/cyan] in scope '[cyan]{stored.scope}[/cyan]'")
+            return 0
         console.print(f"[green]✓ Created memory[/green] [cyan]{memory.id}[/cyan] in scope '[cyan]{memory.scope}[/cyan]'")
         return 0
     finally:
         context.store.close()
 
 
+def _print_jsonl(memories: Iterable[Memory]) -> None:
+    """Stream one JSON object per memory, flushing as each row is read."""
+    for memory in memories:
+        sys.stdout.write(json.dumps(memory.to_dict()) + "\n")
+        sys.stdout.flush()
+
+
+def _print_memory_table(memories: list[Memory], title: str, limit: int | None) -> None:
+    """Render a page of memories; ``memories`` may hold one extra row probing for more."""
+    more = limit is not None and len(memories) > limit
+    page = memories[:limit] if more else memories
+    table = Table(title=title.format(count=len(page)))
+    table.add_column("Type", style="magenta")
+    table.add_column("ID", style="cyan")
+    table.add_column("Content")
+
+    for memory in page:
+        table.add_row(memory.type.value, memory.id, memory.content[:60] + "..." if len(memory.content) > 60 else memory.content)
+
+    console.print(table)
+    if more:
+        console.print(f"[dim]More results available: --after {page[-1].id}[/dim]")
+
+
 def memory_search_command(args: argparse.Namespace) -> int:
+    if getattr(args, "top", None) and (getattr(args, "limit", None) is not None or getattr(args, "after", None)):
+        # Ranked results are not paged: --top K is the whole answer.
+        console.print("[red]✗ --top cannot be combined with --limit or --after[/red]")
+        return 2
     context = _build_context(args)
     if context is None:
         return 1
@@ -125,20 +166,118 @@ def memory_search_command(args: argparse.Namespace) -> int:
         scope = context.resolve_scope(getattr(args, "scope", None))
         type_args = getattr(args, "types", None)
         types = [MemoryType(t) for t in type_args] if type_args else None
-        results = context.store.search_memories(getattr(args, "query"), scope=scope, types=types)
+        query = getattr(args, "query")
+        limit = getattr(args, "limit", None)
+        after = getattr(args, "after", None)
+        top = getattr(args, "top", None)
+        jsonl = getattr(args, "format", "table") == "jsonl"
+
+        if getattr(args, "semantic", False):
+            return _semantic_search(context, query, scope, types, limit or top or DEFAULT_TOP_K, jsonl)
+        if top:
+            results = context.store.rank_memories(query, scope=scope, types=types, limit=top)
+        elif jsonl:
+            results = context.store.iter_search(query, scope=scope, types=types, after=after)
+            _print_jsonl(results if limit is None else islice(results, limit))
+            return 0
+        else:
+            # One extra row tells us whether to print a cursor for the next page.
+            results = context.store.search_memories(
+                query,
+                scope=scope,
+                types=types,
+                limit=None if limit is None else limit + 1,
+                after=after,
+            )
+        if jsonl:
+            _print_jsonl(results)
+            return 0
         if not results:
             console.print("[dim]No memories matched the query.[/dim]")
             return 0
-        
-        table = Table(title=f"Search Results ({len(results)} memories in scope '{scope}')")
-        table.add_column("Type", style="magenta")
-        table.add_column("ID", style="cyan")
-        table.add_column("Content")
-        
-        for memory in results:
-            table.add_row(memory.type.value, memory.id, memory.content[:60] + "..." if len(memory.content) > 60 else memory.content)
-        
-        console.print(table)
+
+        _print_memory_table(
+            results, f"Search Results ({{count}} memories in scope '{scope}')", None if top else limit
+        )
+        return 0
+    finally:
+        context.store.close()
+
+
+def _semantic_search(
+    context: MemoryCLIContext,
+    query: str,
+    scope: str,
+    types: list[MemoryType] | None,
+    limit: int,
+    jsonl: bool,
+) -> int:
+    if not hasattr(context.store, "semantic_search"):
+        console.print(
+            "[yellow]Semantic search is disabled; set memory.vector.enabled in .copal/config.json.[/yellow]"
+        )
+        return 1
+    hits = context.store.semantic_search(query, scope=scope, types=types, limit=limit)
+    if jsonl:
+        _print_jsonl(memory for memory, _ in hits)
+        return 0
+    if not hits:
+        console.print("[dim]No memories matched the query.[/dim]")
+        return 0
+    table = Table(title=f"Semantic Results ({len(hits)} memories in scope '{scope}')")
+    table.add_column("Score", justify="right")
+    table.add_column("Type", style="magenta")
+    table.add_column("ID", style="cyan")
+    table.add_column("Content")
+    for memory, score in hits:
+        content = memory.content[:60] + "..." if len(memory.content) > 60 else memory.content
+        table.add_row(f"{score:.3f}", memory.type.value, memory.id, content)
+    console.print(table)
+    return 0
+
+
+def memory_recall_command(args: argparse.Namespace) -> int:
+    context = _build_context(args)
+    if context is None:
+        return 1
+    try:
+        scope = context.resolve_scope(getattr(args, "scope", None))
+        type_args = getattr(args, "types", None)
+        types = [MemoryType(t) for t in type_args] if type_args else None
+        retriever = HybridRetriever.from_config(context.store, context.config)
+        result = retriever.recall(
+            args.query,
+            scope=scope,
+            types=types,
+            limit=getattr(args, "limit", None) or DEFAULT_TOP_K,
+            token_budget=getattr(args, "budget", None),
+        )
+
+        if getattr(args, "format", "table") == "jsonl":
+            for hit in result.hits:
+                row = {**hit.memory.to_dict(), "score": hit.score, "sources": list(hit.sources)}
+                sys.stdout.write(json.dumps(row) + "\n")
+            sys.stdout.flush()
+            return 0
+        if not result.hits:
+            console.print("[dim]No memories matched the query.[/dim]")
+        else:
+            table = Table(title=f"Recall ({len(result.hits)} memories in scope '{scope}')")
+            table.add_column("Score", justify="right")
+            table.add_column("Via", style="dim")
+            table.add_column("Type", style="magenta")
+            table.add_column("ID", style="cyan")
+            table.add_column("Content")
+            for hit in result.hits:
+                content = hit.memory.content
+                content = content[:60] + "..." if len(content) > 60 else content
+                table.add_row(f"{hit.score:.4f}", "+".join(hit.sources), hit.memory.type.value, hit.memory.id, content)
+            console.print(table)
+        console.print(f"[dim]~{result.tokens} tokens in {result.elapsed_ms:.0f} ms[/dim]")
+        if result.skipped:
+            console.print(
+                f"[yellow]Latency budget reached; skipped {', '.join(result.skipped)} retrieval.[/yellow]"
+            )
         return 0
     finally:
         context.store.close()
@@ -234,20 +373,329 @@ def memory_list_command(args: argparse.Namespace) -> int:
         scope = context.resolve_scope(getattr(args, "scope", None))
         type_args = getattr(args, "types", None)
         types = [MemoryType(t) for t in type_args] if type_args else None
-        memories = context.store.list_memories(scope=scope, types=types)
-        if not memories:
+        limit = getattr(args, "limit", None)
+        after = getattr(args, "after", None)
+        try:
+            where = _parse_where(getattr(args, "where", None))
+        except ValueError as exc:
+            console.print(f"[red]{exc}[/red]")
+            return 1
+        if getattr(args, "format", "table") == "jsonl":
+            memories = context.store.iter_memories(scope=scope, types=types, after=after, where=where)
+            _print_jsonl(memories if limit is None else islice(memories, limit))
+            return 0
+
+        results = context.store.list_memories(
+            scope=scope,
+            types=types,
+            limit=None if limit is None else limit + 1,
+            after=after,
+            where=where,
+        )
+        if not results:
             console.print(f"[dim]No memories stored for scope '{scope}'.[/dim]")
             return 0
-        
-        table = Table(title=f"Memories in scope '{scope}'")
+
+        _print_memory_table(results, f"Memories in scope '{scope}'", limit)
+        return 0
+    finally:
+        context.store.close()
+
+
+def memory_related_command(args: argparse.Namespace) -> int:
+    context = _build_context(args)
+    if context is None:
+        return 1
+    try:
+        scope = context.resolve_scope(getattr(args, "scope", None))
+        memory_id = args.memory_id
+        edge_args = getattr(args, "edge_types", None)
+        edge_types = [EdgeType(t) for t in edge_args] if edge_args else None
+        direction = getattr(args, "direction", "both")
+        depth = getattr(args, "depth", None)
+
+        if context.store.get_memory(memory_id, scope=scope) is None:
+            console.print("[yellow]Memory not found in the requested scope.[/yellow]")
+            return 1
+
+        if getattr(args, "latest", False):
+            latest = context.store.latest_version(memory_id, scope=scope)
+            if latest is None or latest.id == memory_id:
+                console.print(f"[green]✓[/green] [cyan]{memory_id}[/cyan] is the latest version.")
+            else:
+                console.print(f"[cyan]{memory_id}[/cyan] is superseded by [cyan]{latest.id}[/cyan]: {latest.content}")
+            return 0
+
+        if getattr(args, "path_to", None):
+            path = context.store.find_path(
+                memory_id,
+                args.path_to,
+                edge_types=edge_types,
+                direction=direction,
+                max_depth=depth or DEFAULT_PATH_DEPTH,
+                scope=scope,
+            )
+            if path is None:
+                console.print(f"[dim]No path from {memory_id} to {args.path_to}.[/dim]")
+                return 0
+            rows = [(str(hops), memory) for hops, memory in enumerate(path)]
+            title = f"Path from {memory_id} to {args.path_to} ({len(path) - 1} hops)"
+        elif getattr(args, "chain", False):
+            chain = context.store.session_chain(memory_id, direction=direction, scope=scope)
+            rows = [("→" if memory.id == memory_id else "", memory) for memory in chain]
+            title = f"Session chain around {memory_id} ({len(chain)} memories)"
+        else:
+            depth = depth or 1
+            related = context.store.related_memories(
+                memory_id,
+                depth=depth,
+                edge_types=edge_types,
+                direction=direction,
+                scope=scope,
+            )
+            if not related:
+                console.print(f"[dim]No memories related to {memory_id}.[/dim]")
+                return 0
+            rows = [(str(hops), memory) for memory, hops in related]
+            title = f"Memories within {depth} hops of {memory_id}"
+
+        table = Table(title=title)
+        table.add_column("Hop", style="dim")
         table.add_column("Type", style="magenta")
         table.add_column("ID", style="cyan")
         table.add_column("Content")
-        
-        for memory in memories:
-            table.add_row(memory.type.value, memory.id, memory.content[:60] + "..." if len(memory.content) > 60 else memory.content)
-        
+        for marker, memory in rows:
+            table.add_row(marker, memory.type.value, memory.id, memory.content[:60] + "..." if len(memory.content) > 60 else memory.content)
+        console.print(table)
+        return 0
+    except ValueError as exc:
+        console.print(f"[red]{exc}[/red]")
+        return 1
+    finally:
+        context.store.close()
+
+
+def memory_reindex_command(args: argparse.Namespace) -> int:
+    context = _build_context(args)
+    if context is None:
+        return 1
+    try:
+        if not hasattr(context.store, "reindex"):
+            console.print(
+                "[yellow]Semantic search is disabled; set memory.vector.enabled in .copal/config.json.[/yellow]"
+            )
+            return 1
+        scope = None if getattr(args, "all", False) else context.resolve_scope(getattr(args, "scope", None))
+        count = context.store.reindex(scope)
+        where = "all scopes" if scope is None else f"scope '[cyan]{scope}[/cyan]'"
+        console.print(f"[green]✓ Reindexed {count} memories[/green] in {where}")
+        return 0
+    finally:
+        context.store.close()
+
+
+def memory_compact_command(args: argparse.Namespace) -> int:
+    context = _build_context(args)
+    if context is None:
+        return 1
+    try:
+        scope = context.resolve_scope(getattr(args, "scope", None))
+        try:
+            compactor = MemoryCompactor.from_config(
+                context.store,
+                context.config,
+                older_than_days=getattr(args, "older_than", None),
+                period=getattr(args, "period", None),
+            )
+        except ValueError as exc:
+            console.print(f"[red]✗ {exc}[/red]")
+            return 1
+        report = compactor.run(
+            scope,
+            dedupe=not getattr(args, "no_dedupe", False),
+            prune=getattr(args, "prune", False),
+            vacuum=not getattr(args, "no_vacuum", False),
+        )
+        console.print(f"[green]✓ Compacted scope[/green] '[cyan]{scope}[/cyan]'")
+        console.print(f"  Session digests written: {report.digests}")
+        console.print(f"  Sessions archived: {report.sessions_archived}")
+        if report.sessions_pruned:
+            console.print(f"  Sessions deleted: {report.sessions_pruned}")
+        console.print(f"  Duplicates merged: {report.duplicates_merged}")
+        console.print(f"  Space reclaimed: {report.bytes_reclaimed / 1024:.1f} KiB")
+        return 0
+    finally:
+        context.store.close()
+
+
+def memory_branch_create_command(args: argparse.Namespace) -> int:
+    context = _build_context(args)
+    if context is None:
+        return 1
+    try:
+        try:
+            branch = context.store.create_branch(args.task_id, getattr(args, "description", None) or "")
+        except BranchExistsError as exc:
+            console.print(f"[red]✗ {exc}[/red]")
+            return 1
+        console.print(f"[green]✓ Created branch[/green] '[cyan]{branch.scope}[/cyan]'")
+        return 0
+    finally:
+        context.store.close()
+
+
+def memory_branch_list_command(args: argparse.Namespace) -> int:
+    context = _build_context(args)
+    if context is None:
+        return 1
+    try:
+        branches = context.store.list_branches(status=getattr(args, "status", None))
+        if not branches:
+            console.print("[dim]No branches.[/dim]")
+            return 0
+        table = Table(title=f"Branches ({len(branches)})")
+        table.add_column("Task", style="cyan")
+        table.add_column("Status", style="magenta")
+        table.add_column("Memories", justify="right")
+        table.add_column("Created", style="dim")
+        table.add_column("Description")
+        for branch in branches:
+            table.add_row(
+                branch.task_id,
+                branch.status,
+                str(branch.memories),
+                branch.created_at.strftime("%Y-%m-%d %H:%M"),
+                branch.description,
+            )
         console.print(table)
         return 0
     finally:
         context.store.close()
+
+
+def memory_branch_merge_command(args: argparse.Namespace) -> int:
+    """Promote a task branch's memories into the project scope."""
+    context = _build_context(args)
+    if context is None:
+        return 1
+    try:
+        scope = context.resolve_scope(getattr(args, "scope", None))
+        type_args = getattr(args, "types", None)
+        try:
+            promoted = context.store.merge_branch(
+                args.task_id,
+                target_scope=scope,
+                memory_ids=getattr(args, "memory_ids", None),
+                types=[MemoryType(t) for t in type_args] if type_args else None,
+            )
+        except UnknownBranchError as exc:
+            console.print(f"[red]✗ {exc}[/red]")
+            return 1
+        console.print(
+            f"[green]✓ Merged {len(promoted)} memories[/green] from "
+            f"'[cyan]{branch_scope(args.task_id)}[/cyan]' into '[cyan]{scope}[/cyan]'"
+        )
+        for memory in promoted:
+            console.print(f"  {memory.id} [dim]({memory.type.value})[/dim]")
+        return 0
+    finally:
+        context.store.close()
+
+
+@contextlib.contextmanager
+def _open_source(source: str) -> Iterator[IO[str]]:
+    if source == "-":
+        yield sys.stdin
+    else:
+        with open(source, "r", encoding="utf-8") as handle:
+            yield handle
+
+
+def memory_import_command(args: argparse.Namespace) -> int:
+    """Stream NDJSON memories/relationships into the store in batches.
+
+    Lines carrying ``source_id`` are relationships; everything else is a
+    memory in :meth:`Memory.to_dict` form. Records keep their timestamps.
+    """
+    context = _build_context(args)
+    if context is None:
+        return 1
+    try:
+        default_scope = context.resolve_scope(getattr(args, "scope", None))
+        batch_size = max(1, int(getattr(args, "batch_size", None) or IMPORT_BATCH_SIZE))
+        memories: list[Memory] = []
+        relationships: list[Relationship] = []
+        imported = 0
+        skipped: list[int] = []
+
+        def flush() -> None:
+            nonlocal imported, memories, relationships
+            if memories or relationships:
+                context.store.upsert_many(memories, relationships)
+                imported += len(memories) + len(relationships)
+                memories, relationships = [], []
+
+        try:
+            with _open_source(getattr(args, "file", "-")) as stream:
+                for line_no, line in enumerate(stream, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                        if not isinstance(record, dict):
+                            raise ValueError("record is not an object")
+                        record.setdefault("id", str(uuid4()))
+                        record.setdefault("scope", default_scope)
+                        if "source_id" in record:
+                            relationships.append(Relationship.from_dict(record))
+                        else:
+                            memories.append(Memory.from_dict(record))
+                    except (ValueError, KeyError, TypeError):
+                        skipped.append(line_no)
+                        continue
+                    if len(memories) + len(relationships) >= batch_size:
+                        flush()
+                flush()
+        except OSError as exc:
+            console.print(f"[red]✗ Cannot read import source:[/red] {exc}")
+            return 1
+
+        console.print(f"[green]✓ Imported {imported} records[/green]")
+        if skipped:
+            shown = ", ".join(str(n) for n in skipped[:10])
+            more = "..." if len(skipped) > 10 else ""
+            console.print(f"[yellow]Skipped {len(skipped)} invalid lines ({shown}{more})[/yellow]")
+        return 0
+    finally:
+        context.store.close()
+
+
+def memory_serve_command(args: argparse.Namespace) -> int:
+    """Run the memory server for the target root until interrupted."""
+    from .server import MemoryServer
+
+    target_root = _ensure_target_root(getattr(args, "target", "."))
+    config = load_memory_config(target_root)
+    if not is_memory_enabled(config):
+        console.print("[yellow]Memory subsystem is disabled in configuration.[/yellow]")
+        return 1
+    socket_arg = getattr(args, "socket", None)
+    server = MemoryServer(target_root, config, path=Path(socket_arg).resolve() if socket_arg else None)
+
+    def _stop(signum: int, frame: object) -> None:
+        raise KeyboardInterrupt
+
+    previous = signal.signal(signal.SIGTERM, _stop)
+    try:
+        try:
+            server.serve_forever()
+        except OSError as exc:
+            console.print(f"[red]✗ Cannot start memory server:[/red] {exc}")
+            return 1
+        except KeyboardInterrupt:
+            pass
+        return 0
+    finally:
+        server.close()
+        signal.signal(signal.SIGTERM, previous)
@@ -0,0 +1,47 @@
+"""JSON encoding for persisted memories and relationships.
+
+Decoding metadata and payload columns is most of the CPU cost of listing or
+searching a large store, so the stores go through :func:`loads`/:func:`dumps`
+here instead of :mod:`json` directly. When ``orjson`` is installed
+(``copal-cli[fast]``) it is used; otherwise the standard library is. Both
+write compact JSON, and either reads what the other wrote.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:  # pragma: no cover - import guard
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - executed when dependency missing
+    orjson = None  # type: ignore[assignment]
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+_SEPARATORS = (",", ":")
+
+
+def loads(data: str | bytes) -> Any:
+    """Decode a JSON document; raises :class:`ValueError` on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumpb(value: Any) -> bytes:
+    """Encode ``value`` as compact UTF-8 JSON."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson is stricter than json (e.g. integers beyond 64 bits).
+            pass
+    return json.dumps(value, separators=_SEPARATORS).encode("utf-8")
+
+
+def dumps(value: Any) -> str:
+    """Encode ``value`` as compact JSON text (what SQLite's JSON1 expects)."""
+    if orjson is not None:
+        return dumpb(value).decode("utf-8")
+    return json.dumps(value, separators=_SEPARATORS)
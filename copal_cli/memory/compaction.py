@@ -0,0 +1,212 @@
+"""Compaction for long-lived memory stores.
+
+Three passes, run by ``copal memory compact``:
+
+* **Session digests** - session summaries from periods (ISO weeks or
+  months) that ended more than ``older_than_days`` ago are rolled into one
+  ``session_digest`` EXPERIENCE memory per period. The digest SUPERSEDES
+  each original, and the originals are archived by setting ``valid_until``
+  (or deleted with ``prune``), so recent-session queries only see live rows.
+* **Deduplication** - live memories with the same type and content hash are
+  merged into the first stored one: importance takes the maximum, access counts
+  add up, and relationships are re-pointed before the copies are deleted.
+* **Vacuum** - dangling relationships are purged and free space is returned
+  to the filesystem (see :meth:`IMemoryStore.vacuum`).
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import uuid4
+
+from .models import EdgeType, Memory, MemoryType, Relationship
+from .ranking import _utc
+from .store_interface import IMemoryStore
+
+DEFAULT_COMPACTION: dict[str, Any] = {
+    "older_than_days": 30,
+    "period": "week",
+}
+
+PERIODS = ("week", "month")
+
+
+def period_key(moment: datetime, period: str) -> str:
+    """Label of the week (``2025-W03``) or month (``2025-01``) containing ``moment``."""
+    if period == "week":
+        year, week, _ = moment.isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{moment:%Y-%m}"
+
+
+def period_end(moment: datetime, period: str) -> datetime:
+    """Start of the period after the one containing ``moment``."""
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "week":
+        return day + timedelta(days=7 - day.weekday())
+    if day.month == 12:
+        return day.replace(year=day.year + 1, month=1, day=1)
+    return day.replace(month=day.month + 1, day=1)
+
+
+def _session_line(memory: Memory) -> str:
+    return f"- [{memory.created_at:%Y-%m-%d %H:%M}] Task {memory.metadata.get('task_id', 'unknown')}: {memory.content}"
+
+
+@dataclass(slots=True)
+class CompactionReport:
+    digests: int = 0
+    sessions_archived: int = 0
+    sessions_pruned: int = 0
+    duplicates_merged: int = 0
+    bytes_reclaimed: int = 0
+
+
+class MemoryCompactor:
+    """Runs the compaction passes against any :class:`IMemoryStore`."""
+
+    def __init__(
+        self,
+        store: IMemoryStore,
+        *,
+        older_than_days: float = DEFAULT_COMPACTION["older_than_days"],
+        period: str = DEFAULT_COMPACTION["period"],
+        now: datetime | None = None,
+    ) -> None:
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period '{period}' (expected one of {', '.join(PERIODS)})")
+        if older_than_days < 0:
+            raise ValueError("older_than_days must not be negative")
+        self.store = store
+        self.period = period
+        self.now = now or datetime.now(timezone.utc)
+        self.cutoff = self.now - timedelta(days=older_than_days)
+
+    @classmethod
+    def from_config(cls, store: IMemoryStore, config: dict[str, Any], **overrides: Any) -> "MemoryCompactor":
+        settings = config.get("compaction")
+        settings = {**DEFAULT_COMPACTION, **(settings if isinstance(settings, dict) else {})}
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(store, older_than_days=float(settings["older_than_days"]), period=str(settings["period"]))
+
+    def run(self, scope: str, *, dedupe: bool = True, prune: bool = False, vacuum: bool = True) -> CompactionReport:
+        report = CompactionReport()
+        self.digest_sessions(scope, report, prune=prune)
+        if dedupe:
+            self.deduplicate(scope, report)
+        if vacuum:
+            report.bytes_reclaimed = self.store.vacuum()
+        return report
+
+    # --- session digests ------------------------------------------------------
+    def digest_sessions(self, scope: str, report: CompactionReport, *, prune: bool = False) -> None:
+        groups: dict[str, list[Memory]] = defaultdict(list)
+        archived: list[str] = []
+        for memory in self.store.iter_memories(scope=scope, types=[MemoryType.EXPERIENCE]):
+            if memory.metadata.get("type") != "session_summary":
+                continue
+            if memory.valid_until is not None:
+                archived.append(memory.id)
+                continue
+            created = _utc(memory.created_at)
+            # Only whole periods are rolled up, so each is digested once.
+            if period_end(created, self.period) <= self.cutoff:
+                groups[period_key(created, self.period)].append(memory)
+
+        for key, sessions in sorted(groups.items()):
+            sessions.sort(key=lambda memory: memory.created_at)
+            digest = self._digest(scope, key, sessions)
+            if prune:
+                # One write: a failure must not leave sessions to be folded in again.
+                report.sessions_pruned += self.store.apply_changes(
+                    [digest], deletions=[m.id for m in sessions], scope=scope
+                )
+            else:
+                expired = [replace(memory, valid_until=self.now) for memory in sessions]
+                links = [
+                    Relationship(
+                        id=f"rel-{uuid4()}",
+                        source_id=digest.id,
+                        target_id=memory.id,
+                        type=EdgeType.SUPERSEDES,
+                        scope=scope,
+                    )
+                    for memory in sessions
+                ]
+                self.store.upsert_many([digest, *expired], links)
+                report.sessions_archived += len(sessions)
+            report.digests += 1
+
+        if prune and archived:
+            report.sessions_pruned += self.store.delete_many(archived, scope=scope)
+
+    def _digest(self, scope: str, key: str, sessions: list[Memory]) -> Memory:
+        digest_id = f"digest-{scope}-{key}"
+        lines = [_session_line(memory) for memory in sessions]
+        task_ids = {str(memory.metadata.get("task_id", "unknown")) for memory in sessions}
+        count = len(sessions)
+        # get_many: compaction must not count as an access to the digest.
+        existing = next(iter(self.store.get_many([digest_id], scope=scope)), None)
+        if existing is not None:
+            # A session backdated into an already digested period.
+            lines = existing.content.split("\n")[1:] + lines
+            task_ids.update(existing.metadata.get("task_ids", []))
+            count += int(existing.metadata.get("sessions", 0))
+        last = sessions[-1].created_at
+        return Memory(
+            id=digest_id,
+            type=MemoryType.EXPERIENCE,
+            content="\n".join([f"Session digest {key} ({count} sessions)", *lines]),
+            scope=scope,
+            metadata={"type": "session_digest", "period": key, "sessions": count, "task_ids": sorted(task_ids)},
+            created_at=existing.created_at if existing else last,
+            updated_at=last,
+            valid_from=existing.valid_from if existing else sessions[0].created_at,
+            importance=max([memory.importance for memory in sessions] + ([existing.importance] if existing else [])),
+            access_count=existing.access_count if existing else 0,
+            last_accessed=existing.last_accessed if existing else None,
+        )
+
+    # --- deduplication --------------------------------------------------------
+    def deduplicate(self, scope: str, report: CompactionReport) -> None:
+        keepers: dict[tuple[MemoryType, str], str] = {}
+        duplicates: dict[str, list[Memory]] = defaultdict(list)
+        for memory in self.store.iter_memories(scope=scope):
+            if memory.valid_until is not None:
+                continue
+            keeper_id = keepers.setdefault((memory.type, memory.content_hash), memory.id)
+            if keeper_id != memory.id:
+                duplicates[keeper_id].append(memory)
+        if not duplicates:
+            return
+
+        merged: list[Memory] = []
+        links: list[Relationship] = []
+        for stored in self.store.get_many(duplicates, scope=scope):
+            # The graph store hands out its own objects; change a copy.
+            keeper = replace(stored)
+            for copy in duplicates[keeper.id]:
+                keeper.importance = max(keeper.importance, copy.importance)
+                keeper.access_count += copy.access_count
+                if copy.last_accessed and (
+                    keeper.last_accessed is None or _utc(copy.last_accessed) > _utc(keeper.last_accessed)
+                ):
+                    keeper.last_accessed = copy.last_accessed
+                keeper.metadata = {**copy.metadata, **keeper.metadata}
+                for rel in self.store.list_relationships(copy.id, scope=scope, direction="both"):
+                    source = keeper.id if rel.source_id == copy.id else rel.source_id
+                    target = keeper.id if rel.target_id == copy.id else rel.target_id
+                    if source != target:
+                        links.append(replace(rel, id=f"rel-{uuid4()}", source_id=source, target_id=target))
+            merged.append(keeper)
+        # One write, copies deleted first so the rewritten keepers claim the
+        # content hash; the copies' edges are gone only once theirs are saved.
+        report.duplicates_merged += self.store.apply_changes(
+            merged,
+            links,
+            deletions=[copy.id for copies in duplicates.values() for copy in copies],
+            scope=scope,
+        )
@@ -3,13 +3,55 @@
 from __future__ import annotations
 
 import json
+import sqlite3
 from pathlib import Path
 from typing import Any
 
 DEFAULT_CONFIG: dict[str, Any] = {
     "backend": "sqlite",
     "auto_capture": True,
-    "database": ".copal/memory.db",
+    "track_access": True,
+}
+
+# Used when the config sets no ``database``. The graph backend keeps a
+# different schema, so it gets its own default file.
+DEFAULT_DATABASE = ".copal/memory.db"
+DEFAULT_GRAPH_DATABASE = ".copal/memory-graph.db"
+
+STORE_BACKENDS = ("sqlite", "graph", "json")
+
+# Older spellings accepted for ``backend``.
+BACKEND_ALIASES = {"networkx": "graph"}
+
+# Buffered `get_memory` accesses are written back after this many reads.
+DEFAULT_ACCESS_FLUSH_THRESHOLD = 64
+
+# Metadata keys that get an indexed generated column in the SQLite store;
+# override with the ``indexed_metadata`` list in the memory config.
+DEFAULT_INDEXED_METADATA: tuple[str, ...] = ("task_id", "topic")
+
+# Semantic search settings, read from the ``vector`` key of the memory config.
+DEFAULT_VECTOR_CONFIG: dict[str, Any] = {
+    "enabled": False,
+    "backend": "local",
+    "embedder": "hashing",
+    "dimension": 256,
+    "model": "all-MiniLM-L6-v2",
+    "path": ".copal/vectors",
+}
+
+# Memory server settings, read from the ``server`` key of the memory config.
+# ``discover`` lets commands route through a running ``copal memory serve``;
+# the server waits up to ``batch_window_ms`` to group queued writes into one
+# transaction of at most ``max_batch`` requests.
+DEFAULT_SERVER_CONFIG: dict[str, Any] = {
+    "discover": True,
+    "socket": ".copal/memory.sock",
+    "batch_window_ms": 2,
+    "max_batch": 256,
+    "cache_size": 512,
+    # Seconds a client waits for an answer before using the database directly.
+    "timeout": 10.0,
 }
 
 
@@ -32,10 +74,48 @@ def load_memory_config(target_root: Path) -> dict[str, Any]:
     return merged
 
 
+class DatabaseSchemaError(ValueError):
+    """Raised when the memory database was created by a different backend."""
+
+
+def store_backend(config: dict[str, Any]) -> str:
+    """Normalised ``backend`` setting; unknown values fall back to JSON."""
+    backend = str(config.get("backend", DEFAULT_CONFIG["backend"])).lower()
+    backend = BACKEND_ALIASES.get(backend, backend)
+    return backend if backend in STORE_BACKENDS else "json"
+
+
+def database_schema(db_path: Path) -> str | None:
+    """``"graph"`` or ``"sqlite"`` for the backend whose schema ``db_path`` holds; None if it has none."""
+    if not db_path.exists():
+        return None
+    conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(memories)")}
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        conn.close()
+    if not columns:
+        return None
+    return "graph" if "payload" in columns else "sqlite"
+
+
 def resolve_database_path(target_root: Path, config: dict[str, Any]) -> Path:
-    """Determine the persistence path for the memory database."""
+    """Determine the persistence path for the memory database.
 
-    database_value = config.get("database", DEFAULT_CONFIG["database"])
+    Without an explicit ``database`` the SQLite and graph backends use
+    separate files; graph stores created before that keep their
+    ``memory.db``.
+    """
+
+    database_value = config.get("database")
+    if database_value is None:
+        database_value = DEFAULT_DATABASE
+        if store_backend(config) == "graph":
+            legacy = target_root / database_value
+            if (target_root / DEFAULT_GRAPH_DATABASE).exists() or database_schema(legacy) != "graph":
+                database_value = DEFAULT_GRAPH_DATABASE
     db_path = Path(database_value)
     if not db_path.is_absolute():
         db_path = target_root / db_path
@@ -43,9 +123,50 @@ def resolve_database_path(target_root: Path, config: dict[str, Any]) -> Path:
     return db_path
 
 
+def check_database_schema(db_path: Path, backend: str) -> None:
+    """Raise :class:`DatabaseSchemaError` if ``db_path`` belongs to another backend."""
+    found = database_schema(db_path)
+    if found is not None and found != backend:
+        raise DatabaseSchemaError(
+            f"{db_path} holds a {found} memory store, not a {backend} one; "
+            "point the memory `database` setting at a separate file"
+        )
+
+
 def is_memory_enabled(config: dict[str, Any]) -> bool:
     return bool(config.get("enabled", True))
 
 
 def is_auto_capture_enabled(config: dict[str, Any]) -> bool:
     return bool(config.get("auto_capture", DEFAULT_CONFIG["auto_capture"]))
+
+
+def is_access_tracking_enabled(config: dict[str, Any]) -> bool:
+    return bool(config.get("track_access", DEFAULT_CONFIG["track_access"]))
+
+
+def indexed_metadata_keys(config: dict[str, Any]) -> list[str]:
+    keys = config.get("indexed_metadata", DEFAULT_INDEXED_METADATA)
+    if not isinstance(keys, (list, tuple)):
+        return list(DEFAULT_INDEXED_METADATA)
+    return [str(key) for key in keys if str(key).isidentifier() and str(key).isascii()]
+
+
+def vector_config(config: dict[str, Any]) -> dict[str, Any]:
+    merged = DEFAULT_VECTOR_CONFIG.copy()
+    overrides = config.get("vector")
+    if isinstance(overrides, dict):
+        merged.update(overrides)
+    return merged
+
+
+def is_vector_search_enabled(config: dict[str, Any]) -> bool:
+    return bool(vector_config(config)["enabled"])
+
+
+def server_config(config: dict[str, Any]) -> dict[str, Any]:
+    merged = DEFAULT_SERVER_CONFIG.copy()
+    overrides = config.get("server")
+    if isinstance(overrides, dict):
+        merged.update(overrides)
+    return merged
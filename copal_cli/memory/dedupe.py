@@ -0,0 +1,132 @@
+"""Content-hash deduplication applied when memories are added.
+
+Every store keys live memories by ``(scope, type, content_hash)`` and keeps
+at most one of them indexed per key. When ``add_memory``/``add_memories``
+meets a memory whose key is already taken, the ``dedupe`` policy decides:
+
+* ``off`` - store the copy anyway (it stays out of the hash index and is
+  left for ``copal memory compact`` to merge).
+* ``reject`` - raise :class:`DuplicateMemoryError`; nothing is written.
+* ``merge`` - fold the new metadata into the stored memory and keep the
+  higher importance.
+* ``bump`` - leave the stored memory's content alone but count the re-save
+  as an access and raise its importance by :data:`IMPORTANCE_BUMP`.
+
+With ``merge`` and ``bump`` the stored memory is returned in place of the
+new one and relationships naming the new id are re-pointed to it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any
+from collections.abc import Callable, Iterable
+
+from .models import Memory, Relationship, _now
+
+DEDUPE_POLICIES = ("off", "reject", "merge", "bump")
+DEFAULT_DEDUPE_POLICY = "off"
+
+# Importance added each time ``bump`` sees the same content again.
+IMPORTANCE_BUMP = 0.1
+
+
+class DuplicateMemoryError(ValueError):
+    """Raised by the ``reject`` policy; ``existing`` is the stored memory."""
+
+    def __init__(self, existing: Memory) -> None:
+        super().__init__(f"Duplicate of memory '{existing.id}' in scope '{existing.scope}'")
+        self.existing = existing
+
+
+def dedupe_policy(config: dict[str, Any], override: str | None = None) -> str:
+    """Policy to apply: ``override`` if given, else the ``dedupe`` config key."""
+    policy = str(override or config.get("dedupe") or DEFAULT_DEDUPE_POLICY).lower()
+    if policy not in DEDUPE_POLICIES:
+        raise ValueError(f"Unknown dedupe policy '{policy}' (expected one of {', '.join(DEDUPE_POLICIES)})")
+    return policy
+
+
+def dedupe_key(memory: Memory) -> tuple[str, str, str] | None:
+    """``(scope, type, content_hash)``; None for expired memories, which never collide."""
+    if memory.valid_until is not None:
+        return None
+    return (memory.scope, memory.type.value, memory.content_hash)
+
+
+def _absorb(existing: Memory, incoming: Memory, policy: str) -> Memory:
+    now = _now()
+    if policy == "merge":
+        existing.metadata = {**existing.metadata, **incoming.metadata}
+        existing.importance = max(existing.importance, incoming.importance)
+    else:
+        existing.importance = min(1.0, max(existing.importance, incoming.importance) + IMPORTANCE_BUMP)
+        existing.access_count += 1
+        existing.last_accessed = now
+    existing.updated_at = now
+    return existing
+
+
+@dataclass(slots=True)
+class DedupeResult:
+    """Outcome of :func:`resolve_duplicates`.
+
+    ``results`` holds one memory per input, in order, with duplicates replaced
+    by the memory they were folded into. ``fresh`` are the memories to insert,
+    ``merged`` the stored memories the policy changed, and ``remap`` maps each
+    dropped id to the id that absorbed it.
+    """
+
+    results: list[Memory] = field(default_factory=list)
+    fresh: list[Memory] = field(default_factory=list)
+    merged: list[Memory] = field(default_factory=list)
+    remap: dict[str, str] = field(default_factory=dict)
+
+
+def resolve_duplicates(
+    memories: Iterable[Memory],
+    policy: str,
+    find: Callable[[Memory], Memory | None],
+) -> DedupeResult:
+    """Match ``memories`` against stored copies (looked up with ``find``) and each other."""
+    outcome = DedupeResult()
+    merged: dict[str, Memory] = {}
+    fresh_ids: set[str] = set()
+    claimed: dict[tuple[str, str, str], Memory] = {}
+    for memory in memories:
+        key = dedupe_key(memory) if policy != "off" else None
+        existing = None
+        if key is not None:
+            existing = claimed.get(key) or find(memory)
+            if existing is not None and existing.id == memory.id:
+                existing = None
+        if existing is None:
+            if key is not None:
+                claimed.setdefault(key, memory)
+            fresh_ids.add(memory.id)
+            outcome.fresh.append(memory)
+            outcome.results.append(memory)
+            continue
+        if policy == "reject":
+            raise DuplicateMemoryError(existing)
+        claimed[key] = _absorb(existing, memory, policy)
+        if existing.id not in fresh_ids:
+            merged[existing.id] = existing
+        outcome.remap[memory.id] = existing.id
+        outcome.results.append(existing)
+    outcome.merged = list(merged.values())
+    return outcome
+
+
+def remap_relationships(relationships: Iterable[Relationship], remap: dict[str, str]) -> list[Relationship]:
+    """Point relationships at the memories duplicates were folded into, dropping self-loops."""
+    edges: list[Relationship] = []
+    for relationship in relationships:
+        source = remap.get(relationship.source_id, relationship.source_id)
+        target = remap.get(relationship.target_id, relationship.target_id)
+        if source == target:
+            continue
+        if (source, target) != (relationship.source_id, relationship.target_id):
+            relationship = replace(relationship, source_id=source, target_id=target)
+        edges.append(relationship)
+    return edges
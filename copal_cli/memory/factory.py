@@ -0,0 +1,251 @@
+"""Open memory stores from configuration.
+
+:func:`open_store` is the one place that maps the ``backend`` setting to a
+store class (and wraps it with the vector index when semantic search is
+enabled). Stores are pooled per process by ``(target_root, backend,
+db_path)``: every caller gets a lease on the same instance, so a command that
+goes through several managers opens, migrates and warms the database once.
+Closing a lease releases it; the store itself stays open for the next caller
+and is closed when the interpreter exits (or by :func:`close_stores`). An
+idle store whose configuration has changed is rebuilt on the next open.
+Long-lived processes (``copal daemon``) call :func:`refresh_stores` before
+each command so idle stores whose files another process wrote are reopened.
+
+When a memory server (``copal memory serve``) is running for the target
+root, or for the repository a worktree was created from, :func:`open_store`
+returns a client for it instead and never touches the database files.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+# BACKEND_ALIASES, STORE_BACKENDS and store_backend are re-exported here.
+from .config import (
+    BACKEND_ALIASES,
+    STORE_BACKENDS,
+    is_vector_search_enabled,
+    load_memory_config,
+    resolve_database_path,
+    store_backend,
+)
+from .rpc import discover_socket, shared_root
+from .scope import ScopeManager
+from .store_interface import IMemoryStore
+
+logger = logging.getLogger(__name__)
+
+PoolKey = tuple[Path, str, "Path | None"]
+FileStamp = tuple[int, ...]
+
+
+def create_store(target_root: Path, config: dict[str, Any]) -> IMemoryStore:
+    """Build a new, unshared store for ``config``."""
+    scope_manager = ScopeManager.from_config(target_root, config)
+    backend = store_backend(config)
+    store: IMemoryStore
+    if backend == "sqlite":
+        from .sqlite_store import SQLiteMemoryStore
+
+        store = SQLiteMemoryStore(
+            target_root=target_root,
+            db_path=resolve_database_path(target_root, config),
+            config=config,
+            scope_manager=scope_manager,
+        )
+    elif backend == "graph":
+        from .networkx_store import NetworkXMemoryStore
+
+        store = NetworkXMemoryStore(target_root, config=config, scope_manager=scope_manager)
+    else:
+        from .json_store import JsonMemoryStore
+
+        store = JsonMemoryStore(target_root, config=config, scope_manager=scope_manager)
+
+    if is_vector_search_enabled(config):
+        from .vector import open_vector_store
+
+        store = open_vector_store(store, target_root, config)
+    return store
+
+
+def _pool_key(target_root: Path, config: dict[str, Any]) -> PoolKey:
+    backend = store_backend(config)
+    db_path = None if backend == "json" else resolve_database_path(target_root, config).resolve()
+    return (target_root.resolve(), backend, db_path)
+
+
+def _store_files(key: PoolKey) -> tuple[Path, ...]:
+    root, backend, db_path = key
+    if db_path is None:
+        memory_dir = root / ".copal" / "memory"
+        return (memory_dir / "index.json", memory_dir / "journal.jsonl")
+    return (db_path, db_path.with_name(db_path.name + "-wal"))
+
+
+def _file_stamp(key: PoolKey) -> FileStamp:
+    stamp: list[int] = []
+    for path in _store_files(key):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stamp.extend((0, 0))
+        else:
+            stamp.extend((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+
+@dataclass
+class _PoolEntry:
+    store: IMemoryStore
+    config: dict[str, Any]
+    leases: int = 0
+    # Store files as of the last release; compared by :meth:`StorePool.refresh`.
+    stamp: FileStamp = field(default_factory=tuple)
+
+
+class StoreLease:
+    """A caller's handle on a pooled store.
+
+    Behaves like the store itself; :meth:`close` hands the lease back
+    instead of closing the shared instance.
+    """
+
+    def __init__(self, pool: StorePool, key: PoolKey, store: IMemoryStore) -> None:
+        self._pool = pool
+        self._key = key
+        self.store = store
+        self._released = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.store, name)
+
+    def close(self) -> None:
+        if not self._released:
+            self._released = True
+            self._pool.release(self._key)
+
+
+class StorePool:
+    """Reference-counted stores, one per ``(target_root, backend, db_path)``."""
+
+    def __init__(self) -> None:
+        self._entries: dict[PoolKey, _PoolEntry] = {}
+        self._lock = threading.RLock()
+
+    def acquire(self, target_root: Path, config: dict[str, Any]) -> IMemoryStore:
+        key = _pool_key(target_root, config)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.config != config:
+                if entry.leases:
+                    # The settings changed while the shared store is in use;
+                    # this caller gets its own store built from the new ones.
+                    return create_store(target_root, config)
+                del self._entries[key]
+                entry.store.close()
+                entry = None
+            if entry is None:
+                entry = self._entries[key] = _PoolEntry(create_store(target_root, config), dict(config))
+            entry.leases += 1
+            return StoreLease(self, key, entry.store)
+
+    def release(self, key: PoolKey) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.leases = max(0, entry.leases - 1)
+            if entry.leases == 0:
+                # Idle stores stay open, but nothing buffered should wait for exit.
+                flush = getattr(entry.store, "flush_access_stats", None)
+                if flush is not None:
+                    flush()
+                entry.stamp = _file_stamp(key)
+
+    def refresh(self) -> int:
+        """Close idle stores whose files changed since their last release.
+
+        Returns the number of stores dropped; the next open rebuilds them.
+        """
+        with self._lock:
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if not entry.leases and entry.stamp and entry.stamp != _file_stamp(key)
+            ]
+            entries = [self._entries.pop(key) for key in stale]
+        for entry in entries:
+            entry.store.close()
+        return len(entries)
+
+    def leases(self, target_root: Path, config: dict[str, Any]) -> int:
+        """Open leases on the store for ``config`` (0 if it is not pooled)."""
+        entry = self._entries.get(_pool_key(target_root, config))
+        return entry.leases if entry is not None else 0
+
+    def close_all(self) -> None:
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        for key, entry in entries.items():
+            try:
+                entry.store.close()
+            except Exception as exc:  # pragma: no cover - best effort at exit
+                logger.warning(f"Failed to close memory store for {key[0]}: {exc}")
+
+
+_POOL = StorePool()
+atexit.register(_POOL.close_all)
+
+
+def open_store(
+    target_root: Path,
+    config: dict[str, Any] | None = None,
+    *,
+    pooled: bool = True,
+) -> IMemoryStore:
+    """Store for ``target_root``, configured from ``config`` (or its config file).
+
+    If a memory server is running for ``target_root`` the result is a
+    :class:`~copal_cli.memory.remote.RemoteMemoryStore` connected to it,
+    which switches to the store described below if the server stops
+    answering.
+    Otherwise, with ``pooled`` (the default) the result is a
+    :class:`StoreLease` on the process-wide instance; close it when done.
+    ``pooled=False`` returns a private store that the caller owns outright.
+    """
+    target_root = Path(target_root)
+    if config is None:
+        config = load_memory_config(target_root)
+    if discover_socket(target_root, config) is not None:
+        from .remote import connect_server
+
+        # The store the server was serving: a linked worktree's is the main repository's.
+        root = shared_root(target_root)
+        root_config = config if root == target_root else load_memory_config(root)
+
+        def local() -> IMemoryStore:
+            return _POOL.acquire(root, root_config) if pooled else create_store(root, root_config)
+
+        remote = connect_server(target_root, config, fallback=local)
+        if remote is not None:
+            return remote
+    if not pooled:
+        return create_store(target_root, config)
+    return _POOL.acquire(target_root, config)
+
+
+def close_stores() -> None:
+    """Close every pooled store; later :func:`open_store` calls start afresh."""
+    _POOL.close_all()
+
+
+def refresh_stores() -> int:
+    """Drop idle pooled stores whose database files were written by another process."""
+    return _POOL.refresh()
@@ -1,19 +1,60 @@
 from __future__ import annotations
 
+import contextlib
 import json
+import logging
+import os
+from dataclasses import replace
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Iterable, Sequence
+from typing import Any, Iterable, Iterator, Sequence
+
+try:  # pragma: no cover - platform guard
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
 
 from copal_cli.fs.writer import atomic_write
-from .models import Memory, MemoryType, Relationship
+from . import codec
+from .dedupe import dedupe_key, dedupe_policy, resolve_duplicates
+from .models import EdgeType, Memory, MemoryType, Relationship, _now, content_hash
+from .query import bm25_rank, metadata_filters, metadata_matches, paginate, select_sessions
+from .ranking import DEFAULT_TOP_K, RelevanceScorer, text_match
 from .store_interface import IMemoryStore
 from .scope import ScopeManager
 from .branch_manager import BranchManager
+from .branches import (
+    AUTO_BRANCH_DESCRIPTION,
+    BRANCH_ACTIVE,
+    BRANCH_MERGED,
+    Branch,
+    BranchExistsError,
+    UnknownBranchError,
+    branch_scope,
+    branch_task,
+    select_promoted,
+)
+
+logger = logging.getLogger(__name__)
+
+# Fold the journal into index.json once it grows past this many bytes.
+DEFAULT_JOURNAL_COMPACT_BYTES = 1024 * 1024
+
 
 class JsonMemoryStore(IMemoryStore):
     """
     Enhanced JSON file-based memory store.
     Supports Project Memory (Markdown) and Task Memory (Branches).
+
+    Task branches are ordinary ``task:<id>`` scoped records; the branch
+    registry is journalled alongside them and folded into ``index.json``.
+
+    ``index.json`` is a snapshot; every write appends one record to
+    ``journal.jsonl`` (fsynced before returning) and the store keeps an
+    id -> journal offset map for the records written since the snapshot.
+    Once the journal passes ``journal_compact_bytes`` it is folded into a new
+    snapshot. Other processes' appends and compactions are picked up before
+    each operation, so reads always see the merged view.
     """
 
     def __init__(
@@ -27,135 +68,351 @@ class JsonMemoryStore(IMemoryStore):
         self.scope_manager = scope_manager
         self.memory_dir = target_root / ".copal" / "memory"
         self.memory_dir.mkdir(parents=True, exist_ok=True)
-        
+
         self.branch_manager = BranchManager(self.memory_dir)
         self.index_file = self.memory_dir / "index.json"
-        
+        self.journal_file = self.memory_dir / "journal.jsonl"
+        self.lock_file = self.memory_dir / ".journal.lock"
+        self.compact_bytes = int(config.get("journal_compact_bytes", DEFAULT_JOURNAL_COMPACT_BYTES))
+
         if not self.index_file.exists():
             atomic_write(self.index_file, json.dumps({"memories": [], "project_meta": {}}, indent=2))
-            
-    def _load_index(self) -> dict[str, Any]:
-        with open(self.index_file, "r") as f:
-            return json.load(f)
 
-    def _save_index(self, data: dict[str, Any]) -> None:
-        atomic_write(self.index_file, json.dumps(data, indent=2))
+        self._snapshot: dict[str, dict[str, Any]] = {}
+        self._project_meta: dict[str, Any] = {}
+        self._offsets: dict[str, int] = {}
+        self._snapshot_stamp: tuple[int, int, int] | None = None
+        self._journal_pos = 0
+        # (scope, type, content_hash) -> id, built on the first dedupe lookup.
+        self._hash_index: dict[tuple[str, str, str], str] | None = None
+        self._hash_keys: dict[str, tuple[str, str, str]] = {}
+        self._branches: dict[str, dict[str, Any]] = {}
+        self._refresh()
+        self._import_legacy_branches()
+
+    # --- journal ----------------------------------------------------------------
+    @staticmethod
+    def _stamp(path: Path) -> tuple[int, int, int] | None:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialise journal writers across processes (no-op without fcntl)."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _reload(self) -> None:
+        with open(self.index_file, "rb") as f:
+            data = codec.loads(f.read())
+        self._snapshot = {m["id"]: m for m in data.get("memories", [])}
+        self._project_meta = data.get("project_meta", {})
+        self._branches = {branch["task_id"]: branch for branch in data.get("branches", [])}
+        self._offsets = {}
+        self._journal_pos = 0
+        self._snapshot_stamp = self._stamp(self.index_file)
+        self._hash_index = None
+
+    def _refresh(self) -> None:
+        """Bring the in-process view up to date with the files on disk."""
+        if self._stamp(self.index_file) != self._snapshot_stamp:
+            self._reload()
+        journal_stamp = self._stamp(self.journal_file)
+        size = journal_stamp[2] if journal_stamp else 0
+        if size < self._journal_pos:
+            # Compacted by another process between our stat calls.
+            self._reload()
+        if size > self._journal_pos:
+            self._replay(self._journal_pos)
+
+    def _replay(self, start: int) -> None:
+        with open(self.journal_file, "rb") as f:
+            f.seek(start)
+            pos = start
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # Torn tail from an interrupted writer; it was never acknowledged.
+                    break
+                self._apply(raw, pos)
+                pos += len(raw)
+        self._journal_pos = pos
+
+    def _apply(self, raw: bytes, offset: int) -> None:
+        try:
+            record = codec.loads(raw)
+        except ValueError:
+            logger.warning(f"Skipping corrupt journal record at offset {offset} in {self.journal_file}")
+            return
+        memory_id = record.get("id")
+        if record.get("op") == "branch":
+            self._branches[memory_id] = record["branch"]
+            return
+        if record.get("op") == "put":
+            self._offsets[memory_id] = offset
+        elif record.get("op") == "delete":
+            self._offsets.pop(memory_id, None)
+            self._snapshot.pop(memory_id, None)
+        self._index_hash(memory_id, record.get("memory") if record.get("op") == "put" else None)
 
+    def _index_hash(self, memory_id: str, payload: dict[str, Any] | None) -> None:
+        """Keep the first live copy of each content in the dedupe index (once built)."""
+        index = self._hash_index
+        if index is None:
+            return
+        old = self._hash_keys.pop(memory_id, None)
+        if old is not None and index.get(old) == memory_id:
+            del index[old]
+        if payload is None or payload.get("valid_until") is not None:
+            return
+        key = (payload.get("scope", ""), payload.get("type", ""), content_hash(payload.get("content", "")))
+        if index.setdefault(key, memory_id) == memory_id:
+            self._hash_keys[memory_id] = key
+
+    def _append(self, records: Sequence[dict[str, Any]]) -> None:
+        """Durably append journal records; returns once they are on disk."""
+        if not records:
+            return
+        with self._locked():
+            self._refresh()
+            self._append_locked(records)
+
+    def _append_locked(self, records: Sequence[dict[str, Any]]) -> None:
+        with open(self.journal_file, "ab") as f:
+            pos = f.tell()
+            if pos and self._journal_pos < pos:
+                # Bytes we could not replay: a torn record. Terminate it so
+                # our records start on a fresh line.
+                f.write(b"\n")
+                pos += 1
+            for record in records:
+                line = codec.dumpb(record) + b"\n"
+                f.write(line)
+                self._apply(line, pos)
+                pos += len(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_pos = pos
+        if pos >= self.compact_bytes:
+            self._compact_locked()
+
+    def compact(self) -> None:
+        """Fold the journal into a fresh ``index.json`` snapshot."""
+        with self._locked():
+            self._refresh()
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        data = {
+            "memories": list(self._iter_records()),
+            "project_meta": self._project_meta,
+            "branches": list(self._branches.values()),
+        }
+        # The snapshot must be durable before the journal it replaces is dropped;
+        # replaying a journal over a newer snapshot is harmless.
+        atomic_write(self.index_file, codec.dumpb(data), fsync=True)
+        with open(self.journal_file, "wb") as f:
+            os.fsync(f.fileno())
+        self._reload()
+
+    def _read_journal(self, offsets: Iterable[int]) -> Iterator[dict[str, Any]]:
+        with open(self.journal_file, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield codec.loads(f.readline())["memory"]
+
+    def _lookup(self, memory_id: str) -> dict[str, Any] | None:
+        offset = self._offsets.get(memory_id)
+        if offset is not None:
+            return next(self._read_journal([offset]))
+        return self._snapshot.get(memory_id)
+
+    def _iter_records(self) -> Iterator[dict[str, Any]]:
+        """Merged view: snapshot order first, then journal-only ids."""
+        journal: dict[str, dict[str, Any]] = {}
+        if self._offsets:
+            ordered = sorted(self._offsets.items(), key=lambda item: item[1])
+            records = self._read_journal(offset for _, offset in ordered)
+            journal = {memory_id: record for (memory_id, _), record in zip(ordered, records)}
+        for memory_id, record in self._snapshot.items():
+            yield journal.pop(memory_id, record)
+        yield from journal.values()
+
+    @staticmethod
+    def _put(memory: Memory) -> dict[str, Any]:
+        return {"op": "put", "id": memory.id, "memory": memory.to_dict()}
+
+    @staticmethod
+    def _branch_record(branch: Branch) -> dict[str, Any]:
+        return {"op": "branch", "id": branch.task_id, "branch": branch.to_dict()}
+
+    def _register_branches(self, memories: Iterable[Memory]) -> list[dict[str, Any]]:
+        """Registry records for branches that ``memories`` create or reopen."""
+        records: dict[str, dict[str, Any]] = {}
+        for memory in memories:
+            task_id = branch_task(memory.scope)
+            if task_id is None or task_id in records:
+                continue
+            known = self._branches.get(task_id)
+            if known is None:
+                branch = Branch(task_id=task_id, description=AUTO_BRANCH_DESCRIPTION)
+            elif known.get("status") != BRANCH_ACTIVE:
+                branch = replace(Branch.from_dict(known), status=BRANCH_ACTIVE, merged_at=None)
+            else:
+                continue
+            records[task_id] = self._branch_record(branch)
+        return list(records.values())
+
+    def _import_legacy_branches(self) -> None:
+        """Move memories from old ``branches/<task>/memories.json`` files into the journal."""
+        for task_id in self.branch_manager.list_branches():
+            legacy = self.branch_manager.branches_dir / task_id / "memories.json"
+            if not legacy.exists():
+                continue
+            meta = self.branch_manager.get_branch_meta(task_id)
+            branch = Branch.from_dict({**meta, "task_id": task_id})
+            memories = [Memory.from_dict(record) for record in self.branch_manager.get_branch_memories(task_id)]
+            records = [] if task_id in self._branches else [self._branch_record(branch)]
+            self._append(records + [self._put(memory) for memory in memories])
+            legacy.rename(legacy.with_name("memories.json.imported"))
+
+    # --- core API -------------------------------------------------------------
     def add_memory(
         self,
         memory: Memory,
         relationships: Sequence[Relationship] | None = None,
+        *,
+        dedupe: str | None = None,
     ) -> Memory:
-        # Determine storage strategy based on scope
-        if memory.scope.startswith("task:"):
-            task_id = memory.scope.split(":")[1]
-            self.branch_manager.add_memory_to_branch(task_id, memory)
-            # Also add to index for global search? Maybe just partial?
-            # For now, let's keep index as "global project memory mainly"
-        else:
-            # Project scope or default
-            data = self._load_index()
-            data.setdefault("memories", []).append(memory.to_dict())
-            self._save_index(data)
-            
-            # If it's a markdown-able memory, write to markdown
+        return self.add_memories([memory], relationships, dedupe=dedupe)[0]
+
+    def add_memories(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] | None = None,
+        *,
+        dedupe: str | None = None,
+    ) -> list[Memory]:
+        outcome = resolve_duplicates(memories, dedupe_policy(self.config, dedupe), self.find_duplicate)
+        records = [self._put(memory) for memory in (*outcome.merged, *outcome.fresh)]
+        self._append(self._register_branches(outcome.fresh) + records)
+        # If it's a markdown-able memory, write to markdown
+        for memory in outcome.fresh:
             if memory.type in (MemoryType.NOTE, MemoryType.EXPERIENCE) and memory.scope == "project":
                 self._append_to_markdown(memory)
-                
-        return memory
+        return outcome.results
+
+    def find_duplicate(self, memory: Memory) -> Memory | None:
+        """The live memory with the same scope, type and content, if any."""
+        key = dedupe_key(memory)
+        if key is None:
+            return None
+        self._refresh()
+        if self._hash_index is None:
+            self._hash_index, self._hash_keys = {}, {}
+            for record in self._iter_records():
+                self._index_hash(record["id"], record)
+        memory_id = self._hash_index.get(key)
+        record = self._lookup(memory_id) if memory_id else None
+        return Memory.from_dict(record) if record else None
+
+    def upsert_many(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] | None = None,
+    ) -> int:
+        batch = list(memories)
+        self.apply_changes(batch)
+        return len(batch)
+
+    def delete_many(self, memory_ids: Iterable[str], scope: str | None = None) -> int:
+        return self.apply_changes(deletions=memory_ids, scope=scope)
+
+    def apply_changes(
+        self,
+        memories: Iterable[Memory] = (),
+        relationships: Iterable[Relationship] | None = None,
+        *,
+        deletions: Iterable[str] = (),
+        relationship_deletions: Iterable[str] = (),
+        scope: str | None = None,
+    ) -> int:
+        # No relationships are kept; the records land under one lock and fsync.
+        batch = list(memories)
+        with self._locked():
+            self._refresh()
+            records = []
+            for memory_id in dict.fromkeys(deletions):
+                existing = self._lookup(memory_id)
+                if existing is None or (scope and existing.get("scope") != scope):
+                    continue
+                records.append({"op": "delete", "id": memory_id})
+            deleted = len(records)
+            records += self._register_branches(batch) + [self._put(memory) for memory in batch]
+            if records:
+                self._append_locked(records)
+        return deleted
 
     def _append_to_markdown(self, memory: Memory) -> None:
         project_mem_dir = self.memory_dir / "project"
         project_mem_dir.mkdir(exist_ok=True)
-        
+
         # Determine topic from metadata or default
         topic = memory.metadata.get("topic", "general")
         md_file = project_mem_dir / f"{topic}.md"
-        
+
         entry = f"\n## {memory.created_at.strftime('%Y-%m-%d %H:%M')}\n\n{memory.content}\n"
         with open(md_file, "a", encoding="utf-8") as f:
             f.write(entry)
 
     def get_memory(self, memory_id: str, scope: str | None = None) -> Memory | None:
         # Search index first
-        data = self._load_index()
-        for m_dict in data.get("memories", []):
-            if m_dict["id"] == memory_id:
-                return Memory.from_dict(m_dict)
-                
-        # If scope is task, search branch
-        if scope and scope.startswith("task:"):
-            task_id = scope.split(":")[1]
-            branch_mems = self.branch_manager.get_branch_memories(task_id)
-            for m_dict in branch_mems:
-                if m_dict["id"] == memory_id:
-                    return Memory.from_dict(m_dict)
-        
+        self._refresh()
+        m_dict = self._lookup(memory_id)
+        if m_dict is not None and (not scope or m_dict.get("scope") == scope):
+            return Memory.from_dict(m_dict)
         return None
 
+    def get_many(self, memory_ids: Iterable[str], scope: str | None = None) -> list[Memory]:
+        self._refresh()
+        found = []
+        for memory_id in dict.fromkeys(memory_ids):
+            m_dict = self._lookup(memory_id)
+            if m_dict is not None and (not scope or m_dict.get("scope") == scope):
+                found.append(Memory.from_dict(m_dict))
+        return found
+
     def update_memory(
         self,
         memory_id: str,
         *,
         scope: str | None = None,
-        content: str | None = None,
-        **kwargs
+        **updates: Any,
     ) -> Memory | None:
-        # Load index
-        data = self._load_index()
-        memories = data.get("memories", [])
-        
-        target_dict = None
-        target_idx = -1
-        
-        # Search in index
-        for i, m in enumerate(memories):
-            if m["id"] == memory_id:
-                if scope and m.get("scope") != scope:
-                    continue
-                target_dict = m
-                target_idx = i
-                break
-        
-        if target_dict:
-            # Update index memory
-            if content:
-                target_dict["content"] = content
-            # Apply other kwargs
-            for k, v in kwargs.items():
-                if k in target_dict: # Only update known fields? Or simple update
-                     target_dict[k] = v
-                     
-            memories[target_idx] = target_dict
-            self._save_index(data)
-            return Memory.from_dict(target_dict)
-            
-        # TODO: Implement branch/task memory update
-        return None
+        self._refresh()
+        target_dict = self._lookup(memory_id)
+        if target_dict is None or (scope and target_dict.get("scope") != scope):
+            return None
+
+        memory = Memory.from_dict(target_dict)
+        for key, value in updates.items():
+            if value is not None and hasattr(memory, key):
+                setattr(memory, key, value)
+        memory.updated_at = _now()
+        self._append([self._put(memory)])
+        return memory
 
     def delete_memory(self, memory_id: str, scope: str | None = None) -> bool:
-        data = self._load_index()
-        memories = data.get("memories", [])
-        
-        new_memories = []
-        found = False
-        
-        for m in memories:
-            if m["id"] == memory_id:
-                if scope and m.get("scope") != scope:
-                    new_memories.append(m)
-                    continue
-                found = True
-            else:
-                new_memories.append(m)
-                
-        if found:
-            data["memories"] = new_memories
-            self._save_index(data)
-            return True
-            
-        # TODO: Implement branch/task memory delete
-        return False
+        return self.delete_many([memory_id], scope=scope) > 0
 
     def search_memories(
         self,
@@ -163,24 +420,56 @@ class JsonMemoryStore(IMemoryStore):
         *,
         scope: str | None = None,
         types: Iterable[MemoryType] | None = None,
+        limit: int | None = None,
+        after: str | None = None,
     ) -> list[Memory]:
-        results = []
-        
+        return list(paginate(self._iter_matches(query, scope, types), after=after, limit=limit))
+
+    def iter_search(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        after: str | None = None,
+    ) -> Iterator[Memory]:
+        return paginate(self._iter_matches(query, scope, types), after=after)
+
+    def _iter_matches(
+        self,
+        query: str,
+        scope: str | None,
+        types: Iterable[MemoryType] | None,
+    ) -> Iterator[Memory]:
         # Search index
-        data = self._load_index()
-        for m_dict in data.get("memories", []):
+        self._refresh()
+        for m_dict in self._iter_records():
             if self._match(m_dict, query, scope, types):
-                results.append(Memory.from_dict(m_dict))
-                
-        # Search task branch if scope specified
-        if scope and scope.startswith("task:"):
-            task_id = scope.split(":")[1]
-            branch_mems = self.branch_manager.get_branch_memories(task_id)
-            for m_dict in branch_mems:
-                 if self._match(m_dict, query, scope, types):
-                    results.append(Memory.from_dict(m_dict))
-                    
-        return results
+                yield Memory.from_dict(m_dict)
+
+    def rank_memories(
+        self,
+        query: str = "",
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        limit: int = DEFAULT_TOP_K,
+    ) -> list[Memory]:
+        return RelevanceScorer.from_config(self.config).top_k(
+            self._iter_matches(query, scope, types),
+            limit,
+            match=lambda memory: text_match(memory, query),
+        )
+
+    def lexical_search(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        limit: int = DEFAULT_TOP_K,
+    ) -> list[tuple[Memory, float]]:
+        return bm25_rank(query, self.iter_memories(scope=scope, types=types))[:limit]
 
     def _match(self, m_dict: dict, query: str, scope: str | None, types: Iterable[MemoryType] | None) -> bool:
         if scope and m_dict.get("scope") != scope:
@@ -196,17 +485,163 @@ class JsonMemoryStore(IMemoryStore):
         *,
         scope: str | None = None,
         types: Iterable[MemoryType] | None = None,
+        limit: int | None = None,
+        after: str | None = None,
+        where: dict[str, Any] | None = None,
     ) -> list[Memory]:
-        return self.search_memories("", scope=scope, types=types)
+        if where:
+            return list(paginate(self.iter_memories(scope=scope, types=types, where=where), after=after, limit=limit))
+        return self.search_memories("", scope=scope, types=types, limit=limit, after=after)
+
+    def iter_memories(
+        self,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        after: str | None = None,
+        where: dict[str, Any] | None = None,
+    ) -> Iterator[Memory]:
+        filters = metadata_filters(where)
+        if not filters:
+            return self.iter_search("", scope=scope, types=types, after=after)
+        matches = (m for m in self.iter_search("", scope=scope, types=types) if metadata_matches(m, filters))
+        return paginate(matches, after=after)
+
+    def list_sessions(
+        self,
+        *,
+        scope: str | None = None,
+        task_id: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[Memory]:
+        return select_sessions(
+            self.iter_memories(scope=scope, types=[MemoryType.EXPERIENCE]),
+            task_id=task_id,
+            since=since,
+            until=until,
+            limit=limit,
+        )
+
+    def create_branch(self, task_id: str, description: str = "") -> Branch:
+        branch = Branch(task_id=task_id, description=description)
+        with self._locked():
+            self._refresh()
+            if task_id in self._branches:
+                raise BranchExistsError(f"Branch {task_id} already exists")
+            self._append_locked([self._branch_record(branch)])
+        return branch
+
+    def list_branches(self, *, status: str | None = None) -> list[Branch]:
+        self._refresh()
+        counts: dict[str, int] = {}
+        for record in self._iter_records():
+            task_id = branch_task(record.get("scope"))
+            if task_id is not None and record.get("valid_until") is None:
+                counts[task_id] = counts.get(task_id, 0) + 1
+        branches = [
+            Branch.from_dict(payload, memories=counts.get(task_id, 0))
+            for task_id, payload in self._branches.items()
+            if not status or payload.get("status") == status
+        ]
+        branches.sort(key=lambda branch: branch.task_id)
+        branches.sort(key=lambda branch: branch.created_at, reverse=True)
+        return branches
+
+    def merge_branch(
+        self,
+        task_id: str,
+        *,
+        target_scope: str,
+        memory_ids: Iterable[str] | None = None,
+        types: Iterable[MemoryType] | None = None,
+    ) -> list[Memory]:
+        scope = branch_scope(task_id)
+        with self._locked():
+            self._refresh()
+            live = [
+                Memory.from_dict(record)
+                for record in self._iter_records()
+                if record.get("scope") == scope and record.get("valid_until") is None
+            ]
+            known = self._branches.get(task_id)
+            if known is None and not live:
+                raise UnknownBranchError(f"No branch for task {task_id}")
+            promoted = select_promoted(live, memory_ids, types)
+            now = _now()
+            for memory in promoted:
+                memory.scope = target_scope
+                memory.updated_at = now
+            branch = Branch.from_dict(known) if known else Branch(task_id=task_id, description=AUTO_BRANCH_DESCRIPTION)
+            if len(promoted) == len(live):
+                branch = replace(branch, status=BRANCH_MERGED, merged_at=now)
+            # One journal append carries the moved memories and the branch status.
+            self._append_locked([self._put(memory) for memory in promoted] + [self._branch_record(branch)])
+        return promoted
 
     def list_relationships(
         self,
         memory_id: str,
         *,
         scope: str | None = None,
+        direction: str = "out",
     ) -> list[Relationship]:
         return []
 
+    # The JSON store keeps no relationships, so traversals end at the start node.
+    def related_memories(
+        self,
+        memory_id: str,
+        *,
+        depth: int = 1,
+        edge_types: Iterable[EdgeType] | None = None,
+        direction: str = "both",
+        scope: str | None = None,
+    ) -> list[tuple[Memory, int]]:
+        return []
+
+    def find_path(
+        self,
+        source_id: str,
+        target_id: str,
+        *,
+        edge_types: Iterable[EdgeType] | None = None,
+        direction: str = "both",
+        max_depth: int = 6,
+        scope: str | None = None,
+    ) -> list[Memory] | None:
+        memory = self.get_memory(source_id, scope=scope)
+        return [memory] if memory is not None and source_id == target_id else None
+
+    def latest_version(self, memory_id: str, *, scope: str | None = None) -> Memory | None:
+        return self.get_memory(memory_id, scope=scope)
+
+    def session_chain(
+        self,
+        memory_id: str,
+        *,
+        direction: str = "both",
+        limit: int | None = None,
+        scope: str | None = None,
+    ) -> list[Memory]:
+        memory = self.get_memory(memory_id, scope=scope)
+        return [memory] if memory is not None else []
+
+    def vacuum(self) -> int:
+        """Fold the journal into the snapshot; returns the bytes saved."""
+        with self._locked():
+            self._refresh()
+            before = sum(path.stat().st_size for path in (self.index_file, self.journal_file) if path.exists())
+            self._compact_locked()
+            after = self.index_file.stat().st_size
+        return max(before - after, 0)
+
+    def fingerprint(self) -> str:
+        with self._locked():
+            self._refresh()
+        return f"{self._snapshot_stamp}:{self._journal_pos}"
+
     def close(self) -> None:
         """Close any open resources."""
         pass
@@ -0,0 +1,220 @@
+"""Versioned schema migrations for the SQLite memory database.
+
+The schema version lives in ``PRAGMA user_version``. Each entry in
+:data:`MIGRATIONS` upgrades the database by exactly one version and runs in
+its own write transaction, so old ``.copal/memory.db`` files are upgraded in
+place the first time a newer CLI opens them.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Callable
+
+from .branches import AUTO_BRANCH_DESCRIPTION
+from .models import content_hash
+
+Migration = Callable[[sqlite3.Connection], None]
+
+
+def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, declaration: str) -> None:
+    if not _column_exists(conn, table, column):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+def _has_json1(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("SELECT json_extract('{}', '$.x')")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def _v1_base_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS memories (
+            id TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            content TEXT NOT NULL,
+            scope TEXT NOT NULL,
+            metadata TEXT,
+            created_at TEXT,
+            updated_at TEXT,
+            valid_from TEXT,
+            valid_until TEXT,
+            importance REAL,
+            access_count INTEGER,
+            last_accessed TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS relationships (
+            id TEXT PRIMARY KEY,
+            source_id TEXT NOT NULL,
+            target_id TEXT NOT NULL,
+            type TEXT NOT NULL,
+            scope TEXT NOT NULL,
+            weight REAL,
+            confidence REAL,
+            metadata TEXT,
+            created_at TEXT,
+            created_by TEXT,
+            UNIQUE(source_id, target_id, type, scope)
+        )
+        """
+    )
+
+
+def _v2_lookup_indexes(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memories_scope_type_created "
+        "ON memories(scope, type, created_at)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_relationships_source "
+        "ON relationships(source_id, scope)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_relationships_target "
+        "ON relationships(target_id, scope)"
+    )
+
+
+def _v3_session_summary_column(conn: sqlite3.Connection) -> None:
+    _add_column(conn, "memories", "session_summary", "INTEGER NOT NULL DEFAULT 0")
+    if _has_json1(conn):
+        conn.execute(
+            "UPDATE memories SET session_summary = 1 "
+            "WHERE json_extract(metadata, '$.type') = 'session_summary'"
+        )
+    else:
+        conn.execute(
+            "UPDATE memories SET session_summary = 1 "
+            "WHERE metadata LIKE '%\"type\": \"session_summary\"%'"
+        )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memories_sessions "
+        "ON memories(scope, created_at) WHERE session_summary = 1"
+    )
+
+
+def _v4_content_hash(conn: sqlite3.Connection) -> None:
+    _add_column(conn, "memories", "content_hash", "TEXT")
+    # Only the first live copy of each (scope, type, content) is hashed;
+    # existing duplicates stay unhashed until `copal memory compact` merges them.
+    seen: set[tuple[str, str, str]] = set()
+    updates: list[tuple[str, str]] = []
+    for row in conn.execute(
+        "SELECT id, scope, type, content FROM memories WHERE valid_until IS NULL ORDER BY rowid"
+    ):
+        key = (row[1], row[2], content_hash(row[3]))
+        if key not in seen:
+            seen.add(key)
+            updates.append((key[2], row[0]))
+    conn.executemany("UPDATE memories SET content_hash = ? WHERE id = ?", updates)
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_memories_content_hash "
+        "ON memories(scope, type, content_hash) WHERE valid_until IS NULL"
+    )
+
+
+def _v5_session_log_indexes(conn: sqlite3.Connection) -> None:
+    _add_column(conn, "memories", "task_id", "TEXT")
+    if _has_json1(conn):
+        conn.execute(
+            "UPDATE memories SET task_id = CAST(json_extract(metadata, '$.task_id') AS TEXT) "
+            "WHERE session_summary = 1"
+        )
+    else:
+        rows = conn.execute("SELECT id, metadata FROM memories WHERE session_summary = 1").fetchall()
+        conn.executemany(
+            "UPDATE memories SET task_id = ? WHERE id = ?",
+            [(_metadata_task_id(row[1]), row[0]) for row in rows],
+        )
+    # Archived sessions drop out of both indexes, so the session log stays
+    # bounded by what is live rather than by history.
+    conn.execute("DROP INDEX IF EXISTS idx_memories_sessions")
+    conn.execute(
+        "CREATE INDEX idx_memories_sessions "
+        "ON memories(scope, created_at) WHERE session_summary = 1 AND valid_until IS NULL"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memories_sessions_task "
+        "ON memories(scope, task_id, created_at) WHERE session_summary = 1 AND valid_until IS NULL"
+    )
+
+
+def _v6_branches(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS branches (
+            task_id TEXT PRIMARY KEY,
+            description TEXT NOT NULL DEFAULT '',
+            status TEXT NOT NULL DEFAULT 'active',
+            created_at TEXT,
+            merged_at TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_branches_status ON branches(status, created_at)")
+    # Register branches that already have task-scoped memories.
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO branches (task_id, description, created_at)
+        SELECT substr(scope, 6), ?, min(created_at) FROM memories
+        WHERE scope LIKE 'task:%' GROUP BY scope
+        """,
+        (AUTO_BRANCH_DESCRIPTION,),
+    )
+
+
+def _metadata_task_id(metadata: str | None) -> str | None:
+    value = json.loads(metadata or "{}").get("task_id")
+    return None if value is None else str(value)
+
+
+MIGRATIONS: list[Migration] = [
+    _v1_base_tables,
+    _v2_lookup_indexes,
+    _v3_session_summary_column,
+    _v4_content_hash,
+    _v5_session_log_indexes,
+    _v6_branches,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def migrate(conn: sqlite3.Connection, migrations: list[Migration] | None = None) -> int:
+    """Apply pending migrations and return the resulting schema version.
+
+    Databases written by a newer CLI (version above ours) are left untouched.
+    """
+    steps = MIGRATIONS if migrations is None else migrations
+    while True:
+        if schema_version(conn) >= len(steps):
+            return schema_version(conn)
+        # Take the write lock before re-reading the version so concurrent
+        # processes opening the same database migrate it only once.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = schema_version(conn)
+            if version < len(steps):
+                steps[version](conn)
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
@@ -6,6 +6,7 @@ The structures defined here are inspired by the mem-layer project
 
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
@@ -18,6 +19,11 @@ def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _utc(value: datetime) -> datetime:
+    """Stored timestamps may be naive; they are always UTC."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
 def _serialize_datetime(value: datetime | None) -> str | None:
     if value is None:
         return None
@@ -27,11 +33,18 @@ def _serialize_datetime(value: datetime | None) -> str | None:
 def _deserialize_datetime(value: str | None) -> datetime | None:
     if value is None:
         return None
+    # ``fromisoformat`` parses ISO_FORMAT (and values without microseconds)
+    # an order of magnitude faster than ``strptime``.
     try:
-        return datetime.strptime(value, ISO_FORMAT)
+        return datetime.fromisoformat(value[:-1] if value.endswith("Z") else value)
     except ValueError:
-        # Fallback for strings without microseconds
-        return datetime.fromisoformat(value.replace("Z", ""))
+        return datetime.strptime(value, ISO_FORMAT)
+
+
+def content_hash(content: str) -> str:
+    """Stable digest of ``content`` with runs of whitespace collapsed."""
+    normalised = " ".join(content.split())
+    return hashlib.blake2b(normalised.encode("utf-8"), digest_size=16).hexdigest()
 
 
 class MemoryType(Enum):
@@ -72,6 +85,10 @@ class Memory:
     access_count: int = 0
     last_accessed: datetime | None = None
 
+    @property
+    def content_hash(self) -> str:
+        return content_hash(self.content)
+
     def touch(self) -> None:
         """Update timestamps when the memory is accessed or mutated."""
 
@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-import json
 import sqlite3
+from collections import OrderedDict
+from datetime import datetime
 from dataclasses import replace
 from pathlib import Path
 from typing import Any
-from collections.abc import Iterable, Sequence
+from collections.abc import Iterable, Iterator, Sequence
 from uuid import uuid4
 
 try:  # pragma: no cover - import guard
@@ -56,6 +57,20 @@ except ModuleNotFoundError:  # pragma: no cover - executed when dependency missi
                 else:
                     yield (node_id, target)
 
+        def in_edges(self, node_id: str, keys: bool = False, data: bool = False):
+            for source, bucket in self._edges.items():
+                for key, (target, attrs) in bucket.items():
+                    if target != node_id:
+                        continue
+                    if keys and data:
+                        yield (source, node_id, key, attrs)
+                    elif keys:
+                        yield (source, node_id, key)
+                    elif data:
+                        yield (source, node_id, attrs)
+                    else:
+                        yield (source, node_id)
+
         def remove_node(self, node_id: str) -> None:
             self.nodes.pop(node_id, None)
             self._edges.pop(node_id, None)
@@ -66,20 +81,93 @@ except ModuleNotFoundError:  # pragma: no cover - executed when dependency missi
 
     nx = type("nx", (), {"MultiDiGraph": _FallbackMultiDiGraph})()
 
-from .config import resolve_database_path
-from .models import EdgeType, Memory, MemoryType, Relationship
-from .query import MemoryQueryEngine
+from . import codec
+from .branches import (
+    AUTO_BRANCH_DESCRIPTION,
+    BRANCH_ACTIVE,
+    BRANCH_MERGED,
+    Branch,
+    BranchExistsError,
+    UnknownBranchError,
+    branch_scope,
+    branch_task,
+    promote_relationships,
+    select_promoted,
+)
+from .config import check_database_schema, resolve_database_path
+from .migrations import _has_json1
+from .dedupe import dedupe_key, dedupe_policy, remap_relationships, resolve_duplicates
+from .models import EdgeType, Memory, MemoryType, Relationship, _now, _serialize_datetime
+from .query import (
+    DEFAULT_PATH_DEPTH,
+    MAX_CHAIN_LENGTH,
+    MemoryQueryEngine,
+    any_term_query,
+    bm25_rank,
+    check_direction,
+    metadata_filters,
+    metadata_matches,
+    normalise_edge_types,
+    paginate,
+    parse_query,
+    select_sessions,
+)
+from .ranking import DEFAULT_TOP_K, RelevanceScorer, text_match
 from .scope import ScopeManager
 from .store_interface import IMemoryStore
 
+# Hydrated memories kept in the lazy-mode LRU.
+DEFAULT_GRAPH_CACHE_SIZE = 1024
+
+
+def _dedupe_column(memory: Memory) -> str | None:
+    key = dedupe_key(memory)
+    return f"{key[1]}:{key[2]}" if key else None
+
+
+_SAVE_MEMORY_SQL = """
+INSERT INTO memories (id, scope, payload, dedupe_key)
+VALUES (?1, ?2, ?3, CASE WHEN NOT EXISTS (
+    SELECT 1 FROM memories d WHERE d.scope = ?2 AND d.dedupe_key = ?4 AND d.id <> ?1
+) THEN ?4 END)
+ON CONFLICT(id) DO UPDATE SET
+    scope=excluded.scope,
+    payload=excluded.payload,
+    dedupe_key=excluded.dedupe_key
+"""
+
+_SAVE_RELATIONSHIP_SQL = """
+INSERT INTO relationships (id, source_id, target_id, scope, payload)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    source_id=excluded.source_id,
+    target_id=excluded.target_id,
+    scope=excluded.scope,
+    payload=excluded.payload
+"""
+
+# Writing into a merged branch reopens it.
+_REGISTER_BRANCH_SQL = f"""
+INSERT INTO branches (task_id, description, status, created_at) VALUES (?, ?, ?, ?)
+ON CONFLICT(task_id) DO UPDATE SET status = '{BRANCH_ACTIVE}', merged_at = NULL
+WHERE branches.status <> '{BRANCH_ACTIVE}'
+"""
+
+
+def _branch_rows(memories: Iterable[Memory]) -> list[tuple[Any, ...]]:
+    now = _serialize_datetime(_now())
+    tasks = {task for task in (branch_task(memory.scope) for memory in memories) if task is not None}
+    return [(task, AUTO_BRANCH_DESCRIPTION, BRANCH_ACTIVE, now) for task in sorted(tasks)]
 
 class SQLiteMemoryPersistence:
     """Persist memories and relationships to a lightweight SQLite DB."""
 
     def __init__(self, db_path: Path):
         self._db_path = Path(db_path)
+        check_database_schema(self._db_path, "graph")
         self._conn = sqlite3.connect(str(self._db_path))
         self._conn.row_factory = sqlite3.Row
+        self._json1 = _has_json1(self._conn)
         self._ensure_schema()
 
     def _ensure_schema(self) -> None:
@@ -104,75 +192,266 @@ class SQLiteMemoryPersistence:
                 )
                 """
             )
+            # Point lookups used by lazy loading and neighbourhood paging.
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_memories_scope ON memories(scope)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_relationships_source ON relationships(source_id)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(target_id)"
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(memories)")}
+            if "dedupe_key" not in columns:
+                self._conn.execute("ALTER TABLE memories ADD COLUMN dedupe_key TEXT")
+                self._backfill_dedupe_keys()
+            # "type:content_hash" of the first live copy; later copies hold NULL.
+            self._conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_memories_dedupe ON memories(scope, dedupe_key)"
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS branches (
+                    task_id TEXT PRIMARY KEY,
+                    description TEXT NOT NULL DEFAULT '',
+                    status TEXT NOT NULL DEFAULT 'active',
+                    created_at TEXT,
+                    merged_at TEXT
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_branches_status ON branches(status, created_at)"
+            )
+
+    def _backfill_dedupe_keys(self) -> None:
+        seen: set[tuple[str, str]] = set()
+        updates: list[tuple[str, str]] = []
+        for memory in self.iter_memories():
+            key = _dedupe_column(memory)
+            if key is not None and (memory.scope, key) not in seen:
+                seen.add((memory.scope, key))
+                updates.append((key, memory.id))
+        self._conn.executemany("UPDATE memories SET dedupe_key = ? WHERE id = ?", updates)
 
-    def iter_memories(self) -> Iterable[Memory]:
-        cursor = self._conn.execute("SELECT payload FROM memories")
+    def iter_memories(
+        self,
+        *,
+        scope: str | None = None,
+        contains: str | None = None,
+        filters: dict[str, str | None] | None = None,
+    ) -> Iterable[Memory]:
+        """Stream memories, optionally pre-filtered in SQL.
+
+        ``contains`` is a case-insensitive substring prefilter on the raw
+        payload; callers must still check the decoded memory. ``filters``
+        (from :func:`metadata_filters`) are pushed down when JSON1 is available.
+        """
+        query = "SELECT payload FROM memories WHERE 1=1"
+        params: list[Any] = []
+        if scope:
+            query += " AND scope = ?"
+            params.append(scope)
+        for key, value in (filters or {}).items() if self._json1 else ():
+            expression = f"CAST(json_extract(payload, '$.metadata.{key}') AS TEXT)"
+            if value is None:
+                query += f" AND {expression} IS NULL"
+            else:
+                query += f" AND {expression} = ?"
+                params.append(value)
+        if contains:
+            query += " AND payload LIKE ? ESCAPE '\\'"
+            escaped = contains.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        cursor = self._conn.execute(query, params)
         for row in cursor:
-            payload = json.loads(row["payload"])
+            payload = codec.loads(row["payload"])
             yield Memory.from_dict(payload)
 
+    def load_memory(self, memory_id: str) -> Memory | None:
+        row = self._conn.execute(
+            "SELECT payload FROM memories WHERE id = ?", (memory_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return Memory.from_dict(codec.loads(row["payload"]))
+
+    def load_edges(self, memory_id: str) -> list[Relationship]:
+        """Relationships touching ``memory_id`` in either direction."""
+        cursor = self._conn.execute(
+            """
+            SELECT payload FROM relationships WHERE source_id = ?1
+            UNION ALL
+            SELECT payload FROM relationships WHERE target_id = ?1 AND source_id != ?1
+            """,
+            (memory_id,),
+        )
+        return [Relationship.from_dict(codec.loads(row["payload"])) for row in cursor]
+
+    def find_duplicate_id(self, memory: Memory) -> str | None:
+        key = _dedupe_column(memory)
+        if key is None:
+            return None
+        row = self._conn.execute(
+            "SELECT id FROM memories WHERE scope = ? AND dedupe_key = ?", (memory.scope, key)
+        ).fetchone()
+        return row["id"] if row else None
+
     def iter_relationships(self) -> Iterable[Relationship]:
         cursor = self._conn.execute("SELECT payload FROM relationships")
         for row in cursor:
-            payload = json.loads(row["payload"])
+            payload = codec.loads(row["payload"])
             yield Relationship.from_dict(payload)
 
     def save_memory(self, memory: Memory) -> None:
-        payload = json.dumps(memory.to_dict())
+        self.save_many([memory])
+
+    def save_many(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] = (),
+    ) -> None:
+        """Persist memories and relationships in one transaction."""
+        self.apply(memories, relationships)
+
+    def apply(
+        self,
+        memories: Iterable[Memory] = (),
+        relationships: Iterable[Relationship] = (),
+        deletions: Iterable[str] = (),
+        relationship_deletions: Iterable[str] = (),
+    ) -> None:
+        """Delete memories (with their edges) and relationships, then save, in one transaction."""
+        memories = list(memories)
+        ids = [(memory_id,) for memory_id in deletions]
         with self._conn:  # type: ignore[call-arg]
-            self._conn.execute(
-                """
-                INSERT INTO memories (id, scope, payload)
-                VALUES (?, ?, ?)
-                ON CONFLICT(id) DO UPDATE SET
-                    scope=excluded.scope,
-                    payload=excluded.payload
-                """,
-                (memory.id, memory.scope, payload),
+            self._conn.executemany("DELETE FROM memories WHERE id = ?", ids)
+            self._conn.executemany(
+                "DELETE FROM relationships WHERE source_id = ?1 OR target_id = ?1", ids
             )
+            self._conn.executemany(
+                "DELETE FROM relationships WHERE id = ?", ((rel_id,) for rel_id in relationship_deletions)
+            )
+            self._write(memories, relationships)
+            self._conn.executemany(_REGISTER_BRANCH_SQL, _branch_rows(memories))
 
-    def delete_memory(self, memory_id: str) -> None:
+    def relationship_ends(self, relationship_ids: Iterable[str]) -> dict[str, tuple[str, str]]:
+        """``{id: (source_id, target_id)}`` for the stored relationships among ``relationship_ids``."""
+        ends = {}
+        for rel_id in relationship_ids:
+            row = self._conn.execute(
+                "SELECT source_id, target_id FROM relationships WHERE id = ?", (rel_id,)
+            ).fetchone()
+            if row is not None:
+                ends[rel_id] = (row[0], row[1])
+        return ends
+
+    def _write(self, memories: Iterable[Memory], relationships: Iterable[Relationship]) -> None:
+        self._conn.executemany(
+            _SAVE_MEMORY_SQL,
+            ((m.id, m.scope, codec.dumps(m.to_dict()), _dedupe_column(m)) for m in memories),
+        )
+        self._conn.executemany(
+            _SAVE_RELATIONSHIP_SQL,
+            ((r.id, r.source_id, r.target_id, r.scope, codec.dumps(r.to_dict())) for r in relationships),
+        )
+
+    # --- branches -------------------------------------------------------------
+    def insert_branch(self, branch: Branch) -> None:
+        try:
+            with self._conn:  # type: ignore[call-arg]
+                self._conn.execute(
+                    "INSERT INTO branches (task_id, description, status, created_at) VALUES (?, ?, ?, ?)",
+                    (branch.task_id, branch.description, branch.status, _serialize_datetime(branch.created_at)),
+                )
+        except sqlite3.IntegrityError:
+            raise BranchExistsError(f"Branch {branch.task_id} already exists") from None
+
+    def has_branch(self, task_id: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM branches WHERE task_id = ?", (task_id,)).fetchone() is not None
+
+    def list_branches(self, status: str | None = None) -> list[Branch]:
+        live = " AND json_extract(m.payload, '$.valid_until') IS NULL" if self._json1 else ""
+        query = f"""
+            SELECT b.*, (
+                SELECT count(*) FROM memories m WHERE m.scope = 'task:' || b.task_id{live}
+            ) AS memories
+            FROM branches b
+        """
+        params: list[Any] = []
+        if status:
+            query += " WHERE b.status = ?"
+            params.append(status)
+        query += " ORDER BY b.created_at DESC, b.task_id"
+        rows = self._conn.execute(query, params).fetchall()
+        return [Branch.from_dict(dict(row), memories=row["memories"]) for row in rows]
+
+    def save_merge(
+        self,
+        task_id: str,
+        memories: Sequence[Memory],
+        relationships: Sequence[Relationship],
+        *,
+        merged: bool,
+    ) -> None:
+        """Persist promoted memories/edges and the branch's new status in one transaction."""
+        now = _serialize_datetime(_now())
         with self._conn:  # type: ignore[call-arg]
-            self._conn.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
-            self._conn.execute(
-                "DELETE FROM relationships WHERE source_id = ? OR target_id = ?",
-                (memory_id, memory_id),
-            )
+            self._write(memories, relationships)
+            self._conn.execute(_REGISTER_BRANCH_SQL, (task_id, AUTO_BRANCH_DESCRIPTION, BRANCH_ACTIVE, now))
+            if merged:
+                self._conn.execute(
+                    "UPDATE branches SET status = ?, merged_at = ? WHERE task_id = ?",
+                    (BRANCH_MERGED, now, task_id),
+                )
+
+    def delete_memory(self, memory_id: str) -> None:
+        self.delete_many([memory_id])
+
+    def delete_many(self, memory_ids: Iterable[str]) -> None:
+        self.apply(deletions=memory_ids)
 
     def save_relationship(self, relationship: Relationship) -> None:
-        payload = json.dumps(relationship.to_dict())
+        self.save_many([], [relationship])
+
+    def delete_relationship(self, relationship_id: str) -> None:
         with self._conn:  # type: ignore[call-arg]
             self._conn.execute(
-                """
-                INSERT INTO relationships (id, source_id, target_id, scope, payload)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT(id) DO UPDATE SET
-                    source_id=excluded.source_id,
-                    target_id=excluded.target_id,
-                    scope=excluded.scope,
-                    payload=excluded.payload
-                """,
-                (
-                    relationship.id,
-                    relationship.source_id,
-                    relationship.target_id,
-                    relationship.scope,
-                    payload,
-                ),
+                "DELETE FROM relationships WHERE id = ?", (relationship_id,)
             )
 
-    def delete_relationship(self, relationship_id: str) -> None:
+    def vacuum(self) -> int:
         with self._conn:  # type: ignore[call-arg]
             self._conn.execute(
-                "DELETE FROM relationships WHERE id = ?", (relationship_id,)
+                "DELETE FROM relationships WHERE source_id NOT IN (SELECT id FROM memories) "
+                "OR target_id NOT IN (SELECT id FROM memories)"
             )
+        before = self._db_path.stat().st_size
+        self._conn.execute("VACUUM")
+        return max(before - self._db_path.stat().st_size, 0)
+
+    def fingerprint(self) -> str:
+        # The header's file change counter (bytes 24-27) is bumped by every
+        # committed write in rollback-journal mode; reads leave it alone.
+        with open(self._db_path, "rb") as f:
+            header = f.read(28)
+        return f"{int.from_bytes(header[24:28], 'big')}:{self._db_path.stat().st_size}"
 
     def close(self) -> None:
         self._conn.close()
 
 
 class NetworkXMemoryStore(IMemoryStore):
-    """Concrete :class:`IMemoryStore` built on a NetworkX MultiDiGraph."""
+    """Concrete :class:`IMemoryStore` built on a NetworkX MultiDiGraph.
+
+    By default the whole database is loaded into the graph on start-up. With
+    ``{"graph": {"lazy": true}}`` in the memory config nothing is loaded up
+    front: nodes are hydrated from SQLite on first access and kept in a
+    bounded LRU (``graph.cache_size``), a node's edges are paged in the first
+    time its neighbourhood is expanded, and search/list stream straight from
+    SQLite. Start-up cost and memory use then stay flat as the database grows.
+    """
 
     def __init__(
         self,
@@ -181,33 +460,28 @@ class NetworkXMemoryStore(IMemoryStore):
         config: dict[str, Any],
         scope_manager: ScopeManager,
     ) -> None:
-        db_path = resolve_database_path(target_root, config)
+        db_path = resolve_database_path(target_root, {**config, "backend": "graph"})
+        graph_config = config.get("graph") if isinstance(config.get("graph"), dict) else {}
+        self._lazy = bool(graph_config.get("lazy", False))
+        self._cache_size = max(1, int(graph_config.get("cache_size", DEFAULT_GRAPH_CACHE_SIZE)))
+        self._hydrated: OrderedDict[str, None] = OrderedDict()
+        self._expanded: set[str] = set()
         self._graph: nx.MultiDiGraph = nx.MultiDiGraph()
         self._persistence = SQLiteMemoryPersistence(db_path)
         self._scope_manager = scope_manager
-        self._query_engine = MemoryQueryEngine(self._graph)
-        self._load_from_persistence()
+        self._config = config
+        self._scorer = RelevanceScorer.from_config(config)
+        self._query_engine = MemoryQueryEngine(
+            self._graph, expand=self._expand if self._lazy else None
+        )
+        if not self._lazy:
+            self._load_from_persistence()
 
-    # ... (skipping unchanged parts)
+    def vacuum(self) -> int:
+        return self._persistence.vacuum()
 
-    def list_relationships(
-        self,
-        memory_id: str,
-        *,
-        scope: str | None = None,
-    ) -> list[Relationship]:
-        if memory_id not in self._graph:
-            return []
-        resolved_scope = scope or self._scope_manager.current_scope
-        relationships: list[Relationship] = []
-        for _, target, key, data in self._graph.out_edges(memory_id, keys=True, data=True):
-            relationship: Relationship = data.get("relationship")
-            if relationship is None:
-                continue
-            if resolved_scope and relationship.scope != resolved_scope:
-                continue
-            relationships.append(relationship)
-        return relationships
+    def fingerprint(self) -> str:
+        return self._persistence.fingerprint()
 
     def close(self) -> None:
         self._persistence.close()
@@ -218,6 +492,7 @@ class NetworkXMemoryStore(IMemoryStore):
     def _load_from_persistence(self) -> None:
         for memory in self._persistence.iter_memories():
             self._graph.add_node(memory.id, memory=memory)
+            self._query_engine.index(memory)
         for relationship in self._persistence.iter_relationships():
             self._graph.add_edge(
                 relationship.source_id,
@@ -226,6 +501,76 @@ class NetworkXMemoryStore(IMemoryStore):
                 relationship=relationship,
             )
 
+    def _node_memory(self, memory_id: str) -> Memory | None:
+        if memory_id not in self._graph:
+            return None
+        return self._graph.nodes[memory_id].get("memory")
+
+    def _hydrate(self, memory_id: str) -> Memory | None:
+        """Return the node's memory, loading it from SQLite in lazy mode."""
+        memory = self._node_memory(memory_id)
+        if not self._lazy:
+            return memory
+        if memory is None:
+            memory = self._persistence.load_memory(memory_id)
+            if memory is None:
+                return None
+            self._graph.add_node(memory_id, memory=memory)
+        self._remember(memory_id)
+        return memory
+
+    def _remember(self, memory_id: str) -> None:
+        self._hydrated[memory_id] = None
+        self._hydrated.move_to_end(memory_id)
+        while len(self._hydrated) > self._cache_size:
+            evicted, _ = self._hydrated.popitem(last=False)
+            self._evict(evicted)
+
+    def _neighbours(self, memory_id: str) -> set[str]:
+        if memory_id not in self._graph:
+            return set()
+        neighbours = {target for _, target in self._graph.out_edges(memory_id)}
+        neighbours.update(source for source, _ in self._graph.in_edges(memory_id))
+        return neighbours
+
+    def _evict(self, memory_id: str) -> None:
+        neighbours = self._neighbours(memory_id)
+        self._forget(memory_id)
+        for neighbour in neighbours:
+            # Their edge lists lost the evicted node, so re-page them next time.
+            self._expanded.discard(neighbour)
+            if self._node_memory(neighbour) is None and not self._neighbours(neighbour):
+                self._graph.remove_node(neighbour)
+
+    def _forget(self, memory_id: str) -> None:
+        if memory_id in self._graph:
+            self._graph.remove_node(memory_id)
+        self._query_engine.unindex(memory_id)
+        self._hydrated.pop(memory_id, None)
+        self._expanded.discard(memory_id)
+
+    def _expand(self, memory_id: str) -> None:
+        """Page in every edge touching ``memory_id`` (lazy mode only)."""
+        if not self._lazy or memory_id in self._expanded:
+            return
+        for relationship in self._persistence.load_edges(memory_id):
+            self._record_relationship(relationship)
+        self._expanded.add(memory_id)
+
+    @staticmethod
+    def _prefilter(query: str) -> str | None:
+        """SQL substring prefilter for lazy search, when the raw payload allows one.
+
+        Payloads are ASCII-escaped JSON, so only plain ASCII text without
+        characters JSON would escape can be matched directly. Boolean queries
+        match tokens rather than the raw text and get no prefilter.
+        """
+        if parse_query(query).boolean:
+            return None
+        if query and query.isascii() and query.isprintable() and not set(query) & {'"', "\\"}:
+            return query
+        return None
+
     def _ensure_memory_scope(self, memory: Memory) -> Memory:
         scope = memory.scope or self._scope_manager.current_scope
         if memory.scope != scope:
@@ -252,7 +597,6 @@ class NetworkXMemoryStore(IMemoryStore):
             key=relationship.id,
             relationship=relationship,
         )
-        self._persistence.save_relationship(relationship)
 
     # ------------------------------------------------------------------
     # IMemoryStore implementation
@@ -261,19 +605,87 @@ class NetworkXMemoryStore(IMemoryStore):
         self,
         memory: Memory,
         relationships: Sequence[Relationship] | None = None,
+        *,
+        dedupe: str | None = None,
     ) -> Memory:
-        memory = self._ensure_memory_scope(memory)
-        self._graph.add_node(memory.id, memory=memory)
-        self._persistence.save_memory(memory)
-        for relationship in relationships or ():
+        return self.add_memories([memory], relationships, dedupe=dedupe)[0]
+
+    def add_memories(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] | None = None,
+        *,
+        dedupe: str | None = None,
+    ) -> list[Memory]:
+        outcome = resolve_duplicates(
+            (self._ensure_memory_scope(memory) for memory in memories),
+            dedupe_policy(self._config, dedupe),
+            self.find_duplicate,
+        )
+        scoped = [*outcome.fresh, *outcome.merged]
+        edges = remap_relationships(relationships or (), outcome.remap)
+        for memory in scoped:
+            self._graph.add_node(memory.id, memory=memory)
+            if self._lazy:
+                self._remember(memory.id)
+            else:
+                self._query_engine.index(memory)
+        for relationship in edges:
             self._record_relationship(relationship)
-        return memory
+        self._persistence.save_many(scoped, edges)
+        return outcome.results
+
+    def upsert_many(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] | None = None,
+    ) -> int:
+        return len(self.add_memories(memories, relationships, dedupe="off"))
+
+    def find_duplicate(self, memory: Memory) -> Memory | None:
+        """The live memory with the same scope, type and content, if any."""
+        memory_id = self._persistence.find_duplicate_id(memory)
+        return self._hydrate(memory_id) if memory_id else None
+
+    def delete_many(self, memory_ids: Iterable[str], scope: str | None = None) -> int:
+        return self.apply_changes(deletions=memory_ids, scope=scope)
+
+    def apply_changes(
+        self,
+        memories: Iterable[Memory] = (),
+        relationships: Iterable[Relationship] | None = None,
+        *,
+        deletions: Iterable[str] = (),
+        relationship_deletions: Iterable[str] = (),
+        scope: str | None = None,
+    ) -> int:
+        batch = [self._ensure_memory_scope(memory) for memory in memories]
+        edges = list(relationships or ())
+        doomed = [
+            memory_id
+            for memory_id in dict.fromkeys(deletions)
+            if self.get_memory(memory_id, scope=scope) is not None
+        ]
+        ends = self._persistence.relationship_ends(relationship_deletions)
+        # The graph follows only once the database has committed.
+        self._persistence.apply(batch, edges, doomed, list(ends))
+        for memory_id in doomed:
+            self._forget(memory_id)
+        for rel_id, (source_id, target_id) in ends.items():
+            if self._graph.has_edge(source_id, target_id, key=rel_id):
+                self._graph.remove_edge(source_id, target_id, key=rel_id)
+        for memory in batch:
+            self._graph.add_node(memory.id, memory=memory)
+            if self._lazy:
+                self._remember(memory.id)
+            else:
+                self._query_engine.index(memory)
+        for relationship in edges:
+            self._record_relationship(relationship)
+        return len(doomed)
 
     def get_memory(self, memory_id: str, scope: str | None = None) -> Memory | None:
-        if memory_id not in self._graph:
-            return None
-        data = self._graph.nodes[memory_id]
-        memory: Memory | None = data.get("memory")
+        memory = self._hydrate(memory_id)
         if memory is None:
             return None
         resolved_scope = scope or memory.scope
@@ -281,6 +693,13 @@ class NetworkXMemoryStore(IMemoryStore):
             return None
         return memory
 
+    def get_many(self, memory_ids: Iterable[str], scope: str | None = None) -> list[Memory]:
+        return [
+            memory
+            for memory in map(self._hydrate, dict.fromkeys(memory_ids))
+            if memory is not None and (not scope or memory.scope == scope)
+        ]
+
     def update_memory(
         self,
         memory_id: str,
@@ -305,6 +724,8 @@ class NetworkXMemoryStore(IMemoryStore):
             elif hasattr(memory, key):
                 setattr(memory, key, value)
         memory.touch()
+        if not self._lazy:
+            self._query_engine.index(memory)
         self._persistence.save_memory(memory)
         return memory
 
@@ -312,8 +733,7 @@ class NetworkXMemoryStore(IMemoryStore):
         memory = self.get_memory(memory_id, scope=scope)
         if memory is None:
             return False
-        if memory_id in self._graph:
-            self._graph.remove_node(memory_id)
+        self._forget(memory_id)
         self._persistence.delete_memory(memory_id)
         return True
 
@@ -340,7 +760,7 @@ class NetworkXMemoryStore(IMemoryStore):
             scope=scoped_memory.scope,
             metadata=relationship_metadata or {},
         )
-        self.add_memory(scoped_memory, [relationship])
+        self.add_memory(scoped_memory, [relationship], dedupe="off")
         return scoped_memory
 
     def search_memories(
@@ -349,24 +769,101 @@ class NetworkXMemoryStore(IMemoryStore):
         *,
         scope: str | None = None,
         types: Iterable[MemoryType] | None = None,
+        limit: int | None = None,
+        after: str | None = None,
     ) -> list[Memory]:
+        results = self._iter_matches(query, scope=scope, types=types)
+        return list(paginate(results, after=after, limit=limit))
+
+    def iter_search(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        after: str | None = None,
+    ) -> Iterator[Memory]:
+        return paginate(self._iter_matches(query, scope=scope, types=types), after=after)
+
+    def _iter_matches(
+        self,
+        query: str,
+        *,
+        scope: str | None,
+        types: Iterable[MemoryType] | None,
+    ) -> Iterator[Memory]:
         resolved_scope = scope or self._scope_manager.current_scope
-        normalised = self._normalise_types(types)
-        return self._query_engine.search(
+        source = None
+        if self._lazy:
+            source = self._persistence.iter_memories(
+                scope=resolved_scope, contains=self._prefilter(query)
+            )
+        return self._query_engine.iter_search(
             query,
             scope=resolved_scope,
-            types=normalised,
+            types=self._normalise_types(types),
+            memories=source,
         )
 
+    def rank_memories(
+        self,
+        query: str = "",
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        limit: int = DEFAULT_TOP_K,
+    ) -> list[Memory]:
+        return self._scorer.top_k(
+            self._iter_matches(query, scope=scope, types=types),
+            limit,
+            match=lambda memory: text_match(memory, query),
+        )
+
+    def lexical_search(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        limit: int = DEFAULT_TOP_K,
+    ) -> list[tuple[Memory, float]]:
+        terms = any_term_query(query)
+        if not terms:
+            return []
+        matches = self._iter_matches(terms, scope=scope, types=types)
+        return bm25_rank(query, matches)[:limit]
+
     def list_memories(
         self,
         *,
         scope: str | None = None,
         types: Iterable[MemoryType] | None = None,
+        limit: int | None = None,
+        after: str | None = None,
+        where: dict[str, Any] | None = None,
     ) -> list[Memory]:
+        return list(paginate(self.iter_memories(scope=scope, types=types, where=where), after=after, limit=limit))
+
+    def iter_memories(
+        self,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        after: str | None = None,
+        where: dict[str, Any] | None = None,
+    ) -> Iterator[Memory]:
         resolved_scope = scope or self._scope_manager.current_scope
         normalised = self._normalise_types(types)
-        return self._query_engine.list(scope=resolved_scope, types=normalised)
+        filters = metadata_filters(where)
+        source = (
+            self._persistence.iter_memories(scope=resolved_scope, filters=filters)
+            if self._lazy
+            else None
+        )
+        memories = self._query_engine.iter_list(scope=resolved_scope, types=normalised, memories=source)
+        if filters:
+            memories = (memory for memory in memories if metadata_matches(memory, filters))
+        return paginate(memories, after=after)
 
     def summarise_project(self, scope: str | None = None) -> dict[str, Any]:
         resolved_scope = scope or self._scope_manager.current_scope
@@ -374,11 +871,7 @@ class NetworkXMemoryStore(IMemoryStore):
         counts: dict[str, int] = {}
         for mem in memories:
             counts[mem.type.value] = counts.get(mem.type.value, 0) + 1
-        top_memories = sorted(
-            memories,
-            key=lambda m: (m.importance, m.updated_at),
-            reverse=True,
-        )[:5]
+        top_memories = self.rank_memories(scope=resolved_scope, limit=5)
         return {
             "scope": resolved_scope,
             "total_memories": len(memories),
@@ -386,21 +879,146 @@ class NetworkXMemoryStore(IMemoryStore):
             "top_memories": [m.to_dict() for m in top_memories],
         }
 
+    def list_sessions(
+        self,
+        *,
+        scope: str | None = None,
+        task_id: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[Memory]:
+        return select_sessions(
+            self.iter_memories(scope=scope, types=[MemoryType.EXPERIENCE]),
+            task_id=task_id,
+            since=since,
+            until=until,
+            limit=limit,
+        )
+
+    def create_branch(self, task_id: str, description: str = "") -> Branch:
+        branch = Branch(task_id=task_id, description=description)
+        self._persistence.insert_branch(branch)
+        return branch
+
+    def list_branches(self, *, status: str | None = None) -> list[Branch]:
+        return self._persistence.list_branches(status)
+
+    def merge_branch(
+        self,
+        task_id: str,
+        *,
+        target_scope: str,
+        memory_ids: Iterable[str] | None = None,
+        types: Iterable[MemoryType] | None = None,
+    ) -> list[Memory]:
+        scope = branch_scope(task_id)
+        live = [memory for memory in self.iter_memories(scope=scope) if memory.valid_until is None]
+        if not live and not self._persistence.has_branch(task_id):
+            raise UnknownBranchError(f"No branch for task {task_id}")
+        # Lazy listings stream fresh copies; change the graph's own nodes.
+        promoted = self._hydrate_all(
+            memory.id for memory in select_promoted(live, memory_ids, self._normalise_types(types))
+        )
+        ids = {memory.id for memory in promoted}
+        touching = {
+            relationship.id: relationship
+            for memory_id in ids
+            for relationship in self.list_relationships(memory_id, scope=scope, direction="both")
+        }
+        edges = promote_relationships(touching.values(), ids, scope, target_scope)
+        now = _now()
+        for memory in promoted:
+            memory.scope = target_scope
+            memory.updated_at = now
+        self._persistence.save_merge(task_id, promoted, edges, merged=len(promoted) == len(live))
+        return promoted
+
     def list_relationships(
         self,
         memory_id: str,
         *,
         scope: str | None = None,
+        direction: str = "out",
     ) -> list[Relationship]:
-        if memory_id not in self._graph:
-            return []
         resolved_scope = scope or self._scope_manager.current_scope
-        relationships: list[Relationship] = []
-        for _, target, key, data in self._graph.out_edges(memory_id, keys=True, data=True):
-            relationship: Relationship = data.get("relationship")
-            if relationship is None:
-                continue
-            if resolved_scope and relationship.scope != resolved_scope:
-                continue
-            relationships.append(relationship)
-        return relationships
+        return [
+            relationship
+            for _, relationship in self._query_engine.adjacent(
+                memory_id, direction=check_direction(direction), scope=resolved_scope
+            )
+        ]
+
+    def _hydrate_all(self, memory_ids: Iterable[str]) -> list[Memory]:
+        return [memory for memory in map(self._hydrate, memory_ids) if memory is not None]
+
+    def related_memories(
+        self,
+        memory_id: str,
+        *,
+        depth: int = 1,
+        edge_types: Iterable[EdgeType] | None = None,
+        direction: str = "both",
+        scope: str | None = None,
+    ) -> list[tuple[Memory, int]]:
+        hops = self._query_engine.neighbourhood(
+            memory_id,
+            depth=depth,
+            direction=check_direction(direction),
+            edge_types=normalise_edge_types(edge_types),
+            scope=scope or self._scope_manager.current_scope,
+        )
+        related = []
+        for node_id, distance in hops:
+            memory = self._hydrate(node_id)
+            if memory is not None:
+                related.append((memory, distance))
+        return related
+
+    def find_path(
+        self,
+        source_id: str,
+        target_id: str,
+        *,
+        edge_types: Iterable[EdgeType] | None = None,
+        direction: str = "both",
+        max_depth: int = DEFAULT_PATH_DEPTH,
+        scope: str | None = None,
+    ) -> list[Memory] | None:
+        if self._hydrate(source_id) is None or self._hydrate(target_id) is None:
+            return None
+        path = self._query_engine.shortest_path(
+            source_id,
+            target_id,
+            direction=check_direction(direction),
+            edge_types=normalise_edge_types(edge_types),
+            scope=scope or self._scope_manager.current_scope,
+            max_depth=max_depth,
+        )
+        return None if path is None else self._hydrate_all(path)
+
+    def latest_version(self, memory_id: str, *, scope: str | None = None) -> Memory | None:
+        if self.get_memory(memory_id, scope=scope) is None:
+            return None
+        latest = self._query_engine.latest_version(
+            memory_id, scope=scope or self._scope_manager.current_scope
+        )
+        return self._hydrate(latest)
+
+    def session_chain(
+        self,
+        memory_id: str,
+        *,
+        direction: str = "both",
+        limit: int | None = None,
+        scope: str | None = None,
+    ) -> list[Memory]:
+        if self.get_memory(memory_id, scope=scope) is None:
+            return []
+        chain = self._query_engine.session_chain(
+            memory_id,
+            direction=check_direction(direction),
+            scope=scope or self._scope_manager.current_scope,
+            limit=limit or MAX_CHAIN_LENGTH,
+        )
+        return self._hydrate_all(chain)
@@ -2,18 +2,377 @@
 
 from __future__ import annotations
 
+import bisect
+import heapq
+import json
+import math
 import re
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
 from typing import Any
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
 
-from .models import Memory, MemoryType
+from .models import EdgeType, Memory, MemoryType, Relationship, _utc
+
+# Edge directions accepted by the traversal API.
+TRAVERSAL_DIRECTIONS = ("out", "in", "both")
+# Default hop limit for path searches.
+DEFAULT_PATH_DEPTH = 6
+# Upper bound on supersedes/session chain walks, guarding against cycles.
+MAX_CHAIN_LENGTH = 1000
+
+# Okapi BM25 parameters (the usual defaults, as used by SQLite FTS5).
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Metadata keys usable in ``where`` filters (and as generated column names).
+_METADATA_KEY_RE = re.compile(r"^\w+$", re.ASCII)
+
+
+def check_direction(direction: str) -> str:
+    if direction not in TRAVERSAL_DIRECTIONS:
+        raise ValueError(
+            f"Invalid direction '{direction}'; expected one of {', '.join(TRAVERSAL_DIRECTIONS)}"
+        )
+    return direction
+
+
+def normalise_edge_types(edge_types: Iterable[Any] | None) -> set[EdgeType] | None:
+    if not edge_types:
+        return None
+    return {item if isinstance(item, EdgeType) else EdgeType(str(item)) for item in edge_types}
+
+
+def paginate(
+    memories: Iterable[Memory],
+    *,
+    after: str | None = None,
+    limit: int | None = None,
+) -> Iterator[Memory]:
+    """Resume after the memory with id ``after`` and stop after ``limit`` results.
+
+    An ``after`` id that is not in the stream yields nothing.
+    """
+    iterator = iter(memories)
+    if after is not None:
+        for memory in iterator:
+            if memory.id == after:
+                break
+        else:
+            return
+    yield from iterator if limit is None else islice(iterator, limit)
+
+
+def metadata_text(value: Any) -> str | None:
+    """Text form metadata values are compared in, matching SQLite's
+    ``CAST(json_extract(...) AS TEXT)``: booleans become ``1``/``0`` and
+    objects/arrays their compact JSON."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+
+def metadata_filters(where: dict[str, Any] | None) -> dict[str, str | None]:
+    """Validate ``where`` keys and normalise its values with :func:`metadata_text`."""
+    filters: dict[str, str | None] = {}
+    for key, value in (where or {}).items():
+        if not _METADATA_KEY_RE.match(key):
+            raise ValueError(f"Invalid metadata key '{key}' (letters, digits and '_' only)")
+        filters[key] = metadata_text(value)
+    return filters
+
+
+def metadata_matches(memory: Memory, filters: dict[str, str | None]) -> bool:
+    """True if every filtered key has the given value (``None`` matches a missing key)."""
+    return all(metadata_text(memory.metadata.get(key)) == value for key, value in filters.items())
+
+
+def select_sessions(
+    memories: Iterable[Memory],
+    *,
+    task_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int | None = None,
+) -> list[Memory]:
+    """``list_sessions`` for stores without a session index: filter, then newest first."""
+    selected = [
+        memory
+        for memory in memories
+        if memory.metadata.get("type") == "session_summary"
+        and memory.valid_until is None
+        and (task_id is None or str(memory.metadata.get("task_id")) == str(task_id))
+        and (since is None or _utc(memory.created_at) >= _utc(since))
+        and (until is None or _utc(memory.created_at) < _utc(until))
+    ]
+    if limit is not None:
+        return heapq.nlargest(limit, selected, key=lambda memory: _utc(memory.created_at))
+    return sorted(selected, key=lambda memory: _utc(memory.created_at), reverse=True)
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _memory_text(memory: Memory) -> list[str]:
+    haystacks = [memory.content or ""]
+    if memory.metadata:
+        haystacks.extend(str(v) for v in memory.metadata.values())
+    return haystacks
+
+
+def any_term_query(query: str) -> str:
+    """Boolean query matching memories containing any query term as a prefix."""
+    return " OR ".join(f"{token}*" for token in dict.fromkeys(tokenize(query)))
+
+
+def bm25_rank(
+    query: str,
+    memories: Iterable[Memory],
+    *,
+    total: int | None = None,
+) -> list[tuple[Memory, float]]:
+    """Okapi BM25 scores for memories containing any query term, best first.
+
+    Terms match token prefixes, as in the SQLite FTS index. Document
+    frequencies are counted over ``memories``, which is exact when it holds
+    every memory matching a term (e.g. the result of :func:`any_term_query`);
+    ``total`` is the corpus size and defaults to the number of matches.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+    docs: list[tuple[Memory, int, list[int]]] = []
+    for memory in memories:
+        tokens = [token for text in _memory_text(memory) for token in tokenize(text)]
+        freqs = [sum(1 for token in tokens if token.startswith(term)) for term in terms]
+        if any(freqs):
+            docs.append((memory, len(tokens), freqs))
+    if not docs:
+        return []
+    n = max(total or 0, len(docs))
+    avg_len = sum(length for _, length, _ in docs) / len(docs) or 1.0
+    idf = [
+        math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for df in (sum(1 for _, _, freqs in docs if freqs[i]) for i in range(len(terms)))
+    ]
+    scored = []
+    for memory, length, freqs in docs:
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len)
+        score = sum(w * f * (BM25_K1 + 1) / (f + norm) for w, f in zip(idf, freqs) if f)
+        scored.append((memory, score))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored
+
+
+@dataclass(slots=True, frozen=True)
+class Term:
+    """A query token and how it must line up with indexed tokens.
+
+    ``mode`` is ``exact``, ``prefix``, ``suffix`` or ``infix``.
+    """
+
+    text: str
+    mode: str = "exact"
+
+    def matches(self, token: str) -> bool:
+        if self.mode == "prefix":
+            return token.startswith(self.text)
+        if self.mode == "suffix":
+            return token.endswith(self.text)
+        if self.mode == "infix":
+            return self.text in token
+        return token == self.text
+
+
+@dataclass(slots=True, frozen=True)
+class ParsedQuery:
+    """Query as OR-ed clauses of AND-ed terms.
+
+    Plain text is a phrase: a case-insensitive substring of the content or a
+    metadata value, as before. Its terms only narrow the candidates and the
+    phrase itself is checked last. A query using ``OR``, ``AND`` or a
+    trailing ``*`` is boolean and matched on whole tokens (``*`` = prefix).
+    """
+
+    text: str
+    clauses: tuple[tuple[Term, ...], ...]
+    boolean: bool
+
+    @property
+    def plain(self) -> bool:
+        return not self.boolean
+
+
+def parse_query(query: str) -> ParsedQuery:
+    words = query.split()
+    boolean = any(word in ("OR", "AND") or (word.endswith("*") and word != "*") for word in words)
+    if not boolean:
+        tokens = tokenize(query)
+        if not tokens:
+            return ParsedQuery(query, (), False)
+        if len(tokens) == 1:
+            # The phrase may sit anywhere inside a single token.
+            terms = (Term(tokens[0], "infix"),)
+        else:
+            # Only the phrase's ends can be partial tokens.
+            terms = (
+                Term(tokens[0], "suffix"),
+                *(Term(token) for token in tokens[1:-1]),
+                Term(tokens[-1], "prefix"),
+            )
+        return ParsedQuery(query, (terms,), False)
+
+    clauses: list[tuple[Term, ...]] = []
+    current: list[Term] = []
+    for word in words:
+        if word == "OR":
+            if current:
+                clauses.append(tuple(current))
+            current = []
+            continue
+        if word == "AND":
+            continue
+        prefix = word.endswith("*")
+        tokens = tokenize(word)
+        for index, token in enumerate(tokens):
+            last = index == len(tokens) - 1
+            current.append(Term(token, "prefix" if prefix and last else "exact"))
+    if current:
+        clauses.append(tuple(current))
+    return ParsedQuery(query, tuple(clauses), True)
 
 
 class MemoryQueryEngine:
-    """Lightweight search utilities built on top of NetworkX."""
+    """Lightweight search and traversal utilities built on top of NetworkX.
 
-    def __init__(self, graph: Any):
+    Search runs against an inverted index (token -> memory ids) that the
+    owning store keeps current through :meth:`index` and :meth:`unindex`.
+    Candidates come from posting-list intersection; prefix and suffix terms
+    are resolved with a binary search over the sorted vocabulary.
+
+    ``expand`` is called with a node id before its edges are read, letting a
+    lazily loaded graph page the neighbourhood in on demand.
+    """
+
+    def __init__(self, graph: Any, *, expand: Callable[[str], None] | None = None):
         self._graph = graph
+        self._expand = expand
+        self._postings: dict[str, set[str]] = {}
+        self._doc_tokens: dict[str, frozenset[str]] = {}
+        self._order: dict[str, int] = {}
+        self._next_order = 0
+        # Sorted vocabulary (and its reversed spelling, for suffixes); rebuilt
+        # on demand after the vocabulary changes.
+        self._vocab: list[str] | None = None
+        self._reversed_vocab: list[str] | None = None
+
+    def _graph_memories(self) -> Iterable[Memory]:
+        for _, data in self._graph.nodes(data=True):
+            memory: Memory | None = data.get("memory")
+            if memory is not None:
+                yield memory
+
+    # ------------------------------------------------------------------
+    # Inverted index
+    # ------------------------------------------------------------------
+    def index(self, memory: Memory) -> None:
+        """Add or refresh ``memory`` in the token index."""
+        tokens = frozenset(token for text in _memory_text(memory) for token in tokenize(text))
+        previous = self._doc_tokens.get(memory.id, frozenset())
+        if memory.id not in self._order:
+            self._order[memory.id] = self._next_order
+            self._next_order += 1
+        self._doc_tokens[memory.id] = tokens
+        self._drop_postings(memory.id, previous - tokens)
+        self._add_postings(memory.id, tokens - previous)
+
+    def unindex(self, memory_id: str) -> None:
+        tokens = self._doc_tokens.pop(memory_id, None)
+        if tokens is None:
+            return
+        self._order.pop(memory_id, None)
+        self._drop_postings(memory_id, tokens)
+
+    def _add_postings(self, memory_id: str, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                self._postings[token] = {memory_id}
+                self._vocab = self._reversed_vocab = None
+            else:
+                posting.add(memory_id)
+
+    def _drop_postings(self, memory_id: str, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(memory_id)
+            if not posting:
+                del self._postings[token]
+                self._vocab = self._reversed_vocab = None
+
+    def _tokens_with_prefix(self, prefix: str, *, reverse: bool = False) -> list[str]:
+        if reverse:
+            if self._reversed_vocab is None:
+                self._reversed_vocab = sorted(token[::-1] for token in self._postings)
+            vocab = self._reversed_vocab
+        else:
+            if self._vocab is None:
+                self._vocab = sorted(self._postings)
+            vocab = self._vocab
+        start = bisect.bisect_left(vocab, prefix)
+        end = bisect.bisect_left(vocab, prefix + "\U0010ffff")
+        matched = vocab[start:end]
+        return [token[::-1] for token in matched] if reverse else matched
+
+    def _term_postings(self, term: Term) -> set[str]:
+        if term.mode == "exact":
+            return self._postings.get(term.text, set())
+        if term.mode == "prefix":
+            tokens = self._tokens_with_prefix(term.text)
+        elif term.mode == "suffix":
+            tokens = self._tokens_with_prefix(term.text[::-1], reverse=True)
+        else:
+            tokens = [token for token in self._postings if term.text in token]
+        if len(tokens) == 1:
+            return self._postings[tokens[0]]
+        return set().union(*(self._postings[token] for token in tokens))
+
+    def _candidates(self, parsed: ParsedQuery) -> list[str]:
+        """Ids matching any clause, in insertion order."""
+        matched: set[str] = set()
+        for clause in parsed.clauses:
+            postings = sorted((self._term_postings(term) for term in clause), key=len)
+            ids = set(postings[0])
+            for posting in postings[1:]:
+                if not ids:
+                    break
+                ids &= posting
+            matched |= ids
+        return sorted(matched, key=self._order.__getitem__)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _matches(memory: Memory, parsed: ParsedQuery, pattern: re.Pattern[str] | None) -> bool:
+        haystacks = _memory_text(memory)
+        if pattern is not None:
+            return any(pattern.search(text) for text in haystacks)
+        tokens = {token for text in haystacks for token in tokenize(text)}
+        return any(
+            all(any(term.matches(token) for token in tokens) for term in clause)
+            for clause in parsed.clauses
+        )
 
     def search(
         self,
@@ -21,40 +380,217 @@ class MemoryQueryEngine:
         *,
         scope: str | None = None,
         types: Iterable[MemoryType] | None = None,
+        memories: Iterable[Memory] | None = None,
     ) -> list[Memory]:
-        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        """Match ``query`` against indexed graph nodes, or scan ``memories`` if given."""
+        return list(self.iter_search(query, scope=scope, types=types, memories=memories))
+
+    def iter_search(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        memories: Iterable[Memory] | None = None,
+    ) -> Iterator[Memory]:
+        """Lazily yield the matches :meth:`search` would return."""
+        parsed = parse_query(query)
+        if parsed.boolean and not parsed.clauses:
+            return
+        pattern = re.compile(re.escape(query), re.IGNORECASE) if parsed.plain else None
         type_set = set(types) if types else None
-        results: list[Memory] = []
-        for node_id, data in self._graph.nodes(data=True):
-            memory: Memory = data.get("memory")
+        # Index hits already satisfy boolean queries; phrases still need the
+        # final substring check.
+        verify = True
+        if memories is None and parsed.clauses:
+            verify = parsed.plain
+            source: Iterable[Memory] = (
+                self._graph.nodes[node_id].get("memory")
+                for node_id in self._candidates(parsed)
+                if node_id in self._graph
+            )
+        else:
+            source = self._graph_memories() if memories is None else memories
+        for memory in source:
             if memory is None:
                 continue
             if scope and memory.scope != scope:
                 continue
             if type_set and memory.type not in type_set:
                 continue
-            haystacks = [memory.content]
-            if memory.metadata:
-                haystacks.extend(str(v) for v in memory.metadata.values())
-            if any(pattern.search(text or "") for text in haystacks):
-                results.append(memory)
-        return results
+            if not verify or self._matches(memory, parsed, pattern):
+                yield memory
 
     def list(
         self,
         *,
         scope: str | None = None,
         types: Iterable[MemoryType] | None = None,
+        memories: Iterable[Memory] | None = None,
     ) -> list[Memory]:
+        return list(self.iter_list(scope=scope, types=types, memories=memories))
+
+    def iter_list(
+        self,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        memories: Iterable[Memory] | None = None,
+    ) -> Iterator[Memory]:
         type_set = set(types) if types else None
-        results: list[Memory] = []
-        for _, data in self._graph.nodes(data=True):
-            memory: Memory = data.get("memory")
-            if memory is None:
-                continue
+        source = self._graph_memories() if memories is None else memories
+        for memory in source:
             if scope and memory.scope != scope:
                 continue
             if type_set and memory.type not in type_set:
                 continue
-            results.append(memory)
-        return results
+            yield memory
+
+    # ------------------------------------------------------------------
+    # Traversal
+    # ------------------------------------------------------------------
+    def adjacent(
+        self,
+        node_id: str,
+        *,
+        direction: str = "out",
+        edge_types: set[EdgeType] | None = None,
+        scope: str | None = None,
+    ) -> Iterator[tuple[str, Relationship]]:
+        """Yield ``(neighbour_id, relationship)`` pairs for the node's edges."""
+        if self._expand is not None:
+            self._expand(node_id)
+        if node_id not in self._graph:
+            return
+        edges = []
+        if direction in ("out", "both"):
+            edges.extend((target, data) for _, target, _, data in self._graph.out_edges(node_id, keys=True, data=True))
+        if direction in ("in", "both"):
+            edges.extend((source, data) for source, _, _, data in self._graph.in_edges(node_id, keys=True, data=True))
+        for neighbour, data in edges:
+            relationship: Relationship | None = data.get("relationship")
+            if relationship is None:
+                continue
+            if edge_types and relationship.type not in edge_types:
+                continue
+            if scope and relationship.scope != scope:
+                continue
+            yield neighbour, relationship
+
+    def neighbourhood(
+        self,
+        start: str,
+        *,
+        depth: int = 1,
+        direction: str = "both",
+        edge_types: set[EdgeType] | None = None,
+        scope: str | None = None,
+    ) -> list[tuple[str, int]]:
+        """Breadth-first k-hop expansion; returns ``(node_id, hops)`` nearest first."""
+        distances = {start: 0}
+        frontier = [start]
+        for hops in range(1, depth + 1):
+            next_frontier = []
+            for node_id in frontier:
+                for neighbour, _ in self.adjacent(
+                    node_id, direction=direction, edge_types=edge_types, scope=scope
+                ):
+                    if neighbour not in distances:
+                        distances[neighbour] = hops
+                        next_frontier.append(neighbour)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        del distances[start]
+        return list(distances.items())
+
+    def shortest_path(
+        self,
+        source: str,
+        target: str,
+        *,
+        direction: str = "both",
+        edge_types: set[EdgeType] | None = None,
+        scope: str | None = None,
+        max_depth: int = DEFAULT_PATH_DEPTH,
+    ) -> list[str] | None:
+        """Unweighted shortest path from ``source`` to ``target`` (inclusive)."""
+        if source == target:
+            return [source]
+        parents: dict[str, str | None] = {source: None}
+        queue = deque([(source, 0)])
+        while queue:
+            node_id, hops = queue.popleft()
+            if hops >= max_depth:
+                continue
+            for neighbour, _ in self.adjacent(
+                node_id, direction=direction, edge_types=edge_types, scope=scope
+            ):
+                if neighbour in parents:
+                    continue
+                parents[neighbour] = node_id
+                if neighbour == target:
+                    path = [target]
+                    while parents[path[-1]] is not None:
+                        path.append(parents[path[-1]])
+                    return path[::-1]
+                queue.append((neighbour, hops + 1))
+        return None
+
+    def latest_version(self, memory_id: str, *, scope: str | None = None) -> str:
+        """Follow SUPERSEDES edges (new -> old) forward in time to the newest memory."""
+        supersedes = {EdgeType.SUPERSEDES}
+        best, best_hops = memory_id, 0
+        seen = {memory_id}
+        queue = deque([(memory_id, 0)])
+        while queue and len(seen) <= MAX_CHAIN_LENGTH:
+            node_id, hops = queue.popleft()
+            newer = [
+                source
+                for source, _ in self.adjacent(node_id, direction="in", edge_types=supersedes, scope=scope)
+            ]
+            if not newer and hops > best_hops:
+                best, best_hops = node_id, hops
+            for source in newer:
+                if source not in seen:
+                    seen.add(source)
+                    queue.append((source, hops + 1))
+        return best
+
+    def session_chain(
+        self,
+        memory_id: str,
+        *,
+        direction: str = "both",
+        scope: str | None = None,
+        limit: int = MAX_CHAIN_LENGTH,
+    ) -> list[str]:
+        """Walk TEMPORAL_SEQUENCE edges around ``memory_id``, oldest first.
+
+        Both directions advance one step at a time, so with ``direction="both"``
+        the ``limit`` memories kept are the nearest ones on either side.
+        """
+        sequence = {EdgeType.TEMPORAL_SEQUENCE}
+        positions = {memory_id: 0}
+        frontiers = {}
+        if direction in ("in", "both"):
+            frontiers["in"] = [memory_id]
+        if direction in ("out", "both"):
+            frontiers["out"] = [memory_id]
+        distance = 0
+        while any(frontiers.values()) and len(positions) < limit:
+            distance += 1
+            for edge_direction, frontier in frontiers.items():
+                position = -distance if edge_direction == "in" else distance
+                next_frontier = []
+                for node_id in frontier:
+                    for neighbour, _ in self.adjacent(
+                        node_id, direction=edge_direction, edge_types=sequence, scope=scope
+                    ):
+                        if neighbour not in positions:
+                            positions[neighbour] = position
+                            next_frontier.append(neighbour)
+                frontiers[edge_direction] = next_frontier
+        # Insertion order is nearest first; keep the closest, then sort by time.
+        nearest = list(positions.items())[:limit]
+        return [node_id for node_id, _ in sorted(nearest, key=lambda item: item[1])]
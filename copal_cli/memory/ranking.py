@@ -0,0 +1,122 @@
+"""Relevance scoring for memory retrieval.
+
+A memory's score is a weighted sum of four signals, each in ``[0, 1]``:
+
+* ``match`` - how well it matches the query (1.0 when there is no query)
+* ``importance`` - the stored importance
+* ``recency`` - exponential decay on the age of the last access/update,
+  halving every ``half_life_days``
+* ``frequency`` - a saturating function of ``access_count``
+
+Expired memories (``valid_until`` in the past) are never returned. Top-k
+selection uses a bounded heap, so candidates are streamed rather than sorted.
+Tune under the ``ranking`` key of the memory config.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from datetime import datetime, timezone
+from typing import Any
+from collections.abc import Callable, Iterable
+
+from .models import Memory, _utc
+from .query import tokenize
+
+DEFAULT_RANKING: dict[str, Any] = {
+    "half_life_days": 30.0,
+    "weights": {
+        "match": 1.0,
+        "importance": 1.0,
+        "recency": 1.0,
+        "frequency": 0.5,
+    },
+}
+
+DEFAULT_TOP_K = 10
+
+
+def saturate(value: float) -> float:
+    """Map ``[0, inf)`` onto ``[0, 1)``."""
+    return value / (value + 1.0) if value > 0 else 0.0
+
+
+def is_expired(memory: Memory, now: datetime) -> bool:
+    return memory.valid_until is not None and _utc(memory.valid_until) <= now
+
+
+def text_match(memory: Memory, query: str) -> float:
+    """Saturated count of query-token hits (prefix matches) in the memory's text."""
+    terms = tokenize(query)
+    if not terms:
+        return 1.0
+    texts = [memory.content or ""]
+    if memory.metadata:
+        texts.extend(str(v) for v in memory.metadata.values())
+    tokens = [token for text in texts for token in tokenize(text)]
+    hits = sum(1 for token in tokens for term in terms if token.startswith(term))
+    return saturate(hits)
+
+
+class RelevanceScorer:
+    """Combines match, importance, recency and access frequency into one score."""
+
+    def __init__(
+        self,
+        *,
+        half_life_days: float = DEFAULT_RANKING["half_life_days"],
+        weights: dict[str, float] | None = None,
+    ) -> None:
+        if half_life_days <= 0:
+            raise ValueError("half_life_days must be positive")
+        self.half_life_days = float(half_life_days)
+        self.weights = {**DEFAULT_RANKING["weights"], **(weights or {})}
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "RelevanceScorer":
+        ranking = config.get("ranking")
+        if not isinstance(ranking, dict):
+            return cls()
+        weights = ranking.get("weights")
+        return cls(
+            half_life_days=float(ranking.get("half_life_days", DEFAULT_RANKING["half_life_days"])),
+            weights={k: float(v) for k, v in weights.items()} if isinstance(weights, dict) else None,
+        )
+
+    def combine(self, match: float, importance: float, access_count: int, age_days: float) -> float:
+        """Score from raw signals; also registered as an SQLite function."""
+        recency = 0.5 ** (max(age_days or 0.0, 0.0) / self.half_life_days)
+        frequency = saturate(math.log1p(max(access_count or 0, 0)))
+        weights = self.weights
+        return (
+            weights["match"] * (match if match is not None else 1.0)
+            + weights["importance"] * (importance or 0.0)
+            + weights["recency"] * recency
+            + weights["frequency"] * frequency
+        )
+
+    def score(self, memory: Memory, *, match: float = 1.0, now: datetime | None = None) -> float:
+        now = now or datetime.now(timezone.utc)
+        seen = memory.last_accessed or memory.updated_at or memory.created_at
+        age_days = (now - _utc(seen)).total_seconds() / 86400
+        return self.combine(match, memory.importance, memory.access_count, age_days)
+
+    def top_k(
+        self,
+        memories: Iterable[Memory],
+        k: int,
+        *,
+        match: Callable[[Memory], float] | None = None,
+        now: datetime | None = None,
+    ) -> list[Memory]:
+        """Best ``k`` unexpired memories, highest score first."""
+        now = now or datetime.now(timezone.utc)
+        live = (memory for memory in memories if not is_expired(memory, now))
+        return heapq.nlargest(
+            k,
+            live,
+            key=lambda memory: self.score(
+                memory, match=match(memory) if match else 1.0, now=now
+            ),
+        )
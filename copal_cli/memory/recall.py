@@ -0,0 +1,167 @@
+"""Hybrid lexical + semantic retrieval for agents.
+
+``recall`` asks each available retriever for a ranked candidate list - BM25
+full-text search always, embedding similarity when the store has a vector
+index - and merges them with reciprocal rank fusion (RRF): a memory scores
+``sum(weight / (rrf_k + rank))`` over the lists it appears in. RRF only
+looks at ranks, so BM25 and cosine scores never need to be calibrated
+against each other.
+
+Fused results skip expired memories and are packed into a token budget.
+Retrievers run cheapest first; once ``latency_budget_ms`` has elapsed the
+remaining ones are skipped and the result is built from what is available.
+Tune under the ``recall`` key of the memory config.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+from collections.abc import Iterable, Mapping, Sequence
+
+from .models import Memory, MemoryType
+from .ranking import DEFAULT_TOP_K, is_expired
+from .store_interface import IMemoryStore
+
+DEFAULT_RECALL: dict[str, Any] = {
+    "rrf_k": 60,
+    "candidates": 50,
+    "token_budget": 2000,
+    "latency_budget_ms": 300,
+    "weights": {
+        "lexical": 1.0,
+        "semantic": 1.0,
+    },
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def reciprocal_rank_fusion(
+    rankings: Mapping[str, Sequence[str]],
+    *,
+    k: int = DEFAULT_RECALL["rrf_k"],
+    weights: Mapping[str, float] | None = None,
+) -> list[tuple[str, float]]:
+    """Fuse ranked id lists into one ``(id, score)`` list, best first.
+
+    Ties keep the order in which ids were first seen.
+    """
+    scores: dict[str, float] = {}
+    for name, ranking in rankings.items():
+        weight = 1.0 if weights is None else weights.get(name, 1.0)
+        for rank, memory_id in enumerate(ranking, start=1):
+            scores[memory_id] = scores.get(memory_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+@dataclass(slots=True)
+class RecallHit:
+    memory: Memory
+    score: float
+    sources: tuple[str, ...]
+    tokens: int
+
+
+@dataclass(slots=True)
+class RecallResult:
+    hits: list[RecallHit] = field(default_factory=list)
+    tokens: int = 0
+    elapsed_ms: float = 0.0
+    # Retrievers skipped because the latency budget ran out.
+    skipped: list[str] = field(default_factory=list)
+
+
+class HybridRetriever:
+    """Runs lexical and semantic retrieval against a store and fuses the results."""
+
+    def __init__(
+        self,
+        store: IMemoryStore,
+        *,
+        rrf_k: int = DEFAULT_RECALL["rrf_k"],
+        candidates: int = DEFAULT_RECALL["candidates"],
+        token_budget: int = DEFAULT_RECALL["token_budget"],
+        latency_budget_ms: float = DEFAULT_RECALL["latency_budget_ms"],
+        weights: dict[str, float] | None = None,
+    ) -> None:
+        if rrf_k <= 0 or candidates <= 0:
+            raise ValueError("rrf_k and candidates must be positive")
+        self.store = store
+        self.rrf_k = rrf_k
+        self.candidates = candidates
+        self.token_budget = token_budget
+        self.latency_budget_ms = latency_budget_ms
+        self.weights = {**DEFAULT_RECALL["weights"], **(weights or {})}
+
+    @classmethod
+    def from_config(cls, store: IMemoryStore, config: dict[str, Any]) -> "HybridRetriever":
+        recall = config.get("recall")
+        if not isinstance(recall, dict):
+            return cls(store)
+        weights = recall.get("weights")
+        return cls(
+            store,
+            rrf_k=int(recall.get("rrf_k", DEFAULT_RECALL["rrf_k"])),
+            candidates=int(recall.get("candidates", DEFAULT_RECALL["candidates"])),
+            token_budget=int(recall.get("token_budget", DEFAULT_RECALL["token_budget"])),
+            latency_budget_ms=float(recall.get("latency_budget_ms", DEFAULT_RECALL["latency_budget_ms"])),
+            weights={k: float(v) for k, v in weights.items()} if isinstance(weights, dict) else None,
+        )
+
+    def _retrievers(self) -> list[tuple[str, Any]]:
+        retrievers = [("lexical", self.store.lexical_search)]
+        if hasattr(self.store, "semantic_search"):
+            retrievers.append(("semantic", self.store.semantic_search))
+        return retrievers
+
+    def recall(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        limit: int = DEFAULT_TOP_K,
+        token_budget: int | None = None,
+    ) -> RecallResult:
+        """Best memories for ``query`` that fit in ``token_budget`` (0 disables it)."""
+        start = time.perf_counter()
+        deadline = start + self.latency_budget_ms / 1000
+        type_list = list(types) if types else None
+        result = RecallResult()
+
+        rankings: dict[str, list[str]] = {}
+        memories: dict[str, Memory] = {}
+        for name, retrieve in self._retrievers():
+            # The first retriever always runs so there is something to return.
+            if rankings and time.perf_counter() >= deadline:
+                result.skipped.append(name)
+                continue
+            hits = retrieve(query, scope=scope, types=type_list, limit=self.candidates)
+            rankings[name] = [memory.id for memory, _ in hits]
+            for memory, _ in hits:
+                memories.setdefault(memory.id, memory)
+
+        budget = self.token_budget if token_budget is None else token_budget
+        now = datetime.now(timezone.utc)
+        for memory_id, score in reciprocal_rank_fusion(rankings, k=self.rrf_k, weights=self.weights):
+            if len(result.hits) >= limit:
+                break
+            memory = memories[memory_id]
+            if is_expired(memory, now):
+                continue
+            tokens = estimate_tokens(memory.content or "")
+            if budget and result.tokens + tokens > budget:
+                # Keep looking: a shorter, lower-ranked memory may still fit.
+                continue
+            sources = tuple(name for name, ranking in rankings.items() if memory_id in ranking)
+            result.hits.append(RecallHit(memory, score, sources, tokens))
+            result.tokens += tokens
+
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        return result
@@ -0,0 +1,183 @@
+"""Client side of the memory server (see :mod:`copal_cli.memory.server`)."""
+
+from __future__ import annotations
+
+import logging
+import socket
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from . import codec
+from .config import DEFAULT_SERVER_CONFIG, server_config
+from .models import Memory
+from .rpc import (
+    CACHED_METHODS,
+    UNCACHED_READS,
+    RemoteStoreError,
+    decode,
+    discover_socket,
+    dump_message,
+    encode,
+    raise_remote,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per request by the ``iter_*`` methods.
+PAGE_SIZE = 500
+
+# Calls that can safely run again on the fallback after the server got them.
+_READS = CACHED_METHODS | UNCACHED_READS
+
+
+class _Unanswered(RemoteStoreError):
+    """The request was sent but no answer came back, so it may have run."""
+
+
+class RemoteMemoryStore:
+    """:class:`IMemoryStore` whose calls are answered by a running memory server.
+
+    Only the methods the server's store provides are available, so
+    ``hasattr(store, "semantic_search")`` behaves as it does in process.
+
+    Each request waits at most ``timeout`` seconds. If the server stops
+    answering and a ``fallback`` is given, the store opens it and sends every
+    later call there instead; without one the call raises
+    :class:`RemoteStoreError`. The failed call itself is retried on the
+    fallback only if it is a read or never reached the server: a write that
+    timed out may still be applied there, so it raises
+    :class:`RemoteStoreError` rather than running twice.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        timeout: float | None = DEFAULT_SERVER_CONFIG["timeout"],
+        fallback: Callable[[], Any] | None = None,
+    ) -> None:
+        self.socket_path = Path(path)
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._fallback = fallback
+        self._local: Any = None
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(str(self.socket_path))
+        except OSError as exc:
+            self._sock.close()
+            raise RemoteStoreError(f"Cannot reach memory server at {self.socket_path}: {exc}") from exc
+        self._reader = self._sock.makefile("rb")
+        info = self._call("$describe")
+        self.methods = frozenset(info["methods"])
+        self.backend: str = info["backend"]
+        self.root = Path(info["root"])
+
+    def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            if self._local is None:
+                try:
+                    line = self._exchange(method, args, kwargs)
+                except RemoteStoreError as exc:
+                    if self._fallback is None or method == "$describe":
+                        raise
+                    logger.warning(f"{exc}; using the memory database directly")
+                    self._disconnect()
+                    self._local = self._fallback()
+                    if isinstance(exc, _Unanswered) and method not in _READS:
+                        raise RemoteStoreError(f"{exc}; {method} may have been applied, so it was not retried") from exc
+            local = self._local
+        if local is not None:
+            return getattr(local, method)(*args, **kwargs)
+        response = codec.loads(line)
+        if "error" in response:
+            raise_remote(response["error"])
+        return decode(response.get("result"))
+
+    def _exchange(self, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> bytes:
+        self._next_id += 1
+        request = {"id": self._next_id, "method": method, "args": encode(list(args)), "kwargs": encode(kwargs)}
+        try:
+            self._sock.sendall(dump_message(request))
+        except OSError as exc:
+            raise RemoteStoreError(f"Memory server at {self.socket_path} failed: {exc}") from exc
+        try:
+            line = self._reader.readline()
+        except OSError as exc:
+            raise _Unanswered(f"Memory server at {self.socket_path} failed: {exc}") from exc
+        if not line:
+            raise _Unanswered(f"Memory server at {self.socket_path} closed the connection")
+        return line
+
+    def _disconnect(self) -> None:
+        self._reader.close()
+        self._sock.close()
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or name == "methods" or name not in self.methods:
+            raise AttributeError(name)
+        return partial(self._call, name)
+
+    def iter_memories(
+        self,
+        *,
+        scope: str | None = None,
+        types: Sequence[Any] | None = None,
+        after: str | None = None,
+        where: dict[str, Any] | None = None,
+    ) -> Iterator[Memory]:
+        if self._local is not None:
+            yield from self._local.iter_memories(scope=scope, types=types, after=after, where=where)
+            return
+        while page := self._call(
+            "list_memories", scope=scope, types=types, limit=PAGE_SIZE, after=after, where=where
+        ):
+            yield from page
+            if len(page) < PAGE_SIZE:
+                return
+            after = page[-1].id
+
+    def iter_search(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Sequence[Any] | None = None,
+        after: str | None = None,
+    ) -> Iterator[Memory]:
+        if self._local is not None:
+            yield from self._local.iter_search(query, scope=scope, types=types, after=after)
+            return
+        while page := self._call("search_memories", query, scope=scope, types=types, limit=PAGE_SIZE, after=after):
+            yield from page
+            if len(page) < PAGE_SIZE:
+                return
+            after = page[-1].id
+
+    def close(self) -> None:
+        with self._lock:
+            if self._local is not None:
+                self._local.close()
+            else:
+                self._disconnect()
+
+
+def connect_server(
+    target_root: Path,
+    config: dict[str, Any],
+    fallback: Callable[[], Any] | None = None,
+) -> RemoteMemoryStore | None:
+    """A client for the memory server serving ``target_root``, or None if none is running."""
+    path = discover_socket(target_root, config)
+    if path is None:
+        return None
+    timeout = server_config(config)["timeout"]
+    try:
+        return RemoteMemoryStore(path, timeout=float(timeout) if timeout else None, fallback=fallback)
+    except RemoteStoreError as exc:
+        logger.debug(f"Ignoring memory server socket: {exc}")
+        return None
@@ -0,0 +1,205 @@
+"""Wire protocol shared by ``copal memory serve`` and its clients.
+
+Requests and responses are JSON objects, one per line, over a Unix domain
+socket::
+
+    {"id": 1, "method": "search_memories", "args": ["ruff"], "kwargs": {"limit": 5}}
+    {"id": 1, "result": [...]}
+    {"id": 1, "error": {"type": "ValueError", "message": "..."}}
+
+Memories, relationships, branches, enums and datetimes travel as tagged
+objects (``{"$memory": {...}}``), so store methods take and return the same
+types over the socket as they do in process.
+
+A linked worktree shares the memory of the repository it was created from:
+``copal worktree new`` records that repository in
+``.copal/memory/shared.json`` and clients look for its server's socket.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from . import codec
+from .branches import Branch, BranchExistsError, UnknownBranchError
+from .config import load_memory_config, server_config
+from .dedupe import DuplicateMemoryError
+from .models import EdgeType, Memory, MemoryType, Relationship
+
+SHARED_ROOT_FILE = Path(".copal") / "memory" / "shared.json"
+
+# Store methods callable through the server (when its store provides them).
+REMOTE_METHODS = (
+    "add_memory",
+    "add_memories",
+    "find_duplicate",
+    "upsert_many",
+    "delete_many",
+    "apply_changes",
+    "get_memory",
+    "get_many",
+    "update_memory",
+    "delete_memory",
+    "supersede_memory",
+    "search_memories",
+    "rank_memories",
+    "lexical_search",
+    "semantic_search",
+    "list_memories",
+    "list_sessions",
+    "create_branch",
+    "list_branches",
+    "merge_branch",
+    "list_relationships",
+    "related_memories",
+    "find_path",
+    "latest_version",
+    "session_chain",
+    "summarise_project",
+    "reindex",
+    "flush_access_stats",
+    "vacuum",
+    "fingerprint",
+)
+
+# Reads whose answers the server caches until the next write.
+CACHED_METHODS = frozenset(
+    {
+        "find_duplicate",
+        "get_many",
+        "search_memories",
+        "rank_memories",
+        "lexical_search",
+        "semantic_search",
+        "list_memories",
+        "list_sessions",
+        "list_branches",
+        "list_relationships",
+        "related_memories",
+        "find_path",
+        "latest_version",
+        "session_chain",
+        "summarise_project",
+        "fingerprint",
+    }
+)
+
+# Reads that reach the store every time: ``get_memory`` records an access.
+UNCACHED_READS = frozenset({"get_memory"})
+
+# Exceptions re-raised on the client with their original type.
+REMOTE_ERRORS: dict[str, type[Exception]] = {
+    error.__name__: error
+    for error in (
+        ValueError,
+        TypeError,
+        KeyError,
+        LookupError,
+        DuplicateMemoryError,
+        BranchExistsError,
+        UnknownBranchError,
+    )
+}
+
+
+class RemoteStoreError(ConnectionError):
+    """The memory server failed or could not be reached."""
+
+
+def encode(value: Any) -> Any:
+    """``value`` with memory types replaced by tagged JSON objects."""
+    if isinstance(value, Memory):
+        return {"$memory": value.to_dict()}
+    if isinstance(value, Relationship):
+        return {"$relationship": value.to_dict()}
+    if isinstance(value, Branch):
+        return {"$branch": {**value.to_dict(), "memories": value.memories}}
+    if isinstance(value, MemoryType):
+        return {"$memory_type": value.value}
+    if isinstance(value, EdgeType):
+        return {"$edge_type": value.value}
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, tuple):
+        return {"$tuple": [encode(item) for item in value]}
+    if isinstance(value, dict):
+        return {key: encode(item) for key, item in value.items()}
+    if isinstance(value, (str, bytes)) or not isinstance(value, Iterable):
+        return value
+    return [encode(item) for item in value]
+
+
+_DECODERS = {
+    "$memory": Memory.from_dict,
+    "$relationship": Relationship.from_dict,
+    "$branch": lambda payload: Branch.from_dict(payload, payload.get("memories", 0)),
+    "$memory_type": MemoryType,
+    "$edge_type": EdgeType,
+    "$datetime": datetime.fromisoformat,
+    "$tuple": lambda items: tuple(decode(item) for item in items),
+}
+
+
+def decode(value: Any) -> Any:
+    """Inverse of :func:`encode`."""
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if isinstance(value, dict):
+        if len(value) == 1:
+            [(key, payload)] = value.items()
+            decoder = _DECODERS.get(key)
+            if decoder is not None:
+                return decoder(payload)
+        return {key: decode(item) for key, item in value.items()}
+    return value
+
+
+def dump_message(message: dict[str, Any]) -> bytes:
+    return codec.dumpb(message) + b"\n"
+
+
+def error_payload(exc: BaseException) -> dict[str, str]:
+    return {"type": type(exc).__name__, "message": str(exc)}
+
+
+def raise_remote(error: dict[str, Any]) -> None:
+    kind = REMOTE_ERRORS.get(error.get("type", ""), RemoteStoreError)
+    raise kind(error.get("message", "memory server error"))
+
+
+def shared_root(target_root: Path) -> Path:
+    """Repository whose memory ``target_root`` shares (itself unless it is a linked worktree)."""
+    try:
+        payload = json.loads((target_root / SHARED_ROOT_FILE).read_text())
+    except (OSError, ValueError):
+        return target_root
+    root = payload.get("root") if isinstance(payload, dict) else None
+    return Path(root) if root else target_root
+
+
+def link_worktree(source_root: Path, worktree_root: Path) -> None:
+    """Point ``worktree_root`` at the memory server of ``source_root``."""
+    marker = worktree_root / SHARED_ROOT_FILE
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.write_text(json.dumps({"root": str(shared_root(source_root).resolve())}, indent=2))
+
+
+def socket_path(target_root: Path, config: dict[str, Any]) -> Path:
+    """Socket the memory server for ``target_root`` listens on."""
+    path = Path(server_config(config)["socket"])
+    return path if path.is_absolute() else target_root / path
+
+
+def discover_socket(target_root: Path, config: dict[str, Any]) -> Path | None:
+    """Socket of a memory server serving ``target_root``, if one appears to be running."""
+    if not server_config(config)["discover"]:
+        return None
+    root = shared_root(target_root)
+    if root != target_root:
+        config = load_memory_config(root)
+    path = socket_path(root, config)
+    return path if path.is_socket() else None
@@ -0,0 +1,365 @@
+"""Local memory server: one process owns the store for many worktrees.
+
+``copal memory serve`` opens the configured store and listens on a Unix
+domain socket (protocol in :mod:`copal_cli.memory.rpc`). Connections are
+handled on their own threads, but every store call runs on a single worker
+thread, the only writer of the database. Requests queued while the worker
+is busy are taken together: consecutive ``add_memory``/``add_memories``
+calls (and ``upsert_many`` calls) from any number of clients are folded into
+one transaction, and read results are cached until the next write.
+"""
+
+from __future__ import annotations
+
+import copy
+import errno
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from . import codec
+from .config import server_config
+from .factory import create_store, store_backend
+from .rpc import (
+    CACHED_METHODS,
+    REMOTE_METHODS,
+    UNCACHED_READS,
+    decode,
+    dump_message,
+    encode,
+    error_payload,
+    socket_path,
+)
+
+logger = logging.getLogger(__name__)
+
+# Writes folded into a single store call, with their positional parameters.
+_COALESCED = {
+    "add_memory": ("memory", "relationships"),
+    "add_memories": ("memories", "relationships"),
+    "upsert_many": ("memories", "relationships"),
+}
+
+
+@dataclass
+class _Call:
+    method: str
+    args: list[Any]
+    kwargs: dict[str, Any]
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: Exception | None = None
+
+    def resolve(self, result: Any = None, error: Exception | None = None) -> None:
+        self.result, self.error = result, error
+        self.done.set()
+
+    def params(self) -> dict[str, Any] | None:
+        """Named parameters of a coalescable write, or None if it must run alone."""
+        names = _COALESCED.get(self.method)
+        if names is None or len(self.args) > len(names):
+            return None
+        params = dict(zip(names, self.args))
+        params.update(self.kwargs)
+        allowed = {*names, "dedupe"} if self.method != "upsert_many" else set(names)
+        if not set(params) <= allowed or names[0] not in params:
+            return None
+        return params
+
+    def group(self) -> tuple[str, Any] | None:
+        params = self.params()
+        if params is None:
+            return None
+        if self.method == "upsert_many":
+            return ("upsert", None)
+        return ("add", params.get("dedupe"))
+
+
+class _ResultCache:
+    """Encoded read results, dropped wholesale by every write."""
+
+    def __init__(self, size: int) -> None:
+        self.size = max(0, size)
+        self.generation = 0
+        self._entries: OrderedDict[bytes, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: bytes, generation: int, body: bytes) -> None:
+        with self._lock:
+            # A write landed while the read ran; its result may be stale.
+            if generation != self.generation or not self.size:
+                return
+            self._entries[key] = body
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: _SocketServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if line.strip():
+                self.wfile.write(self.server.memory.respond(line))
+
+
+class _SocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, memory: MemoryServer) -> None:
+        self.memory = memory
+        super().__init__(str(path), _Handler)
+
+
+class MemoryServer:
+    """Serve the memory store of ``target_root`` on a Unix domain socket."""
+
+    def __init__(
+        self,
+        target_root: Path,
+        config: dict[str, Any],
+        *,
+        path: Path | None = None,
+    ) -> None:
+        settings = server_config(config)
+        self.target_root = Path(target_root)
+        self.config = config
+        self.path = Path(path) if path is not None else socket_path(self.target_root, config)
+        self.batch_window = max(0.0, float(settings["batch_window_ms"]) / 1000)
+        self.max_batch = max(1, int(settings["max_batch"]))
+        self.cache = _ResultCache(int(settings["cache_size"]))
+        self.batches = 0
+        self._queue: queue.SimpleQueue[_Call | None] = queue.SimpleQueue()
+        self._store: Any = None
+        self._methods: list[str] = []
+        self._server: _SocketServer | None = None
+        self._worker: threading.Thread | None = None
+        self._serving: threading.Thread | None = None
+        self._ready = threading.Event()
+        self._startup_error: Exception | None = None
+
+    # --- lifecycle ------------------------------------------------------------------
+    def _open(self) -> None:
+        if _is_listening(self.path):
+            raise OSError(errno.EADDRINUSE, f"A memory server is already listening on {self.path}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)
+        self._worker = threading.Thread(target=self._work, name="copal-memory-writer", daemon=True)
+        self._worker.start()
+        self._ready.wait()
+        if self._startup_error is not None:
+            raise self._startup_error
+        self._server = _SocketServer(self.path, self)
+        os.chmod(self.path, 0o600)
+        logger.info(f"Memory server for {self.target_root} listening on {self.path}")
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until :meth:`close` or an interrupt."""
+        self._open()
+        assert self._server is not None
+        self._server.serve_forever()
+
+    def start(self) -> MemoryServer:
+        """Serve from a background thread; returns once the socket accepts connections."""
+        self._open()
+        assert self._server is not None
+        self._serving = threading.Thread(target=self._server.serve_forever, name="copal-memory-server", daemon=True)
+        self._serving.start()
+        return self
+
+    def close(self) -> None:
+        if self._server is not None:
+            if self._serving is not None:
+                self._server.shutdown()
+                self._serving.join()
+            self._server.server_close()
+            self._server = None
+            self.path.unlink(missing_ok=True)
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def __enter__(self) -> MemoryServer:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # --- requests -------------------------------------------------------------------
+    def respond(self, line: bytes) -> bytes:
+        """Answer one request line."""
+        try:
+            request = codec.loads(line)
+            request_id = request.get("id")
+            method = request["method"]
+            args = request.get("args") or []
+            kwargs = request.get("kwargs") or {}
+        except (ValueError, KeyError, AttributeError) as exc:
+            return dump_message({"id": None, "error": error_payload(ValueError(f"Malformed request: {exc}"))})
+
+        if method == "$describe":
+            result = {"methods": self._methods, "backend": store_backend(self.config), "root": str(self.target_root)}
+            return dump_message({"id": request_id, "result": result})
+        if method not in self._methods:
+            error = AttributeError(f"Memory server does not provide {method!r}")
+            return dump_message({"id": request_id, "error": error_payload(error)})
+
+        key = None
+        generation = self.cache.generation
+        if method in CACHED_METHODS:
+            key = codec.dumpb([method, args, kwargs])
+            body = self.cache.get(key)
+            if body is not None:
+                return _result_message(request_id, body)
+
+        call = _Call(method, decode(args), decode(kwargs))
+        self._queue.put(call)
+        call.done.wait()
+        if call.error is not None:
+            return dump_message({"id": request_id, "error": error_payload(call.error)})
+        body = codec.dumpb(encode(call.result))
+        if key is not None:
+            self.cache.put(key, generation, body)
+        return _result_message(request_id, body)
+
+    # --- worker ---------------------------------------------------------------------
+    def _work(self) -> None:
+        try:
+            # SQLite connections belong to the thread that opened them.
+            self._store = create_store(self.target_root, self.config)
+            self._methods = [name for name in REMOTE_METHODS if hasattr(self._store, name)]
+        except Exception as exc:
+            self._startup_error = exc
+            return
+        finally:
+            self._ready.set()
+        try:
+            running = True
+            while running:
+                batch, running = self._take()
+                if batch:
+                    self._execute(batch)
+        finally:
+            self._store.close()
+
+    def _take(self) -> tuple[list[_Call], bool]:
+        first = self._queue.get()
+        if first is None:
+            return [], False
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if first.group() is not None and remaining > 0:
+                    call = self._queue.get(timeout=remaining)
+                else:
+                    call = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if call is None:
+                return batch, False
+            batch.append(call)
+        return batch, True
+
+    def _execute(self, batch: list[_Call]) -> None:
+        self.batches += 1
+        index = 0
+        while index < len(batch):
+            group = batch[index].group()
+            end = index + 1
+            if group is not None:
+                while end < len(batch) and batch[end].group() == group:
+                    end += 1
+            calls = batch[index:end]
+            if len(calls) > 1:
+                self._run_coalesced(calls, group)
+            else:
+                self._run(calls[0])
+            index = end
+
+    def _run(self, call: _Call) -> None:
+        try:
+            result = getattr(self._store, call.method)(*call.args, **call.kwargs)
+        except Exception as exc:
+            call.resolve(error=exc)
+        else:
+            call.resolve(result)
+        finally:
+            if call.method not in CACHED_METHODS and call.method not in UNCACHED_READS:
+                self.cache.invalidate()
+
+    def _run_coalesced(self, calls: list[_Call], group: tuple[str, Any]) -> None:
+        memories: list[Any] = []
+        relationships: list[Any] = []
+        sizes: list[int] = []
+        for call in calls:
+            params = call.params() or {}
+            batch = [params["memory"]] if call.method == "add_memory" else list(params["memories"])
+            memories.extend(batch)
+            relationships.extend(params.get("relationships") or ())
+            sizes.append(len(batch))
+        # The store touches what it adds; keep the originals untouched so a
+        # failed batch is retried with the payloads the clients sent.
+        batch = [copy.copy(memory) for memory in memories]
+        try:
+            if group[0] == "upsert":
+                self._store.upsert_many(batch, relationships)
+                stored: list[Any] = batch
+            else:
+                stored = self._store.add_memories(batch, relationships, dedupe=group[1])
+        except Exception:
+            # Let each request fail (or succeed) on its own.
+            for call in calls:
+                self._run(call)
+            return
+        finally:
+            self.cache.invalidate()
+        offset = 0
+        for call, size in zip(calls, sizes):
+            part = stored[offset:offset + size]
+            offset += size
+            if call.method == "add_memory":
+                call.resolve(part[0])
+            elif call.method == "upsert_many":
+                call.resolve(size)
+            else:
+                call.resolve(part)
+
+
+def _result_message(request_id: Any, body: bytes) -> bytes:
+    return b'{"id":' + codec.dumpb(request_id) + b',"result":' + body + b"}\n"
+
+
+def _is_listening(path: Path) -> bool:
+    if not path.is_socket():
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except OSError:
+        return False
+    finally:
+        probe.close()
+    return True
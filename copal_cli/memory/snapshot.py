@@ -0,0 +1,345 @@
+"""Copy-on-write memory snapshots for worktrees.
+
+``copal worktree new --with-memory`` gives the task a snapshot of the
+project's memory database: the SQLite backup API takes a consistent copy
+(``.copal/memory/snapshot.db``, the *base*) even while the project is being
+written, and the worktree's own database (the *overlay* the task writes to)
+is cloned from it, sharing disk blocks on filesystems with reflinks.
+
+When the worktree is removed, the overlay is compared with the base and the
+project's current database, three-way: memories and relationships only the
+task added, changed or deleted are merged back in one transaction; those
+both sides changed, and task relationships whose ends the project no longer
+has, are reported as conflicts and, unless the task's version is preferred,
+left as the project has them.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import sqlite3
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from . import codec
+from .config import load_memory_config, resolve_database_path
+from .factory import create_store, open_store, store_backend
+from .models import Memory, Relationship, _deserialize_datetime, _now, _serialize_datetime
+from .rpc import SHARED_ROOT_FILE
+
+SNAPSHOT_MANIFEST = Path(".copal") / "memory" / "snapshot.json"
+SNAPSHOT_BASE = Path(".copal") / "memory" / "snapshot.db"
+
+# Linux FICLONE ioctl: make the target share the source's blocks.
+_FICLONE = 0x40049409
+
+# Bookkeeping that reads update; not a change to the memory itself.
+_ACCESS_FIELDS = ("access_count", "last_accessed")
+
+
+class SnapshotError(ValueError):
+    """Raised when a worktree memory snapshot cannot be created."""
+
+
+def clone_file(source: Path, target: Path) -> str:
+    """Copy ``source`` to ``target`` as a reflink where supported; returns ``reflink`` or ``copy``."""
+    try:
+        import fcntl
+
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return "reflink"
+    except (ImportError, OSError):
+        target.unlink(missing_ok=True)
+    shutil.copyfile(source, target)
+    return "copy"
+
+
+@dataclass
+class Snapshot:
+    """Manifest of a worktree's memory snapshot."""
+
+    parent: Path
+    worktree: Path
+    config: dict[str, Any]
+    created_at: datetime = field(default_factory=_now)
+    method: str = "copy"
+
+    @property
+    def base_path(self) -> Path:
+        return self.worktree / SNAPSHOT_BASE
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "parent": str(self.parent),
+            "config": self.config,
+            "created_at": _serialize_datetime(self.created_at),
+            "method": self.method,
+        }
+
+    @staticmethod
+    def from_dict(worktree: Path, payload: dict[str, Any]) -> Snapshot:
+        return Snapshot(
+            parent=Path(payload["parent"]),
+            worktree=worktree,
+            config=payload.get("config") or {},
+            created_at=_deserialize_datetime(payload.get("created_at")) or _now(),
+            method=payload.get("method", "copy"),
+        )
+
+
+def create_snapshot(parent_root: Path, worktree_root: Path) -> Snapshot:
+    """Snapshot ``parent_root``'s memory database into ``worktree_root``."""
+    parent_root, worktree_root = Path(parent_root).resolve(), Path(worktree_root).resolve()
+    config = load_memory_config(parent_root)
+    if store_backend(config) == "json":
+        raise SnapshotError("Memory snapshots need the sqlite or graph backend")
+    parent_db = resolve_database_path(parent_root, config)
+    overlay_db = resolve_database_path(worktree_root, config)
+    if overlay_db.resolve() == parent_db.resolve():
+        raise SnapshotError(f"The memory database {parent_db} is shared by every worktree")
+    if overlay_db.exists():
+        raise SnapshotError(f"{overlay_db} already exists")
+    if not parent_db.exists():
+        # Nothing saved yet: create the schema so both sides start equal.
+        create_store(parent_root, config).close()
+
+    snapshot = Snapshot(parent=parent_root, worktree=worktree_root, config=config)
+    snapshot.base_path.parent.mkdir(parents=True, exist_ok=True)
+    source = sqlite3.connect(parent_db)
+    target = sqlite3.connect(snapshot.base_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    snapshot.method = clone_file(snapshot.base_path, overlay_db)
+
+    # The task reads the same config as the project, and writes its overlay
+    # rather than a memory server the project may be running.
+    parent_config = parent_root / ".copal" / "config.json"
+    worktree_config = worktree_root / ".copal" / "config.json"
+    if parent_config.exists() and not worktree_config.exists():
+        shutil.copy2(parent_config, worktree_config)
+    (worktree_root / SHARED_ROOT_FILE).unlink(missing_ok=True)
+
+    (worktree_root / SNAPSHOT_MANIFEST).write_text(json.dumps(snapshot.to_dict(), indent=2))
+    return snapshot
+
+
+def load_snapshot(worktree_root: Path) -> Snapshot | None:
+    """The snapshot manifest of ``worktree_root``, if it was created with one."""
+    worktree_root = Path(worktree_root)
+    try:
+        payload = json.loads((worktree_root / SNAPSHOT_MANIFEST).read_text())
+    except (OSError, ValueError):
+        return None
+    return Snapshot.from_dict(worktree_root, payload) if isinstance(payload, dict) else None
+
+
+@dataclass
+class MemoryConflict:
+    """A memory both the project and the task changed; ``None`` means deleted."""
+
+    memory_id: str
+    parent: Memory | None
+    task: Memory | None
+
+
+@dataclass
+class RelationshipConflict:
+    """A relationship both sides changed, or a task one whose ends the project lost.
+
+    ``None`` means deleted.
+    """
+
+    relationship_id: str
+    parent: Relationship | None
+    task: Relationship | None
+
+
+@dataclass
+class SnapshotDelta:
+    """What merging a worktree's overlay into the project would change."""
+
+    upserts: list[Memory] = field(default_factory=list)
+    deletions: list[str] = field(default_factory=list)
+    relationships: list[Relationship] = field(default_factory=list)
+    relationship_deletions: list[str] = field(default_factory=list)
+    conflicts: list[MemoryConflict] = field(default_factory=list)
+    relationship_conflicts: list[RelationshipConflict] = field(default_factory=list)
+
+    @property
+    def changes(self) -> int:
+        return (
+            len(self.upserts)
+            + len(self.deletions)
+            + len(self.relationships)
+            + len(self.relationship_deletions)
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.changes or self.conflicts or self.relationship_conflicts)
+
+
+def _state(memory: Memory) -> bytes:
+    payload = memory.to_dict()
+    for key in _ACCESS_FIELDS:
+        payload.pop(key)
+    return codec.dumpb(payload)
+
+
+def _edge_state(relationship: Relationship | None) -> bytes | None:
+    return codec.dumpb(relationship.to_dict()) if relationship is not None else None
+
+
+def _open_snapshot_store(snapshot: Snapshot, database: Path) -> Any:
+    # Read-only use: no access bookkeeping, no vector index.
+    config = {**snapshot.config, "database": str(database), "track_access": False, "vector": {"enabled": False}}
+    return create_store(snapshot.worktree, config)
+
+
+def _scopes(database: Path) -> set[str]:
+    # Both SQLite-backed schemas keep a scope column on ``memories``.
+    conn = sqlite3.connect(f"{database.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        return {row[0] for row in conn.execute("SELECT DISTINCT scope FROM memories")}
+    finally:
+        conn.close()
+
+
+def _memories(store: Any, scopes: Iterable[str]) -> dict[str, Memory]:
+    # Per scope: the graph store reads ``scope=None`` as the active scope.
+    return {memory.id: memory for scope in sorted(scopes) for memory in store.iter_memories(scope=scope)}
+
+
+def _relationships(store: Any, memories: Iterable[Memory]) -> dict[str, Relationship]:
+    found: dict[str, Relationship] = {}
+    for memory in memories:
+        for relationship in store.list_relationships(memory.id, scope=memory.scope, direction="out"):
+            found[relationship.id] = relationship
+    return found
+
+
+def diff_snapshot(snapshot: Snapshot) -> SnapshotDelta:
+    """Three-way comparison of the snapshot base, the task's overlay and the project."""
+    overlay_db = resolve_database_path(snapshot.worktree, snapshot.config)
+    scopes = (
+        _scopes(snapshot.base_path)
+        | _scopes(overlay_db)
+        | _scopes(resolve_database_path(snapshot.parent, snapshot.config))
+    )
+    base_store = _open_snapshot_store(snapshot, snapshot.base_path)
+    task_store = _open_snapshot_store(snapshot, overlay_db)
+    parent_store = open_store(snapshot.parent)
+    try:
+        base_memories = _memories(base_store, scopes)
+        base = {memory_id: _state(memory) for memory_id, memory in base_memories.items()}
+        task = _memories(task_store, scopes)
+        parent = _memories(parent_store, scopes)
+
+        delta = SnapshotDelta()
+        for memory_id, memory in task.items():
+            state = _state(memory)
+            if base.get(memory_id) == state:
+                continue
+            current = parent.get(memory_id)
+            current_state = _state(current) if current is not None else None
+            if current_state == state:
+                continue
+            if current_state != base.get(memory_id):
+                delta.conflicts.append(MemoryConflict(memory_id, current, memory))
+            else:
+                delta.upserts.append(memory)
+        for memory_id in base.keys() - task.keys():
+            current = parent.get(memory_id)
+            if current is None:
+                continue
+            if _state(current) != base[memory_id]:
+                delta.conflicts.append(MemoryConflict(memory_id, current, None))
+            else:
+                delta.deletions.append(memory_id)
+
+        # Relationships, three-way like the memories.
+        kept = (parent.keys() | {memory.id for memory in delta.upserts}) - set(delta.deletions)
+        base_edges = _relationships(base_store, base_memories.values())
+        task_edges = _relationships(task_store, task.values())
+        changed = [
+            rel_id
+            for rel_id in base_edges.keys() | task_edges.keys()
+            if _edge_state(base_edges.get(rel_id)) != _edge_state(task_edges.get(rel_id))
+        ]
+        sources = {
+            edge.source_id
+            for rel_id in changed
+            for edge in (base_edges.get(rel_id), task_edges.get(rel_id))
+            if edge is not None and edge.source_id in parent
+        }
+        parent_edges = _relationships(parent_store, [parent[memory_id] for memory_id in sources])
+        for rel_id in sorted(changed):
+            original, ours = base_edges.get(rel_id), task_edges.get(rel_id)
+            if ours is None and not (original.source_id in task and original.target_id in task):
+                continue  # Went with a deleted memory, which is merged on its own.
+            theirs = parent_edges.get(rel_id)
+            if _edge_state(theirs) == _edge_state(ours):
+                continue
+            if _edge_state(theirs) != _edge_state(original):
+                delta.relationship_conflicts.append(RelationshipConflict(rel_id, theirs, ours))
+            elif ours is None:
+                delta.relationship_deletions.append(rel_id)
+            elif ours.source_id in kept and ours.target_id in kept:
+                delta.relationships.append(ours)
+            else:
+                delta.relationship_conflicts.append(RelationshipConflict(rel_id, theirs, ours))
+        return delta
+    finally:
+        parent_store.close()
+        task_store.close()
+        base_store.close()
+
+
+def merge_snapshot(snapshot: Snapshot, delta: SnapshotDelta, *, prefer_task: bool = False) -> int:
+    """Apply ``delta`` to the project store in one transaction; returns the number of memories changed.
+
+    Conflicts keep the project's version unless ``prefer_task`` is set; a
+    task relationship whose ends the project does not have is never written.
+    """
+    upserts = list(delta.upserts)
+    deletions = list(delta.deletions)
+    relationships = list(delta.relationships)
+    removed = list(delta.relationship_deletions)
+    candidates: list[Relationship] = []
+    if prefer_task:
+        for conflict in delta.conflicts:
+            if conflict.task is not None:
+                upserts.append(conflict.task)
+            else:
+                deletions.append(conflict.memory_id)
+        for edge_conflict in delta.relationship_conflicts:
+            if edge_conflict.task is not None:
+                candidates.append(edge_conflict.task)
+            else:
+                removed.append(edge_conflict.relationship_id)
+    store = open_store(snapshot.parent)
+    try:
+        if candidates:
+            ends = {memory_id for rel in candidates for memory_id in (rel.source_id, rel.target_id)}
+            present = {memory.id for memory in store.get_many(ends)} | {memory.id for memory in upserts}
+            present -= set(deletions)
+            relationships += [rel for rel in candidates if {rel.source_id, rel.target_id} <= present]
+        if not (upserts or deletions or relationships or removed):
+            return 0
+        # Changed relationships are replaced: the old row goes first.
+        deleted = store.apply_changes(
+            upserts,
+            relationships,
+            deletions=deletions,
+            relationship_deletions=[*removed, *(rel.id for rel in relationships)],
+        )
+    finally:
+        store.close()
+    return len(upserts) + deleted
@@ -1,18 +1,140 @@
 from __future__ import annotations
 
 import contextlib
-import json
+import re
 import sqlite3
+from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Any, Iterable, Sequence
+from typing import Any, Iterable, Iterator, Sequence
 
-from .models import Memory, MemoryType, Relationship, EdgeType, _serialize_datetime, _deserialize_datetime, _now
+from . import codec
+from .branches import (
+    AUTO_BRANCH_DESCRIPTION,
+    BRANCH_ACTIVE,
+    BRANCH_MERGED,
+    Branch,
+    BranchExistsError,
+    UnknownBranchError,
+    branch_scope,
+    branch_task,
+    select_promoted,
+)
+from .config import (
+    DEFAULT_ACCESS_FLUSH_THRESHOLD,
+    check_database_schema,
+    indexed_metadata_keys,
+    is_access_tracking_enabled,
+)
+from .dedupe import dedupe_policy, remap_relationships, resolve_duplicates
+from .migrations import _has_json1, migrate
+from .query import (
+    DEFAULT_PATH_DEPTH,
+    MAX_CHAIN_LENGTH,
+    any_term_query,
+    bm25_rank,
+    check_direction,
+    metadata_filters,
+    metadata_matches,
+    normalise_edge_types,
+)
+from .ranking import DEFAULT_TOP_K, RelevanceScorer
+from .models import Memory, MemoryType, Relationship, EdgeType, _serialize_datetime, _deserialize_datetime, _now, _utc
 from .store_interface import IMemoryStore
 from .scope import ScopeManager
 
+# Connection tuning defaults; override via the ``sqlite`` key of the memory config.
+DEFAULT_SQLITE_TUNING: dict[str, int] = {
+    "cache_size_kib": 8192,
+    "mmap_size": 64 * 1024 * 1024,
+    "busy_timeout_ms": 5000,
+}
+
+# Metadata values are flattened into a single FTS column so `search` sees them too.
+_FTS_METADATA_SQL = "(SELECT group_concat(value, ' ') FROM json_each(COALESCE({row}.metadata, '{{}}')))"
+_FTS_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Stay well below SQLite's bound-parameter limit in IN (...) lookups.
+_MAX_BATCH_PARAMS = 500
+
+# Text value of one metadata key; shared by `where` filters and generated columns.
+_METADATA_VALUE_SQL = "CAST(json_extract(metadata, '$.{key}') AS TEXT)"
+
+# BM25 with the id column ignored and metadata hits weighted below content hits.
+_BM25_SQL = "bm25(memories_fts, 0.0, 1.0, 0.5)"
+
+# The content hash is only kept for the first live copy of each (scope, type,
+# content); later copies get NULL and so stay out of the unique index.
+_CONTENT_HASH_SQL = """CASE WHEN ?{until} IS NULL AND NOT EXISTS (
+        SELECT 1 FROM memories d
+        WHERE d.scope = ?{scope} AND d.type = ?{type} AND d.content_hash = ?{hash}
+          AND d.valid_until IS NULL AND d.id <> ?{id}
+    ) THEN ?{hash} END"""
+
+_UPSERT_MEMORY_SQL = f"""
+INSERT INTO memories
+(id, type, content, scope, metadata, created_at, updated_at,
+ valid_from, valid_until, importance, access_count, last_accessed,
+ session_summary, content_hash, task_id)
+VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, ?12, ?13,
+    {_CONTENT_HASH_SQL.format(id=1, type=2, scope=4, until=9, hash=14)}, ?15)
+ON CONFLICT(id) DO UPDATE SET
+    type = excluded.type,
+    content = excluded.content,
+    scope = excluded.scope,
+    metadata = excluded.metadata,
+    created_at = excluded.created_at,
+    updated_at = excluded.updated_at,
+    valid_from = excluded.valid_from,
+    valid_until = excluded.valid_until,
+    importance = excluded.importance,
+    access_count = excluded.access_count,
+    last_accessed = excluded.last_accessed,
+    session_summary = excluded.session_summary,
+    content_hash = excluded.content_hash,
+    task_id = excluded.task_id
+"""
+
+_UPDATE_MEMORY_SQL = f"""
+UPDATE memories SET
+    type = ?1,
+    content = ?2,
+    scope = ?3,
+    metadata = ?4,
+    updated_at = ?5,
+    valid_from = ?6,
+    valid_until = ?7,
+    importance = ?8,
+    access_count = ?9,
+    last_accessed = ?10,
+    session_summary = ?11,
+    content_hash = {_CONTENT_HASH_SQL.format(id=12, type=1, scope=3, until=7, hash=13)},
+    task_id = ?14
+WHERE id = ?12
+"""
+
+# Writing into a merged branch reopens it.
+_REGISTER_BRANCH_SQL = f"""
+INSERT INTO branches (task_id, description, status, created_at) VALUES (?, ?, ?, ?)
+ON CONFLICT(task_id) DO UPDATE SET status = '{BRANCH_ACTIVE}', merged_at = NULL
+WHERE branches.status <> '{BRANCH_ACTIVE}'
+"""
+
+_INSERT_RELATIONSHIP_SQL = """
+INSERT OR IGNORE INTO relationships
+(id, source_id, target_id, type, scope, weight, confidence, metadata, created_at, created_by)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 class SQLiteMemoryStore(IMemoryStore):
-    """SQLite-backed memory store with basic conflict-safe writes."""
+    """SQLite-backed memory store with basic conflict-safe writes.
+
+    The store owns a single long-lived connection opened in WAL mode, so
+    repeated operations avoid per-call connect/fsync overhead and concurrent
+    writers from other worktrees wait on the busy timeout instead of failing.
+    Call :meth:`close` to release it.
+    """
 
     def __init__(
         self,
@@ -26,59 +148,215 @@ class SQLiteMemoryStore(IMemoryStore):
         self.db_path = db_path
         self.config = config
         self.scope_manager = scope_manager
+        self._conn: sqlite3.Connection | None = None
+        self._fts_enabled = False
+        self._json1 = False
+        self._metadata_columns: dict[str, str] = {}
+        self._scorer = RelevanceScorer.from_config(config)
+        self._track_access = is_access_tracking_enabled(config)
+        self._access_flush_threshold = max(
+            1, int(config.get("access_flush_threshold", DEFAULT_ACCESS_FLUSH_THRESHOLD))
+        )
+        self._pending_access: dict[str, tuple[int, datetime]] = {}
+        self._pending_total = 0
         self._ensure_db()
 
     # --- setup -----------------------------------------------------------------
-    @contextlib.contextmanager
-    def _get_connection(self) -> Iterable[sqlite3.Connection]:
-        conn = sqlite3.connect(self.db_path)
+    def _tuning(self) -> dict[str, int]:
+        tuning = DEFAULT_SQLITE_TUNING.copy()
+        overrides = self.config.get("sqlite") if isinstance(self.config, dict) else None
+        if isinstance(overrides, dict):
+            for key, value in overrides.items():
+                if key in tuning:
+                    tuning[key] = int(value)
+        return tuning
+
+    def _connect(self) -> sqlite3.Connection:
+        tuning = self._tuning()
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=tuning["busy_timeout_ms"] / 1000,
+        )
         conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+        # Only takes effect on a new database (or at the next VACUUM); must
+        # precede the journal mode switch, which writes the header.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{tuning['cache_size_kib']}")
+        conn.execute(f"PRAGMA mmap_size={tuning['mmap_size']}")
+        conn.execute(f"PRAGMA busy_timeout={tuning['busy_timeout_ms']}")
+        conn.create_function("copal_score", 4, self._scorer.combine, deterministic=True)
+        return conn
+
+    @contextlib.contextmanager
+    def _get_connection(self) -> Iterator[sqlite3.Connection]:
+        if self._conn is None:
+            self._conn = self._connect()
+        yield self._conn
+
+    def vacuum(self) -> int:
+        """Drop dangling relationships, optimise the FTS index and shrink the file.
+
+        Databases created with incremental auto-vacuum only release their free
+        pages; older ones get a full VACUUM, which also converts them.
+        """
+        self.flush_access_stats()
+        with self._get_connection() as conn:
+            with conn:
+                conn.execute(
+                    "DELETE FROM relationships WHERE source_id NOT IN (SELECT id FROM memories) "
+                    "OR target_id NOT IN (SELECT id FROM memories)"
+                )
+                if self._fts_enabled:
+                    conn.execute("INSERT INTO memories_fts(memories_fts) VALUES ('optimize')")
+            before = self._file_size(conn)
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                # execute() steps the pragma once, freeing a single page;
+                # executescript() runs it until the freelist is empty.
+                conn.executescript("PRAGMA incremental_vacuum;")
+            else:
+                conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return max(before - self._file_size(conn), 0)
+
+    @staticmethod
+    def _file_size(conn: sqlite3.Connection) -> int:
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        return page_count * conn.execute("PRAGMA page_size").fetchone()[0]
+
+    def fingerprint(self) -> str:
+        # Access statistics never touch updated_at, so reads leave this alone.
+        with self._get_connection() as conn:
+            memories = conn.execute("SELECT count(*), max(rowid), max(updated_at) FROM memories").fetchone()
+            relationships = conn.execute("SELECT count(*), max(rowid) FROM relationships").fetchone()
+        return ":".join(str(value) for value in (*memories, *relationships))
+
+    def close(self) -> None:
+        """Flush buffered access stats and release the connection.
+
+        The connection is reopened transparently on next use.
+        """
+        self.flush_access_stats()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
 
     def _ensure_db(self) -> None:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        check_database_schema(self.db_path, "sqlite")
         with self._get_connection() as conn:
+            migrate(conn)
+            # FTS depends on the SQLite build rather than the schema version,
+            # so it is (re)checked on every open instead of being a migration.
+            self._fts_enabled = self._ensure_fts(conn)
+            self._json1 = _has_json1(conn)
+            if self._json1:
+                self._metadata_columns = self._ensure_metadata_columns(conn)
+            conn.commit()
+
+    def _ensure_metadata_columns(self, conn: sqlite3.Connection) -> dict[str, str]:
+        """Add an indexed generated column per ``indexed_metadata`` key; returns key -> column.
+
+        Like FTS this follows the config rather than the schema version. The
+        columns are VIRTUAL, so adding one does not rewrite the table.
+        """
+        existing = {row[1] for row in conn.execute("PRAGMA table_xinfo(memories)")}
+        for key in indexed_metadata_keys(self.config):
+            column = f"meta_{key}"
+            if column not in existing:
+                try:
+                    conn.execute(
+                        f"ALTER TABLE memories ADD COLUMN {column} "
+                        f"GENERATED ALWAYS AS ({_METADATA_VALUE_SQL.format(key=key)}) VIRTUAL"
+                    )
+                except sqlite3.OperationalError:
+                    # Generated columns need SQLite 3.31+, or another process won the race.
+                    continue
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_memories_{column} ON memories(scope, {column})")
+        columns = [row[1] for row in conn.execute("PRAGMA table_xinfo(memories)")]
+        return {column[len("meta_"):]: column for column in columns if column.startswith("meta_")}
+
+    @staticmethod
+    def _ensure_fts(conn: sqlite3.Connection) -> bool:
+        """Create the FTS5 index and its sync triggers; False if FTS5/JSON1 are missing."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memories_fts'"
+        ).fetchone()
+        try:
+            conn.execute("SELECT count(*) FROM json_each('{}')")
             conn.execute(
                 """
-                CREATE TABLE IF NOT EXISTS memories (
-                    id TEXT PRIMARY KEY,
-                    type TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    scope TEXT NOT NULL,
-                    metadata TEXT,
-                    created_at TEXT,
-                    updated_at TEXT,
-                    valid_from TEXT,
-                    valid_until TEXT,
-                    importance REAL,
-                    access_count INTEGER,
-                    last_accessed TEXT
-                )
-                """
-            )
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS relationships (
-                    id TEXT PRIMARY KEY,
-                    source_id TEXT NOT NULL,
-                    target_id TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    scope TEXT NOT NULL,
-                    weight REAL,
-                    confidence REAL,
-                    metadata TEXT,
-                    created_at TEXT,
-                    created_by TEXT,
-                    UNIQUE(source_id, target_id, type, scope)
-                )
+                CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts
+                USING fts5(id UNINDEXED, content, metadata, tokenize = 'unicode61')
                 """
             )
-            conn.commit()
+        except sqlite3.OperationalError:
+            return False
+
+        new_meta = _FTS_METADATA_SQL.format(row="new")
+        conn.executescript(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS memories_fts_ai AFTER INSERT ON memories BEGIN
+                INSERT INTO memories_fts (rowid, id, content, metadata)
+                VALUES (new.rowid, new.id, new.content, {new_meta});
+            END;
+            CREATE TRIGGER IF NOT EXISTS memories_fts_ad AFTER DELETE ON memories BEGIN
+                DELETE FROM memories_fts WHERE rowid = old.rowid;
+            END;
+            CREATE TRIGGER IF NOT EXISTS memories_fts_au AFTER UPDATE OF content, metadata ON memories BEGIN
+                DELETE FROM memories_fts WHERE rowid = old.rowid;
+                INSERT INTO memories_fts (rowid, id, content, metadata)
+                VALUES (new.rowid, new.id, new.content, {new_meta});
+            END;
+            """
+        )
+        if not exists:
+            # Existing databases get their index built on first open.
+            SQLiteMemoryStore._rebuild_fts(conn)
+        return True
+
+    @staticmethod
+    def _rebuild_fts(conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM memories_fts")
+        conn.execute(
+            f"""
+            INSERT INTO memories_fts (rowid, id, content, metadata)
+            SELECT rowid, id, content, {_FTS_METADATA_SQL.format(row="memories")} FROM memories
+            """
+        )
+
+    @staticmethod
+    def _fts_query(query: str) -> str | None:
+        """Translate free text into an FTS5 prefix query; None if it has no terms.
+
+        Terms are AND-ed; a bare ``OR`` between terms separates alternatives.
+        """
+        parts: list[str] = []
+        for word in query.split():
+            if word in ("OR", "AND"):
+                if word == "OR" and parts and parts[-1] != "OR":
+                    parts.append("OR")
+                continue
+            parts.extend(f'"{token}"*' for token in _FTS_TOKEN_RE.findall(word))
+        while parts and parts[-1] == "OR":
+            parts.pop()
+        return " ".join(parts) or None
 
     # --- helpers --------------------------------------------------------------
+    @staticmethod
+    def _session_flag(memory: Memory) -> int:
+        """Value for the indexed ``session_summary`` column."""
+        return int(memory.metadata.get("type") == "session_summary")
+
+    @staticmethod
+    def _session_task(memory: Memory) -> str | None:
+        """Value for the indexed ``task_id`` column (session summaries only)."""
+        task_id = memory.metadata.get("task_id")
+        if task_id is None or not SQLiteMemoryStore._session_flag(memory):
+            return None
+        return str(task_id)
+
     @staticmethod
     def _row_to_memory(row: sqlite3.Row) -> Memory:
         return Memory(
@@ -86,7 +364,7 @@ class SQLiteMemoryStore(IMemoryStore):
             type=MemoryType(row["type"]),
             content=row["content"],
             scope=row["scope"],
-            metadata=json.loads(row["metadata"] or "{}"),
+            metadata=codec.loads(row["metadata"] or "{}"),
             created_at=_deserialize_datetime(row["created_at"]),
             updated_at=_deserialize_datetime(row["updated_at"]),
             valid_from=_deserialize_datetime(row["valid_from"]),
@@ -106,87 +384,224 @@ class SQLiteMemoryStore(IMemoryStore):
             scope=row["scope"],
             weight=float(row["weight"] or 1.0),
             confidence=float(row["confidence"] or 1.0),
-            metadata=json.loads(row["metadata"] or "{}"),
+            metadata=codec.loads(row["metadata"] or "{}"),
             created_at=_deserialize_datetime(row["created_at"]),
             created_by=row["created_by"],
         )
 
+    def _memory_params(self, memory: Memory) -> tuple[Any, ...]:
+        payload = memory.to_dict()
+        return (
+            payload["id"],
+            payload["type"],
+            payload["content"],
+            payload["scope"],
+            codec.dumps(payload.get("metadata") or {}),
+            payload["created_at"],
+            payload["updated_at"],
+            payload["valid_from"],
+            payload["valid_until"],
+            payload["importance"],
+            payload["access_count"],
+            payload["last_accessed"],
+            self._session_flag(memory),
+            memory.content_hash,
+            self._session_task(memory),
+        )
+
+    @staticmethod
+    def _branch_params(memories: Iterable[Memory]) -> list[tuple[Any, ...]]:
+        """Registry rows for the branches task-scoped ``memories`` write into."""
+        now = _serialize_datetime(_now())
+        tasks = {task for task in (branch_task(memory.scope) for memory in memories) if task is not None}
+        return [(task, AUTO_BRANCH_DESCRIPTION, BRANCH_ACTIVE, now) for task in sorted(tasks)]
+
+    @staticmethod
+    def _relationship_params(relationship: Relationship) -> tuple[Any, ...]:
+        rel_dict = relationship.to_dict()
+        return (
+            rel_dict["id"],
+            rel_dict["source_id"],
+            rel_dict["target_id"],
+            rel_dict["type"],
+            rel_dict["scope"],
+            rel_dict["weight"],
+            rel_dict["confidence"],
+            codec.dumps(rel_dict.get("metadata") or {}),
+            rel_dict["created_at"],
+            rel_dict["created_by"],
+        )
+
+    def _write_batch(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] | None,
+    ) -> None:
+        """Upsert memories and insert relationships in a single transaction."""
+        memories = list(memories)
+        with self._get_connection() as conn:
+            with conn:
+                self._write_rows(conn, memories, relationships)
+
+    def _write_rows(
+        self,
+        conn: sqlite3.Connection,
+        memories: list[Memory],
+        relationships: Iterable[Relationship] | None,
+    ) -> None:
+        conn.executemany(_UPSERT_MEMORY_SQL, (self._memory_params(m) for m in memories))
+        conn.executemany(_REGISTER_BRANCH_SQL, self._branch_params(memories))
+        if relationships:
+            conn.executemany(
+                _INSERT_RELATIONSHIP_SQL,
+                (self._relationship_params(r) for r in relationships),
+            )
+
     # --- core API -------------------------------------------------------------
     def add_memory(
         self,
         memory: Memory,
         relationships: Sequence[Relationship] | None = None,
+        *,
+        dedupe: str | None = None,
     ) -> Memory:
+        return self.add_memories([memory], relationships, dedupe=dedupe)[0]
+
+    def add_memories(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] | None = None,
+        *,
+        dedupe: str | None = None,
+    ) -> list[Memory]:
+        outcome = resolve_duplicates(memories, dedupe_policy(self.config, dedupe), self.find_duplicate)
         # touch timestamps
-        memory.touch()
-        payload = memory.to_dict()
+        for memory in outcome.fresh:
+            memory.touch()
+        for memory in outcome.merged:
+            # The merged row already includes any buffered accesses.
+            self._discard_pending(memory.id)
+        self._write_batch(
+            [*outcome.fresh, *outcome.merged],
+            remap_relationships(relationships or (), outcome.remap),
+        )
+        return outcome.results
+
+    def find_duplicate(self, memory: Memory) -> Memory | None:
+        """The live memory with the same scope, type and content, if any."""
+        if memory.valid_until is not None:
+            return None
         with self._get_connection() as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO memories
-                (id, type, content, scope, metadata, created_at, updated_at,
-                 valid_from, valid_until, importance, access_count, last_accessed)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    payload["id"],
-                    payload["type"],
-                    payload["content"],
-                    payload["scope"],
-                    json.dumps(payload.get("metadata") or {}),
-                    payload["created_at"],
-                    payload["updated_at"],
-                    payload["valid_from"],
-                    payload["valid_until"],
-                    payload["importance"],
-                    payload["access_count"],
-                    payload["last_accessed"],
-                ),
-            )
-            if relationships:
-                for rel in relationships:
-                    rel_dict = rel.to_dict()
-                    conn.execute(
-                        """
-                        INSERT OR IGNORE INTO relationships
-                        (id, source_id, target_id, type, scope, weight, confidence, metadata, created_at, created_by)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            rel_dict["id"],
-                            rel_dict["source_id"],
-                            rel_dict["target_id"],
-                            rel_dict["type"],
-                            rel_dict["scope"],
-                            rel_dict["weight"],
-                            rel_dict["confidence"],
-                            json.dumps(rel_dict.get("metadata") or {}),
-                            rel_dict["created_at"],
-                            rel_dict["created_by"],
-                        ),
-                    )
-            conn.commit()
-        return memory
+            row = conn.execute(
+                "SELECT id FROM memories WHERE scope = ? AND type = ? AND content_hash = ? "
+                "AND valid_until IS NULL",
+                (memory.scope, memory.type.value, memory.content_hash),
+            ).fetchone()
+        return self._fetch_memory(row["id"]) if row else None
 
-    def get_memory(self, memory_id: str, scope: str | None = None) -> Memory | None:
-        query = "SELECT * FROM memories WHERE id = ?"
-        params: list[Any] = [memory_id]
+    def upsert_many(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] | None = None,
+    ) -> int:
+        batch = list(memories)
+        self.apply_changes(batch, relationships)
+        return len(batch)
+
+    def delete_many(self, memory_ids: Iterable[str], scope: str | None = None) -> int:
+        return self.apply_changes(deletions=memory_ids, scope=scope)
+
+    def apply_changes(
+        self,
+        memories: Iterable[Memory] = (),
+        relationships: Iterable[Relationship] | None = None,
+        *,
+        deletions: Iterable[str] = (),
+        relationship_deletions: Iterable[str] = (),
+        scope: str | None = None,
+    ) -> int:
+        batch = list(memories)
+        ids = list(dict.fromkeys(deletions))
+        for memory_id in [*ids, *(memory.id for memory in batch)]:
+            # The caller's copy is the row's new state, buffered accesses included.
+            self._discard_pending(memory_id)
         if scope:
-            query += " AND scope = ?"
-            params.append(scope)
+            query = "DELETE FROM memories WHERE id = ? AND scope = ?"
+            params: list[tuple[Any, ...]] = [(memory_id, scope) for memory_id in ids]
+        else:
+            query = "DELETE FROM memories WHERE id = ?"
+            params = [(memory_id,) for memory_id in ids]
         with self._get_connection() as conn:
-            row = conn.execute(query, params).fetchone()
-            if not row:
-                return None
-            mem = self._row_to_memory(row)
-            # Update access stats
-            mem.touch()
-            conn.execute(
-                "UPDATE memories SET access_count = ?, last_accessed = ?, updated_at = ? WHERE id = ?",
-                (mem.access_count, _serialize_datetime(mem.last_accessed), _serialize_datetime(mem.updated_at), mem.id),
-            )
-            conn.commit()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = conn.executemany(query, params).rowcount if params else 0
+                conn.executemany(
+                    "DELETE FROM relationships WHERE id = ?",
+                    ((rel_id,) for rel_id in relationship_deletions),
+                )
+                self._write_rows(conn, batch, relationships)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return deleted
+
+    def _fetch_memory(self, memory_id: str, scope: str | None = None) -> Memory | None:
+        """Read a memory without recording an access; pending stats are overlaid."""
+        found = self.get_many([memory_id], scope=scope)
+        return found[0] if found else None
+
+    def get_many(self, memory_ids: Iterable[str], scope: str | None = None) -> list[Memory]:
+        """Fetch memories by id in the given order, without recording an access."""
+        ids = list(dict.fromkeys(memory_ids))
+        found: dict[str, Memory] = {}
+        with self._get_connection() as conn:
+            for start in range(0, len(ids), _MAX_BATCH_PARAMS):
+                chunk = ids[start : start + _MAX_BATCH_PARAMS]
+                query = f"SELECT * FROM memories WHERE id IN ({','.join('?' for _ in chunk)})"
+                params: list[Any] = list(chunk)
+                if scope:
+                    query += " AND scope = ?"
+                    params.append(scope)
+                for row in conn.execute(query, params):
+                    mem = self._row_to_memory(row)
+                    pending = self._pending_access.get(mem.id)
+                    if pending:
+                        mem.access_count += pending[0]
+                        mem.last_accessed = pending[1]
+                    found[mem.id] = mem
+        return [found[memory_id] for memory_id in ids if memory_id in found]
+
+    def get_memory(self, memory_id: str, scope: str | None = None) -> Memory | None:
+        mem = self._fetch_memory(memory_id, scope=scope)
+        if mem is None or not self._track_access:
             return mem
+        # Reads only buffer their access stats; see flush_access_stats().
+        mem.access_count += 1
+        mem.last_accessed = _now()
+        count, _ = self._pending_access.get(mem.id, (0, None))
+        self._pending_access[mem.id] = (count + 1, mem.last_accessed)
+        self._pending_total += 1
+        if self._pending_total >= self._access_flush_threshold:
+            self.flush_access_stats()
+        return mem
+
+    def flush_access_stats(self) -> None:
+        """Write buffered access counts in one batched UPDATE."""
+        if not self._pending_access:
+            return
+        pending, self._pending_access = self._pending_access, {}
+        self._pending_total = 0
+        with self._get_connection() as conn:
+            with conn:
+                conn.executemany(
+                    "UPDATE memories SET access_count = COALESCE(access_count, 0) + ?, "
+                    "last_accessed = ? WHERE id = ?",
+                    (
+                        (count, _serialize_datetime(last), memory_id)
+                        for memory_id, (count, last) in pending.items()
+                    ),
+                )
 
     def update_memory(
         self,
@@ -195,9 +610,11 @@ class SQLiteMemoryStore(IMemoryStore):
         scope: str | None = None,
         **updates: Any,
     ) -> Memory | None:
-        existing = self.get_memory(memory_id, scope=scope)
+        existing = self._fetch_memory(memory_id, scope=scope)
         if not existing:
             return None
+        # The row written below already includes any buffered accesses.
+        self._discard_pending(memory_id)
 
         # Apply updates in-memory
         for key, value in updates.items():
@@ -208,38 +625,33 @@ class SQLiteMemoryStore(IMemoryStore):
         payload = existing.to_dict()
         with self._get_connection() as conn:
             conn.execute(
-                """
-                UPDATE memories SET
-                    type = ?,
-                    content = ?,
-                    scope = ?,
-                    metadata = ?,
-                    updated_at = ?,
-                    valid_from = ?,
-                    valid_until = ?,
-                    importance = ?,
-                    access_count = ?,
-                    last_accessed = ?
-                WHERE id = ?
-                """,
+                _UPDATE_MEMORY_SQL,
                 (
                     payload["type"],
                     payload["content"],
                     payload["scope"],
-                    json.dumps(payload.get("metadata") or {}),
+                    codec.dumps(payload.get("metadata") or {}),
                     payload["updated_at"],
                     payload["valid_from"],
                     payload["valid_until"],
                     payload["importance"],
                     payload["access_count"],
                     payload["last_accessed"],
+                    self._session_flag(existing),
                     payload["id"],
+                    existing.content_hash,
+                    self._session_task(existing),
                 ),
             )
             conn.commit()
         return existing
 
+    def _discard_pending(self, memory_id: str) -> None:
+        count, _ = self._pending_access.pop(memory_id, (0, None))
+        self._pending_total -= count
+
     def delete_memory(self, memory_id: str, scope: str | None = None) -> bool:
+        self._discard_pending(memory_id)
         query = "DELETE FROM memories WHERE id = ?"
         params: list[Any] = [memory_id]
         if scope:
@@ -250,15 +662,159 @@ class SQLiteMemoryStore(IMemoryStore):
             conn.commit()
             return cur.rowcount > 0
 
+    def _match_sql(
+        self,
+        query: str,
+        scope: str | None,
+        types: Iterable[MemoryType] | None,
+    ) -> tuple[str, list[Any], bool]:
+        """FROM/WHERE clause for ``query``; the flag says whether it is an FTS match."""
+        match = self._fts_query(query) if self._fts_enabled else None
+        if match is not None:
+            q = (
+                "FROM memories_fts f JOIN memories m ON m.rowid = f.rowid "
+                "WHERE memories_fts MATCH ?"
+            )
+            params: list[Any] = [match]
+        elif query:
+            like = f"%{query.lower()}%"
+            q = "FROM memories m WHERE (lower(m.content) LIKE ? OR lower(m.metadata) LIKE ?)"
+            params = [like, like]
+        else:
+            q = "FROM memories m WHERE 1=1"
+            params = []
+        if scope:
+            q += " AND m.scope = ?"
+            params.append(scope)
+        if types:
+            placeholders = ",".join("?" for _ in types)
+            q += f" AND m.type IN ({placeholders})"
+            params.extend([t.value for t in types])
+        return q, params, match is not None
+
+    def _search_cursor(
+        self,
+        conn: sqlite3.Connection,
+        query: str,
+        scope: str | None,
+        types: Iterable[MemoryType] | None,
+        after: str | None,
+        limit: int | None,
+    ) -> Iterable[sqlite3.Row]:
+        """Keyset-paginated search: ordered by (bm25, rowid) for FTS, else rowid."""
+        clause, params, fts = self._match_sql(query, scope, types)
+        order = f"{_BM25_SQL}, m.rowid" if fts else "m.rowid"
+        if after is not None:
+            if fts:
+                cursor = conn.execute(
+                    f"SELECT {_BM25_SQL} AS rank, m.rowid AS rid {clause} AND m.id = ?",
+                    [*params, after],
+                ).fetchone()
+                if cursor is None:
+                    return []
+                clause += f" AND ({_BM25_SQL} > ? OR ({_BM25_SQL} = ? AND m.rowid > ?))"
+                params.extend([cursor["rank"], cursor["rank"], cursor["rid"]])
+            else:
+                clause += " AND m.rowid > (SELECT rowid FROM memories WHERE id = ?)"
+                params.append(after)
+        q = f"SELECT m.* {clause} ORDER BY {order}"
+        if limit is not None:
+            q += " LIMIT ?"
+            params.append(limit)
+        return conn.execute(q, params)
+
     def search_memories(
         self,
         query: str,
         *,
         scope: str | None = None,
         types: Iterable[MemoryType] | None = None,
+        limit: int | None = None,
+        after: str | None = None,
     ) -> list[Memory]:
-        q = "SELECT * FROM memories WHERE lower(content) LIKE ?"
-        params: list[Any] = [f"%{query.lower()}%"]
+        """Full-text search ranked by BM25, falling back to LIKE without FTS5.
+
+        Content hits outrank metadata-only hits. ``after`` continues from the
+        result with that id.
+        """
+        with self._get_connection() as conn:
+            rows = self._search_cursor(conn, query, scope, types, after, limit)
+            return [self._row_to_memory(row) for row in rows]
+
+    def iter_search(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        after: str | None = None,
+    ) -> Iterator[Memory]:
+        with self._get_connection() as conn:
+            for row in self._search_cursor(conn, query, scope, types, after, None):
+                yield self._row_to_memory(row)
+
+    def rank_memories(
+        self,
+        query: str = "",
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        limit: int = DEFAULT_TOP_K,
+    ) -> list[Memory]:
+        """Top ``limit`` unexpired matches by relevance score.
+
+        Scoring runs inside SQLite (``copal_score``) and ``ORDER BY ... LIMIT``
+        keeps only the best rows, so the full match set never reaches Python.
+        """
+        self.flush_access_stats()
+        clause, params, fts = self._match_sql(query, scope, types)
+        # bm25() is negative, better matches more so; saturate it into [0, 1).
+        match = f"(-{_BM25_SQL}) / (1.0 - {_BM25_SQL})" if fts else "1.0"
+        now = _serialize_datetime(_now())
+        q = (
+            f"SELECT m.* {clause} AND (m.valid_until IS NULL OR m.valid_until > ?) "
+            f"ORDER BY copal_score({match}, m.importance, m.access_count, "
+            "julianday(?) - julianday(COALESCE(m.last_accessed, m.updated_at, m.created_at))) DESC "
+            "LIMIT ?"
+        )
+        with self._get_connection() as conn:
+            rows = conn.execute(q, [*params, now, now, limit]).fetchall()
+            return [self._row_to_memory(row) for row in rows]
+
+    def lexical_search(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        limit: int = DEFAULT_TOP_K,
+    ) -> list[tuple[Memory, float]]:
+        """Any-term full-text search with BM25 scores (higher is better)."""
+        terms = any_term_query(query)
+        if not terms:
+            return []
+        clause, params, fts = self._match_sql(terms, scope, types)
+        if not fts:
+            return bm25_rank(query, self.iter_memories(scope=scope, types=types))[:limit]
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT m.*, -{_BM25_SQL} AS score {clause} ORDER BY {_BM25_SQL}, m.rowid LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+            return [(self._row_to_memory(row), row["score"]) for row in rows]
+
+    def _list_cursor(
+        self,
+        conn: sqlite3.Connection,
+        scope: str | None,
+        types: Iterable[MemoryType] | None,
+        after: str | None,
+        limit: int | None,
+        filters: dict[str, str | None] | None = None,
+    ) -> sqlite3.Cursor:
+        """Keyset-paginated listing in insertion (rowid) order."""
+        q = "SELECT * FROM memories WHERE 1=1"
+        params: list[Any] = []
         if scope:
             q += " AND scope = ?"
             params.append(scope)
@@ -266,40 +822,379 @@ class SQLiteMemoryStore(IMemoryStore):
             placeholders = ",".join("?" for _ in types)
             q += f" AND type IN ({placeholders})"
             params.extend([t.value for t in types])
+        for key, value in (filters or {}).items():
+            # Keys are validated identifiers, so they can be inlined into the path.
+            column = self._metadata_columns.get(key) or _METADATA_VALUE_SQL.format(key=key)
+            if value is None:
+                q += f" AND {column} IS NULL"
+            else:
+                q += f" AND {column} = ?"
+                params.append(value)
+        if after is not None:
+            q += " AND rowid > (SELECT rowid FROM memories WHERE id = ?)"
+            params.append(after)
+        q += " ORDER BY rowid"
+        if limit is not None:
+            q += " LIMIT ?"
+            params.append(limit)
+        return conn.execute(q, params)
+
+    def list_memories(
+        self,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        limit: int | None = None,
+        after: str | None = None,
+        where: dict[str, Any] | None = None,
+    ) -> list[Memory]:
+        filters = metadata_filters(where)
+        if filters and not self._json1:
+            return list(islice(self.iter_memories(scope=scope, types=types, after=after, where=where), limit))
         with self._get_connection() as conn:
-            rows = conn.execute(q, params).fetchall()
+            rows = self._list_cursor(conn, scope, types, after, limit, filters)
             return [self._row_to_memory(row) for row in rows]
 
-    def list_memories(
+    def iter_memories(
         self,
         *,
         scope: str | None = None,
         types: Iterable[MemoryType] | None = None,
+        after: str | None = None,
+        where: dict[str, Any] | None = None,
+    ) -> Iterator[Memory]:
+        filters = metadata_filters(where)
+        # Without JSON1 the filter runs on decoded rows instead of in SQL.
+        pushed = filters if self._json1 else None
+        with self._get_connection() as conn:
+            for row in self._list_cursor(conn, scope, types, after, None, pushed):
+                memory = self._row_to_memory(row)
+                if pushed is None and filters and not metadata_matches(memory, filters):
+                    continue
+                yield memory
+
+    def list_sessions(
+        self,
+        *,
+        scope: str | None = None,
+        task_id: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
     ) -> list[Memory]:
-        q = "SELECT * FROM memories WHERE 1=1"
+        """Live session summaries, newest first, read off the partial session indexes."""
+        q = "SELECT * FROM memories WHERE session_summary = 1 AND valid_until IS NULL"
         params: list[Any] = []
         if scope:
             q += " AND scope = ?"
             params.append(scope)
-        if types:
-            placeholders = ",".join("?" for _ in types)
-            q += f" AND type IN ({placeholders})"
-            params.extend([t.value for t in types])
+        if task_id is not None:
+            q += " AND task_id = ?"
+            params.append(str(task_id))
+        # Stored timestamps are fixed-width UTC strings, so they compare in order.
+        if since is not None:
+            q += " AND created_at >= ?"
+            params.append(_serialize_datetime(_utc(since).astimezone(timezone.utc)))
+        if until is not None:
+            q += " AND created_at < ?"
+            params.append(_serialize_datetime(_utc(until).astimezone(timezone.utc)))
+        q += " ORDER BY created_at DESC, rowid DESC"
+        if limit is not None:
+            q += " LIMIT ?"
+            params.append(limit)
         with self._get_connection() as conn:
-            rows = conn.execute(q, params).fetchall()
-            return [self._row_to_memory(row) for row in rows]
+            return [self._row_to_memory(row) for row in conn.execute(q, params)]
+
+    # --- branches -------------------------------------------------------------
+    def create_branch(self, task_id: str, description: str = "") -> Branch:
+        branch = Branch(task_id=task_id, description=description)
+        with self._get_connection() as conn:
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT INTO branches (task_id, description, status, created_at) VALUES (?, ?, ?, ?)",
+                        (task_id, description, branch.status, _serialize_datetime(branch.created_at)),
+                    )
+            except sqlite3.IntegrityError:
+                raise BranchExistsError(f"Branch {task_id} already exists") from None
+        return branch
+
+    def list_branches(self, *, status: str | None = None) -> list[Branch]:
+        query = """
+            SELECT b.*, (
+                SELECT count(*) FROM memories m
+                WHERE m.scope = 'task:' || b.task_id AND m.valid_until IS NULL
+            ) AS memories
+            FROM branches b
+        """
+        params: list[Any] = []
+        if status:
+            query += " WHERE b.status = ?"
+            params.append(status)
+        query += " ORDER BY b.created_at DESC, b.task_id"
+        with self._get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [Branch.from_dict(dict(row), memories=row["memories"]) for row in rows]
+
+    def merge_branch(
+        self,
+        task_id: str,
+        *,
+        target_scope: str,
+        memory_ids: Iterable[str] | None = None,
+        types: Iterable[MemoryType] | None = None,
+    ) -> list[Memory]:
+        scope = branch_scope(task_id)
+        self.flush_access_stats()
+        with self._get_connection() as conn:
+            # Read and write under one write lock so the branch cannot change
+            # between choosing memories and moving them.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                promoted = self._merge_branch_locked(conn, task_id, scope, target_scope, memory_ids, types)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return promoted
+
+    def _merge_branch_locked(
+        self,
+        conn: sqlite3.Connection,
+        task_id: str,
+        scope: str,
+        target_scope: str,
+        memory_ids: Iterable[str] | None,
+        types: Iterable[MemoryType] | None,
+    ) -> list[Memory]:
+        rows = conn.execute(
+            "SELECT * FROM memories WHERE scope = ? AND valid_until IS NULL ORDER BY rowid", (scope,)
+        ).fetchall()
+        known = conn.execute("SELECT 1 FROM branches WHERE task_id = ?", (task_id,)).fetchone()
+        if known is None and not rows:
+            raise UnknownBranchError(f"No branch for task {task_id}")
+        promoted = select_promoted((self._row_to_memory(row) for row in rows), memory_ids, types)
+        now = _now()
+        for memory in promoted:
+            memory.scope = target_scope
+            memory.updated_at = now
+        conn.executemany(_UPSERT_MEMORY_SQL, (self._memory_params(m) for m in promoted))
+        ids = [(memory.id, scope, target_scope) for memory in promoted]
+        # Edges already present in the target scope win; the branch copies go.
+        conn.executemany(
+            "UPDATE OR IGNORE relationships SET scope = ?3 WHERE scope = ?2 AND source_id = ?1", ids
+        )
+        conn.executemany(
+            "UPDATE OR IGNORE relationships SET scope = ?3 WHERE scope = ?2 AND target_id = ?1", ids
+        )
+        conn.executemany(
+            "DELETE FROM relationships WHERE scope = ?2 AND (source_id = ?1 OR target_id = ?1)",
+            [(memory_id, branch) for memory_id, branch, _ in ids],
+        )
+        if known is None:
+            conn.execute(_REGISTER_BRANCH_SQL, (task_id, AUTO_BRANCH_DESCRIPTION, BRANCH_ACTIVE, _serialize_datetime(now)))
+        remaining = conn.execute(
+            "SELECT count(*) FROM memories WHERE scope = ? AND valid_until IS NULL", (scope,)
+        ).fetchone()[0]
+        if not remaining:
+            conn.execute(
+                "UPDATE branches SET status = ?, merged_at = ? WHERE task_id = ?",
+                (BRANCH_MERGED, _serialize_datetime(now), task_id),
+            )
+        return promoted
 
     def list_relationships(
         self,
         memory_id: str,
         *,
         scope: str | None = None,
+        direction: str = "out",
     ) -> list[Relationship]:
-        q = "SELECT * FROM relationships WHERE source_id = ?"
-        params: list[Any] = [memory_id]
+        check_direction(direction)
+        columns = {"out": ["source_id"], "in": ["target_id"], "both": ["source_id", "target_id"]}
+        q = "SELECT * FROM relationships WHERE (" + " OR ".join(
+            f"{column} = ?" for column in columns[direction]
+        ) + ")"
+        params: list[Any] = [memory_id] * len(columns[direction])
         if scope:
             q += " AND scope = ?"
             params.append(scope)
         with self._get_connection() as conn:
             rows = conn.execute(q, params).fetchall()
             return [self._row_to_relationship(row) for row in rows]
+
+    # --- traversal ------------------------------------------------------------
+    @staticmethod
+    def _edge_step(
+        direction: str,
+        edge_types: Iterable[EdgeType] | None,
+        scope: str | None,
+    ) -> tuple[str, str, list[Any]]:
+        """Join clause, next-node expression and params for one hop from ``walk.id``.
+
+        Each direction is a single indexed lookup on ``relationships``;
+        ``both`` is an OR that SQLite answers from the source and target indexes.
+        """
+        check_direction(direction)
+        if direction == "out":
+            join, step = "r.source_id = walk.id", "r.target_id"
+        elif direction == "in":
+            join, step = "r.target_id = walk.id", "r.source_id"
+        else:
+            join = "(r.source_id = walk.id OR r.target_id = walk.id)"
+            step = "CASE WHEN r.source_id = walk.id THEN r.target_id ELSE r.source_id END"
+        params: list[Any] = []
+        types = normalise_edge_types(edge_types)
+        if types:
+            join += f" AND r.type IN ({','.join('?' for _ in types)})"
+            params.extend(sorted(t.value for t in types))
+        if scope:
+            join += " AND r.scope = ?"
+            params.append(scope)
+        return join, step, params
+
+    def related_memories(
+        self,
+        memory_id: str,
+        *,
+        depth: int = 1,
+        edge_types: Iterable[EdgeType] | None = None,
+        direction: str = "both",
+        scope: str | None = None,
+    ) -> list[tuple[Memory, int]]:
+        """k-hop neighbourhood via a recursive CTE, nearest first."""
+        join, step, params = self._edge_step(direction, edge_types, scope)
+        q = f"""
+            WITH RECURSIVE walk(id, depth) AS (
+                SELECT ?, 0
+                UNION
+                SELECT {step}, walk.depth + 1
+                FROM walk JOIN relationships r ON {join}
+                WHERE walk.depth < ?
+            )
+            SELECT m.*, MIN(walk.depth) AS hops
+            FROM walk JOIN memories m ON m.id = walk.id
+            WHERE walk.id != ?
+            GROUP BY m.id
+            ORDER BY hops, m.created_at
+        """
+        with self._get_connection() as conn:
+            rows = conn.execute(q, [memory_id, *params, depth, memory_id]).fetchall()
+            return [(self._row_to_memory(row), int(row["hops"])) for row in rows]
+
+    def find_path(
+        self,
+        source_id: str,
+        target_id: str,
+        *,
+        edge_types: Iterable[EdgeType] | None = None,
+        direction: str = "both",
+        max_depth: int = DEFAULT_PATH_DEPTH,
+        scope: str | None = None,
+    ) -> list[Memory] | None:
+        """Shortest path via a breadth-first recursive CTE.
+
+        The recursive step is ordered by depth, so rows come out level by level
+        and the outer ``LIMIT 1`` stops the walk at the first (shortest) hit.
+        Paths are carried as unit-separator delimited strings to skip cycles.
+        """
+        if self._fetch_memory(source_id, scope) is None or self._fetch_memory(target_id, scope) is None:
+            return None
+        if source_id == target_id:
+            return [self._fetch_memory(source_id, scope)]
+        join, step, params = self._edge_step(direction, edge_types, scope)
+        q = f"""
+            WITH RECURSIVE walk(id, depth, path) AS (
+                SELECT ?, 0, char(31) || ? || char(31)
+                UNION ALL
+                SELECT {step}, walk.depth + 1, walk.path || {step} || char(31)
+                FROM walk JOIN relationships r ON {join}
+                WHERE walk.depth < ? AND walk.id != ?
+                  AND instr(walk.path, char(31) || {step} || char(31)) = 0
+                ORDER BY 2
+            )
+            SELECT path FROM walk WHERE id = ? LIMIT 1
+        """
+        with self._get_connection() as conn:
+            row = conn.execute(
+                q, [source_id, source_id, *params, max_depth, target_id, target_id]
+            ).fetchone()
+        if row is None:
+            return None
+        return self.get_many(row["path"].strip("\x1f").split("\x1f"))
+
+    def latest_version(self, memory_id: str, *, scope: str | None = None) -> Memory | None:
+        """Follow SUPERSEDES edges (new -> old) to the newest, unsuperseded memory."""
+        if self._fetch_memory(memory_id, scope) is None:
+            return None
+        join, step, params = self._edge_step("in", [EdgeType.SUPERSEDES], scope)
+        q = f"""
+            WITH RECURSIVE walk(id, depth) AS (
+                SELECT ?, 0
+                UNION
+                SELECT {step}, walk.depth + 1
+                FROM walk JOIN relationships r ON {join}
+                WHERE walk.depth < ?
+            )
+            SELECT m.* FROM walk JOIN memories m ON m.id = walk.id
+            ORDER BY EXISTS (
+                SELECT 1 FROM relationships s
+                WHERE s.target_id = m.id AND s.type = ?{" AND s.scope = ?" if scope else ""}
+            ), walk.depth DESC, m.created_at DESC
+            LIMIT 1
+        """
+        tail: list[Any] = [EdgeType.SUPERSEDES.value] + ([scope] if scope else [])
+        with self._get_connection() as conn:
+            row = conn.execute(q, [memory_id, *params, MAX_CHAIN_LENGTH, *tail]).fetchone()
+            return self._row_to_memory(row) if row else None
+
+    def session_chain(
+        self,
+        memory_id: str,
+        *,
+        direction: str = "both",
+        limit: int | None = None,
+        scope: str | None = None,
+    ) -> list[Memory]:
+        """Memories linked by TEMPORAL_SEQUENCE edges around ``memory_id``, oldest first."""
+        check_direction(direction)
+        if self._fetch_memory(memory_id, scope) is None:
+            return []
+        bound = limit or MAX_CHAIN_LENGTH
+        walks: list[str] = []
+        names: list[str] = []
+        params: list[Any] = []
+        for edge_direction, sign in (("in", -1), ("out", 1)):
+            if direction not in (edge_direction, "both"):
+                continue
+            join, step, step_params = self._edge_step(edge_direction, [EdgeType.TEMPORAL_SEQUENCE], scope)
+            name = f"walk_{edge_direction}"
+            names.append(name)
+            walks.append(
+                f"""{name}(id, pos) AS (
+                    SELECT ?, 0
+                    UNION
+                    SELECT {step}, walk.pos + {sign}
+                    FROM {name} AS walk JOIN relationships r ON {join}
+                    WHERE abs(walk.pos) < ?
+                )"""
+            )
+            params.extend([memory_id, *step_params, bound])
+        union = " UNION ALL ".join(f"SELECT id, pos FROM {name}" for name in names)
+        # Keep the ``bound`` memories nearest the start on either side (2 * steps,
+        # plus one after it, so backward wins a tie like the query engine's
+        # walk), then return them oldest first.
+        q = f"""
+            WITH RECURSIVE {", ".join(walks)}
+            SELECT * FROM (
+                SELECT m.*, MIN(abs(chain.pos) * 2 + (chain.pos > 0)) AS distance
+                FROM ({union}) AS chain JOIN memories m ON m.id = chain.id
+                GROUP BY m.id
+                ORDER BY distance
+                LIMIT ?
+            )
+            ORDER BY CASE distance % 2 WHEN 1 THEN distance / 2 ELSE -(distance / 2) END
+        """
+        with self._get_connection() as conn:
+            rows = conn.execute(q, [*params, bound]).fetchall()
+            return [self._row_to_memory(row) for row in rows]
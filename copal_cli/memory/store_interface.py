@@ -1,10 +1,12 @@
 """Abstract interface for memory back-ends."""
 
 
+from datetime import datetime
 from typing import Any, Protocol
-from collections.abc import  Sequence
+from collections.abc import Iterable, Iterator, Sequence
 
-from .models import Memory, Relationship
+from .branches import Branch
+from .models import EdgeType, Memory, Relationship
 
 
 class IMemoryStore(Protocol):
@@ -14,12 +16,61 @@ class IMemoryStore(Protocol):
         self,
         memory: Memory,
         relationships: Sequence[Relationship] | None = None,
+        *,
+        dedupe: str | None = None,
     ) -> Memory:
-        """Persist a new memory and optional relationships."""
+        """Persist a new memory and optional relationships.
+
+        ``dedupe`` (default: the ``dedupe`` config key) decides what happens
+        when a live memory with the same scope, type and content exists; see
+        :mod:`copal_cli.memory.dedupe`. The stored memory is returned.
+        """
+
+    def add_memories(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] | None = None,
+        *,
+        dedupe: str | None = None,
+    ) -> list[Memory]:
+        """Persist many new memories and relationships in a single write."""
+
+    def find_duplicate(self, memory: Memory) -> Memory | None:
+        """The live memory with the same scope, type and content, if any."""
+
+    def upsert_many(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] | None = None,
+    ) -> int:
+        """Insert or replace memories verbatim (timestamps kept) in a single write."""
+
+    def delete_many(self, memory_ids: Iterable[str], scope: str | None = None) -> int:
+        """Delete memories in a single write and return how many were removed."""
+
+    def apply_changes(
+        self,
+        memories: Iterable[Memory] = (),
+        relationships: Iterable[Relationship] | None = None,
+        *,
+        deletions: Iterable[str] = (),
+        relationship_deletions: Iterable[str] = (),
+        scope: str | None = None,
+    ) -> int:
+        """Delete, then upsert verbatim, in a single write; returns how many memories were deleted.
+
+        ``deletions`` are memory ids, limited to ``scope`` as in
+        :meth:`delete_many`; ``relationship_deletions`` are relationship ids,
+        removed before ``relationships`` are written so an edge can be
+        replaced in place. Either everything is applied or nothing is.
+        """
 
     def get_memory(self, memory_id: str, scope: str | None = None) -> Memory | None:
         """Return a memory by identifier."""
 
+    def get_many(self, memory_ids: Iterable[str], scope: str | None = None) -> list[Memory]:
+        """Return existing memories in the given order, without recording an access."""
+
     def update_memory(
         self,
         memory_id: str,
@@ -38,24 +89,155 @@ class IMemoryStore(Protocol):
         *,
         scope: str | None = None,
         types: Sequence[Any] | None = None,
+        limit: int | None = None,
+        after: str | None = None,
+    ) -> list[Memory]:
+        """Search memories matching query and filters, best matches first.
+
+        ``after`` is a cursor: the id of the last result of the previous page.
+        """
+
+    def iter_search(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Sequence[Any] | None = None,
+        after: str | None = None,
+    ) -> Iterator[Memory]:
+        """Yield search results as they are read, in ``search_memories`` order."""
+
+    def rank_memories(
+        self,
+        query: str = "",
+        *,
+        scope: str | None = None,
+        types: Sequence[Any] | None = None,
+        limit: int = 10,
     ) -> list[Memory]:
-        """Search memories matching query and filters."""
+        """Return the ``limit`` most relevant unexpired matches (importance, recency, use)."""
+
+    def lexical_search(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Sequence[Any] | None = None,
+        limit: int = 10,
+    ) -> list[tuple[Memory, float]]:
+        """Memories containing any query term with their BM25 scores, best first."""
 
     def list_memories(
         self,
         *,
         scope: str | None = None,
         types: Sequence[Any] | None = None,
+        limit: int | None = None,
+        after: str | None = None,
+        where: dict[str, Any] | None = None,
+    ) -> list[Memory]:
+        """List memories matching filters, resuming after the ``after`` id.
+
+        ``where`` maps metadata keys to required values; values are compared
+        as text (see :func:`copal_cli.memory.query.metadata_text`) and
+        ``None`` matches a missing key.
+        """
+
+    def iter_memories(
+        self,
+        *,
+        scope: str | None = None,
+        types: Sequence[Any] | None = None,
+        after: str | None = None,
+        where: dict[str, Any] | None = None,
+    ) -> Iterator[Memory]:
+        """Yield memories matching filters as they are read."""
+
+    def list_sessions(
+        self,
+        *,
+        scope: str | None = None,
+        task_id: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
     ) -> list[Memory]:
-        """List memories matching filters."""
+        """Live session summaries created in ``[since, until)``, newest first."""
+
+    def create_branch(self, task_id: str, description: str = "") -> Branch:
+        """Register a branch for ``task_id``; raises :class:`BranchExistsError` if there is one."""
+
+    def list_branches(self, *, status: str | None = None) -> list[Branch]:
+        """Registered branches, newest first, with their live memory counts."""
+
+    def merge_branch(
+        self,
+        task_id: str,
+        *,
+        target_scope: str,
+        memory_ids: Iterable[str] | None = None,
+        types: Iterable[Any] | None = None,
+    ) -> list[Memory]:
+        """Move live branch memories (all, or those selected) into ``target_scope`` in one write.
+
+        Relationships of the branch touching them move too. The branch is
+        marked merged once it has no live memories left. Raises
+        :class:`UnknownBranchError` if the task has no branch.
+        """
 
     def list_relationships(
         self,
         memory_id: str,
         *,
         scope: str | None = None,
+        direction: str = "out",
     ) -> list[Relationship]:
-        """Return relationships originating from the memory."""
+        """Return the memory's outgoing (``out``), incoming (``in``) or ``both`` relationships."""
+
+    def related_memories(
+        self,
+        memory_id: str,
+        *,
+        depth: int = 1,
+        edge_types: Iterable[EdgeType] | None = None,
+        direction: str = "both",
+        scope: str | None = None,
+    ) -> list[tuple[Memory, int]]:
+        """Return memories within ``depth`` hops as ``(memory, hops)``, nearest first."""
+
+    def find_path(
+        self,
+        source_id: str,
+        target_id: str,
+        *,
+        edge_types: Iterable[EdgeType] | None = None,
+        direction: str = "both",
+        max_depth: int = 6,
+        scope: str | None = None,
+    ) -> list[Memory] | None:
+        """Return the shortest path between two memories (inclusive), or ``None``."""
+
+    def latest_version(self, memory_id: str, *, scope: str | None = None) -> Memory | None:
+        """Follow SUPERSEDES edges to the newest version of the memory."""
+
+    def session_chain(
+        self,
+        memory_id: str,
+        *,
+        direction: str = "both",
+        limit: int | None = None,
+        scope: str | None = None,
+    ) -> list[Memory]:
+        """Return memories linked by TEMPORAL_SEQUENCE edges, oldest first."""
+
+    def vacuum(self) -> int:
+        """Purge dangling data and give free space back; returns bytes reclaimed."""
+
+    def fingerprint(self) -> str:
+        """Token that changes whenever memories or relationships are written.
+
+        Reads (and the access statistics they record) leave it unchanged.
+        """
 
     def close(self) -> None:
         """Close any open resources (e.g. database connections)."""
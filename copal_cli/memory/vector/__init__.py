@@ -0,0 +1,44 @@
+"""Embedding-based semantic search for memory stores."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from ..config import vector_config
+from ..store_interface import IMemoryStore
+from .embedders import Embedder, HashingEmbedder, SentenceTransformerEmbedder, create_embedder
+from .index import (
+    ChromaVectorIndex,
+    LocalVectorIndex,
+    QdrantVectorIndex,
+    VectorIndex,
+    create_vector_index,
+)
+from .store import VectorIndexedStore
+
+
+def open_vector_store(store: IMemoryStore, target_root: Path, config: dict[str, Any]) -> VectorIndexedStore:
+    """Wrap ``store`` with the vector index described by the ``vector`` config."""
+    settings = vector_config(config)
+    embedder = create_embedder(settings)
+    directory = Path(settings["path"])
+    if not directory.is_absolute():
+        directory = target_root / directory
+    index = create_vector_index(settings, directory, dimension=embedder.dimension, model=embedder.name)
+    return VectorIndexedStore(store, index, embedder, batch_size=int(settings.get("batch_size", 64)))
+
+
+__all__ = [
+    "Embedder",
+    "HashingEmbedder",
+    "SentenceTransformerEmbedder",
+    "create_embedder",
+    "VectorIndex",
+    "LocalVectorIndex",
+    "ChromaVectorIndex",
+    "QdrantVectorIndex",
+    "create_vector_index",
+    "VectorIndexedStore",
+    "open_vector_store",
+]
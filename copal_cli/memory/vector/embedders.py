@@ -0,0 +1,95 @@
+"""Text embedders for semantic memory search."""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from typing import Any, Protocol
+from collections.abc import Sequence
+
+from ..models import Memory
+from ..query import tokenize
+
+
+class Embedder(Protocol):
+    """Turns text into fixed-size vectors."""
+
+    name: str
+    dimension: int
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        """Return one unit-length vector per text."""
+
+
+def memory_text(memory: Memory) -> str:
+    """Text embedded for a memory: its content followed by metadata values."""
+    parts = [memory.content or ""]
+    if memory.metadata:
+        parts.extend(str(value) for value in memory.metadata.values())
+    return "\n".join(parts)
+
+
+def normalise(vector: Sequence[float]) -> list[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        return list(vector)
+    return [value / norm for value in vector]
+
+
+class HashingEmbedder:
+    """Deterministic feature-hashing vectoriser (no model download needed).
+
+    Words and adjacent word pairs are hashed into ``dimension`` signed buckets.
+    It captures vocabulary overlap rather than meaning, which is enough for
+    offline use and tests.
+    """
+
+    def __init__(self, dimension: int = 256) -> None:
+        if dimension <= 0:
+            raise ValueError("dimension must be positive")
+        self.dimension = dimension
+        self.name = f"hashing-{dimension}"
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        return digest % self.dimension, 1.0 if digest >> 63 else -1.0
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dimension
+            tokens = tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                index, sign = self._bucket(feature)
+                vector[index] += sign
+            vectors.append(normalise(vector))
+        return vectors
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (``pip install copal-cli[vector-local]``)."""
+
+    def __init__(self, model: str, *, device: str | None = None) -> None:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "The sentence-transformers embedder requires 'pip install copal-cli[vector-local]'"
+            ) from exc
+        self._model = SentenceTransformer(model, device=device)
+        self.dimension = int(self._model.get_sentence_embedding_dimension())
+        self.name = f"sentence-transformers/{model}"
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        return self._model.encode(list(texts), normalize_embeddings=True).tolist()
+
+
+def create_embedder(settings: dict[str, Any]) -> Embedder:
+    """Build the embedder named by the ``vector.embedder`` setting."""
+    kind = str(settings.get("embedder", "hashing")).lower()
+    if kind == "hashing":
+        return HashingEmbedder(int(settings.get("dimension", 256)))
+    if kind in ("sentence-transformers", "local"):
+        return SentenceTransformerEmbedder(str(settings["model"]), device=settings.get("device"))
+    raise ValueError(f"Unknown vector embedder '{kind}'")
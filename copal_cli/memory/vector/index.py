@@ -0,0 +1,456 @@
+"""Vector index back-ends for semantic memory search."""
+
+from __future__ import annotations
+
+import contextlib
+import heapq
+import json
+import logging
+import os
+from array import array
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Protocol
+from collections.abc import Iterable, Iterator, Sequence
+from uuid import NAMESPACE_URL, uuid5
+
+try:  # pragma: no cover - import guard
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover - executed when dependency missing
+    np = None  # type: ignore[assignment]
+
+try:  # pragma: no cover - platform guard
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+from copal_cli.fs.writer import atomic_write
+from .embedders import normalise
+
+logger = logging.getLogger(__name__)
+
+# (memory id, scope, vector)
+VectorEntry = tuple[str, "str | None", Sequence[float]]
+
+# Rewrite the local matrix once dead rows outnumber live ones (and this many).
+COMPACT_MIN_DEAD_ROWS = 1024
+
+
+class VectorIndex(Protocol):
+    """Nearest-neighbour index over memory vectors, filterable by scope."""
+
+    def upsert(self, entries: Iterable[VectorEntry]) -> None:
+        """Insert or replace vectors."""
+
+    def delete(self, memory_ids: Iterable[str]) -> None:
+        """Remove vectors; unknown ids are ignored."""
+
+    def search(
+        self,
+        vector: Sequence[float],
+        k: int,
+        *,
+        scope: str | None = None,
+    ) -> list[tuple[str, float]]:
+        """Return up to ``k`` ``(memory_id, cosine similarity)`` pairs, best first."""
+
+    def clear(self, scope: str | None = None) -> None:
+        """Drop every vector, or only those of ``scope``."""
+
+    def count(self) -> int:
+        """Number of indexed memories."""
+
+    def close(self) -> None:
+        """Release resources."""
+
+
+class LocalVectorIndex:
+    """Float32 matrix on disk with brute-force cosine search.
+
+    ``vectors.f32`` holds unit-length float32 rows and is append-only;
+    ``ids.jsonl`` logs which row belongs to which memory (``put``) and which
+    memories were removed (``del``). Updates append a new row, and the file is
+    rewritten once dead rows dominate. Search is one matrix-vector product
+    (NumPy when installed, pure Python otherwise), which stays fast up to
+    hundreds of thousands of vectors. The index is derived data: writes are
+    not fsynced, and ``copal memory reindex`` rebuilds it.
+    """
+
+    def __init__(self, directory: Path, dimension: int, *, model: str = "") -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dimension = dimension
+        self.vectors_file = directory / "vectors.f32"
+        self.ids_file = directory / "ids.jsonl"
+        self.meta_file = directory / "meta.json"
+        self.lock_file = directory / ".lock"
+        self._row_bytes = dimension * 4
+        self._reset()
+        with self._locked():
+            self._check_meta(model)
+            self._refresh()
+
+    # --- files ------------------------------------------------------------------
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialise access across processes (no-op without fcntl)."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _check_meta(self, model: str) -> None:
+        meta = {"dimension": self.dimension, "model": model}
+        try:
+            current = json.loads(self.meta_file.read_text())
+        except (FileNotFoundError, ValueError):
+            current = None
+        if current == meta:
+            return
+        if current is not None:
+            logger.warning(
+                f"Vector index at {self.directory} was built with {current}; "
+                "discarding it. Run 'copal memory reindex' to rebuild."
+            )
+        self._truncate()
+        atomic_write(self.meta_file, json.dumps(meta))
+
+    def _truncate(self) -> None:
+        for path in (self.vectors_file, self.ids_file):
+            with open(path, "wb"):
+                pass
+        self._reset()
+
+    def _reset(self) -> None:
+        self._rows: dict[str, tuple[int, str | None]] = {}
+        self._total_rows = 0
+        self._log_pos = 0
+        self._log_inode: int | None = None
+        self._matrix: Any = None
+        self._matrix_rows = 0
+
+    def _refresh(self) -> None:
+        """Replay id-log records written since we last looked (by any process)."""
+        try:
+            st = self.ids_file.stat()
+        except FileNotFoundError:
+            self._reset()
+            return
+        if st.st_ino != self._log_inode or st.st_size < self._log_pos:
+            self._reset()
+            self._log_inode = st.st_ino
+        if st.st_size == self._log_pos:
+            return
+        with open(self.ids_file, "rb") as f:
+            f.seek(self._log_pos)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                self._log_pos += len(raw)
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    continue
+                if record[0] == "put":
+                    _, memory_id, scope, row = record
+                    self._rows[memory_id] = (row, scope)
+                    self._total_rows = max(self._total_rows, row + 1)
+                elif record[0] == "del":
+                    self._rows.pop(record[1], None)
+
+    def _append_log(self, records: list[list[Any]]) -> None:
+        with open(self.ids_file, "ab") as f:
+            f.write(b"".join(json.dumps(record).encode("utf-8") + b"\n" for record in records))
+
+    def _load_matrix(self) -> None:
+        """Read rows appended since the last search into the in-memory matrix."""
+        if self._matrix is not None and self._matrix_rows >= self._total_rows:
+            return
+        with open(self.vectors_file, "rb") as f:
+            f.seek(self._matrix_rows * self._row_bytes)
+            data = f.read((self._total_rows - self._matrix_rows) * self._row_bytes)
+        rows = len(data) // self._row_bytes
+        data = data[: rows * self._row_bytes]
+        if np is not None:
+            block = np.frombuffer(data, dtype=np.float32).reshape(rows, self.dimension)
+            self._matrix = block if self._matrix is None else np.concatenate([self._matrix, block])
+        else:
+            block = array("f")
+            block.frombytes(data)
+            if self._matrix is None:
+                self._matrix = block
+            else:
+                self._matrix.extend(block)
+        self._matrix_rows += rows
+
+    # --- API --------------------------------------------------------------------
+    def upsert(self, entries: Iterable[VectorEntry]) -> None:
+        records: list[list[Any]] = []
+        with self._locked():
+            self._refresh()
+            with open(self.vectors_file, "ab") as f:
+                row = -(-f.tell() // self._row_bytes)
+                if row * self._row_bytes != f.tell():
+                    # Torn row from an interrupted writer; pad it out.
+                    f.write(b"\0" * (row * self._row_bytes - f.tell()))
+                for memory_id, scope, vector in entries:
+                    if len(vector) != self.dimension:
+                        raise ValueError(
+                            f"Vector for {memory_id} has {len(vector)} dimensions, expected {self.dimension}"
+                        )
+                    f.write(array("f", normalise(vector)).tobytes())
+                    records.append(["put", memory_id, scope, row])
+                    row += 1
+            # Rows are on disk before the log points at them.
+            if records:
+                self._append_log(records)
+            self._refresh()
+            self._maybe_compact()
+
+    def delete(self, memory_ids: Iterable[str]) -> None:
+        with self._locked():
+            self._refresh()
+            records = [["del", memory_id] for memory_id in dict.fromkeys(memory_ids) if memory_id in self._rows]
+            if records:
+                self._append_log(records)
+                self._refresh()
+                self._maybe_compact()
+
+    def clear(self, scope: str | None = None) -> None:
+        if scope is None:
+            with self._locked():
+                self._truncate()
+            return
+        self.delete([memory_id for memory_id, (_, s) in self._rows.items() if s == scope])
+
+    def count(self) -> int:
+        with self._locked():
+            self._refresh()
+        return len(self._rows)
+
+    def search(
+        self,
+        vector: Sequence[float],
+        k: int,
+        *,
+        scope: str | None = None,
+    ) -> list[tuple[str, float]]:
+        with self._locked():
+            self._refresh()
+            self._load_matrix()
+        entries = [
+            (memory_id, row)
+            for memory_id, (row, entry_scope) in self._rows.items()
+            if (scope is None or entry_scope == scope) and row < self._matrix_rows
+        ]
+        if not entries or k <= 0:
+            return []
+        query = normalise(vector)
+        if np is not None:
+            scores = self._matrix @ np.asarray(query, dtype=np.float32)
+            selected = scores[np.fromiter((row for _, row in entries), dtype=np.int64, count=len(entries))]
+            k = min(k, len(entries))
+            top = np.argpartition(-selected, k - 1)[:k]
+            top = top[np.argsort(-selected[top])]
+            return [(entries[i][0], float(selected[i])) for i in top]
+        dimension, matrix = self.dimension, self._matrix
+        scored = (
+            (memory_id, sum(a * b for a, b in zip(query, matrix[row * dimension : (row + 1) * dimension])))
+            for memory_id, row in entries
+        )
+        return heapq.nlargest(k, scored, key=itemgetter(1))
+
+    def _maybe_compact(self) -> None:
+        dead = self._total_rows - len(self._rows)
+        if dead < max(COMPACT_MIN_DEAD_ROWS, len(self._rows)):
+            return
+        live = sorted(self._rows.items(), key=lambda item: item[1][0])
+        chunks = []
+        records = []
+        with open(self.vectors_file, "rb") as f:
+            for new_row, (memory_id, (row, scope)) in enumerate(live):
+                f.seek(row * self._row_bytes)
+                chunks.append(f.read(self._row_bytes))
+                records.append(["put", memory_id, scope, new_row])
+        atomic_write(self.vectors_file, b"".join(chunks))
+        atomic_write(self.ids_file, b"".join(json.dumps(r).encode("utf-8") + b"\n" for r in records))
+        self._reset()
+        self._refresh()
+
+    def close(self) -> None:
+        self._matrix = None
+        self._matrix_rows = 0
+
+
+class ChromaVectorIndex:
+    """Persistent local Chroma collection (``pip install copal-cli[vector-chroma]``).
+
+    Chroma answers queries from an HNSW graph, i.e. approximate nearest
+    neighbours, which scales past what the brute-force local matrix handles.
+    """
+
+    def __init__(self, directory: Path, *, collection: str = "copal-memories") -> None:
+        try:
+            import chromadb
+        except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("The chroma vector backend requires 'pip install copal-cli[vector-chroma]'") from exc
+        self._client = chromadb.PersistentClient(path=str(directory))
+        self._name = collection
+        self._collection = self._open()
+
+    def _open(self) -> Any:
+        return self._client.get_or_create_collection(self._name, metadata={"hnsw:space": "cosine"})
+
+    def upsert(self, entries: Iterable[VectorEntry]) -> None:
+        batch = list(entries)
+        if not batch:
+            return
+        self._collection.upsert(
+            ids=[memory_id for memory_id, _, _ in batch],
+            embeddings=[list(vector) for _, _, vector in batch],
+            metadatas=[{"scope": scope or ""} for _, scope, _ in batch],
+        )
+
+    def delete(self, memory_ids: Iterable[str]) -> None:
+        ids = list(memory_ids)
+        if ids:
+            self._collection.delete(ids=ids)
+
+    def search(
+        self,
+        vector: Sequence[float],
+        k: int,
+        *,
+        scope: str | None = None,
+    ) -> list[tuple[str, float]]:
+        if k <= 0 or self._collection.count() == 0:
+            return []
+        result = self._collection.query(
+            query_embeddings=[list(vector)],
+            n_results=k,
+            where={"scope": scope} if scope else None,
+        )
+        # Cosine distance -> similarity.
+        return [(memory_id, 1.0 - distance) for memory_id, distance in zip(result["ids"][0], result["distances"][0])]
+
+    def clear(self, scope: str | None = None) -> None:
+        if scope:
+            self._collection.delete(where={"scope": scope})
+            return
+        self._client.delete_collection(self._name)
+        self._collection = self._open()
+
+    def count(self) -> int:
+        return int(self._collection.count())
+
+    def close(self) -> None:
+        pass
+
+
+class QdrantVectorIndex:
+    """Qdrant collection, embedded on disk or at ``url`` (``pip install copal-cli[vector-qdrant]``).
+
+    Qdrant searches an HNSW graph (approximate nearest neighbours) and
+    filters by scope on the server side.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        dimension: int,
+        *,
+        collection: str = "copal-memories",
+        url: str | None = None,
+    ) -> None:
+        try:
+            from qdrant_client import QdrantClient, models
+        except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("The qdrant vector backend requires 'pip install copal-cli[vector-qdrant]'") from exc
+        self._models = models
+        self._client = QdrantClient(url=url) if url else QdrantClient(path=str(directory))
+        self._name = collection
+        self._dimension = dimension
+        if not self._client.collection_exists(collection):
+            self._create()
+
+    def _create(self) -> None:
+        self._client.create_collection(
+            self._name,
+            vectors_config=self._models.VectorParams(size=self._dimension, distance=self._models.Distance.COSINE),
+        )
+
+    @staticmethod
+    def _point_id(memory_id: str) -> str:
+        # Qdrant point ids must be integers or UUIDs.
+        return str(uuid5(NAMESPACE_URL, memory_id))
+
+    def _scope_filter(self, scope: str) -> Any:
+        models = self._models
+        return models.Filter(must=[models.FieldCondition(key="scope", match=models.MatchValue(value=scope))])
+
+    def upsert(self, entries: Iterable[VectorEntry]) -> None:
+        points = [
+            self._models.PointStruct(
+                id=self._point_id(memory_id),
+                vector=list(vector),
+                payload={"memory_id": memory_id, "scope": scope or ""},
+            )
+            for memory_id, scope, vector in entries
+        ]
+        if points:
+            self._client.upsert(self._name, points=points)
+
+    def delete(self, memory_ids: Iterable[str]) -> None:
+        ids = [self._point_id(memory_id) for memory_id in memory_ids]
+        if ids:
+            self._client.delete(self._name, points_selector=self._models.PointIdsList(points=ids))
+
+    def search(
+        self,
+        vector: Sequence[float],
+        k: int,
+        *,
+        scope: str | None = None,
+    ) -> list[tuple[str, float]]:
+        if k <= 0:
+            return []
+        hits = self._client.search(
+            self._name,
+            query_vector=list(vector),
+            limit=k,
+            query_filter=self._scope_filter(scope) if scope else None,
+        )
+        return [(hit.payload["memory_id"], float(hit.score)) for hit in hits]
+
+    def clear(self, scope: str | None = None) -> None:
+        if scope:
+            self._client.delete(
+                self._name,
+                points_selector=self._models.FilterSelector(filter=self._scope_filter(scope)),
+            )
+            return
+        self._client.delete_collection(self._name)
+        self._create()
+
+    def count(self) -> int:
+        return int(self._client.count(self._name).count)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def create_vector_index(settings: dict[str, Any], directory: Path, *, dimension: int, model: str) -> VectorIndex:
+    """Build the index named by the ``vector.backend`` setting."""
+    backend = str(settings.get("backend", "local")).lower()
+    if backend == "local":
+        return LocalVectorIndex(directory, dimension, model=model)
+    if backend == "chroma":
+        return ChromaVectorIndex(directory / "chroma")
+    if backend == "qdrant":
+        return QdrantVectorIndex(directory / "qdrant", dimension, url=settings.get("url"))
+    raise ValueError(f"Unknown vector backend '{backend}'")
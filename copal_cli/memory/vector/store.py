@@ -0,0 +1,181 @@
+"""Memory store wrapper that keeps a vector index in sync."""
+
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any
+from collections.abc import Iterable, Sequence
+
+from ..models import Memory, MemoryType, Relationship
+from ..store_interface import IMemoryStore
+from .embedders import Embedder, memory_text
+from .index import VectorIndex
+
+DEFAULT_EMBED_BATCH_SIZE = 64
+
+
+class VectorIndexedStore:
+    """Wraps an :class:`IMemoryStore`, embedding memories as they are written.
+
+    Writes go to the underlying store first and are then mirrored into the
+    vector index; every other method is forwarded unchanged. If the index
+    ever drifts (e.g. writes made with vector search disabled), run
+    :meth:`reindex`.
+    """
+
+    def __init__(
+        self,
+        store: IMemoryStore,
+        index: VectorIndex,
+        embedder: Embedder,
+        *,
+        batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+    ) -> None:
+        self.store = store
+        self.index = index
+        self.embedder = embedder
+        self.batch_size = max(1, batch_size)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.store, name)
+
+    # --- indexing -----------------------------------------------------------------
+    def _index(self, memories: Iterable[Memory]) -> int:
+        indexed = 0
+        iterator = iter(memories)
+        while batch := list(islice(iterator, self.batch_size)):
+            vectors = self.embedder.embed([memory_text(memory) for memory in batch])
+            self.index.upsert(
+                (memory.id, memory.scope, vector) for memory, vector in zip(batch, vectors)
+            )
+            indexed += len(batch)
+        return indexed
+
+    def reindex(self, scope: str | None = None) -> int:
+        """Re-embed every memory (in ``scope``, or all) and return how many were indexed."""
+        self.index.clear(scope)
+        return self._index(self.store.iter_memories(scope=scope))
+
+    # --- writes -------------------------------------------------------------------
+    def add_memory(
+        self,
+        memory: Memory,
+        relationships: Sequence[Relationship] | None = None,
+        *,
+        dedupe: str | None = None,
+    ) -> Memory:
+        added = self.store.add_memory(memory, relationships, dedupe=dedupe)
+        self._index([added])
+        return added
+
+    def add_memories(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] | None = None,
+        *,
+        dedupe: str | None = None,
+    ) -> list[Memory]:
+        added = self.store.add_memories(memories, relationships, dedupe=dedupe)
+        self._index(added)
+        return added
+
+    def upsert_many(
+        self,
+        memories: Iterable[Memory],
+        relationships: Iterable[Relationship] | None = None,
+    ) -> int:
+        batch = list(memories)
+        count = self.store.upsert_many(batch, relationships)
+        self._index(batch)
+        return count
+
+    def update_memory(
+        self,
+        memory_id: str,
+        *,
+        scope: str | None = None,
+        **updates: Any,
+    ) -> Memory | None:
+        updated = self.store.update_memory(memory_id, scope=scope, **updates)
+        if updated is not None:
+            self._index([updated])
+        return updated
+
+    def supersede_memory(self, old_memory_id: str, new_memory: Memory, *args: Any, **kwargs: Any) -> Memory:
+        added = self.store.supersede_memory(old_memory_id, new_memory, *args, **kwargs)
+        self._index([added])
+        return added
+
+    def merge_branch(self, task_id: str, **kwargs: Any) -> list[Memory]:
+        promoted = self.store.merge_branch(task_id, **kwargs)
+        # The index filters by scope, so promoted memories are re-filed.
+        self._index(promoted)
+        return promoted
+
+    def delete_memory(self, memory_id: str, scope: str | None = None) -> bool:
+        deleted = self.store.delete_memory(memory_id, scope=scope)
+        if deleted:
+            self.index.delete([memory_id])
+        return deleted
+
+    def delete_many(self, memory_ids: Iterable[str], scope: str | None = None) -> int:
+        ids = list(memory_ids)
+        if scope:
+            # Only ids that really live in ``scope`` are removed from the store.
+            ids = [memory.id for memory in self.store.get_many(ids, scope=scope)]
+        deleted = self.store.delete_many(ids, scope=scope)
+        self.index.delete(ids)
+        return deleted
+
+    def apply_changes(
+        self,
+        memories: Iterable[Memory] = (),
+        relationships: Iterable[Relationship] | None = None,
+        *,
+        deletions: Iterable[str] = (),
+        relationship_deletions: Iterable[str] = (),
+        scope: str | None = None,
+    ) -> int:
+        batch = list(memories)
+        ids = list(deletions)
+        if scope:
+            ids = [memory.id for memory in self.store.get_many(ids, scope=scope)]
+        deleted = self.store.apply_changes(
+            batch, relationships, deletions=ids, relationship_deletions=relationship_deletions, scope=scope
+        )
+        self.index.delete(ids)
+        self._index(batch)
+        return deleted
+
+    # --- reads --------------------------------------------------------------------
+    def semantic_search(
+        self,
+        query: str,
+        *,
+        scope: str | None = None,
+        types: Iterable[MemoryType] | None = None,
+        limit: int = 10,
+    ) -> list[tuple[Memory, float]]:
+        """Nearest memories to ``query`` by embedding similarity, best first."""
+        if limit <= 0 or not query.strip():
+            return []
+        type_set = set(types) if types else None
+        [vector] = self.embedder.embed([query])
+        # Type filtering happens after the lookup, so over-fetch to fill the page.
+        hits = self.index.search(vector, limit * 4 if type_set else limit, scope=scope)
+        memories = {memory.id: memory for memory in self.store.get_many([memory_id for memory_id, _ in hits])}
+        results = []
+        for memory_id, score in hits:
+            memory = memories.get(memory_id)
+            if memory is None or (type_set and memory.type not in type_set):
+                continue
+            results.append((memory, score))
+            if len(results) == limit:
+                break
+        return results
+
+    def close(self) -> None:
+        try:
+            self.index.close()
+        finally:
+            self.store.close()
@@ -1,10 +1,13 @@
 import argparse
 import logging
 import os
+import sqlite3
+import sys
 from pathlib import Path
 from typing import Optional
 
 from rich.console import Console
+from rich.prompt import Confirm
 from rich.table import Table
 
 from .git_utils import worktree_add, worktree_list, worktree_remove, get_repo_root
@@ -45,7 +48,18 @@ def handle_new(args: argparse.Namespace) -> int:
     console.print("[dim]Syncing CoPal assets...[/dim]")
     if not sync_assets(repo_root, target_path):
         console.print("[yellow]Warning: Failed to sync some assets. You may need to run 'copal init' manually in the new worktree.[/yellow]")
-        
+
+    # 3. Snapshot Memory (optional)
+    if getattr(args, "with_memory", False):
+        from ..memory.snapshot import SnapshotError, create_snapshot
+
+        try:
+            snapshot = create_snapshot(repo_root, target_path)
+        except (SnapshotError, OSError, sqlite3.Error) as exc:
+            console.print(f"[yellow]Warning: Could not snapshot project memory: {exc}[/yellow]")
+        else:
+            console.print(f"[dim]Snapshotted project memory ({snapshot.method}).[/dim]")
+
     console.print(f"[green]✓ Successfully created worktree '{name}'![/green]")
     console.print(f"\nTo switch to it: [cyan]cd {target_path}[/cyan]")
     
@@ -98,8 +112,74 @@ def handle_remove(args: argparse.Namespace) -> int:
         # For now, strict path matching based on our convention.
         return 1
         
+    if not _merge_memory_snapshot(args, target_path):
+        return 1
+
     if not worktree_remove(repo_root, target_path, force):
         return 1
         
     console.print(f"[green]✓ Removed worktree '{name}'[/green]")
     return 0
+
+
+def _merge_memory_snapshot(args: argparse.Namespace, target_path: Path) -> bool:
+    """Offer to merge a worktree's memory overlay back; False aborts the removal."""
+    from ..memory.snapshot import diff_snapshot, load_snapshot, merge_snapshot
+
+    snapshot = load_snapshot(target_path)
+    choice = getattr(args, "merge_memory", None)
+    if snapshot is None or choice is False:
+        return True
+    try:
+        delta = diff_snapshot(snapshot)
+    except (OSError, sqlite3.Error) as exc:
+        console.print(f"[red]✗ Cannot read the worktree's memory:[/red] {exc}")
+        return False
+    if not delta:
+        return True
+
+    console.print(
+        f"Worktree memory has {len(delta.upserts)} new or changed memories, "
+        f"{len(delta.deletions)} deletions, {len(delta.relationships)} new or changed relationships "
+        f"and {len(delta.relationship_deletions)} deleted relationships."
+    )
+    prefer_task = getattr(args, "prefer_task", False)
+    if delta.conflicts:
+        table = Table(title="Memory Conflicts (changed in both)")
+        table.add_column("ID", style="cyan")
+        table.add_column("Project")
+        table.add_column("Worktree")
+        for conflict in delta.conflicts:
+            table.add_row(
+                conflict.memory_id,
+                conflict.parent.content[:60] if conflict.parent else "[dim]deleted[/dim]",
+                conflict.task.content[:60] if conflict.task else "[dim]deleted[/dim]",
+            )
+        console.print(table)
+    if delta.relationship_conflicts:
+        table = Table(title="Relationship Conflicts")
+        table.add_column("ID", style="cyan")
+        table.add_column("Project")
+        table.add_column("Worktree")
+        for edge_conflict in delta.relationship_conflicts:
+            table.add_row(
+                edge_conflict.relationship_id,
+                *(
+                    f"{rel.source_id} -[{rel.type.value}]-> {rel.target_id}" if rel else "[dim]deleted[/dim]"
+                    for rel in (edge_conflict.parent, edge_conflict.task)
+                ),
+            )
+        console.print(table)
+    if delta.conflicts or delta.relationship_conflicts:
+        kept = "worktree" if prefer_task else "project"
+        console.print(f"[yellow]Conflicts keep the {kept} version.[/yellow]")
+
+    if choice is None:
+        if not sys.stdin.isatty():
+            console.print("[red]✗ Pass --merge-memory or --discard-memory to remove this worktree.[/red]")
+            return False
+        choice = Confirm.ask("Merge these memory changes into the project?", default=True)
+    if choice:
+        changed = merge_snapshot(snapshot, delta, prefer_task=prefer_task)
+        console.print(f"[green]✓ Merged {changed} memories into the project[/green]")
+    return True
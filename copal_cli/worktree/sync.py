@@ -3,13 +3,16 @@ import logging
 from pathlib import Path
 from typing import List
 
+from ..memory.rpc import link_worktree
+
 logger = logging.getLogger(__name__)
 
 def sync_assets(source_root: Path, target_root: Path) -> bool:
     """
     Sync CoPal assets from source repo to target worktree.
     Copies .copal/global, .copal/skills, and config files.
-    Initializes empty .copal/runtime.
+    Initializes empty .copal/runtime and links the worktree's memory to the
+    source repo's memory server.
     """
     source_copal = source_root / ".copal"
     target_copal = target_root / ".copal"
@@ -36,9 +39,10 @@ def sync_assets(source_root: Path, target_root: Path) -> bool:
         (target_copal / "runtime").mkdir(exist_ok=True)
         
         # 5. Initialize Memory (Empty directory structure if needed, but config is copied)
-        # We generally want fresh memory for a new task, or maybe shared?
-        # For now, we start fresh as per "One Task, One Workspace" philosophy.
+        # The worktree starts with its own empty store, but is linked to the
+        # source repo so that a running `copal memory serve` there is shared.
         (target_copal / "memory").mkdir(exist_ok=True)
+        link_worktree(source_root, target_root)
         
         logger.info(f"Successfully synced CoPal assets to {target_root}")
         return True
@@ -0,0 +1,42 @@
+import pytest
+
+from copal_cli.memory.factory import open_store
+
+
+@pytest.fixture
+def open_kind(tmp_path):
+    """``open_kind(kind, **config)``: an unpooled store in ``tmp_path``, closed after the test.
+
+    ``kind`` is a backend name; ``graph-lazy`` is the graph store in lazy mode.
+    """
+    opened = []
+
+    def open_kind(kind, **config):
+        backend, _, variant = kind.partition("-")
+        config = {"backend": backend, **config}
+        if variant == "lazy":
+            config["graph"] = {"lazy": True}
+        store = open_store(tmp_path, config, pooled=False)
+        opened.append(store)
+        return store
+
+    yield open_kind
+    for store in opened:
+        store.close()
+
+
+@pytest.fixture(params=["sqlite", "graph", "json"])
+def store_kind(request):
+    """Backend the ``store`` fixture opens; parametrize it to pick others."""
+    return request.param
+
+
+@pytest.fixture
+def store_config():
+    """Extra memory config for the ``store`` fixture; override or parametrize it."""
+    return {}
+
+
+@pytest.fixture
+def store(open_kind, store_kind, store_config):
+    return open_kind(store_kind, **store_config)
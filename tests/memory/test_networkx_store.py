@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from copal_cli.memory.models import EdgeType, Memory, MemoryType
+from copal_cli.memory.models import EdgeType, Memory, MemoryType, Relationship
 from copal_cli.memory.networkx_store import NetworkXMemoryStore
 from copal_cli.memory.scope import ScopeManager
 
@@ -95,3 +95,73 @@ def test_supersede_memory_creates_relationship(tmp_path):
     superseded = store.get_memory("mem-old")
     assert superseded is not None
     assert superseded.valid_until is not None
+
+
+def test_batch_operations_persist(tmp_path):
+    store, _, scope_manager = build_store(tmp_path)
+    scope = scope_manager.current_scope
+    memories = [
+        Memory(id=f"bulk-{i}", type=MemoryType.NOTE, content=f"bulk {i}", scope=scope)
+        for i in range(3)
+    ]
+    relationship = Relationship(
+        id="bulk-rel",
+        source_id="bulk-0",
+        target_id="bulk-1",
+        type=EdgeType.RELATES_TO,
+        scope=scope,
+    )
+    store.add_memories(memories, [relationship])
+    assert store.delete_many(["bulk-2", "unknown"]) == 1
+    store.close()
+
+    reloaded, *_ = build_store(tmp_path)
+    assert {m.id for m in reloaded.list_memories(scope=scope)} == {"bulk-0", "bulk-1"}
+    assert [r.id for r in reloaded.list_relationships("bulk-0", scope=scope)] == ["bulk-rel"]
+
+
+def build_lazy_store(target_root: Path, cache_size: int = 2):
+    config = {
+        "backend": "networkx",
+        "database": ".copal/memory.db",
+        "graph": {"lazy": True, "cache_size": cache_size},
+    }
+    scope_manager = ScopeManager.from_config(target_root, config)
+    return NetworkXMemoryStore(target_root, config=config, scope_manager=scope_manager)
+
+
+def test_lazy_mode_hydrates_on_demand(tmp_path):
+    store, target_root, scope_manager = build_store(tmp_path)
+    scope = scope_manager.current_scope
+    memories = [
+        Memory(id=f"m{i}", type=MemoryType.NOTE, content=f"note {i} about caching", scope=scope)
+        for i in range(5)
+    ]
+    edges = [
+        Relationship(id="r1", source_id="m0", target_id="m1", type=EdgeType.RELATES_TO, scope=scope),
+        Relationship(id="r2", source_id="m2", target_id="m0", type=EdgeType.RELATES_TO, scope=scope),
+    ]
+    store.add_memories(memories, edges)
+    store.close()
+
+    lazy = build_lazy_store(target_root)
+    assert lazy._graph.number_of_nodes() == 0
+
+    assert lazy.get_memory("m3").content == "note 3 about caching"
+    assert [rel.id for rel in lazy.list_relationships("m0")] == ["r1"]
+
+    # Touching more nodes than the cache holds evicts the least recently used.
+    for memory_id in ("m1", "m2", "m4"):
+        assert lazy.get_memory(memory_id) is not None
+    assert len(lazy._hydrated) == 2
+    assert lazy._node_memory("m3") is None
+    assert lazy.get_memory("m3") is not None
+
+    # Search and list stream from SQLite rather than the (partial) graph.
+    assert {m.id for m in lazy.search_memories("caching", scope=scope)} == {f"m{i}" for i in range(5)}
+    assert len(lazy.list_memories(scope=scope)) == 5
+
+    lazy.delete_memory("m4")
+    assert lazy.get_memory("m4") is None
+    assert len(lazy.list_memories(scope=scope)) == 4
+    lazy.close()
@@ -64,7 +64,7 @@ class TestBuildParser:
 class TestMain:
     """Tests for main function."""
 
-    @patch("copal_cli.cli.harness_init_command")
+    @patch("copal_cli.harness.init.init_command")
     def test_main_calls_init_command(self, mock_init):
         """Test that main calls init_command with correct arguments."""
         mock_init.return_value = 0
@@ -78,7 +78,7 @@ class TestMain:
             packs=None
         )
 
-    @patch("copal_cli.cli.harness_init_command")
+    @patch("copal_cli.harness.init.init_command")
     def test_main_with_dry_run(self, mock_init):
         """Test that main passes dry_run flag correctly."""
         mock_init.return_value = 0
@@ -97,7 +97,7 @@ class TestMain:
         with pytest.raises(SystemExit):
             main([])
 
-    @patch("copal_cli.cli.harness_init_command")
+    @patch("copal_cli.harness.init.init_command")
     def test_main_returns_init_exit_code(self, mock_init):
         """Test that main returns exit code from init_command."""
         mock_init.return_value = 42
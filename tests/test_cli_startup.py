@@ -0,0 +1,89 @@
+"""What building the CLI imports, and a loose start-up budget (see benchmarks/bench_startup.py)."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative ``import copal_cli.cli`` time: about 45 ms when the commands were
+# made lazy, so only a large regression (or lost laziness) trips this.
+STARTUP_BUDGET_US = 450_000
+
+# Modules only specific commands need; building the parser must not load them.
+HEAVY_MODULES = (
+    "networkx",
+    "jsonschema",
+    "yaml",
+    "rich",
+    "sqlite3",
+    "copal_cli.harness",
+    "copal_cli.memory.cli_commands",
+    "copal_cli.memory.networkx_store",
+    "copal_cli.memory.sqlite_store",
+    "copal_cli.worktree.commands",
+)
+
+
+def _importtime(statement: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if line.startswith("import time:") and len(parts) == 3 and parts[1].strip().isdigit():
+            timings[parts[2].strip()] = int(parts[1])
+    return timings
+
+
+def _loaded(timings, prefix):
+    return [name for name in timings if name == prefix or name.startswith(prefix + ".")]
+
+
+def test_package_import_is_light():
+    timings = _importtime("import copal_cli")
+    assert _loaded(timings, "copal_cli") == ["copal_cli"]
+
+
+def test_cli_defers_command_modules():
+    timings = _importtime("import copal_cli.cli; copal_cli.cli.build_parser()")
+    loaded = [name for prefix in HEAVY_MODULES for name in _loaded(timings, prefix)]
+    assert loaded == []
+
+
+def test_client_entry_point_is_light():
+    # What a call forwarded to ``copal daemon`` imports.
+    timings = _importtime("import copal_cli.client")
+    assert _loaded(timings, "copal_cli") == ["copal_cli", "copal_cli.client"]
+    assert [name for prefix in HEAVY_MODULES for name in _loaded(timings, prefix)] == []
+
+
+
+def test_cli_leaves_command_modules_unloaded():
+    statement = (
+        "import json, sys, copal_cli.cli; copal_cli.cli.build_parser(); "
+        "print(json.dumps(sorted(sys.modules)))"
+    )
+    result = subprocess.run([sys.executable, "-c", statement], cwd=ROOT, capture_output=True, text=True, check=True)
+    modules = json.loads(result.stdout)
+    # Only the models the parser takes its choices from; no command, store or worktree module.
+    assert [name for name in modules if name.startswith("copal_cli")] == [
+        "copal_cli",
+        "copal_cli.cli",
+        "copal_cli.memory",
+        "copal_cli.memory.branches",
+        "copal_cli.memory.dedupe",
+        "copal_cli.memory.models",
+    ]
+
+
+def test_cli_import_within_budget():
+    # Best of three runs, to ride out a busy machine.
+    totals = [_importtime("import copal_cli.cli")["copal_cli.cli"] for _ in range(3)]
+    assert min(totals) < STARTUP_BUDGET_US, f"import copal_cli.cli took {min(totals)} us"
@@ -0,0 +1,149 @@
+import socket
+
+import pytest
+
+from copal_cli import client
+from copal_cli.cli import main as cli_main
+from copal_cli.daemon import CopalDaemon
+from copal_cli.fs.cache import FileCache, file_cache
+from copal_cli.memory.factory import close_stores, open_store, refresh_stores
+from copal_cli.memory.models import Memory, MemoryType
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state(monkeypatch):
+    monkeypatch.delenv("COPAL_NO_DAEMON", raising=False)
+    monkeypatch.setattr(file_cache, "enabled", False)
+    file_cache.clear()
+    close_stores()
+    yield
+    close_stores()
+    file_cache.clear()
+
+
+def test_commands_run_in_a_warm_daemon(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    with CopalDaemon(tmp_path) as daemon:
+        assert client.find_daemon() == tmp_path / ".copal" / "daemon.sock"
+        assert file_cache.enabled
+
+        assert client.main(["memory", "add", "--content", "warm note", "--type", "note"]) == 0
+        assert client.main(["memory", "list"]) == 0
+        assert "warm note" in capsys.readouterr().out
+
+        assert client.main(["memory", "bogus"]) == 2
+        assert "invalid choice" in capsys.readouterr().err
+        assert daemon.commands == 3
+
+        # Commands that prompt or read stdin never reach the daemon.
+        assert client.main(["daemon", "--stop"]) == 0
+    assert not (tmp_path / ".copal" / "daemon.sock").exists()
+
+
+def test_client_falls_back_to_running_in_process(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert client.find_daemon() is None
+    assert client.main(["memory", "add", "--content", "local note", "--type", "note"]) == 0
+
+    # A socket file nobody listens on is left over from a daemon that died.
+    stale = tmp_path / ".copal" / "daemon.sock"
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(stale))
+    listener.close()
+    assert client.forward(["memory", "list"], stale) is None
+    assert client.main(["memory", "list"]) == 0
+    assert "local note" in capsys.readouterr().out
+    assert cli_main(["daemon", "--stop"]) == 1
+
+
+def test_unresponsive_daemon_falls_back_without_running_twice(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("COPAL_DAEMON_TIMEOUT", "0.2")
+    (tmp_path / ".copal").mkdir()
+    # Accepts connections (the kernel queues them) but never answers.
+    wedged = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    wedged.bind(str(tmp_path / ".copal" / "daemon.sock"))
+    wedged.listen(1)
+    try:
+        assert client.forward(["memory", "list"], client.find_daemon()) is None
+        assert client.main(["memory", "add", "--content", "ran here", "--type", "note"]) == 0
+    finally:
+        wedged.close()
+        (tmp_path / ".copal" / "daemon.sock").unlink()
+    # The fallback opened the pooled store on this thread; the daemon has its own.
+    close_stores()
+
+    with CopalDaemon(tmp_path) as daemon:
+        # A client that hangs up instead of confirming gets nothing run.
+        conn = client.connect(daemon.path, 1.0)
+        conn.sendall(b'{"argv": ["memory", "add", "--content", "twice", "--type", "note"]}\n')
+        assert conn.makefile("rb").readline() == b'{"ready": true}\n'
+        conn.close()
+        assert client.main(["memory", "list"]) == 0
+        assert daemon.commands == 1
+    out = capsys.readouterr().out
+    assert "ran here" in out and "twice" not in out
+
+
+@pytest.mark.parametrize(
+    "argv, local",
+    [
+        (["memory", "list"], False),
+        (["status"], False),
+        (["init"], True),
+        (["memory", "--target", "x", "serve"], True),
+        (["-v", "memory", "--target", "import", "list"], False),
+        (["memory", "--target=serve", "search", "serve"], False),
+        (["memory", "add", "import"], False),
+        (["skill", "list", "--target", "create"], False),
+        (["wt", "rm", "task-1"], True),
+        (["worktree", "new", "feature"], True),
+        (["next", "--worktree"], True),
+        (["next"], False),
+        (["skill", "create", "demo"], True),
+        (["skill", "create", "demo", "--no-interactive"], False),
+        ([], False),
+    ],
+)
+def test_commands_that_need_the_terminal_run_locally(argv, local):
+    assert client._runs_locally(argv) is local
+
+
+def test_file_cache_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / "todo.json"
+    path.write_text("one")
+    calls = []
+
+    def loader(p):
+        calls.append(p)
+        return {"text": p.read_text()}
+
+    cache = FileCache(enabled=True)
+    first = cache.load(path, loader)
+    first["text"] = "mutated"
+    assert cache.load(path, loader) == {"text": "one"}
+    assert len(calls) == 1
+
+    path.write_text("two!")
+    assert cache.load(path, loader) == {"text": "two!"}
+    assert len(calls) == 2
+
+    FileCache().load(path, loader)
+    assert len(calls) == 3
+
+
+def test_refresh_reopens_stores_written_by_another_process(tmp_path):
+    config = {"backend": "graph"}
+    store = open_store(tmp_path, config)
+    store.add_memory(Memory(id="a", type=MemoryType.NOTE, content="a", scope="proj"))
+    store.close()
+    assert refresh_stores() == 0
+
+    other = open_store(tmp_path, config, pooled=False)
+    other.add_memory(Memory(id="b", type=MemoryType.NOTE, content="b", scope="proj"))
+    other.close()
+
+    assert refresh_stores() == 1
+    store = open_store(tmp_path, config)
+    assert sorted(memory.id for memory in store.list_memories(scope="proj")) == ["a", "b"]
+    store.close()
@@ -0,0 +1,114 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from copal_cli.harness.context import ContextPackBuilder, context_command, load_active_task
+from copal_cli.memory.models import EdgeType, Memory, MemoryType, Relationship
+from copal_cli.memory.scope import ScopeManager
+from copal_cli.memory.sqlite_store import SQLiteMemoryStore
+
+NOW = datetime.now(timezone.utc)
+
+
+def _store(tmp_path):
+    config = {"backend": "sqlite"}
+    return SQLiteMemoryStore(
+        target_root=tmp_path,
+        db_path=tmp_path / ".copal" / "memory.db",
+        config=config,
+        scope_manager=ScopeManager.from_config(tmp_path, config),
+    )
+
+
+def _memory(memory_id, content, memory_type=MemoryType.NOTE, **fields):
+    fields.setdefault("scope", "p")
+    return Memory(id=memory_id, type=memory_type, content=content, **fields)
+
+
+def _write_todo(tmp_path, items):
+    path = tmp_path / ".copal" / "artifacts" / "todo.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"items": items}))
+
+
+def _seed(store):
+    store.upsert_many(
+        [
+            _memory("s-old", "first session", MemoryType.EXPERIENCE,
+                    metadata={"type": "session_summary"}, created_at=NOW - timedelta(days=2)),
+            _memory("s-new", "second session", MemoryType.EXPERIENCE,
+                    metadata={"type": "session_summary"}, created_at=NOW - timedelta(days=1)),
+            _memory("d1", "Use PostgreSQL for storage", MemoryType.DECISION, importance=0.9),
+            _memory("d1-copy", "use postgresql for storage", MemoryType.DECISION, importance=0.8),
+            _memory("pref", "Prefer small commits", MemoryType.PREFERENCE, importance=0.6),
+            _memory("t1", "login form needs rate limiting", metadata={"task_id": "7"}),
+            _memory("linked", "rate limiter lives in middleware"),
+            _memory("huge", "x " * 4000, MemoryType.DECISION, importance=1.0),
+            _memory("noise", "unrelated note"),
+        ],
+        [Relationship(id="r1", source_id="t1", target_id="linked", type=EdgeType.RELATES_TO, scope="p")],
+    )
+
+
+def test_builder_selects_by_relevance_per_token_and_dedupes(tmp_path):
+    store = _store(tmp_path)
+    _seed(store)
+    builder = ContextPackBuilder(store, {})
+    pack = builder.build("p", budget=400, task={"id": "7", "action": "Add login throttling"})
+
+    sections = {name: [e.memory.id for e in entries] for name, entries in pack.sections().items()}
+    assert sections["task"] == ["t1"]
+    assert sections["related"] == ["linked"]
+    assert set(sections["sessions"]) == {"s-old", "s-new"}
+    # The near-duplicate and the oversized decision are left out.
+    assert "pref" in sections["decisions"]
+    assert len({"d1", "d1-copy"} & set(sections["decisions"])) == 1
+    assert "huge" not in sections["decisions"]
+    assert "noise" not in {e.memory.id for e in pack.entries}
+    assert pack.tokens <= 400
+
+    markdown = pack.to_markdown()
+    assert markdown.index("first session") < markdown.index("second session")
+    assert "**7**: Add login throttling" in markdown
+
+    tight = builder.build("p", budget=20)
+    assert tight.tokens <= 20
+    assert len(tight.entries) < len(pack.entries)
+    store.close()
+
+
+def test_load_active_task(tmp_path):
+    assert load_active_task(tmp_path) is None
+    _write_todo(tmp_path, [{"id": 1, "status": "done"}, {"id": 2, "status": "in_progress", "action": "x"}])
+    assert load_active_task(tmp_path)["id"] == 2
+    assert load_active_task(tmp_path, "1")["id"] == 1
+    assert load_active_task(tmp_path, "9") is None
+
+
+def test_context_command_caches_until_memories_change(tmp_path, capsys, monkeypatch):
+    store = _store(tmp_path)
+    _seed(store)
+    store.close()
+    _write_todo(tmp_path, [{"id": "7", "status": "in_progress", "action": "Add login throttling"}])
+
+    assert context_command(target=str(tmp_path), fmt="json", scope="p") == 0
+    first = json.loads(capsys.readouterr().out)
+    assert first["task"]["id"] == "7"
+    assert first["tokens"] <= 4000
+
+    builds = []
+    original = ContextPackBuilder.build
+    monkeypatch.setattr(ContextPackBuilder, "build", lambda self, *a, **kw: builds.append(1) or original(self, *a, **kw))
+
+    assert context_command(target=str(tmp_path), fmt="json", scope="p") == 0
+    assert json.loads(capsys.readouterr().out) == first
+    assert builds == []
+
+    store = _store(tmp_path)
+    store.add_memory(_memory("d2", "Adopt Redis for sessions", MemoryType.DECISION, importance=0.9))
+    store.close()
+    assert context_command(target=str(tmp_path), fmt="json", scope="p") == 0
+    second = json.loads(capsys.readouterr().out)
+    assert builds == [1]
+    assert "d2" in {row["id"] for row in second["sections"]["decisions"]}
+
+    assert context_command(target=str(tmp_path), task_id="missing") == 1
@@ -0,0 +1,85 @@
+import json
+
+from copal_cli.memory.json_store import JsonMemoryStore
+from copal_cli.memory.models import Memory, MemoryType
+from copal_cli.memory.scope import ScopeManager
+
+
+def _store(tmp_path, **config):
+    config = {"backend": "json", **config}
+    return JsonMemoryStore(tmp_path, config, ScopeManager.from_config(tmp_path, config))
+
+
+def _note(memory_id, content="note"):
+    return Memory(id=memory_id, type=MemoryType.DECISION, content=content, scope="proj")
+
+
+def test_writes_append_to_journal_without_rewriting_index(tmp_path):
+    store = _store(tmp_path)
+    index_before = store.index_file.read_text()
+
+    store.add_memory(_note("a"))
+    store.update_memory("a", content="changed")
+    store.add_memory(_note("b"))
+    store.delete_memory("b")
+
+    assert store.index_file.read_text() == index_before
+    ops = [json.loads(line)["op"] for line in store.journal_file.read_text().splitlines()]
+    assert ops == ["put", "put", "put", "delete"]
+
+    reopened = _store(tmp_path)
+    assert [m.content for m in reopened.list_memories(scope="proj")] == ["changed"]
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    store = _store(tmp_path, journal_compact_bytes=600)
+    for i in range(10):
+        store.add_memory(_note(f"m{i}", content="x" * 20))
+    store.delete_memory("m0")
+
+    assert store.journal_file.stat().st_size < 600
+    snapshot_ids = {m["id"] for m in json.loads(store.index_file.read_text())["memories"]}
+    assert snapshot_ids  # at least one compaction happened
+    assert {m.id for m in store.list_memories()} == {f"m{i}" for i in range(1, 10)}
+
+    store.compact()
+    assert store.journal_file.read_bytes() == b""
+    assert {m.id for m in _store(tmp_path).list_memories()} == {f"m{i}" for i in range(1, 10)}
+
+
+def test_instances_see_each_others_writes(tmp_path):
+    writer = _store(tmp_path)
+    reader = _store(tmp_path)
+
+    writer.add_memory(_note("shared", content="v1"))
+    assert reader.get_memory("shared").content == "v1"
+
+    writer.update_memory("shared", content="v2")
+    writer.compact()
+    assert reader.get_memory("shared").content == "v2"
+    reader.delete_memory("shared")
+    assert writer.get_memory("shared") is None
+
+
+def test_task_branch_memories_update_and_delete_in_their_scope(tmp_path):
+    store = _store(tmp_path)
+    store.add_memory(Memory(id="t", type=MemoryType.NOTE, content="draft", scope="task:7"))
+
+    assert store.update_memory("t", scope="proj", content="wrong scope") is None
+    assert store.update_memory("t", scope="task:7", content="final").content == "final"
+    assert not store.delete_memory("t", scope="proj")
+    assert store.delete_memory("t", scope="task:7")
+    assert _store(tmp_path).get_memory("t") is None
+
+
+def test_torn_journal_tail_is_ignored_and_repaired(tmp_path):
+    store = _store(tmp_path)
+    store.add_memory(_note("ok"))
+    with open(store.journal_file, "ab") as f:
+        f.write(b'{"op":"put","id":"torn","mem')
+
+    recovered = _store(tmp_path)
+    assert recovered.get_memory("torn") is None
+    recovered.add_memory(_note("after"))
+
+    assert {m.id for m in _store(tmp_path).list_memories()} == {"ok", "after"}
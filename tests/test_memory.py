@@ -86,3 +86,147 @@ def test_relationships_sqlite_only(tmp_path):
     assert rels[0].target_id == "r2"
     # scope filter should hide if mismatched
     assert store.list_relationships("r1", scope="other") == []
+
+
+def test_sqlite_store_uses_persistent_wal_connection(tmp_path):
+    config = {"backend": "sqlite", "sqlite": {"busy_timeout_ms": 1234}}
+    store = SQLiteMemoryStore(
+        target_root=tmp_path,
+        db_path=tmp_path / ".copal" / "memory.db",
+        config=config,
+        scope_manager=ScopeManager.from_config(tmp_path, config),
+    )
+    store.add_memory(Memory(id="w1", type=MemoryType.NOTE, content="wal", scope="project"))
+
+    with store._get_connection() as first, store._get_connection() as second:
+        assert first is second
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert first.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+
+    store.close()
+    assert store._conn is None
+    # The connection is reopened transparently after close().
+    assert store.get_memory("w1") is not None
+    store.close()
+
+
+def _sqlite_store(tmp_path, config=None):
+    config = config or {"backend": "sqlite"}
+    return SQLiteMemoryStore(
+        target_root=tmp_path,
+        db_path=tmp_path / ".copal" / "memory.db",
+        config=config,
+        scope_manager=ScopeManager.from_config(tmp_path, config),
+    )
+
+
+def test_sqlite_fts_ranks_and_indexes_metadata(tmp_path):
+    store = _sqlite_store(tmp_path)
+    store.add_memory(Memory(id="a", type=MemoryType.NOTE, content="cache layer notes", scope="p"))
+    store.add_memory(Memory(id="b", type=MemoryType.NOTE, content="cache cache cache", scope="p"))
+    store.add_memory(
+        Memory(id="c", type=MemoryType.NOTE, content="unrelated", scope="p", metadata={"topic": "cache policy"})
+    )
+
+    assert [m.id for m in store.search_memories("cache", scope="p")] == ["b", "a", "c"]
+    assert [m.id for m in store.search_memories("cache", scope="p", limit=1)] == ["b"]
+
+    assert {m.id for m in store.search_memories("layer OR unrelated", scope="p")} == {"a", "c"}
+
+    store.update_memory("b", content="nothing relevant")
+    store.delete_memory("a")
+    assert [m.id for m in store.search_memories("cache", scope="p")] == ["c"]
+    store.close()
+
+
+def test_sqlite_fts_backfills_existing_database(tmp_path):
+    store = _sqlite_store(tmp_path)
+    store.add_memory(Memory(id="old", type=MemoryType.DECISION, content="Adopt WAL mode", scope="p"))
+    with store._get_connection() as conn:
+        conn.executescript(
+            "DROP TRIGGER memories_fts_ai; DROP TRIGGER memories_fts_ad; "
+            "DROP TRIGGER memories_fts_au; DROP TABLE memories_fts;"
+        )
+    store.close()
+
+    reopened = _sqlite_store(tmp_path)
+    assert [m.id for m in reopened.search_memories("wal")] == ["old"]
+    reopened.close()
+
+
+def test_sqlite_search_falls_back_without_fts(tmp_path):
+    store = _sqlite_store(tmp_path)
+    store._fts_enabled = False
+    store.add_memory(Memory(id="x", type=MemoryType.NOTE, content="Substring match", scope="p"))
+    store.add_memory(Memory(id="y", type=MemoryType.NOTE, content="other", scope="p", metadata={"k": "stringy"}))
+
+    assert {m.id for m in store.search_memories("string", scope="p")} == {"x", "y"}
+    store.close()
+
+
+def test_batch_write_and_delete(memory_store):
+    added = memory_store.add_memories(
+        Memory(id=f"b{i}", type=MemoryType.NOTE, content=f"batch {i}", scope="project") for i in range(5)
+    )
+    assert [m.id for m in added] == [f"b{i}" for i in range(5)]
+    assert len(memory_store.list_memories(scope="project")) == 5
+
+    replaced = Memory(id="b0", type=MemoryType.DECISION, content="replaced", scope="project")
+    assert memory_store.upsert_many([replaced]) == 1
+    assert memory_store.get_memory("b0").content == "replaced"
+    assert len(memory_store.list_memories(scope="project")) == 5
+
+    assert memory_store.delete_many(["b1", "b2", "missing"]) == 2
+    assert {m.id for m in memory_store.list_memories(scope="project")} == {"b0", "b3", "b4"}
+
+
+def test_sqlite_batch_is_one_transaction(tmp_path):
+    store = _sqlite_store(tmp_path)
+    memories = [Memory(id=f"t{i}", type=MemoryType.NOTE, content="x", scope="p") for i in range(3)]
+    bad = Relationship(id="r", source_id="t0", target_id="t1", type=EdgeType.RELATES_TO, scope="p")
+    bad.metadata = {"unserialisable": object()}
+
+    with pytest.raises(TypeError):
+        store.add_memories(memories, [bad])
+    assert store.list_memories(scope="p") == []
+    store.close()
+
+
+def _stored_access_count(tmp_path, memory_id):
+    import sqlite3
+
+    conn = sqlite3.connect(tmp_path / ".copal" / "memory.db")
+    try:
+        return conn.execute("SELECT access_count FROM memories WHERE id = ?", (memory_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_sqlite_get_memory_buffers_access_stats(tmp_path):
+    store = _sqlite_store(tmp_path, {"backend": "sqlite", "access_flush_threshold": 3})
+    store.add_memory(Memory(id="hot", type=MemoryType.NOTE, content="read me", scope="p"))
+    baseline = _stored_access_count(tmp_path, "hot")
+
+    first = store.get_memory("hot")
+    second = store.get_memory("hot")
+    assert second.access_count == first.access_count + 1
+    assert _stored_access_count(tmp_path, "hot") == baseline
+
+    store.get_memory("hot")  # third read reaches the flush threshold
+    assert _stored_access_count(tmp_path, "hot") == baseline + 3
+
+    store.get_memory("hot")
+    updated = store.update_memory("hot", content="changed")
+    store.close()
+    # update_memory persists the buffered read itself; close() must not add it twice.
+    assert _stored_access_count(tmp_path, "hot") == updated.access_count == baseline + 5
+
+
+def test_sqlite_access_tracking_can_be_disabled(tmp_path):
+    store = _sqlite_store(tmp_path, {"backend": "sqlite", "track_access": False})
+    store.add_memory(Memory(id="cold", type=MemoryType.NOTE, content="x", scope="p"))
+    baseline = _stored_access_count(tmp_path, "cold")
+    for _ in range(5):
+        assert store.get_memory("cold").access_count == baseline
+    store.close()
+    assert _stored_access_count(tmp_path, "cold") == baseline
@@ -0,0 +1,137 @@
+import json
+import sqlite3
+from argparse import Namespace
+
+import pytest
+
+from copal_cli.memory.branch_manager import BranchManager
+from copal_cli.memory.branches import BranchExistsError, UnknownBranchError
+from copal_cli.memory.cli_commands import memory_branch_list_command, memory_branch_merge_command
+from copal_cli.memory.factory import close_stores, open_store
+from copal_cli.memory.migrations import MIGRATIONS
+from copal_cli.memory.models import EdgeType, Memory, MemoryType, Relationship
+
+KINDS = ["sqlite", "graph", "graph-lazy", "json"]
+
+
+def _store(kind, tmp_path):
+    config = {"backend": kind.split("-")[0]}
+    if kind == "graph-lazy":
+        config["graph"] = {"lazy": True}
+    return open_store(tmp_path, config, pooled=False)
+
+
+def _memory(memory_id, memory_type=MemoryType.NOTE, scope="task:42", content=None):
+    return Memory(id=memory_id, type=memory_type, content=content or f"about {memory_id}", scope=scope)
+
+
+def _ids(memories):
+    return sorted(memory.id for memory in memories)
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_create_list_and_merge(kind, tmp_path):
+    store = _store(kind, tmp_path)
+    branch = store.create_branch("42", "login throttling")
+    assert branch.scope == "task:42"
+    with pytest.raises(BranchExistsError):
+        store.create_branch("42")
+
+    store.add_memories(
+        [_memory("d1", MemoryType.DECISION), _memory("n1"), _memory("other", scope="task:7")],
+        [Relationship(id="r", source_id="d1", target_id="n1", type=EdgeType.RELATES_TO, scope="task:42")],
+    )
+    # Writing into a new task scope registers its branch.
+    listed = {branch.task_id: branch for branch in store.list_branches()}
+    assert set(listed) == {"42", "7"}
+    assert (listed["42"].description, listed["42"].memories) == ("login throttling", 2)
+
+    promoted = store.merge_branch("42", target_scope="proj", types=[MemoryType.DECISION])
+    assert _ids(promoted) == ["d1"]
+    assert _ids(store.list_memories(scope="proj")) == ["d1"]
+    assert _ids(store.list_memories(scope="task:42")) == ["n1"]
+    assert store.list_branches(status="merged") == []
+    if kind != "json":
+        assert [rel.scope for rel in store.list_relationships("d1", scope="proj")] == ["proj"]
+
+    store.merge_branch("42", target_scope="proj", memory_ids=["n1"])
+    [merged] = store.list_branches(status="merged")
+    assert (merged.task_id, merged.memories) == ("42", 0)
+    assert merged.merged_at is not None
+    with pytest.raises(UnknownBranchError):
+        store.merge_branch("missing", target_scope="proj")
+    store.close()
+
+    # Branches and promoted memories survive a reopen.
+    store = _store(kind, tmp_path)
+    assert _ids(store.list_memories(scope="proj")) == ["d1", "n1"]
+    assert [branch.status for branch in store.list_branches()] == ["active", "merged"]
+    store.close()
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_merge_into_scope_holding_same_content(kind, tmp_path):
+    store = _store(kind, tmp_path)
+    store.add_memory(_memory("p1", scope="proj", content="Use ruff"))
+    store.add_memory(_memory("t1", content="Use ruff"))
+    assert _ids(store.merge_branch("42", target_scope="proj")) == ["t1"]
+    # Both copies are kept; compaction merges them later.
+    assert _ids(store.list_memories(scope="proj")) == ["p1", "t1"]
+    store.close()
+
+
+def test_json_store_imports_legacy_branch_files(tmp_path):
+    legacy = BranchManager(tmp_path / ".copal" / "memory")
+    legacy.create_branch("9", "old task")
+    legacy.add_memory_to_branch("9", _memory("old", scope="task:9"))
+
+    store = _store("json", tmp_path)
+    [branch] = store.list_branches()
+    assert (branch.task_id, branch.description, branch.memories) == ("9", "old task", 1)
+    assert store.get_memory("old").scope == "task:9"
+    assert not (legacy.branches_dir / "9" / "memories.json").exists()
+    store.close()
+
+
+def test_migration_registers_existing_task_scopes(tmp_path):
+    path = tmp_path / ".copal" / "memory.db"
+    path.parent.mkdir(parents=True)
+    conn = sqlite3.connect(path)
+    for migration in MIGRATIONS[:5]:
+        migration(conn)
+    conn.execute("PRAGMA user_version = 5")
+    conn.execute(
+        "INSERT INTO memories (id, type, content, scope, created_at, importance, access_count) "
+        "VALUES ('m', 'note', 'x', 'task:3', '2025-01-01T00:00:00.000000Z', 0.5, 0)"
+    )
+    conn.commit()
+    conn.close()
+
+    store = _store("sqlite", tmp_path)
+    [branch] = store.list_branches()
+    assert (branch.task_id, branch.memories) == ("3", 1)
+    with store._get_connection() as conn:
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT count(*) FROM memories WHERE scope = ? AND valid_until IS NULL", ("task:3",)
+        ))
+    assert "USING INDEX" in plan or "USING COVERING INDEX" in plan
+    store.close()
+
+
+def test_branch_commands(tmp_path, capsys):
+    (tmp_path / ".copal").mkdir()
+    (tmp_path / ".copal" / "config.json").write_text(json.dumps({"memory": {"scope": "proj"}}))
+    store = open_store(tmp_path)
+    store.add_memory(_memory("d1", MemoryType.DECISION))
+    store.close()
+
+    assert memory_branch_list_command(Namespace(target=str(tmp_path), status=None)) == 0
+    assert "42" in capsys.readouterr().out
+    args = Namespace(target=str(tmp_path), task_id="42", scope=None, memory_ids=None, types=None)
+    assert memory_branch_merge_command(args) == 0
+    assert "Merged 1 memories" in capsys.readouterr().out
+    assert memory_branch_merge_command(Namespace(**{**vars(args), "task_id": "nope"})) == 1
+    store = open_store(tmp_path)
+    assert store.get_memory("d1").scope == "proj"
+    store.close()
+    close_stores()
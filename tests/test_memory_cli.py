@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import MagicMock, patch
 from argparse import Namespace
@@ -8,6 +9,8 @@ from copal_cli.memory.cli_commands import (
     memory_search_command,
     memory_update_command,
     memory_delete_command,
+    memory_import_command,
+    memory_related_command,
     _build_context
 )
 from copal_cli.memory.models import Memory, MemoryType
@@ -23,7 +26,7 @@ def mock_context(mock_store):
     with patch("copal_cli.memory.cli_commands.load_memory_config") as mock_load, \
          patch("copal_cli.memory.cli_commands.is_memory_enabled") as mock_enabled, \
          patch("copal_cli.memory.cli_commands.ScopeManager") as MockScopeManager, \
-         patch("copal_cli.memory.cli_commands.JsonMemoryStore", return_value=mock_store):
+         patch("copal_cli.memory.cli_commands.open_store", return_value=mock_store):
          
         mock_load.return_value = {"enabled": True, "backend": "json"}
         mock_enabled.return_value = True
@@ -41,6 +44,7 @@ def test_add_command(tmp_path, mock_context, mock_store, capsys):
         content="test content",
         importance="0.8"
     )
+    mock_store.add_memory.side_effect = lambda memory, **kwargs: memory
     
     ret = memory_add_command(args)
     assert ret == 0
@@ -88,6 +92,24 @@ def test_search_command(tmp_path, mock_context, mock_store, capsys):
     assert "m1" in out
     assert "note" in out or "match" in out
 
+def test_search_command_top_uses_ranking(tmp_path, mock_context, mock_store, capsys):
+    mock_store.rank_memories.return_value = [
+        Memory(id="m1", type=MemoryType.NOTE, content="match", scope="project")
+    ]
+    args = Namespace(target=str(tmp_path), scope=None, query="match", types=None, top=3)
+    assert memory_search_command(args) == 0
+    mock_store.rank_memories.assert_called_once_with("match", scope="project", types=None, limit=3)
+    mock_store.search_memories.assert_not_called()
+    assert "m1" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("paging", [{"limit": 5}, {"after": "m1"}])
+def test_search_command_top_is_not_paged(tmp_path, mock_context, mock_store, capsys, paging):
+    args = Namespace(target=str(tmp_path), scope=None, query="match", types=None, top=3, **paging)
+    assert memory_search_command(args) == 2
+    mock_store.rank_memories.assert_not_called()
+    assert "cannot be combined" in capsys.readouterr().out
+
 def test_update_command(tmp_path, mock_context, mock_store, capsys):
     mock_store.update_memory.return_value = Memory(id="m1", type=MemoryType.NOTE, content="new", scope="project")
     
@@ -119,3 +141,65 @@ def test_context_disabled(tmp_path, capsys):
         ctx = _build_context(args)
         assert ctx is None
         assert "disabled" in capsys.readouterr().out
+
+def test_import_command_streams_batches(tmp_path, mock_context, mock_store, capsys):
+    source = tmp_path / "history.ndjson"
+    lines = [
+        json.dumps({"id": f"m{i}", "type": "note", "content": f"c{i}"}) for i in range(3)
+    ]
+    lines.append(json.dumps({"source_id": "m0", "target_id": "m1", "type": "relates_to"}))
+    lines.append("{not json")
+    source.write_text("\n".join(lines) + "\n")
+
+    args = Namespace(target=str(tmp_path), scope=None, file=str(source), batch_size=2)
+    assert memory_import_command(args) == 0
+
+    assert mock_store.upsert_many.call_count == 2
+    first_memories, first_rels = mock_store.upsert_many.call_args_list[0][0]
+    assert [m.id for m in first_memories] == ["m0", "m1"]
+    out = capsys.readouterr().out
+    assert "Imported 4 records" in out
+    assert "Skipped 1 invalid lines (5)" in out
+
+
+def test_related_command_modes(tmp_path, mock_context, mock_store, capsys):
+    start = Memory(id="m1", type=MemoryType.NOTE, content="start", scope="project")
+    newer = Memory(id="m2", type=MemoryType.NOTE, content="newer", scope="project")
+    mock_store.get_memory.return_value = start
+    mock_store.related_memories.return_value = [(newer, 1)]
+    mock_store.latest_version.return_value = newer
+
+    base = dict(target=str(tmp_path), scope=None, memory_id="m1", depth=2, edge_types=["supersedes"],
+                direction="both", path_to=None, latest=False, chain=False)
+    assert memory_related_command(Namespace(**base)) == 0
+    assert mock_store.related_memories.call_args.kwargs["depth"] == 2
+    assert "m2" in capsys.readouterr().out
+
+    assert memory_related_command(Namespace(**{**base, "latest": True})) == 0
+    assert "superseded by m2" in capsys.readouterr().out
+
+    mock_store.find_path.return_value = None
+    assert memory_related_command(Namespace(**{**base, "path_to": "m9"})) == 0
+    assert "No path" in capsys.readouterr().out
+
+
+def test_list_command_pages_and_streams_jsonl(tmp_path, mock_context, mock_store, capsys):
+    memories = [Memory(id=f"m{i}", type=MemoryType.NOTE, content=f"c{i}", scope="project") for i in range(3)]
+    mock_store.list_memories.return_value = memories
+    args = Namespace(target=str(tmp_path), scope=None, types=None, limit=2, after="m0", format="table")
+    assert memory_list_command(args) == 0
+    mock_store.list_memories.assert_called_once_with(scope="project", types=None, limit=3, after="m0", where=None)
+    assert "--after m1" in capsys.readouterr().out
+
+    mock_store.iter_memories.return_value = iter(memories)
+    args.format = "jsonl"
+    assert memory_list_command(args) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["m0", "m1"]
+
+    args.where = ["topic=ci", "bad key=x"]
+    assert memory_list_command(args) == 1
+    assert "Invalid metadata key" in capsys.readouterr().out
+    args.where = ["topic"]
+    assert memory_list_command(args) == 1
+    assert "expected key=value" in capsys.readouterr().out
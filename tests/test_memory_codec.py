@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from copal_cli.memory import codec
+from copal_cli.memory.models import Memory, MemoryType, _deserialize_datetime, _serialize_datetime
+
+
+@pytest.fixture(params=["default", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(codec, "orjson", None)
+    return request.param
+
+
+def test_round_trip(backend):
+    value = {"topic": "ci", "nested": {"tags": ["a", "b"]}, "n": 1.5, "flag": True, "none": None}
+    assert codec.loads(codec.dumps(value)) == value
+    assert codec.loads(codec.dumpb(value)) == value
+    assert codec.dumps({"a": 1}) == '{"a":1}'
+    # Keys and oversized integers behave like the json module.
+    assert codec.loads(codec.dumps({1: 2**70})) == {"1": 2**70}
+    with pytest.raises(ValueError):
+        codec.loads("{not json")
+
+
+def test_datetimes_round_trip():
+    moment = datetime(2025, 1, 13, 9, 30, 5, 123456, tzinfo=timezone.utc)
+    text = _serialize_datetime(moment)
+    assert text == "2025-01-13T09:30:05.123456Z"
+    assert _deserialize_datetime(text) == moment.replace(tzinfo=None)
+    assert _deserialize_datetime("2025-01-13T09:30:05Z") == datetime(2025, 1, 13, 9, 30, 5)
+    assert _deserialize_datetime("2025-01-13T09:30:05") == datetime(2025, 1, 13, 9, 30, 5)
+
+    memory = Memory(id="m", type=MemoryType.NOTE, content="x", scope="p", valid_from=moment)
+    restored = Memory.from_dict(codec.loads(codec.dumps(memory.to_dict())))
+    assert restored.valid_from == moment.replace(tzinfo=None)
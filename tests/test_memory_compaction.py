@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from copal_cli.memory.compaction import MemoryCompactor, period_end, period_key
+from copal_cli.memory.json_store import JsonMemoryStore
+from copal_cli.memory.models import EdgeType, Memory, MemoryType, Relationship, content_hash
+from copal_cli.memory.networkx_store import NetworkXMemoryStore, SQLiteMemoryPersistence
+from copal_cli.memory.sqlite_store import SQLiteMemoryStore
+
+NOW = datetime(2025, 3, 20, 12, 0, tzinfo=timezone.utc)
+
+
+def _session(memory_id, when, task="1"):
+    return Memory(
+        id=memory_id,
+        type=MemoryType.EXPERIENCE,
+        content=f"worked on {memory_id}",
+        scope="p",
+        metadata={"type": "session_summary", "task_id": task},
+        created_at=when,
+        updated_at=when,
+        importance=0.8,
+    )
+
+
+def test_periods():
+    monday = datetime(2025, 1, 13, 9, tzinfo=timezone.utc)
+    assert period_key(monday, "week") == "2025-W03"
+    assert period_end(monday + timedelta(days=6), "week") == datetime(2025, 1, 20, tzinfo=timezone.utc)
+    assert period_key(monday, "month") == "2025-01"
+    assert period_end(datetime(2024, 12, 31, tzinfo=timezone.utc), "month") == datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert content_hash("a  b\n") == content_hash("a b")
+
+
+def test_session_digests_archive_originals(open_kind):
+    store = open_kind("sqlite")
+    store.upsert_many(
+        [
+            _session("w1-a", datetime(2025, 1, 13, 9, tzinfo=timezone.utc)),
+            _session("w1-b", datetime(2025, 1, 15, 9, tzinfo=timezone.utc), task="2"),
+            _session("w2-a", datetime(2025, 1, 21, 9, tzinfo=timezone.utc)),
+            _session("recent", NOW - timedelta(days=2)),
+        ]
+    )
+    report = MemoryCompactor(store, older_than_days=30, now=NOW).run("p", vacuum=False)
+    assert (report.digests, report.sessions_archived) == (2, 3)
+
+    digest = store.get_memory("digest-p-2025-W03")
+    assert digest.metadata == {
+        "type": "session_digest",
+        "period": "2025-W03",
+        "sessions": 2,
+        "task_ids": ["1", "2"],
+    }
+    assert digest.content.splitlines()[1:] == [
+        "- [2025-01-13 09:00] Task 1: worked on w1-a",
+        "- [2025-01-15 09:00] Task 2: worked on w1-b",
+    ]
+    superseded = {rel.target_id for rel in store.list_relationships(digest.id) if rel.type == EdgeType.SUPERSEDES}
+    assert superseded == {"w1-a", "w1-b"}
+    assert store.get_memory("w1-a").valid_until is not None
+    assert store.get_memory("recent").valid_until is None
+
+    # Already digested periods are left alone on the next run.
+    again = MemoryCompactor(store, older_than_days=30, now=NOW).run("p", vacuum=False)
+    assert (again.digests, again.sessions_archived) == (0, 0)
+
+    # A session backdated into a digested period extends the digest without
+    # counting as a read of it.
+    accesses = store.get_many([digest.id])[0].access_count
+    store.upsert_many([_session("w1-c", datetime(2025, 1, 16, 9, tzinfo=timezone.utc))])
+    late = MemoryCompactor(store, older_than_days=30, now=NOW).run("p", vacuum=False)
+    assert (late.digests, late.sessions_archived) == (1, 1)
+    [extended] = store.get_many([digest.id])
+    assert extended.metadata["sessions"] == 3
+    assert extended.access_count == accesses
+
+    pruned = MemoryCompactor(store, older_than_days=30, now=NOW).run("p", prune=True)
+    assert pruned.sessions_pruned == 4
+    assert store.get_memory("w1-a") is None
+    assert store.get_memory("digest-p-2025-W03") is not None
+    store.close()
+
+
+def test_deduplicate_merges_identical_content(store, store_kind):
+    note = dict(type=MemoryType.NOTE, scope="p")
+    store.upsert_many(
+        [
+            Memory(id="a", content="Use  ruff", importance=0.3, access_count=2, **note),
+            Memory(id="b", content="Use ruff\n", importance=0.9, access_count=3, metadata={"src": "b"}, **note),
+            Memory(id="c", content="Use ruff", type=MemoryType.DECISION, scope="p"),
+            Memory(id="other", content="unrelated", **note),
+        ]
+    )
+    if store_kind != "json":
+        store.upsert_many([], [Relationship(id="r", source_id="other", target_id="b",
+                                            type=EdgeType.RELATES_TO, scope="p")])
+
+    report = MemoryCompactor(store, now=NOW).run("p")
+    assert report.duplicates_merged == 1
+    assert store.get_memory("b") is None
+    kept = store.get_memory("a")
+    assert kept.importance == 0.9
+    assert kept.metadata == {"src": "b"}
+    assert store.get_memory("c") is not None
+    if store_kind != "json":
+        assert [rel.target_id for rel in store.list_relationships("other", scope="p")] == ["a"]
+
+
+# Where each backend writes its rows; failing there aborts the whole batch.
+_WRITES = {
+    "sqlite": (SQLiteMemoryStore, "_write_rows"),
+    "graph": (SQLiteMemoryPersistence, "_write"),
+    "json": (JsonMemoryStore, "_append_locked"),
+}
+
+
+def test_failed_deduplicate_loses_nothing(store, store_kind):
+    note = dict(type=MemoryType.NOTE, scope="p")
+    store.upsert_many([Memory(id="a", content="same", access_count=1, **note),
+                       Memory(id="b", content="same", access_count=2, **note),
+                       Memory(id="other", content="unrelated", **note)])
+    if store_kind != "json":
+        store.upsert_many([], [Relationship(id="r", source_id="other", target_id="b",
+                                            type=EdgeType.RELATES_TO, scope="p")])
+
+    with patch.object(*_WRITES[store_kind], side_effect=OSError("disk full")), pytest.raises(OSError):
+        MemoryCompactor(store, now=NOW).run("p", vacuum=False)
+    assert [m.access_count for m in store.get_many(["a", "b"])] == [1, 2]
+    if store_kind != "json":
+        assert [rel.target_id for rel in store.list_relationships("other", scope="p")] == ["b"]
+
+    assert MemoryCompactor(store, now=NOW).run("p", vacuum=False).duplicates_merged == 1
+    assert [m.access_count for m in store.get_many(["a", "b"])] == [3]
+
+
+def test_failed_prune_keeps_sessions_out_of_the_digest(open_kind):
+    store = open_kind("sqlite")
+    store.upsert_many([_session("w1-a", datetime(2025, 1, 13, 9, tzinfo=timezone.utc))])
+    with patch.object(SQLiteMemoryStore, "_write_rows", side_effect=OSError("disk full")), pytest.raises(OSError):
+        MemoryCompactor(store, older_than_days=30, now=NOW).run("p", prune=True, vacuum=False)
+    assert store.get_many(["digest-p-2025-W03"]) == []
+
+    report = MemoryCompactor(store, older_than_days=30, now=NOW).run("p", prune=True, vacuum=False)
+    assert (report.digests, report.sessions_pruned) == (1, 1)
+    assert store.get_many(["digest-p-2025-W03"])[0].metadata["sessions"] == 1
+    store.close()
+
+
+def test_vacuum_reclaims_space_and_purges_dangling_edges(open_kind):
+    store = open_kind("sqlite")
+    store.upsert_many(
+        [Memory(id=f"m{i}", type=MemoryType.NOTE, content="x" * 2000, scope="p") for i in range(200)],
+        [Relationship(id="r", source_id="m0", target_id="m1", type=EdgeType.RELATES_TO, scope="p")],
+    )
+    store.delete_many([f"m{i}" for i in range(1, 200)])
+    with store._get_connection() as conn:
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    assert store.vacuum() >= (free_pages - 1) * page_size > page_size
+    with store._get_connection() as conn:
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        assert conn.execute("SELECT count(*) FROM relationships").fetchone()[0] == 0
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    store.close()
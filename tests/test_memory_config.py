@@ -6,6 +6,7 @@ from copal_cli.memory.config import (
     resolve_database_path,
     is_memory_enabled,
     is_auto_capture_enabled,
+    is_access_tracking_enabled,
     DEFAULT_CONFIG,
 )
 
@@ -36,6 +37,7 @@ def test_resolve_database_path_default(tmp_path):
     db_path = resolve_database_path(tmp_path, cfg)
     assert db_path == tmp_path / ".copal/memory.db"
     assert db_path.parent.exists()
+    assert resolve_database_path(tmp_path, {**cfg, "backend": "graph"}) == tmp_path / ".copal/memory-graph.db"
 
 def test_resolve_database_path_absolute(tmp_path):
     abs_path = tmp_path / "abs" / "db.sqlite"
@@ -52,3 +54,7 @@ def test_is_memory_enabled():
 def test_is_auto_capture_enabled():
     assert is_auto_capture_enabled({"auto_capture": True}) is True
     assert is_auto_capture_enabled({"auto_capture": False}) is False
+
+def test_is_access_tracking_enabled():
+    assert is_access_tracking_enabled({}) is True
+    assert is_access_tracking_enabled({"track_access": False}) is False
@@ -0,0 +1,114 @@
+import sqlite3
+from argparse import Namespace
+
+import pytest
+
+from copal_cli.memory.cli_commands import memory_add_command
+from copal_cli.memory.dedupe import IMPORTANCE_BUMP, DuplicateMemoryError, dedupe_policy
+from copal_cli.memory.migrations import MIGRATIONS
+from copal_cli.memory.models import EdgeType, Memory, MemoryType, Relationship
+
+def _note(memory_id, content="Use ruff for linting", **fields):
+    return Memory(id=memory_id, type=MemoryType.DECISION, content=content, scope="p", **fields)
+
+
+def _ids(store):
+    return sorted(memory.id for memory in store.list_memories(scope="p"))
+
+
+def test_off_keeps_copies(store):
+    store.add_memory(_note("a"))
+    store.add_memory(_note("b"))
+    assert _ids(store) == ["a", "b"]
+    # Only the first copy is indexed.
+    assert store.find_duplicate(_note("c")).id == "a"
+
+
+@pytest.mark.parametrize("store_config", [{"dedupe": "reject"}])
+def test_reject_raises_without_writing(store):
+    store.add_memory(_note("a"))
+    with pytest.raises(DuplicateMemoryError) as excinfo:
+        store.add_memory(_note("b", content="  Use ruff\nfor linting "))
+    assert excinfo.value.existing.id == "a"
+    # Other types and scopes do not collide.
+    store.add_memory(Memory(id="c", type=MemoryType.NOTE, content="Use ruff for linting", scope="p"))
+    store.add_memory(Memory(id="d", type=MemoryType.DECISION, content="Use ruff for linting", scope="q"))
+    assert _ids(store) == ["a", "c"]
+
+
+def test_merge_folds_metadata_into_stored_memory(store, store_kind):
+    store.add_memory(_note("a", metadata={"source": "review"}, importance=0.4))
+    stored = store.add_memory(_note("b", metadata={"ticket": "7"}, importance=0.7), dedupe="merge")
+    assert stored.id == "a"
+    assert _ids(store) == ["a"]
+    kept = store.get_many(["a"])[0]
+    assert kept.metadata == {"source": "review", "ticket": "7"}
+    assert kept.importance == 0.7
+
+    # Duplicates within one batch collapse too, and edges follow the survivor.
+    added = store.add_memories(
+        [_note("c", content="Pin ruff"), _note("d", content="Pin ruff"), _note("e", content="other")],
+        [Relationship(id="r", source_id="e", target_id="d", type=EdgeType.RELATES_TO, scope="p")],
+        dedupe="merge",
+    )
+    assert [memory.id for memory in added] == ["c", "c", "e"]
+    assert _ids(store) == ["a", "c", "e"]
+    if store_kind != "json":
+        assert [rel.target_id for rel in store.list_relationships("e", scope="p")] == ["c"]
+
+
+@pytest.mark.parametrize("store_config", [{"dedupe": "bump"}])
+def test_bump_raises_importance_and_access_count(store):
+    accesses = store.add_memory(_note("a", importance=0.5)).access_count
+    store.add_memory(_note("b", importance=0.5))
+    kept = store.get_many(["a"])[0]
+    assert kept.importance == pytest.approx(0.5 + IMPORTANCE_BUMP)
+    assert kept.access_count == accesses + 1
+    assert _ids(store) == ["a"]
+
+
+def test_dedupe_policy_validation():
+    assert dedupe_policy({}) == "off"
+    assert dedupe_policy({"dedupe": "merge"}, "reject") == "reject"
+    with pytest.raises(ValueError):
+        dedupe_policy({"dedupe": "sometimes"})
+
+
+def test_existing_duplicates_are_hashed_once_on_upgrade(open_kind, tmp_path):
+    path = tmp_path / ".copal" / "memory.db"
+    path.parent.mkdir(parents=True)
+    conn = sqlite3.connect(path)
+    for migration in MIGRATIONS[:3]:
+        migration(conn)
+    conn.execute("PRAGMA user_version = 3")
+    conn.executemany(
+        "INSERT INTO memories (id, type, content, scope, importance, access_count) VALUES (?, ?, ?, ?, ?, ?)",
+        [("a", "note", "same", "p", 0.5, 0), ("b", "note", "same", "p", 0.5, 0)],
+    )
+    conn.commit()
+    conn.close()
+
+    store = open_kind("sqlite")
+    with store._get_connection() as conn:
+        hashes = dict(conn.execute("SELECT id, content_hash FROM memories").fetchall())
+    assert hashes["a"] is not None and hashes["b"] is None
+    # Rewriting the unhashed copy keeps it out of the unique index.
+    store.update_memory("b", importance=0.9)
+    store.upsert_many([store.get_many(["b"])[0]])
+    store.close()
+
+
+def test_add_command_dedupe(tmp_path, capsys):
+    def add(memory_id, dedupe):
+        return memory_add_command(
+            Namespace(
+                target=str(tmp_path), scope="p", metadata=None, type="note",
+                id=memory_id, content="Run tests before pushing", importance=0.5, dedupe=dedupe,
+            )
+        )
+
+    assert add("a", None) == 0
+    assert add("b", "reject") == 1
+    assert "duplicate of a" in capsys.readouterr().out
+    assert add("c", "merge") == 0
+    assert "Merged into existing memory a" in capsys.readouterr().out
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+
+from copal_cli.harness.session import SessionManager
+from copal_cli.memory.config import DatabaseSchemaError, load_memory_config
+from copal_cli.memory.factory import _POOL, close_stores, open_store, store_backend
+from copal_cli.memory.json_store import JsonMemoryStore
+from copal_cli.memory.models import Memory, MemoryType
+from copal_cli.memory.networkx_store import NetworkXMemoryStore
+from copal_cli.memory.sqlite_store import SQLiteMemoryStore
+from copal_cli.memory.vector import VectorIndexedStore
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool():
+    close_stores()
+    yield
+    close_stores()
+
+
+@pytest.mark.parametrize(
+    "backend, expected",
+    [("sqlite", SQLiteMemoryStore), ("graph", NetworkXMemoryStore), ("NetworkX", NetworkXMemoryStore),
+     ("json", JsonMemoryStore), ("mystery", JsonMemoryStore)],
+)
+def test_backend_selection(tmp_path, backend, expected):
+    store = open_store(tmp_path, {"backend": backend}, pooled=False)
+    assert isinstance(store, expected)
+    store.close()
+    assert store_backend({}) == "sqlite"
+
+
+def test_switching_backends_keeps_separate_databases(tmp_path):
+    sqlite_store = open_store(tmp_path, {"backend": "sqlite"}, pooled=False)
+    sqlite_store.add_memory(Memory(id="s", type=MemoryType.NOTE, content="from sqlite", scope="p"))
+    sqlite_store.close()
+
+    graph_store = open_store(tmp_path, {"backend": "graph"}, pooled=False)
+    assert graph_store.get_memory("s") is None
+    graph_store.add_memory(Memory(id="g", type=MemoryType.NOTE, content="from graph", scope="p"))
+    graph_store.close()
+    assert (tmp_path / ".copal" / "memory-graph.db").exists()
+
+    sqlite_store = open_store(tmp_path, {"backend": "sqlite"}, pooled=False)
+    assert [m.id for m in sqlite_store.list_memories(scope="p")] == ["s"]
+    sqlite_store.close()
+
+
+def test_configured_backend_switch_uses_the_graph_default(tmp_path):
+    config_file = tmp_path / ".copal" / "config.json"
+    config_file.parent.mkdir()
+    config_file.write_text(json.dumps({"memory": {"backend": "sqlite"}}))
+    sqlite_store = open_store(tmp_path, load_memory_config(tmp_path), pooled=False)
+    sqlite_store.add_memory(Memory(id="s", type=MemoryType.NOTE, content="from sqlite", scope="p"))
+    sqlite_store.close()
+
+    config_file.write_text(json.dumps({"memory": {"backend": "graph"}}))
+    graph_store = open_store(tmp_path, load_memory_config(tmp_path), pooled=False)
+    assert isinstance(graph_store, NetworkXMemoryStore)
+    assert graph_store.get_memory("s") is None
+    graph_store.close()
+    assert (tmp_path / ".copal" / "memory-graph.db").exists()
+
+
+def test_graph_store_keeps_its_legacy_database(tmp_path):
+    legacy = open_store(tmp_path, {"backend": "graph", "database": ".copal/memory.db"}, pooled=False)
+    legacy.add_memory(Memory(id="old", type=MemoryType.NOTE, content="kept", scope="p"))
+    legacy.close()
+
+    store = open_store(tmp_path, {"backend": "graph"}, pooled=False)
+    assert store.get_memory("old").content == "kept"
+    store.close()
+    assert not (tmp_path / ".copal" / "memory-graph.db").exists()
+
+
+def test_shared_database_file_of_another_backend_is_rejected(tmp_path):
+    open_store(tmp_path, {"backend": "sqlite"}, pooled=False).close()
+    with pytest.raises(DatabaseSchemaError, match="sqlite memory store"):
+        open_store(tmp_path, {"backend": "graph", "database": ".copal/memory.db"}, pooled=False)
+
+
+def test_leases_share_one_store(tmp_path):
+    config = {"backend": "graph"}
+    first = open_store(tmp_path, config)
+    second = open_store(tmp_path, dict(config))
+    assert first.store is second.store
+    assert _POOL.leases(tmp_path, config) == 2
+
+    first.add_memory(Memory(id="m1", type=MemoryType.NOTE, content="shared", scope="p"))
+    first.close()
+    first.close()  # releasing twice is harmless
+    assert _POOL.leases(tmp_path, config) == 1
+    assert second.get_memory("m1").content == "shared"
+    second.close()
+
+    # The idle store is kept warm for the next caller.
+    third = open_store(tmp_path, config)
+    assert third.store is second.store
+    third.close()
+
+
+def test_changed_config_rebuilds_idle_store(tmp_path):
+    plain = open_store(tmp_path, {"backend": "sqlite"})
+    busy = open_store(tmp_path, {"backend": "sqlite", "vector": {"enabled": True, "dimension": 16}})
+    # The shared store is leased, so the new settings get a private store.
+    assert isinstance(busy, VectorIndexedStore)
+    busy.close()
+    plain.close()
+
+    rebuilt = open_store(tmp_path, {"backend": "sqlite", "vector": {"enabled": True, "dimension": 16}})
+    assert isinstance(rebuilt.store, VectorIndexedStore)
+    rebuilt.close()
+
+
+def test_session_manager_uses_configured_backend(tmp_path):
+    (tmp_path / ".copal").mkdir()
+    (tmp_path / ".copal" / "config.json").write_text(json.dumps({"memory": {"backend": "graph"}}))
+    manager = SessionManager(tmp_path)
+    assert isinstance(manager._store.store, NetworkXMemoryStore)
+    assert manager.save_session_summary("7", "wired the factory") is not None
+    assert [s.task_id for s in manager.get_sessions()] == ["7"]
+    manager.close()
+    assert _POOL.leases(tmp_path, manager.config) == 0
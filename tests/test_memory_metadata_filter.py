@@ -0,0 +1,66 @@
+import pytest
+
+from copal_cli.memory.models import Memory, MemoryType
+
+KINDS = ["sqlite", "graph", "graph-lazy", "json"]
+
+
+def _seed(store):
+    store.upsert_many(
+        [
+            Memory(id="m1", type=MemoryType.NOTE, content="a", scope="p", metadata={"topic": "ci", "task_id": 7}),
+            Memory(id="m2", type=MemoryType.NOTE, content="b", scope="p", metadata={"topic": "ci", "flaky": True}),
+            Memory(id="m3", type=MemoryType.NOTE, content="c", scope="p", metadata={"topic": "docs"}),
+            Memory(id="m4", type=MemoryType.NOTE, content="d", scope="p", metadata={"topic": "ci", "task_id": "7"}),
+            Memory(id="m5", type=MemoryType.NOTE, content="e", scope="q", metadata={"topic": "ci"}),
+        ]
+    )
+
+
+def _ids(memories):
+    return sorted(memory.id for memory in memories)
+
+
+@pytest.mark.parametrize("store_kind", KINDS)
+def test_where_filters_metadata(store):
+    _seed(store)
+    assert _ids(store.list_memories(scope="p", where={"topic": "ci"})) == ["m1", "m2", "m4"]
+    # Values compare as text, so numbers and booleans match their string forms.
+    assert _ids(store.list_memories(scope="p", where={"task_id": 7})) == ["m1", "m4"]
+    assert _ids(store.list_memories(scope="p", where={"task_id": "7", "topic": "ci"})) == ["m1", "m4"]
+    assert _ids(store.list_memories(scope="p", where={"flaky": True})) == ["m2"]
+    assert _ids(store.list_memories(scope="p", where={"flaky": "1"})) == ["m2"]
+    # None matches memories without the key.
+    assert _ids(store.list_memories(scope="p", where={"task_id": None})) == ["m2", "m3"]
+
+    page = store.list_memories(scope="p", where={"topic": "ci"}, limit=1)
+    rest = list(store.iter_memories(scope="p", where={"topic": "ci"}, after=page[0].id))
+    assert _ids(page + rest) == ["m1", "m2", "m4"]
+
+
+@pytest.mark.parametrize("store_kind", KINDS)
+def test_where_rejects_unsafe_keys(store):
+    with pytest.raises(ValueError):
+        store.list_memories(where={"topic') OR 1=1 --": "x"})
+
+
+def test_indexed_keys_use_generated_column_index(open_kind):
+    store = open_kind("sqlite", indexed_metadata=["topic"])
+    _seed(store)
+    with store._get_connection() as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(memories)")}
+        assert "meta_topic" in columns and "meta_task_id" not in columns
+        plan = " ".join(
+            row[-1]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM memories WHERE scope = ? AND meta_topic = ?", ("p", "ci")
+            )
+        )
+    assert "idx_memories_meta_topic" in plan
+    assert _ids(store.list_memories(scope="p", where={"topic": "ci"})) == ["m1", "m2", "m4"]
+    store.close()
+
+    # Keys added to the config later are picked up on the next open.
+    store = open_kind("sqlite", indexed_metadata=["topic", "task_id"])
+    assert _ids(store.list_memories(scope="p", where={"task_id": 7})) == ["m1", "m4"]
+    store.close()
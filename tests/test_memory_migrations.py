@@ -0,0 +1,88 @@
+import json
+import sqlite3
+
+from copal_cli.memory.migrations import MIGRATIONS, SCHEMA_VERSION, migrate, schema_version
+from copal_cli.memory.models import Memory, MemoryType
+from copal_cli.memory.scope import ScopeManager
+from copal_cli.memory.sqlite_store import SQLiteMemoryStore
+
+
+def _legacy_db(path):
+    """Create a database as written before migrations existed (user_version 0)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    MIGRATIONS[0](conn)
+    conn.execute(
+        "INSERT INTO memories (id, type, content, scope, metadata, importance, access_count) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ("s1", "experience", "did things", "proj", json.dumps({"type": "session_summary"}), 0.8, 0),
+    )
+    conn.execute(
+        "INSERT INTO memories (id, type, content, scope, metadata, importance, access_count) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ("n1", "note", "plain note", "proj", "{}", 0.5, 0),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _open(tmp_path):
+    config = {"backend": "sqlite"}
+    return SQLiteMemoryStore(
+        target_root=tmp_path,
+        db_path=tmp_path / ".copal" / "memory.db",
+        config=config,
+        scope_manager=ScopeManager.from_config(tmp_path, config),
+    )
+
+
+def test_legacy_database_is_upgraded_in_place(tmp_path):
+    _legacy_db(tmp_path / ".copal" / "memory.db")
+    store = _open(tmp_path)
+
+    with store._get_connection() as conn:
+        assert schema_version(conn) == SCHEMA_VERSION
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {
+            "idx_memories_scope_type_created",
+            "idx_relationships_source",
+            "idx_relationships_target",
+            "idx_memories_sessions",
+        } <= indexes
+        flags = dict(conn.execute("SELECT id, session_summary FROM memories").fetchall())
+        assert flags == {"s1": 1, "n1": 0}
+
+        plan = " ".join(
+            row[-1]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM memories WHERE scope = ? AND type IN (?)",
+                ("proj", "note"),
+            )
+        )
+        assert "idx_memories_scope_type_created" in plan
+
+    # Existing rows stay readable and new writes maintain the promoted column.
+    assert store.get_memory("n1").content == "plain note"
+    store.add_memory(
+        Memory(
+            id="s2",
+            type=MemoryType.EXPERIENCE,
+            content="more",
+            scope="proj",
+            metadata={"type": "session_summary"},
+        )
+    )
+    with store._get_connection() as conn:
+        row = conn.execute("SELECT session_summary FROM memories WHERE id = 's2'").fetchone()
+        assert row[0] == 1
+    store.close()
+
+
+def test_migrate_is_idempotent_and_ignores_newer_versions(tmp_path):
+    conn = sqlite3.connect(tmp_path / "db.sqlite")
+    assert migrate(conn) == SCHEMA_VERSION
+    assert migrate(conn) == SCHEMA_VERSION
+
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 5}")
+    assert migrate(conn) == SCHEMA_VERSION + 5
+    conn.close()
@@ -0,0 +1,40 @@
+import pytest
+
+from copal_cli.memory.models import Memory, MemoryType
+
+
+def _pages(fetch, size):
+    pages, after = [], None
+    while True:
+        page = fetch(limit=size, after=after)
+        if not page:
+            return pages
+        pages.append([m.id for m in page])
+        after = page[-1].id
+
+
+@pytest.mark.parametrize("store_kind", ["sqlite", "graph", "graph-lazy", "json"])
+def test_cursor_pagination_covers_every_result_once(store):
+    store.upsert_many(
+        [
+            Memory(
+                id=f"m{i:02d}",
+                type=MemoryType.NOTE,
+                content=f"shared topic {'word ' * (i % 4)}",
+                scope="p",
+            )
+            for i in range(10)
+        ]
+    )
+
+    listed = _pages(lambda **kw: store.list_memories(scope="p", **kw), 3)
+    assert [len(page) for page in listed] == [3, 3, 3, 1]
+    assert sorted(sum(listed, [])) == [f"m{i:02d}" for i in range(10)]
+    assert [m.id for m in store.iter_memories(scope="p")] == sum(listed, [])
+
+    searched = _pages(lambda **kw: store.search_memories("shared", scope="p", **kw), 4)
+    assert [len(page) for page in searched] == [4, 4, 2]
+    assert [m.id for m in store.search_memories("shared", scope="p")] == sum(searched, [])
+    assert [m.id for m in store.iter_search("shared", scope="p", after=searched[0][-1])] == sum(searched[1:], [])
+
+    assert store.list_memories(scope="p", after="missing") == []
@@ -0,0 +1,78 @@
+import pytest
+
+from copal_cli.memory.models import Memory, MemoryType
+from copal_cli.memory.query import MemoryQueryEngine, parse_query
+
+try:
+    import networkx as nx
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    nx = None
+
+
+@pytest.fixture
+def engine():
+    if nx is None:
+        pytest.skip("networkx not installed")
+    graph = nx.MultiDiGraph()
+    engine = MemoryQueryEngine(graph)
+    for memory in [
+        Memory(id="a", type=MemoryType.NOTE, content="Adopt Redis for session storage", scope="p"),
+        Memory(id="b", type=MemoryType.DECISION, content="Session tokens expire hourly", scope="p"),
+        Memory(id="c", type=MemoryType.NOTE, content="Unrelated", scope="p", metadata={"topic": "authentication"}),
+        Memory(id="d", type=MemoryType.NOTE, content="Redis cluster sizing", scope="other"),
+    ]:
+        graph.add_node(memory.id, memory=memory)
+        engine.index(memory)
+    return engine
+
+
+def _ids(results):
+    return [m.id for m in results]
+
+
+def test_plain_query_keeps_substring_semantics(engine):
+    assert _ids(engine.search("redis", scope="p")) == ["a"]
+    assert _ids(engine.search("edi")) == ["a", "d"]
+    assert _ids(engine.search("dis for sess")) == ["a"]
+    # Both words occur, but not as one phrase.
+    assert _ids(engine.search("storage Redis")) == []
+    assert _ids(engine.search("thentic")) == ["c"]
+    assert _ids(engine.search("")) == ["a", "b", "c", "d"]
+
+
+def test_boolean_and_or_prefix(engine):
+    assert _ids(engine.search("storage AND redis")) == ["a"]
+    assert _ids(engine.search("session OR cluster")) == ["a", "b", "d"]
+    assert _ids(engine.search("auth*")) == ["c"]
+    assert _ids(engine.search("sess* AND hourly OR sizing", types=[MemoryType.DECISION])) == ["b"]
+    assert _ids(engine.search("redi")) == ["a", "d"]
+    assert _ids(engine.search("redi AND sizing")) == []
+
+
+def test_index_tracks_updates_and_deletes(engine):
+    memory = engine._graph.nodes["a"]["memory"]
+    memory.content = "Adopt Postgres for session storage"
+    engine.index(memory)
+    assert _ids(engine.search("redis")) == ["d"]
+    assert _ids(engine.search("postgres")) == ["a"]
+
+    engine._graph.remove_node("d")
+    engine.unindex("d")
+    assert _ids(engine.search("redis")) == []
+    assert "cluster" not in engine._postings
+
+
+def test_streamed_memories_match_like_the_index(engine):
+    memories = [engine._graph.nodes[n]["memory"] for n in ("a", "b", "c", "d")]
+    for query in ("edi", "session OR cluster", "auth*", "storage redis", "dis for sess"):
+        assert _ids(engine.search(query, memories=memories)) == _ids(engine.search(query)), query
+
+
+def test_parse_query_clauses():
+    parsed = parse_query("foo bar* OR baz")
+    assert parsed.boolean
+    assert [[(t.text, t.mode) for t in clause] for clause in parsed.clauses] == [
+        [("foo", "exact"), ("bar", "prefix")],
+        [("baz", "exact")],
+    ]
+    assert [t.mode for t in parse_query("alpha beta gamma").clauses[0]] == ["suffix", "exact", "prefix"]
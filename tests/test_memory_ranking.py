@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from copal_cli.memory.models import Memory, MemoryType
+from copal_cli.memory.ranking import RelevanceScorer, text_match
+
+NOW = datetime.now(timezone.utc)
+
+
+def _memory(memory_id, content="deploy notes", **fields):
+    fields.setdefault("updated_at", NOW)
+    return Memory(id=memory_id, type=MemoryType.NOTE, content=content, scope="p", **fields)
+
+
+def test_scorer_decays_with_age_and_rewards_use():
+    scorer = RelevanceScorer(half_life_days=10)
+    fresh = _memory("fresh")
+    old = _memory("old", updated_at=NOW - timedelta(days=10))
+    used = _memory("used", access_count=20, last_accessed=NOW)
+
+    fresh_score = scorer.score(fresh, now=NOW)
+    assert scorer.score(old, now=NOW) == pytest.approx(fresh_score - 0.5)
+    assert scorer.score(used, now=NOW) > fresh_score
+
+
+def test_top_k_skips_expired_and_orders_by_score():
+    scorer = RelevanceScorer(weights={"recency": 0.0, "frequency": 0.0})
+    memories = [
+        _memory("low", importance=0.1),
+        _memory("high", importance=0.9),
+        _memory("expired", importance=1.0, valid_until=NOW - timedelta(seconds=1)),
+        _memory("mid", importance=0.5),
+    ]
+    assert [m.id for m in scorer.top_k(memories, 2, now=NOW)] == ["high", "mid"]
+
+
+def test_text_match_saturates():
+    assert text_match(_memory("a"), "") == 1.0
+    assert text_match(_memory("a", content="cache"), "cache") == 0.5
+    assert text_match(_memory("a", content="cache caching"), "cach") > 0.5
+    assert text_match(_memory("a", content="other"), "cache") == 0.0
+
+
+@pytest.fixture
+def store_config():
+    return {"ranking": {"half_life_days": 7}}
+
+
+def test_rank_memories_across_backends(store):
+    store.upsert_many(
+        [
+            _memory("stale", content="deploy checklist", importance=0.9, updated_at=NOW - timedelta(days=3)),
+            _memory("fresh", content="deploy checklist", importance=0.9),
+            _memory("minor", content="deploy checklist", importance=0.1),
+            _memory("gone", content="deploy checklist", importance=1.0, valid_until=NOW - timedelta(days=1)),
+            _memory("other", content="unrelated", importance=1.0),
+        ]
+    )
+    ranked = store.rank_memories("deploy", scope="p", limit=3)
+    assert [m.id for m in ranked] == ["fresh", "stale", "minor"]
+    assert [m.id for m in store.rank_memories("deploy", scope="p", limit=1)] == ["fresh"]
+    assert "gone" not in {m.id for m in store.rank_memories(scope="p", limit=10)}
@@ -0,0 +1,112 @@
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from copal_cli.memory.cli_commands import memory_recall_command
+from copal_cli.memory.models import Memory, MemoryType
+from copal_cli.memory.query import bm25_rank
+from copal_cli.memory.recall import HybridRetriever, estimate_tokens, reciprocal_rank_fusion
+from copal_cli.memory.vector import HashingEmbedder, LocalVectorIndex, VectorIndexedStore
+
+
+def _memory(memory_id, content, memory_type=MemoryType.NOTE, **fields):
+    return Memory(id=memory_id, type=memory_type, content=content, scope="p", **fields)
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion({"a": ["x", "y", "z"], "b": ["y", "w"]}, k=60)
+    assert [memory_id for memory_id, _ in fused] == ["y", "x", "w", "z"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+    weighted = reciprocal_rank_fusion({"a": ["x"], "b": ["y"]}, weights={"a": 0.5})
+    assert [memory_id for memory_id, _ in weighted] == ["y", "x"]
+
+
+def test_bm25_rank_prefers_rare_terms_and_short_documents():
+    memories = [
+        _memory("common", "deploy deploy notes"),
+        _memory("rare", "deploy rollback"),
+        _memory("long", "rollback " + "filler " * 40),
+        _memory("none", "unrelated"),
+    ]
+    ranked = bm25_rank("deploy rollback", memories)
+    assert [m.id for m, _ in ranked] == ["rare", "common", "long"]
+    assert bm25_rank("", memories) == []
+
+
+def test_lexical_search_matches_any_term(store):
+    store.upsert_many(
+        [
+            _memory("both", "cache eviction policy"),
+            _memory("one", "eviction of stale workers"),
+            _memory("other", "frontend colours"),
+        ]
+    )
+    hits = store.lexical_search("cache eviction", scope="p", limit=5)
+    assert [m.id for m, _ in hits] == ["both", "one"]
+    assert hits[0][1] > hits[1][1] > 0
+    assert store.lexical_search("evict", scope="p", types=[MemoryType.DECISION]) == []
+
+
+def _vector_store(open_kind, tmp_path):
+    store = open_kind("sqlite")
+    index = LocalVectorIndex(tmp_path / ".copal" / "vectors", 128, model="hashing-128")
+    return VectorIndexedStore(store, index, HashingEmbedder(128))
+
+
+def test_recall_fuses_sources_and_respects_budgets(open_kind, tmp_path):
+    store = _vector_store(open_kind, tmp_path)
+    store.add_memories(
+        [
+            _memory("db", "sqlite write ahead logging keeps readers unblocked"),
+            _memory("long", "sqlite " + "details " * 200),
+            _memory("ui", "frontend button colours"),
+            _memory(
+                "old",
+                "sqlite logging was disabled",
+                valid_until=datetime.now(timezone.utc) - timedelta(days=1),
+            ),
+        ]
+    )
+    retriever = HybridRetriever(store, latency_budget_ms=10_000)
+
+    result = retriever.recall("sqlite logging", scope="p", token_budget=0)
+    assert result.hits[0].memory.id == "db"
+    assert result.hits[0].sources == ("lexical", "semantic")
+    assert "old" not in {hit.memory.id for hit in result.hits}
+    assert result.skipped == []
+
+    small = retriever.recall("sqlite logging", scope="p", token_budget=50)
+    assert "long" not in {hit.memory.id for hit in small.hits}
+    assert small.tokens <= 50
+    assert small.tokens == sum(estimate_tokens(hit.memory.content) for hit in small.hits)
+
+    assert [h.memory.id for h in retriever.recall("sqlite", scope="p", limit=1).hits] == ["db"]
+
+    rushed = HybridRetriever(store, latency_budget_ms=0).recall("sqlite logging", scope="p")
+    assert rushed.skipped == ["semantic"]
+    assert all(hit.sources == ("lexical",) for hit in rushed.hits)
+    store.close()
+
+
+def test_recall_reads_config():
+    retriever = HybridRetriever.from_config(object(), {"recall": {"candidates": 5, "weights": {"semantic": 2}}})
+    assert retriever.candidates == 5
+    assert retriever.weights == {"lexical": 1.0, "semantic": 2.0}
+
+
+def test_recall_command_jsonl(open_kind, tmp_path, capsys):
+    store = open_kind("sqlite")
+    store.add_memory(_memory("db", "sqlite write ahead logging"))
+    store.close()
+
+    args = argparse.Namespace(
+        target=str(tmp_path), query="sqlite", scope="p", types=None, limit=None, budget=None, format="jsonl"
+    )
+    assert memory_recall_command(args) == 0
+    [row] = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert row["id"] == "db"
+    assert row["sources"] == ["lexical"]
+    assert row["score"] == pytest.approx(1 / 61)
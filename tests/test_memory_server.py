@@ -0,0 +1,190 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from copal_cli.memory import remote
+from copal_cli.memory.branches import BranchExistsError
+from copal_cli.memory.factory import close_stores, create_store, open_store
+from copal_cli.memory.models import EdgeType, Memory, MemoryType, Relationship
+from copal_cli.memory.remote import RemoteMemoryStore
+from copal_cli.memory.rpc import RemoteStoreError, decode, encode, link_worktree, socket_path
+from copal_cli.memory.server import MemoryServer, _Call
+from copal_cli.memory.sqlite_store import SQLiteMemoryStore
+
+CONFIG = {"backend": "sqlite", "server": {"batch_window_ms": 50}}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool():
+    close_stores()
+    yield
+    close_stores()
+
+
+def _memory(memory_id, content=None, **fields):
+    return Memory(id=memory_id, type=MemoryType.NOTE, content=content or f"note {memory_id}", scope="proj", **fields)
+
+
+def test_wire_encoding_round_trips_store_types():
+    memory = _memory("m", metadata={"topic": "ci"})
+    value = {"hits": [(memory, 0.5)], "types": [MemoryType.DECISION], "edge": EdgeType.SUPERSEDES}
+    decoded = decode(encode(value))
+    [(copy, score)] = decoded["hits"]
+    assert (copy.id, copy.metadata, score) == ("m", {"topic": "ci"}, 0.5)
+    assert decoded["types"] == [MemoryType.DECISION] and decoded["edge"] is EdgeType.SUPERSEDES
+
+
+def test_commands_go_through_a_running_server(tmp_path, monkeypatch):
+    monkeypatch.setattr(remote, "PAGE_SIZE", 2)
+    with MemoryServer(tmp_path, CONFIG):
+        store = open_store(tmp_path, CONFIG)
+        assert isinstance(store, RemoteMemoryStore)
+        assert not hasattr(store, "semantic_search")
+
+        stored = store.add_memory(_memory("a", metadata={"topic": "ci"}))
+        assert stored.id == "a"
+        store.add_memories(
+            [_memory("b"), _memory("c")],
+            [Relationship(id="r", source_id="a", target_id="b", type=EdgeType.RELATES_TO, scope="proj")],
+        )
+        assert store.get_memory("a").metadata == {"topic": "ci"}
+        assert [m.id for m in store.list_memories(scope="proj", where={"topic": "ci"})] == ["a"]
+        assert sorted(m.id for m in store.iter_memories(scope="proj")) == ["a", "b", "c"]
+        assert [(m.id, hops) for m, hops in store.related_memories("a")] == [("b", 1)]
+        store.create_branch("7")
+        with pytest.raises(BranchExistsError):
+            store.create_branch("7")
+        store.close()
+
+    # The server wrote to the same database a direct store opens.
+    direct = open_store(tmp_path, CONFIG, pooled=False)
+    assert isinstance(direct, SQLiteMemoryStore)
+    assert len(direct.list_memories(scope="proj")) == 3
+    direct.close()
+
+
+def test_reads_are_cached_until_the_next_write(tmp_path):
+    with MemoryServer(tmp_path, CONFIG) as server:
+        store = open_store(tmp_path, CONFIG)
+        store.add_memory(_memory("a"))
+        assert len(store.list_memories(scope="proj")) == 1
+        generation = server.cache.generation
+        assert len(store.list_memories(scope="proj")) == 1
+        assert len(server.cache._entries) == 1
+        store.add_memory(_memory("b"))
+        assert server.cache.generation > generation
+        assert len(store.list_memories(scope="proj")) == 2
+        store.close()
+
+
+def test_concurrent_adds_share_transactions(tmp_path):
+    writers = 16
+    with MemoryServer(tmp_path, CONFIG) as server:
+        clients = [open_store(tmp_path, CONFIG) for _ in range(writers)]
+        barrier = threading.Barrier(writers)
+
+        def write(index, client):
+            barrier.wait()
+            client.add_memory(_memory(f"m{index}"))
+
+        threads = [threading.Thread(target=write, args=pair) for pair in enumerate(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(clients[0].list_memories(scope="proj")) == writers
+        # The writes arrived together and were committed in a few batches.
+        assert server.batches < writers
+        for client in clients:
+            client.close()
+
+
+def test_failed_batch_retries_untouched_payloads(tmp_path):
+    server = MemoryServer(tmp_path, CONFIG)
+    server._store = store = create_store(tmp_path, CONFIG)
+    add_memories = store.add_memories
+
+    def fail_combined(memories, *args, **kwargs):
+        if len(memories) > 1:
+            for memory in memories:
+                memory.touch()
+            raise ValueError("batch rejected")
+        return add_memories(memories, *args, **kwargs)
+
+    store.add_memories = fail_combined
+    calls = [_Call("add_memory", [_memory(name)], {}) for name in ("a", "b")]
+    server._execute(calls)
+    assert [call.result.access_count for call in calls] == [1, 1]
+    assert [m.access_count for m in store.get_many(["a", "b"])] == [1, 1]
+    store.close()
+
+
+def test_hung_server_falls_back_to_the_database(tmp_path):
+    config = {**CONFIG, "server": {**CONFIG["server"], "timeout": 0.2}}
+    with MemoryServer(tmp_path, config) as server:
+        store = open_store(tmp_path, config)
+        assert isinstance(store, RemoteMemoryStore)
+        server.respond = lambda line: time.sleep(1) or b""
+        assert store.list_memories(scope="proj") == []
+        store.add_memory(_memory("a"))
+        assert [m.id for m in store.list_memories(scope="proj")] == ["a"]
+        assert [m.id for m in store.iter_memories(scope="proj")] == ["a"]
+        store.close()
+    direct = open_store(tmp_path, config, pooled=False)
+    assert direct.get_memory("a") is not None
+    direct.close()
+
+
+def test_timed_out_write_is_not_replayed(tmp_path):
+    config = {**CONFIG, "server": {**CONFIG["server"], "timeout": 0.2}}
+    calls = []
+    with MemoryServer(tmp_path, config) as server:
+        store = open_store(tmp_path, config)
+        server.respond = lambda line: calls.append(line) or time.sleep(1) or b""
+        with pytest.raises(RemoteStoreError):
+            store.add_memory(_memory("a"))
+        assert len(calls) == 1
+        # Later calls go to the database directly.
+        assert store.list_memories(scope="proj") == []
+        store.add_memory(_memory("b"))
+        assert len(calls) == 1
+        store.close()
+    direct = open_store(tmp_path, config, pooled=False)
+    assert [m.id for m in direct.list_memories(scope="proj")] == ["b"]
+    direct.close()
+
+
+def test_worktree_shares_the_source_server(tmp_path):
+    source, worktree = tmp_path / "repo", tmp_path / "repo.wt" / "task"
+    (source / ".copal").mkdir(parents=True)
+    worktree.mkdir(parents=True)
+    link_worktree(source, worktree)
+    with MemoryServer(source, CONFIG):
+        store = open_store(worktree, CONFIG)
+        assert isinstance(store, RemoteMemoryStore) and store.root == source
+        store.add_memory(_memory("shared"))
+        store.close()
+        other = open_store(source, CONFIG)
+        assert other.get_memory("shared") is not None
+        other.close()
+
+
+def test_falls_back_to_files_without_a_server(tmp_path):
+    path = socket_path(tmp_path, CONFIG)
+    path.parent.mkdir(parents=True)
+    # A socket file left behind by a server that is no longer running.
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+    store = open_store(tmp_path, CONFIG, pooled=False)
+    assert isinstance(store, SQLiteMemoryStore)
+    store.close()
+
+    with MemoryServer(tmp_path, CONFIG):
+        with pytest.raises(OSError):
+            MemoryServer(tmp_path, CONFIG).start()
+        store = open_store(tmp_path, {**CONFIG, "server": {"discover": False}}, pooled=False)
+        assert isinstance(store, SQLiteMemoryStore)
+        store.close()
@@ -0,0 +1,213 @@
+import json
+from argparse import Namespace
+from unittest.mock import patch
+
+import pytest
+
+from copal_cli.memory.factory import close_stores, open_store
+from copal_cli.memory.models import EdgeType, Memory, MemoryType, Relationship
+from copal_cli.memory.snapshot import (
+    SnapshotError,
+    clone_file,
+    create_snapshot,
+    diff_snapshot,
+    load_snapshot,
+    merge_snapshot,
+)
+from copal_cli.memory.sqlite_store import SQLiteMemoryStore
+from copal_cli.worktree.commands import handle_remove
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool():
+    close_stores()
+    yield
+    close_stores()
+
+
+def _memory(memory_id, content=None):
+    return Memory(id=memory_id, type=MemoryType.NOTE, content=content or f"note {memory_id}", scope="proj")
+
+
+def _project(tmp_path, backend="sqlite"):
+    parent, worktree = tmp_path / "repo", tmp_path / "repo.wt" / "task"
+    (parent / ".copal").mkdir(parents=True)
+    (parent / ".copal" / "config.json").write_text(json.dumps({"memory": {"backend": backend}}))
+    worktree.mkdir(parents=True)
+    store = open_store(parent)
+    store.add_memories([_memory(name) for name in ("keep", "edit", "both", "drop", "gone")])
+    store.close()
+    return parent, worktree
+
+
+def _edit(root, memory_id, content):
+    store = open_store(root)
+    store.update_memory(memory_id, content=content)
+    store.close()
+
+
+def _contents(root):
+    store = open_store(root)
+    try:
+        return {memory.id: memory.content for memory in store.iter_memories(scope="proj")}
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "graph"])
+def test_three_way_merge(tmp_path, backend):
+    parent, worktree = _project(tmp_path, backend)
+    snapshot = create_snapshot(parent, worktree)
+    assert snapshot.method in ("reflink", "copy")
+    assert load_snapshot(worktree).parent == parent.resolve()
+    assert _contents(worktree) == _contents(parent)
+
+    # The task's changes stay in its overlay...
+    task = open_store(worktree)
+    task.add_memory(_memory("new"), [Relationship(id="r", source_id="new", target_id="keep",
+                                                  type=EdgeType.RELATES_TO, scope="proj")])
+    task.update_memory("edit", content="task edit")
+    task.update_memory("both", content="task version")
+    task.delete_memory("drop")
+    task.delete_memory("gone")
+    task.close()
+    assert "new" not in _contents(parent)
+    # ...while the project moves on.
+    _edit(parent, "both", "project version")
+    _edit(parent, "gone", "edited after snapshot")
+
+    delta = diff_snapshot(snapshot)
+    assert sorted(memory.id for memory in delta.upserts) == ["edit", "new"]
+    assert delta.deletions == ["drop"]
+    assert [rel.id for rel in delta.relationships] == ["r"]
+    conflicts = {conflict.memory_id: conflict for conflict in delta.conflicts}
+    assert set(conflicts) == {"both", "gone"}
+    assert conflicts["gone"].task is None
+
+    assert merge_snapshot(snapshot, delta) == 3
+    merged = _contents(parent)
+    assert merged == {"keep": "note keep", "edit": "task edit", "both": "project version",
+                      "gone": "edited after snapshot", "new": "note new"}
+    store = open_store(parent)
+    assert [rel.id for rel in store.list_relationships("new", scope="proj")] == ["r"]
+    store.close()
+
+    # Merging again is a no-op apart from the conflicts, which the task can win.
+    delta = diff_snapshot(snapshot)
+    assert delta.changes == 0 and len(delta.conflicts) == 2
+    merge_snapshot(snapshot, delta, prefer_task=True)
+    assert _contents(parent) == {"keep": "note keep", "edit": "task edit", "both": "task version",
+                                 "new": "note new"}
+
+
+def _edge(rel_id, source, target, weight=1.0):
+    return Relationship(id=rel_id, source_id=source, target_id=target, type=EdgeType.RELATES_TO,
+                        scope="proj", weight=weight)
+
+
+def _reweigh(root, rel_id, source, target, weight):
+    store = open_store(root)
+    store.apply_changes([], [_edge(rel_id, source, target, weight)], relationship_deletions=[rel_id])
+    store.close()
+
+
+def _edges(root):
+    store = open_store(root)
+    try:
+        return {rel.id: rel.weight for memory in store.iter_memories(scope="proj")
+                for rel in store.list_relationships(memory.id, scope="proj")}
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "graph"])
+def test_relationship_changes_and_conflicts(tmp_path, backend):
+    parent, worktree = _project(tmp_path, backend)
+    store = open_store(parent)
+    store.upsert_many([], [_edge("e1", "keep", "edit"), _edge("e2", "keep", "both"),
+                           _edge("e3", "edit", "both")])
+    store.close()
+    snapshot = create_snapshot(parent, worktree)
+
+    task = open_store(worktree)
+    task.apply_changes([], [_edge("e4", "keep", "drop"), _edge("e5", "gone", "keep")],
+                       relationship_deletions=["e1"])
+    task.close()
+    _reweigh(worktree, "e2", "keep", "both", 0.5)
+    _reweigh(worktree, "e3", "edit", "both", 0.5)
+    _reweigh(parent, "e3", "edit", "both", 0.8)
+    store = open_store(parent)
+    store.delete_many(["drop"])
+    store.close()
+
+    delta = diff_snapshot(snapshot)
+    assert delta.relationship_deletions == ["e1"]
+    assert [(rel.id, rel.weight) for rel in delta.relationships] == [("e2", 0.5), ("e5", 1.0)]
+    conflicts = {conflict.relationship_id: conflict for conflict in delta.relationship_conflicts}
+    assert set(conflicts) == {"e3", "e4"}
+    assert conflicts["e3"].parent.weight == 0.8 and conflicts["e3"].task.weight == 0.5
+    assert conflicts["e4"].parent is None
+
+    merge_snapshot(snapshot, delta)
+    assert _edges(parent) == {"e2": 0.5, "e3": 0.8, "e5": 1.0}
+    delta = diff_snapshot(snapshot)
+    assert delta.changes == 0 and len(delta.relationship_conflicts) == 2
+    merge_snapshot(snapshot, delta, prefer_task=True)
+    # The task's edge to a memory the project deleted is never written.
+    assert _edges(parent) == {"e2": 0.5, "e3": 0.5, "e5": 1.0}
+
+
+def test_failed_merge_changes_nothing(tmp_path):
+    parent, worktree = _project(tmp_path)
+    snapshot = create_snapshot(parent, worktree)
+    task = open_store(worktree)
+    task.update_memory("edit", content="task edit")
+    task.delete_memory("drop")
+    task.close()
+    delta = diff_snapshot(snapshot)
+    close_stores()
+
+    with patch.object(SQLiteMemoryStore, "_write_rows", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            merge_snapshot(snapshot, delta)
+    assert _contents(parent)["drop"] == "note drop"
+    assert _contents(parent)["edit"] == "note edit"
+
+    assert merge_snapshot(snapshot, diff_snapshot(snapshot)) == 2
+    assert "drop" not in _contents(parent)
+    assert diff_snapshot(snapshot).changes == 0
+
+
+def test_snapshot_requires_separate_sqlite_database(tmp_path):
+    parent, worktree = _project(tmp_path, "json")
+    with pytest.raises(SnapshotError):
+        create_snapshot(parent, worktree)
+    shared = tmp_path / "shared.db"
+    (parent / ".copal" / "config.json").write_text(json.dumps({"memory": {"database": str(shared)}}))
+    with pytest.raises(SnapshotError):
+        create_snapshot(parent, worktree)
+
+
+def test_clone_file_copies_contents(tmp_path):
+    source = tmp_path / "a.db"
+    source.write_bytes(b"x" * 10_000)
+    assert clone_file(source, tmp_path / "b.db") in ("reflink", "copy")
+    assert (tmp_path / "b.db").read_bytes() == source.read_bytes()
+
+
+def test_remove_merges_or_refuses(tmp_path):
+    parent, worktree = _project(tmp_path)
+    create_snapshot(parent, worktree)
+    task = open_store(worktree)
+    task.add_memory(_memory("new"))
+    task.close()
+
+    with patch("copal_cli.worktree.commands.get_repo_root", return_value=parent), \
+         patch("copal_cli.worktree.commands.worktree_remove", return_value=True) as remove, \
+         patch("os.getcwd", return_value=str(parent)):
+        # Non-interactive without a decision: keep the worktree.
+        with patch("sys.stdin.isatty", return_value=False):
+            assert handle_remove(Namespace(name=str(worktree), force=False)) == 1
+        remove.assert_not_called()
+        assert handle_remove(Namespace(name=str(worktree), force=False, merge_memory=True)) == 0
+    assert "new" in _contents(parent)
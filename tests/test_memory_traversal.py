@@ -0,0 +1,116 @@
+import pytest
+
+from copal_cli.memory.models import EdgeType, Memory, MemoryType, Relationship
+from copal_cli.memory.networkx_store import NetworkXMemoryStore
+from copal_cli.memory.scope import ScopeManager
+from copal_cli.memory.sqlite_store import SQLiteMemoryStore
+
+SCOPE = "proj"
+
+
+def _build(kind, tmp_path):
+    config = {"backend": kind, "database": ".copal/memory.db"}
+    if kind == "lazy":
+        config["graph"] = {"lazy": True, "cache_size": 2}
+    scope_manager = ScopeManager.from_config(tmp_path, config)
+    if kind == "sqlite":
+        return SQLiteMemoryStore(
+            target_root=tmp_path,
+            db_path=tmp_path / ".copal" / "memory.db",
+            config=config,
+            scope_manager=scope_manager,
+        )
+    return NetworkXMemoryStore(tmp_path, config=config, scope_manager=scope_manager)
+
+
+def _edge(source, target, edge_type):
+    return Relationship(
+        id=f"{source}-{target}", source_id=source, target_id=target, type=edge_type, scope=SCOPE
+    )
+
+
+@pytest.fixture(params=["sqlite", "networkx", "lazy"])
+def store(request, tmp_path):
+    ids = ["a", "b", "c", "d", "v1", "v2", "v3", "s1", "s2", "s3"]
+    edges = [
+        _edge("a", "b", EdgeType.DEPENDS_ON),
+        _edge("b", "c", EdgeType.DEPENDS_ON),
+        _edge("d", "a", EdgeType.RELATES_TO),
+        _edge("v2", "v1", EdgeType.SUPERSEDES),
+        _edge("v3", "v2", EdgeType.SUPERSEDES),
+        _edge("s1", "s2", EdgeType.TEMPORAL_SEQUENCE),
+        _edge("s2", "s3", EdgeType.TEMPORAL_SEQUENCE),
+    ]
+    # Populate through an eager store so the lazy variant starts cold.
+    seed = _build("sqlite" if request.param == "sqlite" else "networkx", tmp_path)
+    seed.add_memories(
+        [Memory(id=i, type=MemoryType.NOTE, content=f"memory {i}", scope=SCOPE) for i in ids],
+        edges,
+    )
+    seed.close()
+    store = _build(request.param, tmp_path)
+    yield store
+    store.close()
+
+
+def test_list_relationships_direction(store):
+    assert [r.id for r in store.list_relationships("a", scope=SCOPE)] == ["a-b"]
+    assert [r.id for r in store.list_relationships("a", scope=SCOPE, direction="in")] == ["d-a"]
+    both = store.list_relationships("a", scope=SCOPE, direction="both")
+    assert {r.id for r in both} == {"a-b", "d-a"}
+    with pytest.raises(ValueError):
+        store.list_relationships("a", scope=SCOPE, direction="sideways")
+
+
+def test_related_memories_k_hop(store):
+    one_hop = store.related_memories("a", scope=SCOPE)
+    assert sorted((m.id, hops) for m, hops in one_hop) == [("b", 1), ("d", 1)]
+
+    two_hops = store.related_memories("a", depth=2, scope=SCOPE)
+    assert sorted((m.id, hops) for m, hops in two_hops) == [("b", 1), ("c", 2), ("d", 1)]
+
+    deps = store.related_memories(
+        "a", depth=3, edge_types=[EdgeType.DEPENDS_ON], direction="out", scope=SCOPE
+    )
+    assert [(m.id, hops) for m, hops in deps] == [("b", 1), ("c", 2)]
+
+
+def test_find_path(store):
+    path = store.find_path("d", "c", scope=SCOPE)
+    assert [m.id for m in path] == ["d", "a", "b", "c"]
+    assert [m.id for m in store.find_path("c", "d", scope=SCOPE)] == ["c", "b", "a", "d"]
+    assert store.find_path("c", "d", direction="out", scope=SCOPE) is None
+    assert store.find_path("d", "c", max_depth=2, scope=SCOPE) is None
+    assert store.find_path("a", "v1", scope=SCOPE) is None
+
+
+def test_latest_version_and_session_chain(store):
+    assert store.latest_version("v1", scope=SCOPE).id == "v3"
+    assert store.latest_version("v3", scope=SCOPE).id == "v3"
+    assert store.latest_version("missing", scope=SCOPE) is None
+
+    assert [m.id for m in store.session_chain("s2", scope=SCOPE)] == ["s1", "s2", "s3"]
+    assert [m.id for m in store.session_chain("s2", direction="out", scope=SCOPE)] == ["s2", "s3"]
+    assert [m.id for m in store.session_chain("s1", limit=2, scope=SCOPE)] == ["s1", "s2"]
+
+
+def test_session_chain_limit_keeps_the_nearest_on_both_sides(tmp_path):
+    ids = [f"s{i}" for i in range(9)]
+    chains = {}
+    for kind in ("sqlite", "networkx"):
+        store = _build(kind, tmp_path / kind)
+        store.add_memories(
+            [Memory(id=i, type=MemoryType.NOTE, content=f"memory {i}", scope=SCOPE) for i in ids],
+            [_edge(a, b, EdgeType.TEMPORAL_SEQUENCE) for a, b in zip(ids, ids[1:])],
+        )
+        chains[kind] = {
+            (start, limit): [m.id for m in store.session_chain(start, limit=limit, scope=SCOPE)]
+            for start in ("s1", "s4", "s7")
+            for limit in (1, 2, 3, 4, 5)
+        }
+        store.close()
+    assert chains["sqlite"] == chains["networkx"]
+    assert chains["sqlite"]["s4", 3] == ["s3", "s4", "s5"]
+    assert chains["sqlite"]["s4", 4] == ["s2", "s3", "s4", "s5"]
+    assert chains["sqlite"]["s1", 4] == ["s0", "s1", "s2", "s3"]
+    assert chains["sqlite"]["s7", 5] == ["s4", "s5", "s6", "s7", "s8"]
@@ -0,0 +1,150 @@
+import argparse
+import json
+
+import pytest
+
+from copal_cli.memory.cli_commands import memory_reindex_command, memory_search_command
+from copal_cli.memory.models import Memory, MemoryType
+from copal_cli.memory.scope import ScopeManager
+from copal_cli.memory.sqlite_store import SQLiteMemoryStore
+from copal_cli.memory.vector import HashingEmbedder, LocalVectorIndex, VectorIndexedStore
+from copal_cli.memory.vector import index as index_module
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_hashing_embedder_is_deterministic_and_reflects_overlap():
+    embedder = HashingEmbedder(64)
+    base, close, far = embedder.embed(
+        ["sqlite write ahead logging", "enable sqlite write ahead log", "frontend button colours"]
+    )
+    assert embedder.embed(["sqlite write ahead logging"])[0] == base
+    assert len(base) == 64
+    assert _cosine(base, close) > _cosine(base, far)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def index_factory(request, monkeypatch, tmp_path):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(index_module, "np", None)
+    return lambda **kw: LocalVectorIndex(tmp_path / "vectors", 3, model="m", **kw)
+
+
+def test_local_index_upsert_search_delete_and_reload(index_factory):
+    index = index_factory()
+    index.upsert([("a", "p", [1, 0, 0]), ("b", "p", [0, 1, 0]), ("c", "q", [1, 1, 0])])
+    hits = index.search([1, 0.1, 0], 2)
+    assert [memory_id for memory_id, _ in hits] == ["a", "c"]
+    assert hits[0][1] == pytest.approx(0.995, abs=1e-3)
+    assert [memory_id for memory_id, _ in index.search([1, 0, 0], 5, scope="q")] == ["c"]
+
+    # Updates replace, deletes remove, and a second handle sees both.
+    index.upsert([("b", "p", [1, 0, 0.1])])
+    index.delete(["a", "missing"])
+    other = index_factory()
+    assert other.count() == 2
+    assert [memory_id for memory_id, _ in other.search([1, 0, 0], 5)] == ["b", "c"]
+
+    index.clear("q")
+    assert [memory_id for memory_id, _ in other.search([1, 0, 0], 5)] == ["b"]
+
+
+def test_local_index_compacts_dead_rows(index_factory, monkeypatch):
+    monkeypatch.setattr(index_module, "COMPACT_MIN_DEAD_ROWS", 2)
+    index = index_factory()
+    for step in range(5):
+        index.upsert([("a", "p", [1, step, 0]), ("b", "p", [0, 1, step])])
+    assert index._total_rows <= 4
+    assert index.vectors_file.stat().st_size == index._total_rows * 12
+    assert index.count() == 2
+    assert index.search([1, 4, 0], 1)[0][0] == "a"
+
+
+def test_local_index_discards_vectors_from_another_model(tmp_path):
+    index = LocalVectorIndex(tmp_path, 3, model="one")
+    index.upsert([("a", "p", [1, 0, 0])])
+    assert LocalVectorIndex(tmp_path, 3, model="two").count() == 0
+
+
+def _vector_store(tmp_path):
+    config = {"backend": "sqlite"}
+    store = SQLiteMemoryStore(
+        target_root=tmp_path,
+        db_path=tmp_path / ".copal" / "memory.db",
+        config=config,
+        scope_manager=ScopeManager.from_config(tmp_path, config),
+    )
+    index = LocalVectorIndex(tmp_path / ".copal" / "vectors", 128, model="hashing-128")
+    return VectorIndexedStore(store, index, HashingEmbedder(128), batch_size=2)
+
+
+def _memory(memory_id, content, memory_type=MemoryType.NOTE):
+    return Memory(id=memory_id, type=memory_type, content=content, scope="p")
+
+
+def test_vector_store_stays_in_sync_with_writes(tmp_path):
+    store = _vector_store(tmp_path)
+    store.add_memory(_memory("db", "sqlite write ahead logging tuning"))
+    store.add_memories(
+        [
+            _memory("ui", "frontend button colours"),
+            _memory("cache", "redis cache eviction policy", MemoryType.DECISION),
+        ]
+    )
+
+    hits = store.semantic_search("sqlite logging", scope="p", limit=1)
+    assert [(memory.id, round(score, 6) > 0) for memory, score in hits] == [("db", True)]
+    assert [m.id for m, _ in store.semantic_search("cache eviction", types=[MemoryType.DECISION])] == ["cache"]
+
+    store.update_memory("ui", content="sqlite logging dashboard")
+    assert store.semantic_search("dashboard", limit=1)[0][0].id == "ui"
+
+    store.delete_memory("db")
+    store.delete_many(["cache"], scope="other")
+    assert store.index.count() == 2
+    store.delete_many(["cache"])
+    assert {m.id for m, _ in store.semantic_search("sqlite logging cache")} == {"ui"}
+
+    # Writes that bypass the wrapper are picked up by a rebuild.
+    store.store.add_memory(_memory("late", "late arrival about sqlite"))
+    assert store.reindex("p") == 2
+    assert store.index.count() == 2
+    store.close()
+
+
+def _args(tmp_path, **kwargs):
+    defaults = {"target": str(tmp_path), "scope": "p", "types": None, "limit": None, "top": None,
+                "after": None, "format": "table", "semantic": False}
+    defaults.update(kwargs)
+    return argparse.Namespace(**defaults)
+
+
+def test_semantic_search_cli(tmp_path, capsys):
+    (tmp_path / ".copal").mkdir()
+    config_path = tmp_path / ".copal" / "config.json"
+
+    assert memory_search_command(_args(tmp_path, query="x", semantic=True)) == 1
+    assert "disabled" in capsys.readouterr().out
+
+    config_path.write_text(json.dumps({"memory": {"vector": {"enabled": True, "dimension": 64}}}))
+    store = SQLiteMemoryStore(
+        target_root=tmp_path,
+        db_path=tmp_path / ".copal" / "memory.db",
+        config={},
+        scope_manager=ScopeManager.from_config(tmp_path, {}),
+    )
+    store.add_memory(_memory("db", "sqlite write ahead logging"))
+    store.add_memory(_memory("ui", "frontend button colours"))
+    store.close()
+
+    assert memory_reindex_command(_args(tmp_path)) == 0
+    assert "Reindexed 2 memories" in capsys.readouterr().out
+
+    assert memory_search_command(_args(tmp_path, query="sqlite logging", semantic=True, limit=1,
+                                       format="jsonl")) == 0
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["id"] for row in rows] == ["db"]
@@ -1,11 +1,12 @@
 """Unit tests for session.py SessionManager class."""
 
+import json
 import pytest
 from unittest.mock import MagicMock, patch
 from pathlib import Path
 from datetime import datetime, timezone
 
-from copal_cli.harness.session import SessionManager, SessionSummary
+from copal_cli.harness.session import SessionManager, SessionSummary, sessions_command
 from copal_cli.memory.models import Memory, MemoryType, EdgeType
 
 
@@ -14,16 +15,13 @@ def mock_memory_enabled():
     """Mock memory as enabled with SQLite store."""
     with patch("copal_cli.harness.session.is_memory_enabled") as mock_enabled, \
          patch("copal_cli.harness.session.load_memory_config") as mock_config, \
-         patch("copal_cli.harness.session.resolve_database_path") as mock_db_path, \
-         patch("copal_cli.harness.session.SQLiteMemoryStore") as mock_store_cls, \
+         patch("copal_cli.harness.session.open_store") as mock_open_store, \
          patch("copal_cli.harness.session.ScopeManager") as mock_scope_mgr:
         
         mock_enabled.return_value = True
         mock_config.return_value = {"enabled": True}
-        mock_db_path.return_value = Path("/tmp/test_memory.sqlite")
-        
         mock_store = MagicMock()
-        mock_store_cls.return_value = mock_store
+        mock_open_store.return_value = mock_store
         
         mock_scope = MagicMock()
         mock_scope.current_scope = "test-scope"
@@ -88,7 +86,7 @@ class TestSessionManager:
         mock_store = mock_memory_enabled["store"]
         
         # No previous session
-        mock_store.list_memories.return_value = []
+        mock_store.list_sessions.return_value = []
         
         result = manager.save_session_summary("task-1", "Completed task successfully")
         
@@ -117,8 +115,7 @@ class TestSessionManager:
             metadata={"task_id": "task-0", "type": "session_summary"},
             scope="test-scope",
         )
-        mock_store.list_memories.return_value = [prev_memory]
-        mock_store.get_memory.return_value = prev_memory
+        mock_store.list_sessions.return_value = [prev_memory]
         
         result = manager.save_session_summary("task-1", "New session")
         
@@ -143,7 +140,7 @@ class TestSessionManager:
     def test_get_recent_sessions_empty(self, tmp_path, mock_memory_enabled):
         manager = SessionManager(tmp_path)
         mock_store = mock_memory_enabled["store"]
-        mock_store.list_memories.return_value = []
+        mock_store.list_sessions.return_value = []
         
         result = manager.get_recent_sessions(limit=5)
         
@@ -166,43 +163,74 @@ class TestSessionManager:
             )
             for i in range(3)
         ]
-        mock_store.list_memories.return_value = memories
+        mock_store.list_sessions.return_value = memories
         
         result = manager.get_recent_sessions(limit=5)
         
         assert len(result) == 3
         assert all(isinstance(s, SessionSummary) for s in result)
+        mock_store.list_sessions.assert_called_once_with(
+            scope="test-scope", task_id=None, since=None, until=None, limit=5
+        )
 
-    def test_get_recent_sessions_filters_non_summaries(self, tmp_path, mock_memory_enabled):
-        manager = SessionManager(tmp_path)
-        mock_store = mock_memory_enabled["store"]
-        
-        now = datetime.now(timezone.utc)
-        # Mix of session summaries and other EXPERIENCE memories
-        memories = [
-            Memory(
-                id="session-1",
-                type=MemoryType.EXPERIENCE,
-                content="Real session",
-                metadata={"task_id": "1", "type": "session_summary"},
-                scope="test-scope",
-                created_at=now,
-            ),
-            Memory(
-                id="other-exp",
-                type=MemoryType.EXPERIENCE,
-                content="Other experience",
-                metadata={"type": "other"},
-                scope="test-scope",
-                created_at=now,
-            ),
-        ]
-        mock_store.list_memories.return_value = memories
-        
-        result = manager.get_recent_sessions(limit=5)
-        
-        assert len(result) == 1
-        assert result[0].id == "session-1"
+    def test_get_sessions_uses_indexed_store_query(self, tmp_path):
+        config = {"backend": "sqlite"}
+        with patch("copal_cli.harness.session.load_memory_config", return_value=config):
+            manager = SessionManager(tmp_path)
+        store = manager._store
+        day = datetime(2025, 1, 10, tzinfo=timezone.utc)
+        store.upsert_many(
+            [
+                Memory(
+                    id=f"s{i}",
+                    type=MemoryType.EXPERIENCE,
+                    content=f"session {i}",
+                    scope=manager.scope_manager.current_scope,
+                    metadata={"task_id": str(i % 2), "type": "session_summary"},
+                    created_at=day.replace(day=10 + i),
+                )
+                for i in range(4)
+            ]
+            + [
+                Memory(
+                    id="other-exp",
+                    type=MemoryType.EXPERIENCE,
+                    content="Other experience",
+                    metadata={"type": "other"},
+                    scope=manager.scope_manager.current_scope,
+                    created_at=day.replace(day=20),
+                ),
+                Memory(
+                    id="archived",
+                    type=MemoryType.EXPERIENCE,
+                    content="Archived session",
+                    metadata={"task_id": "1", "type": "session_summary"},
+                    scope=manager.scope_manager.current_scope,
+                    created_at=day.replace(day=21),
+                    valid_until=day.replace(day=22),
+                ),
+            ]
+        )
+
+        assert [s.id for s in manager.get_recent_sessions(limit=2)] == ["s3", "s2"]
+        assert [s.id for s in manager.get_sessions(task_id="1")] == ["s3", "s1"]
+        window = manager.get_sessions(since=day.replace(day=11), until=day.replace(day=13))
+        assert [s.id for s in window] == ["s2", "s1"]
+        assert manager._get_latest_session_memory().id == "s3"
+
+        with store._get_connection() as conn:
+            plan = " ".join(
+                row[-1]
+                for row in conn.execute(
+                    "EXPLAIN QUERY PLAN SELECT * FROM memories WHERE session_summary = 1 "
+                    "AND valid_until IS NULL AND scope = ? AND task_id = ? "
+                    "ORDER BY created_at DESC, rowid DESC LIMIT 5",
+                    ("p", "1"),
+                )
+            )
+        assert "idx_memories_sessions_task" in plan
+        assert "TEMP B-TREE" not in plan
+        manager.close()
 
     def test_get_recent_sessions_disabled_returns_empty(self, tmp_path, mock_memory_disabled):
         manager = SessionManager(tmp_path)
@@ -218,3 +246,16 @@ class TestSessionManager:
         manager.close()
         
         mock_store.close.assert_called_once()
+
+
+def test_sessions_command_filters_by_task(tmp_path, capsys):
+    manager = SessionManager(tmp_path)
+    manager.save_session_summary("1", "first")
+    manager.save_session_summary("2", "second")
+    manager.close()
+
+    assert sessions_command(target=str(tmp_path), task_id="2", fmt="jsonl") == 0
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(row["task_id"], row["content"]) for row in rows] == [("2", "second")]
+
+    assert sessions_command(target=str(tmp_path), since="not-a-date") == 1
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from pathlib import Path
+from copal_cli.memory.rpc import shared_root
 from copal_cli.worktree.sync import sync_assets
 
 def test_sync_assets_no_source(tmp_path):
@@ -29,6 +30,7 @@ def test_sync_assets_success(tmp_path):
     assert (dst_copal / "memory-config.json").exists()
     assert (dst_copal / "runtime").exists()
     assert (dst_copal / "memory").exists()
+    assert shared_root(dst) == src.resolve()
 
 def test_sync_assets_failure(tmp_path):
     src = tmp_path / "src"